@@ -0,0 +1,166 @@
+# admission_estimator.py
+# ---------------------------------------------------------------------
+# 학생 한 명의 환산등급/전교과 등급으로 (대학, 모집단위, 전형)별 합격 가능성 추정
+#
+# 그룹마다 최종 합격자(합격+충원합격) 등급을 정렬해 하나의 배열에 이어 붙이고
+# (그룹 번호 * 간격 + 등급)을 키로 쓰면 전체가 하나의 정렬 배열이 된다.
+# 학생 등급으로 그룹 수만큼의 질의 키를 만들어 np.searchsorted 한 번으로
+# 모든 그룹의 경험적 누적분포(ECDF) 값을 구한다.
+#
+#   가능성 = 그룹 합격자 중 학생보다 등급이 같거나 낮은(숫자가 큰) 합격자 비율
+#   (1.0이면 모든 합격자보다 좋거나 같고, 0이면 모든 합격자보다 낮음)
+# ---------------------------------------------------------------------
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from selection_stats import GRADE_COLUMNS, RESULT_KEYS
+
+GROUP_COLUMNS = ("univ", "dept", "subtype")
+
+
+class AdmissionEstimator:
+    """
+    로드한 데이터셋에서 만든 합격 가능성 추정기.
+    min_pass: 합격자 등급이 이보다 적은 그룹은 추정하지 않는다 (NaN).
+    """
+
+    def __init__(self, df: pd.DataFrame, min_pass: int = 3):
+        self.min_pass = min_pass
+        keys = pd.MultiIndex.from_frame(df[list(GROUP_COLUMNS)])
+        gid, groups = keys.factorize()
+        self.n_groups = len(groups)
+        self._group_values = {
+            dim: groups.get_level_values(level).to_numpy() for level, dim in enumerate(GROUP_COLUMNS)
+        }
+
+        passed = df["result"].isin(RESULT_KEYS[:2]).to_numpy()
+        self.applicants = np.bincount(gid, minlength=self.n_groups)
+        self.pass_count = np.bincount(gid[passed], minlength=self.n_groups)
+
+        # 등급 종류별 정렬 키 배열 (CSR: offsets[g]:offsets[g+1]이 그룹 g의 합격자)
+        self._index = {}
+        for col in GRADE_COLUMNS:
+            grades = df[col].to_numpy(dtype=float)
+            valid = passed & ~np.isnan(grades)
+            g, v = gid[valid], grades[valid]
+            order = np.lexsort((v, g))
+            g, v = g[order], v[order]
+            offsets = np.searchsorted(g, np.arange(self.n_groups + 1))
+            lo = float(v.min()) if len(v) else 0.0
+            span = float(v.max()) - lo if len(v) else 0.0
+            stride = span + 1.0  # 그룹 사이에 1 이상의 간격을 둔다
+            self._index[col] = {
+                "keys": g * stride + (v - lo),
+                "offsets": offsets,
+                "lo": lo,
+                "span": span,
+                "stride": stride,
+            }
+
+    def likelihood(self, grade_column: str, grade: float) -> np.ndarray:
+        """모든 그룹에 대한 가능성 배열 (길이 n_groups, 합격자가 min_pass 미만이면 NaN)"""
+        return self.likelihood_matrix(grade_column, np.array([grade], dtype=float))[0]
+
+    def likelihood_matrix(self, grade_column: str, grades: np.ndarray) -> np.ndarray:
+        """
+        학생 여러 명(grades, 길이 S)에 대한 (S, n_groups) 가능성 행렬.
+        S * n_groups 개의 질의 키를 searchsorted 한 번으로 처리한다. 등급이 NaN인 학생 행은 NaN.
+        """
+        idx = self._index[grade_column]
+        offsets = idx["offsets"]
+        n = np.diff(offsets)
+        grades = np.asarray(grades, dtype=float)
+        # 그룹 범위를 벗어난 등급은 간격 안쪽으로 잘라 이웃 그룹 키와 섞이지 않게 한다
+        x = np.clip(grades - idx["lo"], -0.5, idx["span"] + 0.5)
+        missing = np.isnan(x)
+        x[missing] = 0.0
+        # 학생 등급을 정렬하고 (그룹, 학생) 순으로 키를 만들면 질의 전체가 정렬된 상태라
+        # searchsorted가 직전 위치를 이용해 훨씬 빨리 찾는다. 결과는 원래 학생 순서로 되돌린다.
+        order = np.argsort(x, kind="stable")
+        queries = np.arange(self.n_groups)[:, None] * idx["stride"] + x[order][None, :]
+        pos = np.empty((len(x), self.n_groups), dtype=np.int64)
+        pos[order] = np.searchsorted(idx["keys"], queries.ravel(), side="left").reshape(queries.shape).T
+        at_or_below = offsets[1:] - pos
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = at_or_below / n
+        result[:, n < self.min_pass] = np.nan
+        result[missing] = np.nan
+        return result
+
+    def group_mask(
+        self,
+        univs: Optional[Iterable[str]] = None,
+        subtypes: Optional[Iterable[str]] = None,
+        depts: Optional[Iterable[str]] = None,
+    ) -> np.ndarray:
+        """선택 조건을 만족하는 그룹 마스크 (빈 선택은 '전체')"""
+        mask = np.ones(self.n_groups, dtype=bool)
+        for dim, sel in (("univ", univs), ("subtype", subtypes), ("dept", depts)):
+            sel = list(sel or ())
+            if sel:
+                mask &= np.isin(self._group_values[dim], sel)
+        return mask
+
+    @staticmethod
+    def combine(per_column: dict) -> np.ndarray:
+        """등급 종류별 가능성의 평균 (NaN은 제외, 모두 NaN이면 NaN)"""
+        stacked = np.stack(list(per_column.values()))
+        valid = ~np.isnan(stacked)
+        counts = valid.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, np.where(valid, stacked, 0).sum(axis=0) / np.maximum(counts, 1), np.nan)
+
+    def rank_keys(self, combined: np.ndarray) -> np.ndarray:
+        """
+        순위 정렬 키 (int64, 클수록 앞): 가능성(1e-6 단위) → 합격자 수 → 그룹 번호 순.
+        키가 모두 달라서 단건 조회와 일괄 매칭(argpartition)의 순위가 항상 같다. NaN은 음수.
+        """
+        n = self.n_groups
+        pc_base = int(self.pass_count.max()) + 1 if n else 1
+        q = np.round(np.nan_to_num(combined, nan=-1e-6) * 1e6).astype(np.int64)
+        return (q * pc_base + self.pass_count) * n + (n - 1 - np.arange(n))
+
+    def group_frame(self, groups: np.ndarray) -> dict:
+        """그룹 번호 배열 → univ/dept/subtype/지원자 수/합격자 수 열"""
+        out = {dim: self._group_values[dim][groups] for dim in GROUP_COLUMNS}
+        out["applicants"] = self.applicants[groups]
+        out["pass_count"] = self.pass_count[groups]
+        return out
+
+    def score(
+        self,
+        conv_grade: Optional[float] = None,
+        all_subj_grade: Optional[float] = None,
+        *,
+        univs: Optional[Iterable[str]] = None,
+        subtypes: Optional[Iterable[str]] = None,
+        depts: Optional[Iterable[str]] = None,
+        top: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        학생 등급으로 그룹별 가능성을 계산해 높은 순으로 정렬한 DataFrame.
+        두 등급을 모두 주면 가능성은 두 값의 평균 (한쪽만 있는 그룹은 그 값).
+        빈 선택(univs 등)은 '전체'로 취급한다.
+        """
+        grades = {"conv_grade": conv_grade, "all_subj_grade": all_subj_grade}
+        grades = {col: g for col, g in grades.items() if g is not None and not np.isnan(g)}
+        if not grades:
+            raise ValueError("환산등급 또는 전교과 등급 중 하나 이상을 입력해주세요.")
+
+        per_column = {col: self.likelihood(col, g) for col, g in grades.items()}
+        combined = self.combine(per_column)
+
+        mask = ~np.isnan(combined) & self.group_mask(univs, subtypes, depts)
+        idx = np.flatnonzero(mask)
+        # 가능성 내림차순, 같으면 합격자 수가 많은 그룹 먼저
+        order = idx[np.argsort(-self.rank_keys(combined)[idx], kind="stable")]
+        if top is not None:
+            order = order[:top]
+
+        out = self.group_frame(order)
+        for col in GRADE_COLUMNS:
+            out[f"{col}_likelihood"] = per_column[col][order] if col in per_column else np.full(len(order), np.nan)
+        out["likelihood"] = combined[order]
+        return pd.DataFrame(out)
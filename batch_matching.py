@@ -0,0 +1,206 @@
+# batch_matching.py
+# ---------------------------------------------------------------------
+# 학년 전체(명단 워크북)를 모든 모집단위 그룹과 한 번에 매칭
+#   - read_roster():     명단 엑셀/CSV 읽기 (normalize_roster: 머리글 이름으로 열 찾기)
+#   - match_students():  학생 x 그룹 가능성 행렬을 학생 묶음(chunk) 단위로 계산해
+#                        학생별 상위 추천 목록을 만든다 (메모리 상한 안에서)
+#   - write_match_excel(): 추천 목록/학생 요약을 엑셀로 저장
+# 학생별 HTML 보고서는 html_generator.render_match_html 참고.
+# ---------------------------------------------------------------------
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from admission_estimator import AdmissionEstimator
+from instrumentation import Instrumentation
+from selection_stats import GRADE_COLUMNS
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024  # 묶음 하나가 쓰는 임시 배열 상한 (바이트)
+
+# 명단 열 → 허용하는 머리글 이름 (공백 제거, 소문자 비교)
+ROSTER_HEADERS = {
+    "name": ("이름", "성명", "학생", "학생명", "name"),
+    "student_id": ("학번", "번호", "수험번호", "id", "student_id"),
+    "conv_grade": ("환산등급", "환산", "conv_grade"),
+    "all_subj_grade": ("전교과", "전교과등급", "전교과100", "전교과100등급", "all_subj_grade"),
+}
+
+# 학생 한 명 x 그룹 하나당 묶음 계산에 드는 대략적인 바이트 수
+# (질의 키, 위치, 등급 종류별 가능성 2개, 합친 점수 - 모두 8바이트)
+_BYTES_PER_CELL = 8 * 5
+_EXCLUDED = np.iinfo(np.int64).min
+
+
+@dataclass
+class MatchResult:
+    """매칭 결과: 추천 목록(학생 x 순위 한 줄씩)과 학생 요약, 처리량"""
+    recommendations: pd.DataFrame
+    students: pd.DataFrame
+    elapsed: float
+    chunk_size: int
+
+    @property
+    def students_per_sec(self) -> float:
+        return len(self.students) / self.elapsed if self.elapsed > 0 else float("inf")
+
+
+def _normalize(header) -> str:
+    return str(header).replace(" ", "").strip().lower()
+
+
+def read_roster(path: Path) -> pd.DataFrame:
+    """
+    명단 워크북(.xlsx/.xls/.csv)을 읽어 name, student_id, conv_grade, all_subj_grade 열로 정리.
+    첫 행을 머리글로 보고 ROSTER_HEADERS의 이름으로 열을 찾는다.
+    이름 열과 등급 열(둘 중 하나 이상)이 없으면 ValueError.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        raw = pd.read_csv(path)
+    else:
+        raw = pd.read_excel(path, engine="openpyxl" if path.suffix.lower() == ".xlsx" else "xlrd")
+    return normalize_roster(raw)
+
+
+def normalize_roster(raw: pd.DataFrame) -> pd.DataFrame:
+    """머리글이 있는 명단 DataFrame을 read_roster 결과 형식으로 정리"""
+    lookup = {_normalize(c): c for c in raw.columns}
+    found = {}
+    for column, names in ROSTER_HEADERS.items():
+        for name in names:
+            if _normalize(name) in lookup:
+                found[column] = lookup[_normalize(name)]
+                break
+    if "name" not in found:
+        raise ValueError(f"명단에서 이름 열을 찾을 수 없습니다. (머리글: {', '.join(map(str, raw.columns))})")
+    if not any(col in found for col in GRADE_COLUMNS):
+        raise ValueError("명단에서 환산등급/전교과 등급 열을 찾을 수 없습니다.")
+
+    roster = pd.DataFrame({"name": raw[found["name"]].astype(str).str.strip()})
+    roster["student_id"] = raw[found["student_id"]].astype(str) if "student_id" in found else ""
+    for col in GRADE_COLUMNS:
+        roster[col] = pd.to_numeric(raw[found[col]], errors="coerce") if col in found else np.nan
+    rows_before = len(roster)
+    roster = roster[roster[list(GRADE_COLUMNS)].notna().any(axis=1)].reset_index(drop=True)
+    if rows_before > len(roster):
+        print(f"경고: {rows_before - len(roster)}명이 등급 정보 누락으로 제외됨")
+    return roster
+
+
+def chunk_size_for(n_groups: int, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> int:
+    """메모리 상한 안에서 한 번에 계산할 학생 수"""
+    return max(1, memory_budget // max(1, n_groups * _BYTES_PER_CELL))
+
+
+def match_students(
+    estimator: AdmissionEstimator,
+    roster: pd.DataFrame,
+    top: int = 10,
+    *,
+    min_likelihood: float = 0.0,
+    univs: Optional[Iterable[str]] = None,
+    subtypes: Optional[Iterable[str]] = None,
+    depts: Optional[Iterable[str]] = None,
+    chunk_size: Optional[int] = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    instr: Optional[Instrumentation] = None,
+) -> MatchResult:
+    """
+    명단 전체를 모든 그룹과 매칭해 학생별 상위 top개 추천을 만든다.
+    학생 묶음마다 (묶음 크기 x 그룹 수) 가능성 행렬을 만들고 argpartition으로 상위만 고른다.
+    순위는 AdmissionEstimator.rank_keys로 정해 score()의 단건 조회 결과와 같다.
+    """
+    instr = instr or Instrumentation("match_students")
+    start = time.perf_counter()
+    n_students, n_groups = len(roster), estimator.n_groups
+    chunk_size = chunk_size or chunk_size_for(n_groups, memory_budget)
+    k = min(top, n_groups)
+
+    allowed = estimator.group_mask(univs, subtypes, depts)
+    grades = {col: roster[col].to_numpy(dtype=float) for col in GRADE_COLUMNS}
+
+    student_idx, groups, values = [], [], {col: [] for col in GRADE_COLUMNS + ("likelihood",)}
+    for lo in range(0, n_students, chunk_size):
+        hi = min(lo + chunk_size, n_students)
+        with instr.span("match_chunk", students=hi - lo):
+            per_column = {col: estimator.likelihood_matrix(col, grades[col][lo:hi]) for col in GRADE_COLUMNS}
+            combined = estimator.combine(per_column)
+            keys = estimator.rank_keys(combined)
+            keys[~(allowed & ~np.isnan(combined) & (combined >= min_likelihood))] = _EXCLUDED
+            if k == 0:
+                continue
+            if k < n_groups:
+                cand = np.argpartition(keys, n_groups - k, axis=1)[:, n_groups - k:]
+            else:
+                cand = np.tile(np.arange(n_groups), (hi - lo, 1))
+            cand_keys = np.take_along_axis(keys, cand, axis=1)
+            order = np.argsort(cand_keys, axis=1)[:, ::-1]
+            cand = np.take_along_axis(cand, order, axis=1)
+            keep = np.take_along_axis(cand_keys, order, axis=1) != _EXCLUDED
+
+            rows = np.broadcast_to(np.arange(lo, hi)[:, None], cand.shape)[keep]
+            picked = cand[keep]
+            student_idx.append(rows)
+            groups.append(picked)
+            for col in GRADE_COLUMNS:
+                values[col].append(per_column[col][rows - lo, picked])
+            values["likelihood"].append(combined[rows - lo, picked])
+        instr.count("students", hi - lo)
+
+    student_idx = np.concatenate(student_idx) if student_idx else np.empty(0, dtype=np.int64)
+    groups = np.concatenate(groups) if groups else np.empty(0, dtype=np.int64)
+    rank = np.ones(len(student_idx), dtype=np.int64)
+    if len(student_idx):
+        # 학생별로 연속해 있으므로 구간 시작 위치로 순위를 만든다
+        starts = np.flatnonzero(np.r_[True, student_idx[1:] != student_idx[:-1]])
+        rank = np.arange(len(student_idx)) - np.repeat(starts, np.diff(np.r_[starts, len(student_idx)])) + 1
+
+    rec = {
+        "student": student_idx,
+        "name": roster["name"].to_numpy()[student_idx],
+        "student_id": roster["student_id"].to_numpy()[student_idx],
+        "rank": rank,
+    }
+    rec.update(estimator.group_frame(groups))
+    for col in GRADE_COLUMNS:
+        rec[f"{col}_likelihood"] = np.concatenate(values[col]) if values[col] else np.empty(0)
+    rec["likelihood"] = np.concatenate(values["likelihood"]) if values["likelihood"] else np.empty(0)
+    recommendations = pd.DataFrame(rec)
+
+    # 학생 요약: 추천 수와 최상위 추천
+    students = roster.copy()
+    first = recommendations[recommendations["rank"] == 1].set_index("student")
+    students["recommended"] = np.bincount(student_idx, minlength=n_students)
+    students["best_univ"] = first["univ"].reindex(range(n_students)).to_numpy()
+    students["best_dept"] = first["dept"].reindex(range(n_students)).to_numpy()
+    students["best_subtype"] = first["subtype"].reindex(range(n_students)).to_numpy()
+    students["best_likelihood"] = first["likelihood"].reindex(range(n_students)).to_numpy()
+
+    elapsed = time.perf_counter() - start
+    return MatchResult(recommendations, students, elapsed, chunk_size)
+
+
+_EXCEL_COLUMNS = {
+    "name": "이름", "student_id": "학번", "rank": "순위", "univ": "대학", "dept": "모집단위", "subtype": "전형",
+    "likelihood": "가능성", "conv_grade_likelihood": "환산 기준", "all_subj_grade_likelihood": "전교과 기준",
+    "pass_count": "합격자 수", "applicants": "지원자 수",
+    "conv_grade": "환산등급", "all_subj_grade": "전교과 등급", "recommended": "추천 수",
+    "best_univ": "1순위 대학", "best_dept": "1순위 모집단위", "best_subtype": "1순위 전형", "best_likelihood": "1순위 가능성",
+}
+
+
+def write_match_excel(result: MatchResult, path: Path) -> Path:
+    """추천 목록(한 줄에 학생 x 추천 하나)과 학생 요약 시트를 엑셀로 저장"""
+    path = Path(path)
+    rec_cols = ["name", "student_id", "rank", "univ", "dept", "subtype", "likelihood",
+                "conv_grade_likelihood", "all_subj_grade_likelihood", "pass_count", "applicants"]
+    sum_cols = ["name", "student_id", "conv_grade", "all_subj_grade", "recommended",
+                "best_univ", "best_dept", "best_subtype", "best_likelihood"]
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        result.students[sum_cols].rename(columns=_EXCEL_COLUMNS).to_excel(writer, sheet_name="학생 요약", index=False)
+        result.recommendations[rec_cols].rename(columns=_EXCEL_COLUMNS).to_excel(writer, sheet_name="추천 목록", index=False)
+    return path
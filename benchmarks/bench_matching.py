@@ -0,0 +1,62 @@
+# bench_matching.py
+# ---------------------------------------------------------------------
+# 일괄 학생 매칭 처리량 벤치마크 (학생/초)
+#
+#   python benchmarks/bench_matching.py                          # 기본: 30만 행, 500/2000/5000명
+#   python benchmarks/bench_matching.py --rows 1000000 --students 10000 --budget-mb 16 64
+# ---------------------------------------------------------------------
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from admission_estimator import AdmissionEstimator
+from batch_matching import chunk_size_for, match_students, normalize_roster
+from synthetic_data import generate_dataset, generate_roster
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="일괄 학생 매칭 벤치마크")
+    parser.add_argument("--rows", type=int, default=300_000, help="합성 데이터 행 수")
+    parser.add_argument("--students", type=int, nargs="+", default=[500, 2_000, 5_000])
+    parser.add_argument("--budget-mb", type=int, nargs="+", default=[64], help="묶음 메모리 상한(MB)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    df = generate_dataset(args.rows, seed=args.seed).dropna(subset=["univ", "dept", "subtype"])
+    t = time.perf_counter()
+    estimator = AdmissionEstimator(df)
+    build = time.perf_counter() - t
+    print(f"추정기 구축: {len(df):,}행 · {estimator.n_groups:,}개 그룹 · {build:.3f}s")
+
+    results = []
+    for n_students in args.students:
+        roster = normalize_roster(generate_roster(n_students, seed=args.seed))
+        for budget in args.budget_mb:
+            result = match_students(estimator, roster, top=args.top, memory_budget=budget * 1024 * 1024)
+            results.append({
+                "students": n_students,
+                "budget_mb": budget,
+                "chunk_size": result.chunk_size,
+                "elapsed_s": result.elapsed,
+                "students_per_sec": result.students_per_sec,
+            })
+            print(f"  {n_students:>6,}명 · 상한 {budget}MB (묶음 {result.chunk_size}명): "
+                  f"{result.elapsed:.3f}s · {result.students_per_sec:,.0f}명/초")
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            "rows": len(df), "groups": estimator.n_groups, "build_s": build,
+            "expected_chunk_64mb": chunk_size_for(estimator.n_groups), "results": results,
+        }, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+# bench_pipeline.py
+# ---------------------------------------------------------------------
+# 데이터 규모별 파이프라인 벤치마크 (수집 → 통계 → 보고서)
+#
+#   python benchmarks/bench_pipeline.py                       # 10k/100k/1M 측정
+#   python benchmarks/bench_pipeline.py --sizes 10000 --save  # 기준값(baseline) 저장
+#   python benchmarks/bench_pipeline.py --compare             # 기준값과 비교 (회귀 시 종료코드 1)
+#
+# 합성 워크북은 benchmarks/.data/ 에 캐시되어 재실행 시 생성 시간을 건너뛴다.
+# ---------------------------------------------------------------------
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+
+from data_processor import compute_stats, read_input
+from html_generator import plot_selected_depts
+from instrumentation import Instrumentation
+from selection_stats import SelectionAggregator
+from synthetic_data import generate_dataset, write_workbook
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def workbook_for(n_rows: int, args) -> Path:
+    """규모/파라미터별 합성 워크북 (캐시 재사용)"""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    path = DATA_DIR / f"synthetic_{n_rows}_{args.univs}u{args.depts}d{args.subtypes}s_seed{args.seed}.xlsx"
+    if not path.exists():
+        t = time.perf_counter()
+        df = generate_dataset(n_rows, args.univs, args.depts, args.subtypes, seed=args.seed)
+        write_workbook(df, path)
+        print(f"  워크북 생성: {path.name} ({time.perf_counter() - t:.1f}s)")
+    return path
+
+
+def bench_size(n_rows: int, args) -> dict:
+    path = workbook_for(n_rows, args)
+
+    # 1) 수집 (엑셀 파싱 + 정리)
+    load = Instrumentation("ingest")
+    t = time.perf_counter()
+    df = read_input(path, instr=load)
+    ingest = time.perf_counter() - t
+    load_report = load.report()
+
+    # 2) 통계: 증분 집계기 구축 + 모든 그룹 compute_stats
+    t = time.perf_counter()
+    SelectionAggregator(df)
+    aggregator_build = time.perf_counter() - t
+    t = time.perf_counter()
+    groups = 0
+    for _, group in df.groupby(["univ", "subtype", "dept"], sort=False):
+        compute_stats(group, "conv_grade")
+        compute_stats(group, "all_subj_grade")
+        groups += 1
+    group_stats = time.perf_counter() - t
+
+    # 3) 보고서: 앞쪽 대학 몇 개를 선택한 보고서 생성
+    univs = sorted(df["univ"].unique())[: args.report_univs]
+    report = Instrumentation("report")
+    with tempfile.TemporaryDirectory() as tmp:
+        t = time.perf_counter()
+        plot_selected_depts(df, Path(tmp), None, univs, None, "bench.html", instr=report)
+        report_time = time.perf_counter() - t
+        html_bytes = (Path(tmp) / "bench.html").stat().st_size
+    report_report = report.report()
+
+    return {
+        "rows": len(df),
+        "groups": groups,
+        "ingest_s": ingest,
+        "excel_parse_s": load_report.spans["excel_parse"].total,
+        "clean_s": load_report.spans["clean"].total,
+        "aggregator_build_s": aggregator_build,
+        "group_stats_s": group_stats,
+        "report_s": report_time,
+        "report_rows": report_report.counters.get("rows_selected", 0),
+        "report_html_bytes": html_bytes,
+        "report_spans_s": {name: st.self_time for name, st in report_report.spans.items()},
+    }
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+
+
+TIMED_KEYS = ["ingest_s", "aggregator_build_s", "group_stats_s", "report_s"]
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """기준값 대비 threshold배 이상 느려진 항목이 있으면 False"""
+    ok = True
+    for size, current in results.items():
+        base = baseline.get("results", {}).get(size)
+        if base is None:
+            print(f"[{size}] 기준값 없음")
+            continue
+        for key in TIMED_KEYS:
+            if key not in base or base[key] <= 0:
+                continue
+            ratio = current[key] / base[key]
+            flag = "회귀" if ratio > threshold else "ok"
+            ok &= ratio <= threshold
+            print(f"[{size}] {key:<20} {base[key]:8.3f}s → {current[key]:8.3f}s  x{ratio:.2f} {flag}")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="susiForSchool 파이프라인 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--univs", type=int, default=40)
+    parser.add_argument("--depts", type=int, default=30)
+    parser.add_argument("--subtypes", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report-univs", type=int, default=5, help="보고서에 포함할 대학 수")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="결과를 기준값 파일로 저장")
+    parser.add_argument("--compare", action="store_true", help="기준값과 비교")
+    parser.add_argument("--threshold", type=float, default=1.25, help="회귀로 볼 배율")
+    parser.add_argument("--output", type=Path, help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for n_rows in args.sizes:
+        print(f"== {n_rows:,}행 ==")
+        res = bench_size(n_rows, args)
+        results[str(n_rows)] = res
+        print("  " + " · ".join(f"{k} {res[k]:.3f}s" for k in TIMED_KEYS))
+
+    payload = {"environment": environment(), "params": {
+        "univs": args.univs, "depts": args.depts, "subtypes": args.subtypes,
+        "seed": args.seed, "report_univs": args.report_univs,
+    }, "results": results}
+
+    if args.output:
+        args.output.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.save:
+        args.baseline.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"기준값 저장: {args.baseline}")
+    if args.compare:
+        if not args.baseline.exists():
+            print(f"기준값 파일이 없습니다: {args.baseline}")
+            return 1
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        return 0 if compare(results, baseline, args.threshold) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,490 @@
+# cli.py
+# ---------------------------------------------------------------------
+# 명령줄 실행 (GUI 없이 보고서 생성)
+#
+#   python cli.py report 입시결과.xlsx --univ 가람대학교 --subtype 학생부교과 -o 보고서.html
+#   python cli.py report 입시결과.xlsx --univ 가람대학교 --profile-memory --trace trace.json
+#   python cli.py report 2024_결과.xlsx 2025_결과.xlsx --univ 가람대학교   (연도별 추이 포함)
+#   python cli.py report 입시결과.xlsx --univ 가람대학교 --format html --format xlsx   (읽기/집계는 한 번)
+#   python cli.py estimate 입시결과.xlsx --conv 2.3 --all-subj 2.6 --top 20
+#   python cli.py match 입시결과.xlsx --roster 3학년_명단.xlsx --top 10   (학년 전체 일괄 추천)
+#   python cli.py range 입시결과.xlsx 3.2            (합격 범위가 3.2등급을 포함하는 모집단위)
+#   python cli.py range 입시결과.xlsx 2.5 --to 3.0 --all-subj
+#   python cli.py check 입시결과.xlsx --limit 50     (사유별 제외 행 번호, --strict면 제외 시 종료 코드 1)
+#   python cli.py ingest --year 2024 2024_입시결과.xlsx      (이력 DB에 누적)
+#   python cli.py report --db admissions_history.sqlite3 --univ 가람대학교
+#   python cli.py serve 입시결과.xlsx --host 0.0.0.0 --port 8765   (교내 보고서 서버)
+#   python cli.py serve --watch 공유폴더/   (폴더가 바뀌면 새 데이터셋으로 교체하며 서비스)
+#   python cli.py batch 입시결과.xlsx --job "univ=가람대학교" --job "univ=나래대학교;subtype=학생부교과" --workers 2
+#   python cli.py batch 입시결과.xlsx --jobs-file jobs.txt --processes 4   (공유 메모리 작업 프로세스)
+#   python cli.py export 입시결과.xlsx -o 그룹별_통계.xlsx   (그룹별 통계 표, .csv도 가능)
+#   python cli.py watch 공유폴더/ --job "univ=가람대학교" --interval 10   (바뀐 파일만 다시 읽고 보고서 갱신)
+# ---------------------------------------------------------------------
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from admission_estimator import AdmissionEstimator
+from batch_matching import DEFAULT_MEMORY_BUDGET, match_students, read_roster, write_match_excel
+from data_processor import read_input, read_inputs, read_raw, validate_frame
+from dataset_snapshot import DatasetSnapshot
+from folder_watch import DEFAULT_POLL_SECONDS, FolderDataset
+from history_store import DEFAULT_DB_PATH, HistoryStore
+from html_generator import plot_selected_depts, render_match_html
+from instrumentation import Instrumentation
+from interval_index import PassRangeIndex
+from pipeline import RENDER_STAGES, ReportPipeline, from_snapshot
+from report_cache import selection_key
+from report_jobs import DEFAULT_JOB_MEMORY, DEFAULT_WORKERS, ReportJobQueue, estimate_report_bytes
+from report_server import DEFAULT_CACHE_BYTES, DEFAULT_CACHE_ENTRIES, DEFAULT_HOST, DEFAULT_PORT, load_service, make_server, watch_folder
+from shared_dataset import SharedDataset, init_worker, worker_dataset
+from sheet_schema import DEFAULT_LAYOUT_CACHE, LayoutCache, use_layout_cache
+from stats_export import DEFAULT_CHUNK_GROUPS, export_stats
+from utils import sanitize
+
+
+def _add_selection_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--univ", action="append", default=[], help="대학 (여러 번 지정 가능)")
+    parser.add_argument("--subtype", action="append", default=[], help="전형 (여러 번 지정 가능)")
+    parser.add_argument("--dept", action="append", default=[], help="모집단위 (여러 번 지정 가능)")
+
+
+def _print_report(title: str, report, profile_memory: bool) -> None:
+    print(f"[{title}] {report.summary()}")
+    if profile_memory:
+        print(report.memory_summary())
+
+
+def cmd_report(args) -> int:
+    if not any([args.univ, args.subtype, args.dept]):
+        print("오류: --univ, --subtype, --dept 중 하나 이상을 지정해주세요.", file=sys.stderr)
+        return 2
+    if not args.db and not args.input:
+        print("오류: 입력 엑셀 파일 또는 --db 중 하나를 지정해주세요.", file=sys.stderr)
+        return 2
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = args.output[:-5] if args.output.lower().endswith(".html") else args.output
+    params = {"sources": args.input, "univs": args.univ or None, "subtypes": args.subtype or None, "depts": args.dept or None}
+
+    # 형식이 여러 개여도 읽기/정리/선택/집계는 파이프라인 캐시로 한 번만 한다
+    pipe = ReportPipeline()
+    store = HistoryStore(Path(args.db)) if args.db else None
+    # 이력 DB 모드: 선택 조건을 SQL로 내려 필요한 행만 읽는다 (load/clean 단계 없음)
+    given = from_snapshot(DatasetSnapshot.from_store(store)) if store is not None else None
+    instr = Instrumentation("report", trace_memory=args.profile_memory)
+    try:
+        for fmt in args.format or ["html"]:
+            try:
+                rendered = pipe.render(fmt, params, given=given, instr=instr)
+            except ValueError as e:
+                print(f"오류: {e}", file=sys.stderr)
+                return 2
+            path = rendered.write(out_dir / sanitize(f"{stem}.{fmt}"))
+            print(f"{path.resolve()} 파일이 생성되었습니다.")
+    finally:
+        instr.close()  # 오류로 빠져나가도 tracemalloc을 멈춘다 (report()도 멈추므로 두 번째는 아무 일 없음)
+        if store is not None:
+            store.close()
+    _print_report("보고서", instr.report(), args.profile_memory)
+    if args.trace:
+        instr.write_trace(Path(args.trace))
+        print(f"추적 파일 저장: {args.trace}")
+    return 0
+
+
+def cmd_estimate(args) -> int:
+    if args.conv is None and args.all_subj is None:
+        print("오류: --conv, --all-subj 중 하나 이상을 지정해주세요.", file=sys.stderr)
+        return 2
+    df = read_inputs(args.input) if len(args.input) > 1 else read_input(Path(args.input[0]))
+    estimator = AdmissionEstimator(df, min_pass=args.min_pass)
+    ranked = estimator.score(
+        args.conv, args.all_subj,
+        univs=args.univ, subtypes=args.subtype, depts=args.dept, top=args.top,
+    )
+    if ranked.empty:
+        print("추정 가능한 모집단위가 없습니다.")
+        return 0
+    for i, row in enumerate(ranked.itertuples(index=False), 1):
+        print(f"{i:>3}. {row.univ} / {row.dept} / {row.subtype}: {row.likelihood*100:5.1f}% (합격자 {row.pass_count}명)")
+    return 0
+
+
+def cmd_match(args) -> int:
+    try:
+        roster = read_roster(Path(args.roster))
+    except ValueError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 2
+    df = read_inputs(args.input) if len(args.input) > 1 else read_input(Path(args.input[0]))
+    estimator = AdmissionEstimator(df, min_pass=args.min_pass)
+
+    instr = Instrumentation("match")
+    result = match_students(
+        estimator, roster, top=args.top,
+        univs=args.univ, subtypes=args.subtype, depts=args.dept,
+        memory_budget=args.budget_mb * 1024 * 1024, instr=instr,
+    )
+    print(f"{len(roster):,}명 x {estimator.n_groups:,}개 모집단위: {result.elapsed:.2f}s "
+          f"({result.students_per_sec:,.0f}명/초, 묶음 {result.chunk_size}명)")
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = sanitize(args.output)
+    excel_path = write_match_excel(result, out_dir / f"{stem}.xlsx")
+    html_path = out_dir / f"{stem}.html"
+    html_path.write_text(render_match_html(result.recommendations, result.students), encoding="utf-8")
+    print(f"저장: {excel_path.resolve()}")
+    print(f"저장: {html_path.resolve()}")
+    return 0
+
+
+def cmd_range(args) -> int:
+    df = read_inputs(args.input) if len(args.input) > 1 else read_input(Path(args.input[0]))
+    index = PassRangeIndex.from_frame(df, kind="all_pass" if args.include_waitlist else "pass")
+    column = "all_subj_grade" if args.all_subj else "conv_grade"
+    table = index.query(column, args.grade, args.to)
+    if table.empty:
+        print("조건에 맞는 모집단위가 없습니다.")
+        return 0
+    for row in table.itertuples(index=False):
+        print(f"{row.univ} / {row.dept} / {row.subtype}: {row.min:.2f} ~ {row.max:.2f} (합격 {row.count}명)")
+    print(f"총 {len(table):,}개")
+    return 0
+
+
+def cmd_check(args) -> int:
+    rejected = 0
+    for path in args.input:
+        instr = Instrumentation("check")
+        _, report = validate_frame(read_raw(Path(path), instr), Path(path).name)
+        print(f"{report.summary()} · {report.rows_kept:,}/{report.rows_in:,}행 사용 ({instr.report().summary()})")
+        for line in report.details(args.limit):
+            print(line)
+        rejected += report.rows_rejected
+    return 1 if args.strict and rejected else 0
+
+
+def cmd_ingest(args) -> int:
+    store = HistoryStore(Path(args.db))
+    try:
+        for path in args.files:
+            df = read_input(Path(path))
+            added = store.append(df, year=args.year, source=str(path))
+            print(f"{path}: {added:,}행 추가")
+        print(f"이력 DB {args.db}: 전체 {store.count():,}행, 연도 {store.years() or '미지정'}")
+    finally:
+        store.close()
+    return 0
+
+
+def cmd_serve(args) -> int:
+    if not args.input and not args.db and not args.watch:
+        print("오류: 입력 엑셀 파일, --db, --watch 중 하나를 지정해주세요.", file=sys.stderr)
+        return 2
+    folder = None
+    if args.watch:
+        folder = FolderDataset(Path(args.watch))
+        loaded = folder.load()
+        if loaded.failed:
+            print(loaded.failure_note(), file=sys.stderr)
+        if folder.df is None:
+            print(f"오류: {args.watch}에 읽을 수 있는 엑셀 파일이 없습니다.", file=sys.stderr)
+            return 2
+    try:
+        service = load_service(args.input, args.db, args.cache_entries, args.cache_mb * 1024 * 1024, folder)
+    except ValueError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 2
+    service.attach_jobs(args.workers, args.max_jobs, args.job_budget_mb * 1024 * 1024)
+    server = make_server(service, args.host, args.port)
+    host, port = server.server_address[:2]
+    stop = threading.Event()
+    if folder is not None:
+        threading.Thread(target=watch_folder, args=(service, folder, args.interval, stop), daemon=True).start()
+    print(f"보고서 서버 시작: http://{host}:{port}/  (데이터셋 {service.version}, 종료: Ctrl+C)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        print(f"서버 종료: {service.status()}")
+        service.close()
+    return 0
+
+
+def parse_job_spec(spec: str) -> dict:
+    """"univ=가람대학교,나래대학교;subtype=학생부교과" → {"univs": [...], "subtypes": [...], "depts": []}"""
+    selection = {"univs": [], "subtypes": [], "depts": []}
+    for part in filter(None, (p.strip() for p in spec.split(";"))):
+        name, sep, values = part.partition("=")
+        arg = {"univ": "univs", "subtype": "subtypes", "dept": "depts"}.get(name.strip())
+        if not sep or arg is None:
+            raise ValueError(f"작업 형식 오류: {part} (univ=…;subtype=…;dept=…)")
+        selection[arg].extend(v.strip() for v in values.split(",") if v.strip())
+    if not any(selection.values()):
+        raise ValueError(f"작업에 선택 조건이 없습니다: {spec}")
+    return selection
+
+
+def _render_shared_job(selection: dict, out_dir: Path, filename: str) -> str:
+    """작업 프로세스: 공유 데이터셋에서 선택된 행만 복원해 보고서 생성"""
+    df = worker_dataset().frame(**selection)
+    return plot_selected_depts(df, out_dir, selection["depts"] or None, selection["univs"] or None,
+                               selection["subtypes"] or None, filename)
+
+
+def cmd_batch(args) -> int:
+    specs = list(args.job)
+    if args.jobs_file:
+        lines = Path(args.jobs_file).read_text(encoding="utf-8").splitlines()
+        specs += [line for line in lines if line.strip() and not line.lstrip().startswith("#")]
+    try:
+        selections = [parse_job_spec(spec) for spec in specs]
+    except ValueError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 2
+    if not selections:
+        print("오류: --job 또는 --jobs-file로 작업을 하나 이상 지정해주세요.", file=sys.stderr)
+        return 2
+
+    df = read_inputs(args.input) if len(args.input) > 1 else read_input(Path(args.input[0]))
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    shared = pool = None
+    if args.processes:
+        # 작업 프로세스에는 DataFrame 대신 공유 메모리 블록 이름만 넘긴다
+        shared = SharedDataset.create(df)
+        pool = ProcessPoolExecutor(args.processes, initializer=init_worker, initargs=(shared.handle,))
+
+    def render(payload, instr):
+        selection, filename = payload
+        if pool is not None:
+            with instr.span("html_template"):
+                return pool.submit(_render_shared_job, selection, out_dir, filename).result()
+        return plot_selected_depts(df, out_dir, selection["depts"] or None, selection["univs"] or None,
+                                   selection["subtypes"] or None, filename, instr=instr)
+
+    async def run_all():
+        queue = ReportJobQueue(render, workers=max(args.workers, args.processes), max_concurrent=args.max_jobs,
+                               memory_budget=args.budget_mb * 1024 * 1024)
+        try:
+            jobs = []
+            for spec, selection in zip(specs, selections):
+                key = selection_key("batch", selection["univs"], selection["subtypes"], selection["depts"])
+                filename = _job_filename(spec)
+                estimate = estimate_report_bytes(df, **selection)
+                jobs.append(await queue.submit(key, (selection, filename), estimate, spec))
+            await queue.join()
+            return queue, jobs
+        finally:
+            queue.close()
+
+    try:
+        queue, jobs = asyncio.run(run_all())
+    finally:
+        if pool is not None:
+            pool.shutdown()
+            shared.close()
+    failed = 0
+    for job in {job.id: job for job in jobs}.values():
+        if job.error:
+            failed += 1
+            print(f"[{job.id}] {job.label}: 실패 - {job.error}")
+        else:
+            print(f"[{job.id}] {job.label}: 대기 {job.wait_seconds:.2f}s, 실행 {job.run_seconds:.2f}s - {job.result}")
+    stats = queue.stats()
+    print(f"작업 {stats['done']}개 완료, {stats['failed']}개 실패, 중복 {stats['deduplicated']}개 합침")
+    return 1 if failed else 0
+
+
+def cmd_export(args) -> int:
+    if args.db:
+        source = HistoryStore(Path(args.db))
+    elif args.input:
+        source = read_inputs(args.input) if len(args.input) > 1 else read_input(Path(args.input[0]))
+    else:
+        print("오류: 입력 엑셀 파일 또는 --db 중 하나를 지정해주세요.", file=sys.stderr)
+        return 2
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    filename = sanitize(args.output if Path(args.output).suffix.lower() in (".xlsx", ".csv") else args.output + ".xlsx")
+
+    instr = Instrumentation("export")
+    try:
+        result = export_stats(
+            source, out_dir / filename,
+            univs=args.univ or None, subtypes=args.subtype or None, depts=args.dept or None,
+            chunk_groups=args.chunk_groups, instr=instr,
+        )
+    finally:
+        if args.db:
+            source.close()
+    print(f"{result.groups:,}개 그룹 ({result.rows:,}행): {result.elapsed:.2f}s ({result.groups_per_sec:,.0f}그룹/초)")
+    print(f"저장: {result.path.resolve()}")
+    _print_report("내보내기", instr.report(), False)
+    return 0
+
+
+def _job_filename(spec: str) -> str:
+    return sanitize(spec.replace(";", "_").replace("=", "-").replace(",", "+")) + ".html"
+
+
+def cmd_watch(args) -> int:
+    try:
+        jobs = [(spec, parse_job_spec(spec)) for spec in args.job]
+    except ValueError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 2
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    dataset = FolderDataset(Path(args.folder))
+    instr = Instrumentation("load")
+    result = dataset.load(instr)
+    print(f"폴더 {args.folder}: 파일 {len(dataset.paths)}개, {result.rows_read:,}행 ({instr.report().summary()})")
+    if result.failed:
+        print(f"  {result.failure_note()}")
+    try:
+        while True:
+            if dataset.df is not None:
+                for spec, sel in jobs:
+                    if result.touches(**sel):
+                        msg = plot_selected_depts(dataset.df, out_dir, sel["depts"] or None, sel["univs"] or None,
+                                                  sel["subtypes"] or None, _job_filename(spec), order=dataset.order)
+                        print(f"  {spec}: {msg}")
+            if args.once:
+                return 0
+            while True:
+                time.sleep(args.interval)
+                instr = Instrumentation("load")
+                result = dataset.poll(instr)
+                if result is not None:
+                    break
+            changes = result.changes
+            print(f"변경: 추가 {len(changes.added)} · 변경 {len(changes.changed)} · 삭제 {len(changes.removed)}개 파일, "
+                  f"{result.rows_read:,}행 다시 읽음, 바뀐 그룹 {len(result.affected):,}개 ({instr.report().summary()})")
+            if result.failed:
+                print(f"  {result.failure_note()}")
+    except KeyboardInterrupt:
+        return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="모집단위 입시 결과 시각화 (명령줄)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rep = sub.add_parser("report", help="HTML 보고서 생성")
+    rep.add_argument("input", nargs="*", help="입시 결과 엑셀 파일 (.xlsx/.xls, 여러 해면 파일 이름에 연도 포함)")
+    rep.add_argument("--db", help="엑셀 대신 조회할 이력 DB(SQLite) 경로")
+    _add_selection_args(rep)
+    rep.add_argument("-o", "--output", default="선택된_모집단위_입시결과.html", help="출력 파일명 (확장자는 형식에 맞춰 붙인다)")
+    rep.add_argument("--format", action="append", choices=sorted(RENDER_STAGES), help="출력 형식 (여러 번 지정 가능, 기본 html)")
+    rep.add_argument("--out-dir", default="output_htmls", help="출력 디렉터리")
+    rep.add_argument("--trace", help="Chrome trace-event 형식 성능 추적 JSON 저장 경로")
+    rep.add_argument("--profile-memory", action="store_true", help="tracemalloc 메모리 프로파일링")
+    rep.set_defaults(func=cmd_report)
+
+    est = sub.add_parser("estimate", help="학생 등급으로 모집단위별 합격 가능성 순위")
+    est.add_argument("input", nargs="+", help="입시 결과 엑셀 파일")
+    est.add_argument("--conv", type=float, help="환산등급")
+    est.add_argument("--all-subj", type=float, help="전교과 등급")
+    _add_selection_args(est)
+    est.add_argument("--top", type=int, default=30, help="출력할 모집단위 수")
+    est.add_argument("--min-pass", type=int, default=3, help="최소 합격자 수 (미만이면 제외)")
+    est.set_defaults(func=cmd_estimate)
+
+    mat = sub.add_parser("match", help="학생 명단 전체를 모집단위별 합격 가능성으로 일괄 추천")
+    mat.add_argument("input", nargs="+", help="입시 결과 엑셀 파일")
+    mat.add_argument("--roster", required=True, help="학생 명단 (.xlsx/.csv, 머리글: 이름/학번/환산등급/전교과)")
+    _add_selection_args(mat)
+    mat.add_argument("--top", type=int, default=10, help="학생별 추천 수")
+    mat.add_argument("--min-pass", type=int, default=3, help="최소 합격자 수 (미만이면 제외)")
+    mat.add_argument("--budget-mb", type=int, default=DEFAULT_MEMORY_BUDGET // (1024 * 1024), help="묶음 계산 메모리 상한(MB)")
+    mat.add_argument("-o", "--output", default="학생별_추천결과", help="출력 파일 이름 (확장자 제외)")
+    mat.add_argument("--out-dir", default="output_htmls", help="출력 디렉터리")
+    mat.set_defaults(func=cmd_match)
+
+    rng = sub.add_parser("range", help="합격 등급 범위가 주어진 등급(구간)에 걸치는 모집단위 찾기")
+    rng.add_argument("input", nargs="+", help="입시 결과 엑셀 파일")
+    rng.add_argument("grade", type=float, help="등급 (--to를 주면 구간 시작)")
+    rng.add_argument("--to", type=float, help="구간 끝 (겹침 질의)")
+    rng.add_argument("--all-subj", action="store_true", help="전교과 등급 기준 (기본: 환산등급)")
+    rng.add_argument("--include-waitlist", action="store_true", help="충원합격 포함 범위")
+    rng.set_defaults(func=cmd_range)
+
+    chk = sub.add_parser("check", help="엑셀 결과 검증 (사유별 제외 행 번호)")
+    chk.add_argument("input", nargs="+", help="입시 결과 엑셀 파일")
+    chk.add_argument("--limit", type=int, default=20, help="사유마다 보여줄 행 번호 수")
+    chk.add_argument("--strict", action="store_true", help="제외된 행이 있으면 종료 코드 1")
+    chk.set_defaults(func=cmd_check)
+
+    ing = sub.add_parser("ingest", help="엑셀 결과를 이력 DB(SQLite)에 누적")
+    ing.add_argument("files", nargs="+", help="입시 결과 엑셀 파일")
+    ing.add_argument("--db", default=str(DEFAULT_DB_PATH), help="이력 DB 경로")
+    ing.add_argument("--year", type=int, help="입시 연도 태그")
+    ing.set_defaults(func=cmd_ingest)
+
+    srv = sub.add_parser("serve", help="로컬 보고서 서버 (데이터셋을 한 번만 읽고 요청마다 보고서 생성)")
+    srv.add_argument("input", nargs="*", help="입시 결과 엑셀 파일")
+    srv.add_argument("--db", help="엑셀 대신 조회할 이력 DB(SQLite) 경로")
+    srv.add_argument("--watch", help="엑셀 대신 감시할 폴더 (바뀐 파일만 다시 읽어 데이터셋 교체)")
+    srv.add_argument("--interval", type=float, default=DEFAULT_POLL_SECONDS, help="--watch 폴링 간격(초)")
+    srv.add_argument("--host", default=DEFAULT_HOST, help="바인딩 주소 (교내 공유는 0.0.0.0)")
+    srv.add_argument("--port", type=int, default=DEFAULT_PORT, help="포트")
+    srv.add_argument("--cache-entries", type=int, default=DEFAULT_CACHE_ENTRIES, help="캐시할 보고서 수")
+    srv.add_argument("--cache-mb", type=int, default=DEFAULT_CACHE_BYTES // (1024 * 1024), help="보고서 캐시 용량(MB)")
+    srv.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="렌더링 스레드 수")
+    srv.add_argument("--max-jobs", type=int, help="동시에 실행할 보고서 작업 수 (기본: --workers)")
+    srv.add_argument("--job-budget-mb", type=int, default=DEFAULT_JOB_MEMORY // (1024 * 1024), help="실행 중 작업의 예상 메모리 합계 상한(MB)")
+    srv.set_defaults(func=cmd_serve)
+
+    bat = sub.add_parser("batch", help="여러 보고서를 작업 큐로 한 번에 생성")
+    bat.add_argument("input", nargs="+", help="입시 결과 엑셀 파일")
+    bat.add_argument("--job", action="append", default=[], help='작업 선택 조건 (예: "univ=가람대학교;subtype=학생부교과", 여러 번 지정 가능)')
+    bat.add_argument("--jobs-file", help="작업 선택 조건 파일 (한 줄에 하나)")
+    bat.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="렌더링 스레드 수")
+    bat.add_argument("--processes", type=int, default=0, help="작업 프로세스 수 (데이터셋은 공유 메모리로 전달, 0이면 스레드만)")
+    bat.add_argument("--max-jobs", type=int, help="동시에 실행할 작업 수 (기본: --workers)")
+    bat.add_argument("--budget-mb", type=int, default=DEFAULT_JOB_MEMORY // (1024 * 1024), help="실행 중 작업의 예상 메모리 합계 상한(MB)")
+    bat.add_argument("--out-dir", default="output_htmls", help="출력 디렉터리")
+    bat.set_defaults(func=cmd_batch)
+
+    exp = sub.add_parser("export", help="(대학, 모집단위, 전형) 그룹별 통계 표를 엑셀/CSV로 저장")
+    exp.add_argument("input", nargs="*", help="입시 결과 엑셀 파일")
+    exp.add_argument("--db", help="엑셀 대신 조회할 이력 DB(SQLite) 경로")
+    _add_selection_args(exp)
+    exp.add_argument("-o", "--output", default="그룹별_통계.xlsx", help="출력 파일명 (.xlsx 또는 .csv)")
+    exp.add_argument("--out-dir", default="output_htmls", help="출력 디렉터리")
+    exp.add_argument("--chunk-groups", type=int, default=DEFAULT_CHUNK_GROUPS, help="한 번에 계산해 쓰는 그룹 수")
+    exp.set_defaults(func=cmd_export)
+
+    wat = sub.add_parser("watch", help="폴더의 엑셀 파일 변경을 감시해 바뀐 파일만 다시 읽고 보고서 갱신")
+    wat.add_argument("folder", help="감시할 폴더 (*.xlsx, *.xls, 파일 이름에 연도가 있으면 year 열)")
+    wat.add_argument("--job", action="append", default=[], help="바뀐 그룹이 들어 있으면 다시 만들 보고서 선택 조건 (batch와 같은 형식)")
+    wat.add_argument("--interval", type=float, default=DEFAULT_POLL_SECONDS, help="폴링 간격(초)")
+    wat.add_argument("--once", action="store_true", help="한 번 읽고 보고서만 만든 뒤 종료")
+    wat.add_argument("--out-dir", default="output_htmls", help="출력 디렉터리")
+    wat.set_defaults(func=cmd_watch)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    # 워크북별 열 배치를 파일에 남겨 다음 실행에서도 머리글을 다시 훑지 않는다
+    use_layout_cache(LayoutCache(DEFAULT_LAYOUT_CACHE))
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
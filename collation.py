@@ -0,0 +1,95 @@
+# collation.py
+# ---------------------------------------------------------------------
+# 한글 가나다순 정렬 (대학/전형/모집단위 목록과 보고서 순서)
+#   - collation_key(): 한 값의 정렬 키. 유니코드 코드 순서 대신
+#       공백/기호 < 숫자(크기 순) < 한글 < 한자 < 라틴(대소문자 무시) < 기타
+#     순으로 비교한다 (CLDR 한국어 정렬처럼 한글을 라틴 문자보다 앞에).
+#     "전형2"는 "전형10"보다 앞에 오고, NFD로 풀어 쓴 한글(macOS 파일 등)도 같은 자리에 온다.
+#   - ColumnOrder: 한 열의 값 → 정렬 순위(int). 로드할 때 값 종류마다 한 번만 키를 계산하고
+#     이후 목록/보고서 정렬은 순위 정수 비교로만 한다.
+#   - HierarchyOrder: univ/subtype/dept 열별 ColumnOrder 묶음
+# ---------------------------------------------------------------------
+import re
+import unicodedata
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+HIERARCHY_COLUMNS = ("univ", "subtype", "dept")
+
+_SPACE, _DIGIT, _HANGUL, _HANJA, _LATIN, _OTHER = range(6)
+_TOKEN = re.compile(r"\d+|\D")
+
+
+def _char_class(ch: str) -> int:
+    code = ord(ch)
+    if 0xAC00 <= code <= 0xD7A3 or 0x1100 <= code <= 0x11FF or 0x3130 <= code <= 0x318F:
+        return _HANGUL
+    if 0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF or 0xF900 <= code <= 0xFAFF:
+        return _HANJA
+    if ch.isalpha():
+        return _LATIN if "LATIN" in unicodedata.name(ch, "") else _OTHER
+    return _SPACE
+
+
+def collation_key(text) -> tuple:
+    """정렬 키: ((분류, 값), ...) 뒤에 원래 문자열 (키가 같을 때 순서를 고정)"""
+    text = str(text)
+    parts = []
+    for token in _TOKEN.findall(unicodedata.normalize("NFKC", text)):
+        if token.isdigit():
+            parts.append((_DIGIT, int(token)))
+        else:
+            cls = _char_class(token)
+            parts.append((cls, ord(token.lower() if cls == _LATIN else token)))
+    return tuple(parts), text
+
+
+class ColumnOrder:
+    """한 열의 값 목록(가나다순)과 값 → 순위"""
+
+    def __init__(self, values: Iterable):
+        unique = {str(v) for v in values if not pd.isna(v)}
+        self.values = sorted(unique, key=collation_key)
+        self.rank = {v: i for i, v in enumerate(self.values)}
+        self._index = pd.Index(self.values, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def sort(self, items: Iterable) -> list:
+        """items를 중복 없이 가나다순으로 (색인에 없는 값은 뒤에 키를 계산해 붙인다)"""
+        n = len(self.values)
+        return sorted(set(items), key=lambda v: (self.rank[v],) if v in self.rank else (n, collation_key(v)))
+
+    def ranks(self, values) -> np.ndarray:
+        """값 배열 → 순위 배열 (색인에 없는 값과 NaN은 맨 뒤)"""
+        codes = self._index.get_indexer(np.asarray(values, dtype=object)).astype(np.int64)
+        codes[codes < 0] = len(self.values)
+        return codes
+
+
+class HierarchyOrder:
+    """univ/subtype/dept 열별 ColumnOrder (데이터를 불러올 때 한 번 만든다)"""
+
+    def __init__(self, columns: dict):
+        self.columns = columns
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Iterable[str] = HIERARCHY_COLUMNS) -> "HierarchyOrder":
+        return cls({col: ColumnOrder(df[col].unique()) for col in columns})
+
+    @classmethod
+    def from_values(cls, values: dict) -> "HierarchyOrder":
+        """{열: 값 목록} (예: 이력 DB의 DISTINCT 결과)"""
+        return cls({col: ColumnOrder(vals) for col, vals in values.items()})
+
+    def __getitem__(self, column: str) -> ColumnOrder:
+        return self.columns[column]
+
+    def get(self, column: str) -> Optional[ColumnOrder]:
+        return self.columns.get(column)
+
+    def ranks(self, column: str, values) -> np.ndarray:
+        return self.columns[column].ranks(values)
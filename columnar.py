@@ -0,0 +1,90 @@
+# columnar.py
+# ---------------------------------------------------------------------
+# DataFrame ↔ 압축 열 배열(numpy) 변환
+#   - 문자열 열: 정렬된 범주 목록 + 정수 코드 (NaN은 -1)
+#                범주 값은 원래 타입(숫자 학과 코드 등)과 열 dtype을 함께 남겨 그대로 복원한다
+#   - 등급 열:   소수 둘째 자리까지 정확하면 1/100 단위 정수(int16), 아니면 float64
+#   - 정수 열:   그대로
+# 배열은 .npy 파일(memmap)이나 공유 메모리에 그대로 올릴 수 있는 형태다.
+# ---------------------------------------------------------------------
+import numpy as np
+import pandas as pd
+
+_GRADE_SCALE = 100
+_INT16_NA = np.iinfo(np.int16).min
+
+
+def _code_dtype(n_categories: int):
+    return np.int16 if n_categories < np.iinfo(np.int16).max else np.int32
+
+
+def _category_values(categories: pd.Index) -> list:
+    """JSON에 원래 타입으로 들어가는 값(문자열/정수/실수/불리언)이면 그대로, 아니면 문자열로"""
+    values = categories.tolist()
+    if all(isinstance(v, (str, int, float, bool)) for v in values):
+        return values
+    return [str(v) for v in values]
+
+
+def encode_frame(df: pd.DataFrame) -> tuple[dict, dict]:
+    """
+    DataFrame을 (열 이름 → numpy 배열, 복원용 메타데이터)로 변환한다.
+    메타데이터는 JSON으로 저장 가능한 값만 담는다.
+    """
+    arrays, columns = {}, []
+    for name in df.columns:
+        series = df[name]
+        if pd.api.types.is_float_dtype(series.dtype):
+            values = series.to_numpy(dtype=float)
+            scaled = np.round(values * _GRADE_SCALE)
+            finite = ~np.isnan(values)
+            exact = np.allclose(scaled[finite] / _GRADE_SCALE, values[finite], rtol=0, atol=1e-9)
+            in_range = (not finite.any()) or np.abs(scaled[finite]).max() < np.iinfo(np.int16).max
+            if exact and in_range:
+                encoded = np.where(finite, scaled, _INT16_NA).astype(np.int16)
+                arrays[name] = encoded
+                columns.append({"name": name, "kind": "scaled", "scale": _GRADE_SCALE})
+            else:
+                arrays[name] = values
+                columns.append({"name": name, "kind": "float"})
+        elif pd.api.types.is_integer_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            arrays[name] = series.to_numpy()
+            columns.append({"name": name, "kind": "int"})
+        else:
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+            else:
+                codes, categories = pd.factorize(series, sort=True, use_na_sentinel=True)
+            arrays[name] = codes.astype(_code_dtype(len(categories)))
+            columns.append({
+                "name": name, "kind": "category", "dtype": str(series.dtype),
+                "categories": _category_values(categories),
+            })
+    return arrays, {"columns": columns, "rows": len(df)}
+
+
+def decode_frame(arrays: dict, meta: dict, categorical: bool = False) -> pd.DataFrame:
+    """
+    encode_frame 결과로 원래 형태(원래 dtype의 범주 열 + float 등급 열)의 DataFrame 복원
+    categorical: 범주 열을 값 배열로 풀지 않고 pd.Categorical(코드 + 범주 목록)로 둔다.
+                 memmap 세션 복원처럼 행마다 값 객체를 만들 필요가 없을 때 쓴다.
+    """
+    data = {}
+    for col in meta["columns"]:
+        name, kind = col["name"], col["kind"]
+        values = arrays[name]
+        if kind == "scaled":
+            out = values.astype(float) / col["scale"]
+            out[values == _INT16_NA] = np.nan
+            data[name] = out
+        elif kind == "category":
+            dtype = col.get("dtype", "object")  # dtype이 없는 이전 세션은 object로
+            if categorical or dtype == "category":
+                data[name] = pd.Categorical.from_codes(values, categories=pd.Index(col["categories"]))
+                continue
+            categories = np.asarray(col["categories"] + [np.nan], dtype=object)
+            # 코드 -1(NaN)은 마지막 원소(np.nan)를 가리키게 된다
+            data[name] = pd.array(categories[values], dtype=dtype)
+        else:
+            data[name] = np.asarray(values)
+    return pd.DataFrame(data, columns=[col["name"] for col in meta["columns"]])
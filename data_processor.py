@@ -1,7 +1,13 @@
 import pandas as pd
 import numpy as np
 import json
+import re
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterable, Optional
+
+from instrumentation import Instrumentation
+from sheet_schema import RAW_COLUMNS, LayoutCache, resolve_layout
 
 class NumpyEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -19,62 +25,241 @@ def compute_additional_stats(data, grade_column):
     추가 통계 정보(표준편차, 변동계수, 최솟값, 최댓값 등) 계산
     """
     stats = {}
+    results = data['result']
+    grades = data[grade_column]
 
-    # 결과별 통계 계산
+    # 결과별 통계 계산 (DataFrame 복사 없이 numpy 배열로 계산)
     for result_key in ["합격", "불합격", "충원합격"]:
-        result_data = data[data['result'] == result_key][grade_column].dropna()
+        result_data = grades[results == result_key].to_numpy(dtype=float)
+        result_data = result_data[~np.isnan(result_data)]
         if len(result_data) > 0: # 데이터가 있을 때만 통계 계산
+            mean = result_data.mean()
+            std = result_data.std(ddof=1) if len(result_data) > 1 else np.nan
+            q1, median, q3 = np.quantile(result_data, [0.25, 0.5, 0.75])
             stats[result_key] = {
                 'count': len(result_data),
-                'mean': result_data.mean(),
-                'std': result_data.std(),
-                'cv': (result_data.std() / result_data.mean()) * 100 if result_data.mean() != 0 else 0,  # 변동계수 (%)
+                'mean': mean,
+                'std': std,
+                'cv': (std / mean) * 100 if mean != 0 else 0,  # 변동계수 (%)
                 'min': result_data.min(),
                 'max': result_data.max(),
-                'median': result_data.median(),
-                'q1': result_data.quantile(0.25),
-                'q3': result_data.quantile(0.75)
+                'median': median,
+                'q1': q1,
+                'q3': q3
             }
         else: # 데이터가 없는 경우 count만 0으로 설정하고 나머지는 N/A 처리 준비 (또는 빈 dict)
              stats[result_key] = {'count': 0}
 
     return stats
 
-def read_input(path: Path) -> pd.DataFrame:
+def infer_year(path) -> Optional[int]:
+    """파일 이름에 들어 있는 입시 연도(예: '2025_입시결과.xlsx' → 2025). 없으면 None"""
+    match = re.search(r"(?<!\d)(20\d{2})(?!\d)", Path(path).stem)
+    return int(match.group(1)) if match else None
+
+
+GRADE_RANGE = (1.0, 9.0)
+
+# 결과 표기 정리: 공백을 모두 지운 뒤 이 표로 바꾼다 (없는 표기는 그대로 두고 '기타'로 집계됨)
+RESULT_ALIASES = {
+    "최초합격": "합격",
+    "추가합격": "충원합격",
+    "충원": "충원합격",
+}
+
+# 제외 사유 (앞의 사유가 우선) / 제외하지 않고 고친 항목
+REJECT_REASONS = {
+    "missing_required": "필수 정보 누락",
+    "grade_out_of_range": "등급 범위(1~9) 밖",
+    "missing_grade": "등급 정보 누락",
+}
+FIX_LABELS = {
+    "result_normalized": "결과 표기 정리",
+    "grade_cleared": "범위 밖 등급 비움",
+}
+
+
+@dataclass
+class ValidationReport:
     """
-    엑셀 파일을 읽어서 필요한 열만 추출하고 전처리합니다.
-    성능 최적화: 필요한 열만 로드하여 메모리 사용 최소화
+    파일 하나의 검증 결과.
+    rejected: 사유 → 제외된 행의 엑셀 행 번호 배열, fixed: 고친 항목 → 행 수
     """
-    try:
-        engine = "openpyxl" if str(path).lower().endswith(".xlsx") else "xlrd"
+    source: str
+    rows_in: int
+    rows_kept: int
+    rejected: dict = field(default_factory=dict)
+    fixed: dict = field(default_factory=dict)
+
+    @property
+    def rows_rejected(self) -> int:
+        return self.rows_in - self.rows_kept
+
+    def summary(self) -> str:
+        """한 줄 요약 (예: '결과.xlsx: 12행 제외 (필수 정보 누락 3, 등급 정보 누락 9) · 결과 표기 정리 40')"""
+        parts = [f"{self.source}: {self.rows_rejected:,}행 제외" if self.rows_rejected else f"{self.source}: 제외 없음"]
+        reasons = [f"{REJECT_REASONS[r]} {len(ids):,}" for r, ids in self.rejected.items() if len(ids)]
+        if reasons:
+            parts[0] += f" ({', '.join(reasons)})"
+        parts += [f"{FIX_LABELS[k]} {n:,}" for k, n in self.fixed.items() if n]
+        return " · ".join(parts)
+
+    def details(self, limit: int = 20) -> list:
+        """사유별 제외 행 번호 (사유마다 limit개까지)"""
+        lines = []
+        for reason, ids in self.rejected.items():
+            if len(ids):
+                shown = ", ".join(str(i) for i in ids[:limit])
+                more = " …" if len(ids) > limit else ""
+                lines.append(f"  {REJECT_REASONS[reason]} {len(ids):,}행: {shown}{more}")
+        return lines
+
+
+def read_raw(path: Path, instr: Optional[Instrumentation] = None, layout_cache: Optional[LayoutCache] = None) -> pd.DataFrame:
+    """
+    엑셀에서 필요한 열만 읽은 정리 전 원본 (열 이름만 붙임).
+    열 위치는 머리글 이름으로 찾고(sheet_schema, 워크북별 캐시) 못 찾으면 예전 F,J,L,R,U,AE 배치.
+    인덱스는 엑셀 행 번호라서 검증 결과에 그대로 쓴다.
+    """
+    instr = instr or Instrumentation("read_raw")
+    layout = resolve_layout(Path(path), layout_cache, instr)
+    engine = "openpyxl" if str(path).lower().endswith(".xlsx") else "xlrd"
+    with instr.span("excel_parse", file=Path(path).name):
         df = pd.read_excel(
             path,
             header=None,
-            skiprows=2,
-            usecols="F,L,J,R,U,AE",
+            skiprows=layout.skiprows,
+            usecols=layout.usecols,
             engine=engine,
         )
-        
-        df.columns = ["univ", "subtype", "dept", "conv_grade", "result", "all_subj_grade"]
-        df["result"] = df["result"].astype(str).str.strip()
-        df["conv_grade"] = pd.to_numeric(df["conv_grade"], errors="coerce")
-        df["all_subj_grade"] = pd.to_numeric(df["all_subj_grade"], errors="coerce")
-        rows_before = len(df)
-        df = df.dropna(subset=["result", "univ", "dept", "subtype"])
-        rows_after = len(df)
-        if rows_before > rows_after:
-            print(f"경고: {rows_before - rows_after}개 행이 필수 정보 누락으로 제외됨")
-        rows_before = len(df)
-        df = df[(~df["conv_grade"].isna()) | (~df["all_subj_grade"].isna())]
-        rows_after = len(df)
-        if rows_before > rows_after:
-            print(f"경고: {rows_before - rows_after}개 행이 등급 정보 누락으로 제외됨")
-        df = df.reset_index(drop=True)
-        return df
+    df.columns = layout.names
+    if tuple(df.columns) != RAW_COLUMNS:
+        df = df[list(RAW_COLUMNS)]
+    df.index = pd.RangeIndex(layout.first_row, layout.first_row + len(df))
+    instr.count("rows_read", len(df))
+    return df
+
+
+def _normalize_results(values: pd.Series) -> tuple:
+    """결과 열 정리: 서로 다른 표기(수십 개)만 정리하고 코드로 펼친다 → (값 배열, 누락 마스크, 바뀐 행 마스크)"""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    labels = ["".join(str(u).split()) for u in uniques]
+    labels = [RESULT_ALIASES.get(u, u) for u in labels] + [""]
+    changed = np.array([u != v for u, v in zip(uniques, labels)] + [False])
+    # codes -1(누락) → 마지막 칸(""). 값은 표기 목록(작은 배열)의 take라서 행마다 문자열을 다시 만들지 않는다
+    codes = np.where(codes < 0, len(labels) - 1, codes)
+    return pd.Series(labels).array.take(codes), np.array([v == "" for v in labels])[codes], changed[codes]
+
+
+def _valid_grades(values: pd.Series) -> tuple:
+    """등급 숫자 변환 + 범위 검사 → (범위 안 값만 남긴 배열, 범위 밖 마스크)"""
+    grades = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    low, high = GRADE_RANGE
+    with np.errstate(invalid="ignore"):
+        out = ~np.isnan(grades) & ((grades < low) | (grades > high))
+    return np.where(out, np.nan, grades), out
+
+
+def validate_frame(df: pd.DataFrame, source: str = "") -> tuple:
+    """
+    read_raw 결과를 한 번에 검사/정리해 (정리된 DataFrame, ValidationReport)를 돌려준다.
+    열마다 한 번씩만 배열로 바꾸고 사유별 마스크를 만든 뒤 남길 행을 한 번에 고른다.
+    """
+    result, result_missing, normalized = _normalize_results(df["result"])
+    conv, conv_out = _valid_grades(df["conv_grade"])
+    all_subj, all_out = _valid_grades(df["all_subj_grade"])
+
+    missing_required = result_missing | df[["univ", "dept", "subtype"]].isna().to_numpy().any(axis=1)
+    no_grade = np.isnan(conv) & np.isnan(all_subj) & ~missing_required
+    out_of_range = no_grade & (conv_out | all_out)
+    keep = ~(missing_required | no_grade)
+
+    row_ids = df.index.to_numpy()
+    positions = np.flatnonzero(keep)
+    report = ValidationReport(
+        source=source,
+        rows_in=len(df),
+        rows_kept=int(keep.sum()),
+        rejected={
+            "missing_required": row_ids[missing_required],
+            "grade_out_of_range": row_ids[out_of_range],
+            "missing_grade": row_ids[no_grade & ~out_of_range],
+        },
+        fixed={
+            "result_normalized": int(np.count_nonzero(keep & normalized)),
+            "grade_cleared": int(np.count_nonzero(keep & (conv_out | all_out))),
+        },
+    )
+    clean = df[["univ", "subtype", "dept"]].take(positions).reset_index(drop=True)
+    clean.insert(3, "conv_grade", conv[positions])
+    clean.insert(4, "result", result.take(positions))
+    clean["all_subj_grade"] = all_subj[positions]
+    return clean, report
+
+
+def clean_frame(
+    df: pd.DataFrame,
+    instr: Optional[Instrumentation] = None,
+    year: Optional[int] = None,
+    reports: Optional[list] = None,
+    source: str = "",
+) -> pd.DataFrame:
+    """
+    read_raw 결과 정리 (validate_frame): 결과 표기 정리, 등급 숫자 변환/범위 검사, 필수 정보/등급 누락 행 제외
+    year: 전달하면 모든 행에 입시 연도(year 열)를 붙인다
+    reports: 목록을 주면 ValidationReport를 덧붙인다 (GUI/CLI에서 사유별 제외 행 표시)
+    """
+    instr = instr or Instrumentation("clean_frame")
+    with instr.span("clean"):
+        df, report = validate_frame(df, source)
+        if year is not None:
+            df["year"] = np.full(len(df), int(year), dtype=np.int64)
+    for reason, ids in report.rejected.items():
+        if len(ids):
+            instr.count(f"rejected:{reason}", len(ids))
+    for key, n in report.fixed.items():
+        if n:
+            instr.count(f"fixed:{key}", n)
+    if report.rows_rejected:
+        print(f"경고: {report.summary()}")
+    if reports is not None:
+        reports.append(report)
+    instr.count("rows_loaded", len(df))
+    return df
+
+
+def read_input(path: Path, instr: Optional[Instrumentation] = None, year: Optional[int] = None,
+               reports: Optional[list] = None) -> pd.DataFrame:
+    """
+    엑셀 파일을 읽어서 필요한 열만 추출하고 전처리합니다.
+    성능 최적화: 필요한 열만 로드하여 메모리 사용 최소화
+    instr: 전달하면 엑셀 파싱/정리 구간 시간과 행 수, 사유별 제외(rejected:*) 카운터를 기록
+    year: 전달하면 모든 행에 입시 연도(year 열)를 붙인다
+    reports: 목록을 주면 파일의 ValidationReport(사유별 제외 행 번호)를 덧붙인다
+    """
+    instr = instr or Instrumentation("read_input")
+    try:
+        return clean_frame(read_raw(path, instr), instr, year, reports, Path(path).name)
     except Exception as e:
         print(f"파일 읽기 오류: {e}")
         raise
 
+def read_inputs(paths: Iterable[Path], years: Optional[Iterable[int]] = None,
+                instr: Optional[Instrumentation] = None, reports: Optional[list] = None) -> pd.DataFrame:
+    """
+    여러 해의 엑셀 파일을 읽어 year 열을 붙여 하나로 합친다.
+    years를 주지 않으면 파일 이름에서 연도를 찾는다 (infer_year).
+    """
+    paths = [Path(p) for p in paths]
+    years = list(years) if years is not None else [infer_year(p) for p in paths]
+    if len(years) != len(paths):
+        raise ValueError("파일 수와 연도 수가 다릅니다.")
+    missing = [p.name for p, y in zip(paths, years) if y is None]
+    if missing:
+        raise ValueError(f"연도를 알 수 없는 파일: {', '.join(missing)} (파일 이름에 연도를 넣거나 직접 지정해주세요)")
+    frames = [read_input(p, instr=instr, year=y, reports=reports) for p, y in zip(paths, years)]
+    return pd.concat(frames, ignore_index=True)
+
 # 그룹별 통계 계산 함수 (기존 코드 유지)
 def compute_stats(group_data: pd.DataFrame, grade_column: str = "conv_grade") -> dict:
     """
@@ -87,13 +272,16 @@ def compute_stats(group_data: pd.DataFrame, grade_column: str = "conv_grade") ->
     if total_count == 0:
         return stats
 
-    result_counts = group_data['result'].value_counts()
-    pass_data = group_data[group_data['result'].isin(['합격', '충원합격'])]
-    if not pass_data.empty:
-        all_pass_count = len(pass_data)
+    results = group_data['result']
+    grades = group_data[grade_column]
+    result_counts = results.value_counts()
+    result_counts = result_counts[result_counts > 0]  # 범주형(세션 복원) 열은 없는 결과도 0으로 센다
+    pass_mask = results.isin(['합격', '충원합격'])
+    all_pass_count = int(pass_mask.sum())
+    if all_pass_count > 0:
         stats['all_pass_count'] = all_pass_count
         stats['all_pass_rate'] = f"{all_pass_count/total_count*100:.1f}%" if total_count > 0 else "0.0%"
-        valid_grades = pass_data[grade_column].dropna()
+        valid_grades = grades[pass_mask].dropna()
         if not valid_grades.empty:
             stats['all_pass_min'] = valid_grades.min()
             stats['all_pass_max'] = valid_grades.max()
@@ -103,7 +291,7 @@ def compute_stats(group_data: pd.DataFrame, grade_column: str = "conv_grade") ->
         pass_count = result_counts['합격']
         stats['pass_count'] = pass_count
         stats['pass_rate'] = f"{pass_count/total_count*100:.1f}%" if total_count > 0 else "0.0%"
-        pass_grades = group_data[group_data['result'] == '합격'][grade_column].dropna()
+        pass_grades = grades[results == '합격'].dropna()
         if not pass_grades.empty:
             stats['pass_min'] = pass_grades.min()
             stats['pass_max'] = pass_grades.max()
@@ -113,7 +301,7 @@ def compute_stats(group_data: pd.DataFrame, grade_column: str = "conv_grade") ->
         waitlist_count = result_counts['충원합격']
         stats['waitlist_count'] = waitlist_count
         stats['waitlist_rate'] = f"{waitlist_count/total_count*100:.1f}%" if total_count > 0 else "0.0%"
-        waitlist_grades = group_data[group_data['result'] == '충원합격'][grade_column].dropna()
+        waitlist_grades = grades[results == '충원합격'].dropna()
         if not waitlist_grades.empty:
             stats['waitlist_min'] = waitlist_grades.min()
             stats['waitlist_max'] = waitlist_grades.max()
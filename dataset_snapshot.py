@@ -0,0 +1,133 @@
+# dataset_snapshot.py
+# ---------------------------------------------------------------------
+# 변경되지 않는 데이터셋 스냅숏 + 원자적 교체
+#   - DatasetSnapshot: 한 번 로드한 데이터(DataFrame 또는 이력 DB)와 거기서 만든 색인
+#     (그룹 부분 집계, 가나다순 순위, 합격 범위 색인, 합격 가능성 추정기)을 한 객체로 묶는다.
+#     만든 뒤에는 바꾸지 않는다. 선택 상태가 필요한 쪽은 selection()으로 자기 집계기를 받는다.
+#     version은 로드를 시작할 때 받은 번호라서 나중에 시작한 로드일수록 크다.
+#   - DatasetRef: 현재 스냅숏을 가리키는 참조. publish()는 속성 하나만 바꾸므로
+#     읽는 쪽은 잠금 없이 current를 한 번 읽어 그 스냅숏을 끝까지 쓴다(고정).
+#     먼저 시작했지만 늦게 끝난 로드는 더 새 스냅숏을 덮어쓰지 못한다.
+#
+# DataFrame은 pandas Copy-on-Write라서 스냅숏에서 파생한 프레임을 고쳐도 원본은 그대로다.
+# ---------------------------------------------------------------------
+import itertools
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from admission_estimator import AdmissionEstimator
+from collation import HIERARCHY_COLUMNS, HierarchyOrder
+from history_store import HistoryStore
+from interval_index import PassRangeIndex
+from report_cache import dataset_version
+from selection_stats import SelectionAggregator
+
+_versions = itertools.count(1)
+
+
+def next_version() -> int:
+    """로드 시작 순서 번호 (itertools.count의 next는 스레드 사이에서도 겹치지 않는다)"""
+    return next(_versions)
+
+
+@dataclass(frozen=True, eq=False)
+class DatasetSnapshot:
+    """
+    version: 로드 순서 번호, token: 보고서 캐시 키용 내용 버전 (dataset_version)
+    df/aggregator는 엑셀 데이터일 때, store는 이력 DB 탐색일 때 채워진다.
+    """
+    version: int
+    token: str
+    order: HierarchyOrder
+    df: Optional[pd.DataFrame] = None
+    aggregator: Optional[SelectionAggregator] = None
+    store: Optional[HistoryStore] = None
+    sources: tuple = ()
+    validation: tuple = ()  # 파일별 data_processor.ValidationReport (제외 행 표시용)
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        sources: Iterable = (),
+        *,
+        version: Optional[int] = None,
+        aggregator: Optional[SelectionAggregator] = None,
+        order: Optional[HierarchyOrder] = None,
+        token: Optional[str] = None,
+        validation: Iterable = (),
+    ) -> "DatasetSnapshot":
+        """이미 만든 색인(세션 복원, 폴더 감시)이 있으면 넘겨서 다시 계산하지 않는다"""
+        sources = tuple(str(s) for s in sources)
+        return cls(
+            version=version if version is not None else next_version(),
+            token=token or dataset_version(sources, len(df)),
+            order=order or HierarchyOrder.from_frame(df),
+            df=df,
+            aggregator=aggregator or SelectionAggregator(df),
+            sources=sources,
+            validation=tuple(validation),
+        )
+
+    @classmethod
+    def from_store(
+        cls, store: HistoryStore, *, version: Optional[int] = None, token: Optional[str] = None,
+    ) -> "DatasetSnapshot":
+        """이력 DB는 추가할 때마다 바뀌므로 만든 시점의 파일 정보/행 수로 token을 만든다"""
+        return cls(
+            version=version if version is not None else next_version(),
+            token=token or dataset_version([store.path], store.count()),
+            order=HierarchyOrder.from_values({col: store.distinct(col) for col in HIERARCHY_COLUMNS}),
+            store=store,
+            sources=(str(store.path),),
+        )
+
+    @property
+    def source(self):
+        """보고서/통계 함수에 넘길 데이터 (DataFrame 또는 HistoryStore)"""
+        return self.store if self.store is not None else self.df
+
+    @property
+    def uses_store(self) -> bool:
+        return self.store is not None
+
+    def selection(self) -> Optional[SelectionAggregator]:
+        """선택 상태를 따로 가진 집계기 (부분 집계 배열은 스냅숏과 공유)"""
+        return self.aggregator.copy() if self.aggregator is not None else None
+
+    # 처음 쓸 때 만든다. 두 스레드가 동시에 만들면 한쪽 결과가 남을 뿐 내용은 같다.
+    @cached_property
+    def range_index(self) -> PassRangeIndex:
+        if self.aggregator is None:
+            raise ValueError("합격 등급 범위 색인은 엑셀 데이터에서만 만들 수 있습니다.")
+        return PassRangeIndex(self.aggregator)
+
+    @cached_property
+    def estimator(self) -> AdmissionEstimator:
+        # 이력 DB 모드에서는 전체 행을 한 번 읽어 추정기를 만든다
+        return AdmissionEstimator(self.store.query(sort=False) if self.store is not None else self.df)
+
+
+class DatasetRef:
+    """현재 스냅숏 참조 (교체는 한 번의 속성 대입)"""
+
+    def __init__(self, snapshot: Optional[DatasetSnapshot] = None):
+        self._current = snapshot
+
+    @property
+    def current(self) -> Optional[DatasetSnapshot]:
+        return self._current
+
+    def publish(self, snapshot: DatasetSnapshot) -> bool:
+        """
+        snapshot이 현재 것보다 나중에 시작한 로드면 교체하고 True.
+        교체는 한 스레드(GUI에서는 Tk 메인 스레드)에서만 한다.
+        """
+        current = self._current
+        if current is not None and current.version > snapshot.version:
+            return False
+        self._current = snapshot
+        return True
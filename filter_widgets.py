@@ -6,6 +6,8 @@ import tkinter as tk
 from tkinter import ttk
 from typing import Iterable, Callable, Optional
 
+from collation import ColumnOrder, collation_key
+
 class MultiSelectFilter(ttk.Frame):
     """
     공통 다중-선택 필터 위젯
@@ -13,11 +15,12 @@ class MultiSelectFilter(ttk.Frame):
     Parameters
     ----------
     master : tk widget
-    df : pandas.DataFrame           # 전체 데이터 (후보 목록 계산용)
+    df : pandas.DataFrame | None    # 전체 데이터 (후보 목록 계산용, None이면 refresh로 채움)
     column : str                    # df 컬럼명 – 이 필터가 담당할 열
     label : str, optional           # 위젯 상단 라벨
     height : int, optional          # Listbox 표시 행 수
     callback : callable, optional   # 선택 변경 시 호출 함수
+    order : ColumnOrder, optional   # 로드 때 만든 가나다순 순위 (없으면 후보마다 정렬 키 계산)
     """
     def __init__(
         self,
@@ -28,9 +31,10 @@ class MultiSelectFilter(ttk.Frame):
         label: str = "선택",
         height: int = 14,
         callback: Optional[Callable] = None,
+        order: Optional[ColumnOrder] = None,
     ):
         super().__init__(master)
-        self.df, self.column, self.callback = df, column, callback
+        self.df, self.column, self.callback, self.order = df, column, callback, order
 
         # ── 타이틀 ──────────────────────────────────────────────
         ttk.Label(self, text=label, font=("Pretendard", 10, "bold")).pack(anchor="w")
@@ -71,16 +75,30 @@ class MultiSelectFilter(ttk.Frame):
         """현재 선택된 항목 리스트 반환"""
         return [self._lb.get(i) for i in self._lb.curselection()]
     
+    def set_selected(self, values: Iterable[str]) -> None:
+        """주어진 항목들을 선택 상태로 만든다 (콜백은 호출하지 않음)"""
+        wanted = set(values)
+        self._lb.selection_clear(0, tk.END)
+        for i, item in enumerate(self._lb.get(0, tk.END)):
+            if item in wanted:
+                self._lb.selection_set(i)
+
+    def set_source(self, df, order: Optional[ColumnOrder] = None) -> None:
+        """데이터셋이 바뀌면(폴더 감시 다시 읽기 등) 위젯은 그대로 두고 후보만 갱신 (선택 유지)"""
+        self.df, self.order = df, order
+        self.refresh()
+
     def refresh(self, candidates: Optional[Iterable[str]] = None) -> None:
         """후보 목록을 갱신한다. 이전 선택은 가능한 유지한다."""
         # 현재 선택된 항목들을 저장
         currently_selected = set(self.get_selected())
         
-        items = (
-            sorted(set(candidates))
-            if candidates is not None
-            else sorted(self.df[self.column].dropna().unique())
-        )
+        if candidates is not None:
+            items = self._sort(candidates)
+        elif self.df is not None:
+            items = self._sort(self.df[self.column].dropna().unique())
+        else:  # DataFrame 없이(예: 이력 DB) 후보를 나중에 채우는 경우
+            items = []
         q = self._q.get().lower().strip()
 
         # Listbox 내용 갱신
@@ -96,6 +114,12 @@ class MultiSelectFilter(ttk.Frame):
                 if item in currently_selected:
                     self._lb.selection_set(tk.END)
     # ──────────────────────── 내부 유틸 ───────────────────────────
+    def _sort(self, items: Iterable[str]) -> list[str]:
+        """가나다순 (순위가 있으면 정수 비교만)"""
+        if self.order is not None:
+            return self.order.sort(items)
+        return sorted(set(items), key=collation_key)
+
     def _fire(self):
         if callable(self.callback):
             self.callback()
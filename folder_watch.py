@@ -0,0 +1,257 @@
+# folder_watch.py
+# ---------------------------------------------------------------------
+# 공유 폴더 감시 + 증분 다시 읽기
+#   - FolderWatcher: 폴더의 엑셀 파일을 주기적으로 stat()해서 (수정 시각, 크기)를 비교한다.
+#     외부 서비스/라이브러리 없이 폴링만 쓴다. 복사 중인 파일을 읽지 않도록
+#     연속 두 번의 폴링에서 (수정 시각, 크기)가 같아진 파일만 변경으로 넘긴다.
+#   - FolderDataset: 파일별 DataFrame과 SelectionAggregator를 들고 있다가
+#     새로 생겼거나 바뀐 파일만 다시 읽고, 데이터셋/필터 색인/미리보기 집계는
+#     파일별 결과를 합쳐(SelectionAggregator.merge) 갱신한다.
+#     ReloadResult.affected에는 집계가 실제로 달라진 (대학, 모집단위, 전형) 그룹이 담겨
+#     어떤 보고서를 다시 만들어야 하는지 고를 수 있다.
+# ---------------------------------------------------------------------
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from collation import HierarchyOrder
+from data_processor import ValidationReport, infer_year, read_input
+from dataset_snapshot import DatasetSnapshot
+from instrumentation import Instrumentation
+from report_cache import dataset_version
+from selection_stats import SelectionAggregator
+
+DEFAULT_PATTERNS = ("*.xlsx", "*.xls")
+DEFAULT_POLL_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class FileSignature:
+    mtime_ns: int
+    size: int
+
+    @classmethod
+    def of(cls, path: Path) -> "FileSignature":
+        st = path.stat()
+        return cls(st.st_mtime_ns, st.st_size)
+
+
+@dataclass
+class FolderChanges:
+    added: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+class FolderWatcher:
+    """폴더 안 엑셀 파일의 (수정 시각, 크기) 비교로 추가/변경/삭제를 찾는다"""
+
+    def __init__(self, folder: Path, patterns: Iterable[str] = DEFAULT_PATTERNS):
+        self.folder = Path(folder)
+        self.patterns = tuple(patterns)
+        self.known: dict[Path, FileSignature] = {}   # 마지막으로 읽어 들인 파일 상태
+        self._seen: dict[Path, FileSignature] = {}   # 직전 폴링에서 본 상태
+        self._failed: dict[Path, FileSignature] = {} # 읽기에 실패한 상태 (파일이 다시 바뀔 때까지 건너뜀)
+
+    def files(self) -> dict:
+        """현재 폴더의 {경로: FileSignature} (엑셀 잠금 파일 ~$… 과 숨김 파일 제외)"""
+        found = {}
+        for pattern in self.patterns:
+            for path in self.folder.glob(pattern):
+                if path.name.startswith(("~$", ".")) or not path.is_file():
+                    continue
+                try:
+                    found[path] = FileSignature.of(path)
+                except OSError:  # 폴링 사이에 지워진 파일
+                    continue
+        return found
+
+    def poll(self, settle: bool = True) -> FolderChanges:
+        """
+        known과 비교한 변경 목록. settle이면 직전 폴링과 상태가 같은(복사가 끝난) 파일만 넘긴다.
+        넘긴 파일을 다 읽은 뒤 mark_loaded()/forget()으로 known을 갱신해야 다음 폴링에서 빠진다.
+        """
+        current = self.files()
+        ready = {p: sig for p, sig in current.items() if not settle or self._seen.get(p) == sig}
+        self._seen = current
+        changes = FolderChanges()
+        for path, sig in sorted(ready.items()):
+            if self._failed.get(path) == sig:
+                continue
+            if path not in self.known:
+                changes.added.append(path)
+            elif self.known[path] != sig:
+                changes.changed.append(path)
+        changes.removed = sorted(p for p in self.known if p not in current)
+        return changes
+
+    def mark_loaded(self, path: Path, sig: FileSignature) -> None:
+        self.known[path] = sig
+        self._failed.pop(path, None)
+
+    def mark_failed(self, path: Path, sig: FileSignature) -> None:
+        self._failed[path] = sig
+
+    def forget(self, path: Path) -> None:
+        self.known.pop(path, None)
+        self._failed.pop(path, None)
+
+
+@dataclass
+class ReloadResult:
+    changes: FolderChanges
+    affected: set                 # 집계가 달라진 (univ, dept, subtype) 그룹
+    rows_read: int
+    elapsed: float
+    failed: dict = field(default_factory=dict)   # 읽지 못한 파일 → 오류 메시지
+
+    def failure_note(self) -> str:
+        """읽지 못한 파일 안내 (없으면 빈 문자열). 호출한 쪽이 상태 표시줄/콘솔에 붙인다"""
+        if not self.failed:
+            return ""
+        return "읽기 실패: " + ", ".join(f"{path.name} ({msg})" for path, msg in self.failed.items())
+
+    def touches(self, univs=None, subtypes=None, depts=None, groups=None) -> bool:
+        """이 선택(빈 목록은 전체)으로 만든 보고서가 바뀐 그룹을 포함하는지"""
+        allowed = set(map(tuple, groups)) if groups is not None else None
+        for univ, dept, subtype in self.affected:
+            if univs and univ not in univs:
+                continue
+            if subtypes and subtype not in subtypes:
+                continue
+            if depts and dept not in depts:
+                continue
+            if allowed is not None and (univ, dept, subtype) not in allowed:
+                continue
+            return True
+        return False
+
+
+class FolderDataset:
+    """
+    감시 폴더 전체를 하나의 데이터셋으로. poll()은 바뀐 파일만 다시 읽고
+    df / aggregator / order / version을 새 객체로 바꾼다 (이전 객체는 그대로 두므로
+    진행 중인 보고서 생성은 이전 데이터로 끝난다).
+    """
+
+    def __init__(self, folder: Path, patterns: Iterable[str] = DEFAULT_PATTERNS):
+        self.watcher = FolderWatcher(folder, patterns)
+        self._frames: dict[Path, pd.DataFrame] = {}
+        self._aggregators: dict[Path, SelectionAggregator] = {}
+        self._validation: dict[Path, ValidationReport] = {}
+        self.df: Optional[pd.DataFrame] = None
+        self.aggregator: Optional[SelectionAggregator] = None
+        self.order: Optional[HierarchyOrder] = None
+        self.version: Optional[str] = None
+
+    @property
+    def folder(self) -> Path:
+        return self.watcher.folder
+
+    @property
+    def paths(self) -> list:
+        return sorted(self._frames)
+
+    @property
+    def validation(self) -> tuple:
+        """현재 읽혀 있는 파일들의 검증 결과 (파일 이름 순)"""
+        return tuple(self._validation[p] for p in self.paths if p in self._validation)
+
+    def snapshot(self) -> DatasetSnapshot:
+        """현재 데이터로 만든 스냅숏 (색인은 다시 계산하지 않고 그대로 넘긴다)"""
+        return DatasetSnapshot.from_frame(
+            self.df, self.paths, aggregator=self.aggregator, order=self.order, token=self.version,
+            validation=self.validation,
+        )
+
+    def load(self, instr: Optional[Instrumentation] = None) -> ReloadResult:
+        """처음 한 번: 폴더의 파일을 (복사 완료를 기다리지 않고) 모두 읽는다"""
+        return self._apply(self.watcher.poll(settle=False), instr)
+
+    def poll(self, instr: Optional[Instrumentation] = None) -> Optional[ReloadResult]:
+        """바뀐 파일이 없으면 None"""
+        changes = self.watcher.poll()
+        return self._apply(changes, instr) if changes else None
+
+    # ───────────────────────── 내부 ──────────────────────────
+    def _apply(self, changes: FolderChanges, instr: Optional[Instrumentation]) -> ReloadResult:
+        instr = instr or Instrumentation("folder_reload")
+        start = time.perf_counter()
+        previous = self.aggregator
+        failed, rows_read = {}, 0
+
+        for path in changes.removed:
+            self._frames.pop(path, None)
+            self._aggregators.pop(path, None)
+            self._validation.pop(path, None)
+            self.watcher.forget(path)
+        for path in changes.added + changes.changed:
+            try:
+                sig = FileSignature.of(path)
+                reports = []
+                df = read_input(path, instr=instr, year=infer_year(path), reports=reports)
+            except Exception as e:  # 형식이 다른 파일 등: 이전 내용을 유지하고 파일이 다시 바뀌면 재시도
+                failed[path] = str(e)
+                if path.exists():
+                    self.watcher.mark_failed(path, FileSignature.of(path))
+                continue
+            with instr.span("index_build"):
+                self._aggregators[path] = SelectionAggregator(df)
+            self._frames[path] = df
+            self._validation[path] = reports[0]
+            self.watcher.mark_loaded(path, sig)
+            rows_read += len(df)
+
+        self._combine(instr)
+        with instr.span("index_build"):
+            affected = _changed_groups(previous, self.aggregator)
+        instr.count("reload_files", len(changes.added) + len(changes.changed) - len(failed))
+        instr.count("reload_rows", rows_read)
+        return ReloadResult(changes, affected, rows_read, time.perf_counter() - start, failed)
+
+    def _combine(self, instr: Instrumentation) -> None:
+        paths = self.paths
+        frames = [self._frames[p] for p in paths]
+        with instr.span("merge"):
+            if frames and not all("year" in f.columns for f in frames):
+                # 연도를 알 수 없는 파일이 섞이면 year 열을 쓰지 않는다 (추이 차트 없음)
+                frames = [f.drop(columns="year", errors="ignore") for f in frames]
+            self.df = pd.concat(frames, ignore_index=True) if frames else None
+        with instr.span("index_build"):
+            self.aggregator = SelectionAggregator.merge(self._aggregators[p] for p in paths) if paths else None
+            self.order = HierarchyOrder.from_values(self.aggregator.group_keys()) if paths else None
+        self.version = dataset_version(paths, len(self.df) if self.df is not None else 0)
+
+
+def _group_table(aggregator: Optional[SelectionAggregator]) -> pd.DataFrame:
+    """그룹 키 → 부분 집계 한 줄 (비교용)"""
+    if aggregator is None:
+        return pd.DataFrame(index=pd.MultiIndex.from_arrays([[], [], []], names=["univ", "dept", "subtype"]))
+    keys = aggregator.group_keys()
+    index = pd.MultiIndex.from_arrays([keys["univ"], keys["dept"], keys["subtype"]], names=["univ", "dept", "subtype"])
+    n_groups = aggregator.n_groups
+    state = aggregator.state()[1]
+    columns = [state["g_count"].reshape(n_groups, -1)]
+    for key in ("g_n", "g_sum", "g_min", "g_max"):
+        columns.append(np.moveaxis(state[key], 1, 0).reshape(n_groups, -1))
+    return pd.DataFrame(np.nan_to_num(np.hstack(columns).astype(float), nan=-1.0), index=index)
+
+
+def _changed_groups(old: Optional[SelectionAggregator], new: Optional[SelectionAggregator]) -> set:
+    """두 집계에서 새로 생겼거나, 없어졌거나, 부분 집계가 달라진 그룹"""
+    before, after = _group_table(old), _group_table(new)
+    gone = before.index.difference(after.index)
+    added = after.index.difference(before.index)
+    common = after.index.intersection(before.index)
+    changed = set(gone) | set(added)
+    if len(common):
+        diff = ~np.isclose(after.loc[common].to_numpy(), before.loc[common].to_numpy()).all(axis=1)
+        changed |= set(common[diff])
+    return changed
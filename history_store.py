@@ -0,0 +1,203 @@
+# history_store.py
+# ---------------------------------------------------------------------
+# 여러 해/여러 학교의 입시 결과를 누적하는 SQLite 저장소 (표준 라이브러리 sqlite3)
+#   - append():    read_input 결과를 행 단위로 추가 (연도/원본 파일 태그 포함)
+#   - distinct():  필터 후보 목록 (WHERE 조건을 SQL로 내려 보냄)
+#   - selection_stats(): compute_stats 형식 통계를 SQL 집계로 계산
+#   - query():     선택 조건에 맞는 행만 DataFrame으로 읽기 (전체를 메모리에 올리지 않음)
+# ---------------------------------------------------------------------
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from selection_stats import RESULT_KEYS, stats_from_partials
+
+DEFAULT_DB_PATH = Path("admissions_history.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT,
+    year INTEGER,
+    rows INTEGER NOT NULL,
+    imported_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    univ TEXT NOT NULL,
+    subtype TEXT NOT NULL,
+    dept TEXT NOT NULL,
+    year INTEGER,
+    result TEXT NOT NULL,
+    conv_grade REAL,
+    all_subj_grade REAL,
+    source_id INTEGER REFERENCES sources(id)
+);
+CREATE INDEX IF NOT EXISTS idx_results_hierarchy ON results(univ, dept, subtype, year, result);
+CREATE INDEX IF NOT EXISTS idx_results_subtype ON results(subtype, year);
+CREATE INDEX IF NOT EXISTS idx_results_dept ON results(dept, year);
+CREATE INDEX IF NOT EXISTS idx_results_year ON results(year, result);
+"""
+
+FILTER_COLUMNS = ("univ", "subtype", "dept", "year")
+_FRAME_COLUMNS = ["univ", "subtype", "dept", "conv_grade", "result", "all_subj_grade"]
+# 이보다 많은 값은 IN (?, ?, …) 대신 JSON 배열 하나로 묶어 json_each로 넘긴다
+# (SQLite 바인딩 변수 상한: 3.32 이전 999개, 이후 32766개)
+MAX_INLINE_VALUES = 200
+
+
+class HistoryStore:
+    """
+    입시 결과 누적 저장소.
+
+    GUI 작업 스레드와 메인 스레드가 함께 쓰므로 연결은 check_same_thread=False로
+    열고, 모든 접근을 하나의 잠금으로 직렬화한다.
+    """
+
+    def __init__(self, path: Path = DEFAULT_DB_PATH):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ───────────────────────── 적재 ──────────────────────────
+    def append(self, df: pd.DataFrame, year: Optional[int] = None, source: Optional[str] = None) -> int:
+        """
+        read_input 결과를 추가하고 추가된 행 수를 반환한다.
+        df에 year 열이 있으면 그 값을, 없으면 year 인자를 모든 행에 쓴다.
+        """
+        if "year" in df.columns:
+            years = df["year"].to_numpy()
+        else:
+            years = np.full(len(df), year, dtype=object)
+
+        def rows(source_id):
+            columns = [df[c].to_numpy(dtype=object) for c in ("univ", "subtype", "dept", "result")]
+            grades = [df[c].to_numpy(dtype=float) for c in ("conv_grade", "all_subj_grade")]
+            for i in range(len(df)):
+                conv, all_subj = grades[0][i], grades[1][i]
+                yr = years[i]
+                yield (
+                    columns[0][i], columns[1][i], columns[2][i],
+                    None if pd.isna(yr) else int(yr),
+                    columns[3][i],
+                    None if np.isnan(conv) else float(conv),
+                    None if np.isnan(all_subj) else float(all_subj),
+                    source_id,
+                )
+
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO sources(path, year, rows, imported_at) VALUES (?, ?, ?, ?)",
+                (source, year, len(df), time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO results(univ, subtype, dept, year, result, conv_grade, all_subj_grade, source_id)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows(cur.lastrowid),
+            )
+        return len(df)
+
+    # ───────────────────────── 조회 ──────────────────────────
+    def distinct(self, column: str, **filters) -> list:
+        """column의 고유값 목록 (column 자신에 대한 조건은 무시)"""
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"지원하지 않는 열: {column}")
+        filters = {k: v for k, v in filters.items() if k != self._filter_key(column)}
+        where, params = self._where(**filters)
+        sql = f"SELECT DISTINCT {column} FROM results {where} ORDER BY {column}"
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params) if row[0] is not None]
+
+    def count(self, **filters) -> int:
+        where, params = self._where(**filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM results {where}", params).fetchone()[0]
+
+    def selection_size(self, **filters) -> tuple[int, int]:
+        """선택 조건의 (행 수, (univ, dept, subtype) 그룹 수) - 작업 큐의 메모리 추정용"""
+        where, params = self._where(**filters)
+        sql = f"SELECT COUNT(*), COUNT(DISTINCT univ || char(31) || dept || char(31) || subtype) FROM results {where}"
+        with self._lock:
+            rows, groups = self._conn.execute(sql, params).fetchone()
+        return rows, groups
+
+    def selection_stats(self, grade_column: str = "conv_grade", **filters) -> dict:
+        """선택 조건에 대한 compute_stats 형식 통계 (결과별 SQL 집계 한 번)"""
+        if grade_column not in ("conv_grade", "all_subj_grade"):
+            raise ValueError(f"지원하지 않는 등급 열: {grade_column}")
+        where, params = self._where(**filters)
+        sql = (
+            f"SELECT result, COUNT(*), COUNT({grade_column}), TOTAL({grade_column}),"
+            f" MIN({grade_column}), MAX({grade_column}) FROM results {where} GROUP BY result"
+        )
+        size = len(RESULT_KEYS) + 1
+        count, n, total = np.zeros(size, dtype=np.int64), np.zeros(size, dtype=np.int64), np.zeros(size)
+        mins, maxs = np.full(size, np.nan), np.full(size, np.nan)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        for result, cnt, valid, sum_, lo, hi in rows:
+            i = RESULT_KEYS.index(result) if result in RESULT_KEYS else len(RESULT_KEYS)
+            count[i] += cnt
+            n[i] += valid
+            total[i] += sum_
+            if lo is not None:
+                mins[i] = np.fmin(mins[i], lo)
+                maxs[i] = np.fmax(maxs[i], hi)
+        return stats_from_partials(count, n, total, mins, maxs)
+
+    def query(self, *, sort: bool = True, with_year: bool = False, **filters) -> pd.DataFrame:
+        """
+        선택 조건에 맞는 행만 read_input과 같은 열 구성으로 읽는다.
+        sort=True이면 (univ, dept, subtype) 코드 순서로 정렬한다 (보고서용 가나다순 정렬은 select_sorted).
+        """
+        where, params = self._where(**filters)
+        columns = _FRAME_COLUMNS + (["year"] if with_year else [])
+        order = " ORDER BY univ, dept, subtype, id" if sort else ""
+        sql = f"SELECT {', '.join(columns)} FROM results {where}{order}"
+        with self._lock:
+            cur = self._conn.execute(sql, params)
+            rows = cur.fetchall()
+        df = pd.DataFrame.from_records(rows, columns=columns)
+        for col in ("conv_grade", "all_subj_grade"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(float)
+        return df
+
+    def years(self) -> list:
+        return self.distinct("year")
+
+    # ──────────────────────── 내부 유틸 ───────────────────────────
+    @staticmethod
+    def _filter_key(column: str) -> str:
+        return {"univ": "univs", "subtype": "subtypes", "dept": "depts", "year": "years"}[column]
+
+    @staticmethod
+    def _where(
+        univs: Optional[Iterable[str]] = None,
+        subtypes: Optional[Iterable[str]] = None,
+        depts: Optional[Iterable[str]] = None,
+        years: Optional[Iterable[int]] = None,
+    ) -> tuple[str, list]:
+        """빈 선택은 '전체'로 취급하는 WHERE 절과 바인딩 값 (값이 아무리 많아도 변수는 열마다 MAX_INLINE_VALUES개 이하)"""
+        clauses, params = [], []
+        for column, values in (("univ", univs), ("subtype", subtypes), ("dept", depts), ("year", years)):
+            # numpy 스칼라(np.int64 연도 등)는 sqlite3가 바인딩하지 못하므로 파이썬 값으로
+            values = [v.item() if isinstance(v, np.generic) else v for v in (values or ())]
+            if len(values) > MAX_INLINE_VALUES:
+                clauses.append(f"{column} IN (SELECT value FROM json_each(?))")
+                params.append(json.dumps(values, ensure_ascii=False))
+            elif values:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
@@ -1,7 +1,19 @@
 from pathlib import Path
+import hashlib
 import json
+import time
+from html import escape
 from data_processor import compute_additional_stats, compute_stats, NumpyEncoder # data_processor 모듈이 있다고 가정합니다.
+import numpy as np
 import pandas as pd
+from typing import Optional
+
+from history_store import HistoryStore
+from selection_stats import YearlyTrends
+from instrumentation import Instrumentation
+from plot_reduction import PLOT_POINT_BUDGET, bin_histogram, reduce_box_points, split_budget
+from report_cache import ReportFileCache
+from collation import ColumnOrder, HierarchyOrder
 
 def create_additional_stats_html(stats, grade_type, result_order=["합격", "충원합격", "불합격"]):
     """
@@ -100,98 +112,97 @@ def create_stats_html(stats: dict) -> str:
         sc += f'<div class="stats-item stats-fail">불합격: {fc}명 <span class="highlight-fail-rate">({fc/tc*100:.1f}%)</span></div>'
     return sc
 
+def _dumps(values, instr: Instrumentation) -> str:
+    """플롯 데이터 JSON 인코딩 (json_encode 구간으로 계측)"""
+    with instr.span("json_encode"):
+        return json.dumps(values, cls=NumpyEncoder)
+
+
+def _result_values(values: np.ndarray, results: np.ndarray, result: str) -> list:
+    """결과가 result인 행의 유효한(NaN 아닌) 등급 값 리스트"""
+    selected = values[results == result]
+    return selected[~np.isnan(selected)].tolist()
+
+def _box_traces(values: np.ndarray, results: np.ndarray, label: str, color_map: dict, point_budget: int, instr: Instrumentation) -> list:
+    """
+    결과별(합격, 충원합격, 불합격) 박스플롯 trace 문자열 목록.
+    전체 점 수가 point_budget 이하이면 모든 값을 넣고 Plotly가 통계를 계산한다.
+    넘으면 정확한 요약 통계(q1/median/q3/수염/평균)로 박스를 그리고, 이상치와
+    hover용 층화 표본(보이지 않는 점)만 넣는다.
+    """
+    per_result = [_result_values(values, results, result) for result in ["합격", "충원합격", "불합격"]]
+    reduce = sum(len(v) for v in per_result) > point_budget
+    budgets = split_budget([len(v) for v in per_result], point_budget)
+    traces = []
+    for result, y_values, budget in zip(["합격", "충원합격", "불합격"], per_result, budgets):
+        color = color_map[result]
+        if len(y_values) == 0:
+            traces.append(f"""{{
+                y: [], x: ['{result}'], type: 'box', name: '{result}', boxpoints: false, width: 0.5,
+                marker: {{ color: '{color["border"]}', opacity: 0.5 }},
+                line: {{ color: '{color["border"]}', width: 2 }},
+                fillcolor: '{color["fill"]}', showlegend: false, hoverinfo: 'skip'
+            }}""")
+        elif not reduce:
+            y_values_json = _dumps(y_values, instr)
+            traces.append(f"""{{
+                y: {y_values_json}, x: Array({len(y_values)}).fill('{result}'), type: 'box', name: '{result}',
+                boxpoints: 'outliers', width: 0.5,
+                marker: {{ color: '{color["border"]}', size: 6, opacity: 0.8, line: {{ width: 1, color: 'rgba(0,0,0,0.5)' }} }},
+                line: {{ color: '{color["border"]}', width: 2 }},
+                fillcolor: '{color["fill"]}', boxmean: true, hoverinfo: 'y+name',
+                hovertemplate: '{label}: %{{y}}<br>{result}<extra></extra>'
+            }}""")
+        else:
+            with instr.span("point_reduction"):
+                outliers, sample, summary = reduce_box_points(np.asarray(y_values), budget)
+            instr.count("points_dropped", len(y_values) - len(outliers) - len(sample))
+            stats = ", ".join(f"{name}: [{value!r}]" for name, value in summary.items())
+            traces.append(f"""{{
+                x: ['{result}'], {stats}, type: 'box', name: '{result}',
+                boxpoints: false, width: 0.5,
+                line: {{ color: '{color["border"]}', width: 2 }},
+                fillcolor: '{color["fill"]}', boxmean: true, hoverinfo: 'y+name'
+            }}""")
+            for points, opacity in ((outliers, 0.8), (sample, 0)):
+                if len(points) == 0:
+                    continue
+                traces.append(f"""{{
+                y: {_dumps(points.tolist(), instr)}, x: Array({len(points)}).fill('{result}'), type: 'scatter', mode: 'markers',
+                name: '{result}', showlegend: false,
+                marker: {{ color: '{color["border"]}', size: 6, opacity: {opacity}, line: {{ width: {1 if opacity else 0}, color: 'rgba(0,0,0,0.5)' }} }},
+                hovertemplate: '{label}: %{{y}}<br>{result}<extra></extra>'
+            }}""")
+    return traces
+
+
     # 플롯 데이터 스크립트 생성 함수 (수정됨: 평균 숫자 표시 제거)
-def create_plot_data_script(plot_id, data, y_positions, marker_styles, symbol_map=None):
+def create_plot_data_script(plot_id, data, y_positions, marker_styles, symbol_map=None, instr: Optional[Instrumentation] = None, point_budget: int = PLOT_POINT_BUDGET):
     """
     환산등급과 전교과 등급에 대한 박스플롯 데이터를 생성하는 JavaScript 코드 반환.
     추가 통계 정보를 함께 표시하며 결과 순서를 변경한다.
     모든 결과 카테고리(합격, 충원합격, 불합격)에 대해 항상 trace를 생성한다.
     (script, conv_stats_html, all_subj_stats_html) 튜플을 반환한다.
+    instr: 전달하면 통계 계산(stats)과 JSON 인코딩(json_encode) 시간을 기록
+    point_budget: 등급 종류별 점 수가 이보다 많으면 박스는 요약 통계로 그리고
+        이상치 + 층화 표본만 넣는다 (plot_reduction 참고)
     """
+    instr = instr or Instrumentation("create_plot_data_script")
+    instr.count("plots")
     color_map = {
         "합격": {"border": "#3366CC", "fill": "rgba(51, 102, 204, 0.3)"},
         "불합격": {"border": "#DC3912", "fill": "rgba(220, 57, 18, 0.3)"},
         "충원합격": {"border": "#109618", "fill": "rgba(16, 150, 24, 0.3)"}
     }
-    conv_add_stats = compute_additional_stats(data, "conv_grade")
-    all_subj_add_stats = compute_additional_stats(data, "all_subj_grade")
-    conv_traces = []
-    # conv_means_traces = [] # 평균 숫자 표시 제거
-
-    for result in ["합격", "충원합격", "불합격"]:
-        result_data = data[data["result"] == result]
-        y_values_conv = result_data["conv_grade"].dropna().tolist()
-        if len(y_values_conv) == 0:
-            conv_traces.append(f"""{{
-                y: [], x: ['{result}'], type: 'box', name: '{result}', boxpoints: false, width: 0.5,
-                marker: {{ color: '{color_map[result]["border"]}', opacity: 0.5 }},
-                line: {{ color: '{color_map[result]["border"]}', width: 2 }},
-                fillcolor: '{color_map[result]["fill"]}', showlegend: false, hoverinfo: 'skip'
-            }}""")
-        else:
-            y_values_json = json.dumps(y_values_conv, cls=NumpyEncoder)
-            # mean_value = sum(y_values_conv) / len(y_values_conv) if len(y_values_conv) > 0 else 0 # 평균 숫자 표시 제거
-
-            conv_traces.append(f"""{{
-                y: {y_values_json}, x: Array({len(y_values_conv)}).fill('{result}'), type: 'box', name: '{result}',
-                boxpoints: 'outliers', width: 0.5,
-                marker: {{ color: '{color_map[result]["border"]}', size: 6, opacity: 0.8, line: {{ width: 1, color: 'rgba(0,0,0,0.5)' }} }},
-                line: {{ color: '{color_map[result]["border"]}', width: 2 }},
-                fillcolor: '{color_map[result]["fill"]}', boxmean: true, hoverinfo: 'y+name',
-                hovertemplate: '환산등급: %{{y}}<br>{result}<extra></extra>'
-            }}""")
-
-            # 평균값을 표시하는 텍스트 트레이스 추가 (제거됨)
-            # conv_means_traces.append(f"""{{
-            #     type: 'scatter',
-            #     x: ['{result}'],
-            #     y: [{mean_value}],
-            #     mode: 'text',
-            #     text: ['평균: {mean_value:.2f}'],
-            #     textposition: 'top center',
-            #     textfont: {{ size: 11, color: '{color_map[result]["border"]}', weight: 'bold' }},
-            #     showlegend: false,
-            #     hoverinfo: 'none'
-            # }}""")
-
-    all_subj_traces = []
-    # all_subj_means_traces = [] # 평균 숫자 표시 제거
-
-    for result in ["합격", "충원합격", "불합격"]:
-        result_data = data[data["result"] == result]
-        y_values_all_subj = result_data["all_subj_grade"].dropna().tolist()
-        if len(y_values_all_subj) == 0:
-            all_subj_traces.append(f"""{{
-                y: [], x: ['{result}'], type: 'box', name: '{result}', boxpoints: false, width: 0.5,
-                marker: {{ color: '{color_map[result]["border"]}', opacity: 0.5 }},
-                line: {{ color: '{color_map[result]["border"]}', width: 2 }},
-                fillcolor: '{color_map[result]["fill"]}', showlegend: false, hoverinfo: 'skip'
-            }}""")
-        else:
-            y_values_json = json.dumps(y_values_all_subj, cls=NumpyEncoder)
-            # mean_value = sum(y_values_all_subj) / len(y_values_all_subj) if len(y_values_all_subj) > 0 else 0 # 평균 숫자 표시 제거
-
-            all_subj_traces.append(f"""{{
-                y: {y_values_json}, x: Array({len(y_values_all_subj)}).fill('{result}'), type: 'box', name: '{result}',
-                boxpoints: 'outliers', width: 0.5,
-                marker: {{ color: '{color_map[result]["border"]}', size: 6, opacity: 0.8, line: {{ width: 1, color: 'rgba(0,0,0,0.5)' }} }},
-                line: {{ color: '{color_map[result]["border"]}', width: 2 }},
-                fillcolor: '{color_map[result]["fill"]}', boxmean: true, hoverinfo: 'y+name',
-                hovertemplate: '전교과등급: %{{y}}<br>{result}<extra></extra>'
-            }}""")
-
-            # 평균값을 표시하는 텍스트 트레이스 추가 (제거됨)
-            # all_subj_means_traces.append(f"""{{
-            #     type: 'scatter',
-            #     x: ['{result}'],
-            #     y: [{mean_value}],
-            #     mode: 'text',
-            #     text: ['평균: {mean_value:.2f}'],
-            #     textposition: 'top center',
-            #     textfont: {{ size: 11, color: '{color_map[result]["border"]}', weight: 'bold' }},
-            #     showlegend: false,
-            #     hoverinfo: 'none'
-            # }}""")
+    with instr.span("stats"):
+        conv_add_stats = compute_additional_stats(data, "conv_grade")
+        all_subj_add_stats = compute_additional_stats(data, "all_subj_grade")
+    # 결과별 값은 DataFrame 복사 없이 numpy 배열에서 바로 추출
+    results = data["result"].to_numpy()
+    conv_values = data["conv_grade"].to_numpy(dtype=float)
+    all_subj_values = data["all_subj_grade"].to_numpy(dtype=float)
+    conv_traces = _box_traces(conv_values, results, "환산등급", color_map, point_budget, instr)
+    all_subj_traces = _box_traces(all_subj_values, results, "전교과등급", color_map, point_budget, instr)
 
     conv_stats_html_table = create_additional_stats_html(conv_add_stats, "환산등급", ["합격", "충원합격", "불합격"])
     all_subj_stats_html_table = create_additional_stats_html(all_subj_add_stats, "전교과등급", ["합격", "충원합격", "불합격"])
@@ -210,9 +221,26 @@ def create_plot_data_script(plot_id, data, y_positions, marker_styles, symbol_ma
 
     return script, conv_stats_html_table, all_subj_stats_html_table
 
+def _histogram_data(values: np.ndarray, point_budget: int, instr: Instrumentation) -> str:
+    """
+    히스토그램 trace의 데이터 부분. 값이 많으면 xbins(1~9, 0.25)와 같은 구간으로
+    미리 세어 (대표값, 개수)와 histfunc: 'sum'으로 넣는다 (막대 높이는 같다).
+    """
+    if len(values) <= point_budget:
+        return f"x: {_dumps(values.tolist(), instr)}"
+    with instr.span("point_reduction"):
+        xs, counts = bin_histogram(values, 1, 0.25)
+    instr.count("points_dropped", len(values) - len(xs))
+    return f"x: {_dumps(xs, instr)}, y: {_dumps(counts, instr)}, histfunc: 'sum'"
+
+
 # 새로운 함수: 히스토그램 및 추가 시각화 생성
-def create_advanced_visualizations(plot_id, data):
-    """전체 데이터 요약에 대한 추가 시각화 생성"""
+def create_advanced_visualizations(plot_id, data, instr: Optional[Instrumentation] = None, point_budget: int = PLOT_POINT_BUDGET):
+    """
+    전체 데이터 요약에 대한 추가 시각화 생성.
+    히스토그램 값이 point_budget보다 많으면 구간별 개수로 미리 집계해 넣는다.
+    """
+    instr = instr or Instrumentation("create_advanced_visualizations")
     # 파스텔톤 색상 맵
     color_map = {
         "합격": "#A8D8EA",     # 부드러운 하늘색
@@ -221,7 +249,8 @@ def create_advanced_visualizations(plot_id, data):
     }
 
     # 1. 결과별 도넛 차트 데이터 생성
-    result_counts = data['result'].value_counts().to_dict()
+    result_counts = data['result'].value_counts()
+    result_counts = result_counts[result_counts > 0].to_dict()  # 범주형 열의 0건 범주 제외
 
     # 도넛 차트 데이터 - 모든 결과를 하나의 차트로 표시
     values = []
@@ -256,9 +285,9 @@ def create_advanced_visualizations(plot_id, data):
     # 합격(충원합격 포함) 데이터
     pass_data = data[data["result"].isin(["합격", "충원합격"])]["conv_grade"].dropna()
     if len(pass_data) > 0:
-        values_json = json.dumps(pass_data.tolist(), cls=NumpyEncoder)
+        values_json = _histogram_data(pass_data.to_numpy(), point_budget, instr)
         conv_grade_histograms.append(f"""{{
-            x: {values_json},
+            {values_json},
             type: 'histogram',
             name: '합격(충원포함)',
             opacity: 0.7,
@@ -271,9 +300,9 @@ def create_advanced_visualizations(plot_id, data):
     # 불합격 데이터
     fail_data = data[data["result"] == "불합격"]["conv_grade"].dropna()
     if len(fail_data) > 0:
-        values_json = json.dumps(fail_data.tolist(), cls=NumpyEncoder)
+        values_json = _histogram_data(fail_data.to_numpy(), point_budget, instr)
         conv_grade_histograms.append(f"""{{
-            x: {values_json},
+            {values_json},
             type: 'histogram',
             name: '불합격',
             opacity: 0.7,
@@ -289,9 +318,9 @@ def create_advanced_visualizations(plot_id, data):
     # 합격(충원합격 포함) 데이터
     pass_data = data[data["result"].isin(["합격", "충원합격"])]["all_subj_grade"].dropna()
     if len(pass_data) > 0:
-        values_json = json.dumps(pass_data.tolist(), cls=NumpyEncoder)
+        values_json = _histogram_data(pass_data.to_numpy(), point_budget, instr)
         all_subj_grade_histograms.append(f"""{{
-            x: {values_json},
+            {values_json},
             type: 'histogram',
             name: '합격(충원포함)',
             opacity: 0.7,
@@ -304,9 +333,9 @@ def create_advanced_visualizations(plot_id, data):
     # 불합격 데이터
     fail_data = data[data["result"] == "불합격"]["all_subj_grade"].dropna()
     if len(fail_data) > 0:
-        values_json = json.dumps(fail_data.tolist(), cls=NumpyEncoder)
+        values_json = _histogram_data(fail_data.to_numpy(), point_budget, instr)
         all_subj_grade_histograms.append(f"""{{
-            x: {values_json},
+            {values_json},
             type: 'histogram',
             name: '불합격',
             opacity: 0.7,
@@ -321,7 +350,7 @@ def create_advanced_visualizations(plot_id, data):
     if len(data) > 0 and 'univ' in data.columns: # 'univ' 컬럼 존재 확인
         # 대학별 지원자 및 합격자 수 계산
         univ_stats = {}
-        for univ, group in data.groupby('univ'):
+        for univ, group in data.groupby('univ', observed=True):
             total = len(group)
             passed = len(group[group['result'].isin(['합격', '충원합격'])])
             if total >= 5:  # 최소 5명 이상 지원한 대학만 포함
@@ -487,527 +516,401 @@ def create_advanced_visualizations(plot_id, data):
     return script + visualizations_html + init_script
 
 
+def _column_ranks(values: np.ndarray, column: str, order: Optional[HierarchyOrder]) -> np.ndarray:
+    """가나다순 순위 (로드 때 만든 order가 없으면 선택된 값 종류만으로 만든다)"""
+    column_order = order.get(column) if order is not None else None
+    if column_order is None:
+        column_order = ColumnOrder(pd.unique(values))
+    return column_order.ranks(values)
+
+
+def select_sorted(df: pd.DataFrame, selected_depts: list = None, selected_univs: list = None, selected_subtypes: list = None, groups: list = None, order: Optional[HierarchyOrder] = None) -> pd.DataFrame:
+    """
+    선택 조건에 맞는 행을 (univ, dept, subtype) 가나다순으로 정렬해 반환.
+    마스크 결합과 정렬 순서 계산은 numpy로 처리하고 DataFrame은 take 한 번으로만 만든다.
+    groups: [(univ, dept, subtype), ...]를 주면 그 조합의 행만 남긴다 (합격 등급 범위 필터).
+    order: 로드 때 만든 HierarchyOrder (정렬이 순위 정수 비교만으로 끝난다)
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for column, selected in (("dept", selected_depts), ("univ", selected_univs), ("subtype", selected_subtypes)):
+        if selected:
+            mask &= df[column].isin(selected).to_numpy()
+    if groups is not None:
+        keys = pd.MultiIndex.from_frame(df[["univ", "dept", "subtype"]])
+        mask &= keys.isin(list(groups))
+    positions = np.flatnonzero(mask)
+
+    # 가나다순 순위로 lexsort (마지막 키가 1순위)
+    sort_keys = [
+        _column_ranks(df[column].to_numpy()[positions], column, order)
+        for column in ("subtype", "dept", "univ")
+    ]
+    order = np.lexsort(sort_keys) if len(positions) else positions
+    return df.take(positions[order])
+
+
+def run_bounds(values: np.ndarray, start: int = 0, end: int = None) -> list:
+    """정렬된 values[start:end]에서 같은 값이 이어지는 구간 (시작, 끝) 목록"""
+    end = len(values) if end is None else end
+    if end <= start:
+        return []
+    part = values[start:end]
+    change = np.flatnonzero(part[1:] != part[:-1]) + 1 + start
+    starts = [start] + change.tolist()
+    ends = change.tolist() + [end]
+    return list(zip(starts, ends))
+
+
+def select_report_rows(source, selected_depts: list = None, selected_univs: list = None, selected_subtypes: list = None, groups: list = None, instr: Optional[Instrumentation] = None, order: Optional[HierarchyOrder] = None) -> pd.DataFrame:
+    """
+    보고서에 들어갈 행을 (univ, dept, subtype) 가나다순으로 가져온다.
+    source: DataFrame 또는 HistoryStore (저장소면 선택 조건을 SQL WHERE로 내려 필요한 행만 읽음)
+    """
+    instr = instr or Instrumentation("select_report_rows")
+    # 선택 조건을 하나의 마스크로 합친 뒤 (univ, dept, subtype) 순으로 한 번만 정렬해서 가져온다.
+    with instr.span("filter_sort"):
+        if isinstance(source, HistoryStore):
+            # SQL ORDER BY는 코드 순서이므로 정렬은 가져온 뒤 select_sorted에서 한다
+            df_filtered = source.query(univs=selected_univs, subtypes=selected_subtypes, depts=selected_depts, with_year=True, sort=False)
+            df_filtered = select_sorted(df_filtered, groups=groups, order=order)
+        else:
+            df_filtered = select_sorted(source, selected_depts, selected_univs, selected_subtypes, groups, order)
+    instr.count("rows_selected", len(df_filtered))
+    return df_filtered
+
+
 # 선택된 모집단위에 대한 대학별 시각화 함수 (전형 필터 추가)
-def plot_selected_depts(df: pd.DataFrame, out_dir: Path, selected_depts: list = None, selected_univs: list = None, selected_subtypes: list = None, output_file: str = "선택된_모집단위들.html") -> str:
-    """선택된 모집단위에 대한 입시 결과를 대학별로 시각화"""
-    # 선택된 모집단위와 대학에 해당하는 데이터만 필터링
-    df_filtered = df.copy()
+REPORT_WRITTEN = "파일이 생성되었습니다."
 
-    # 선택된 모집단위 필터링
-    if selected_depts:
-        df_filtered = df_filtered[df_filtered['dept'].isin(selected_depts)]
 
-    # 선택된 대학 필터링
-    if selected_univs:
-        df_filtered = df_filtered[df_filtered['univ'].isin(selected_univs)]
+def plot_selected_depts(df, out_dir: Path, selected_depts: list = None, selected_univs: list = None, selected_subtypes: list = None, output_file: str = "선택된_모집단위들.html", instr: Optional[Instrumentation] = None, groups: list = None, cache: Optional[ReportFileCache] = None, dataset_version: Optional[str] = None, order: Optional[HierarchyOrder] = None) -> str:
+    """
+    선택된 모집단위에 대한 입시 결과를 대학별로 시각화
+    df: DataFrame 또는 HistoryStore (저장소면 선택 조건을 SQL WHERE로 내려 필요한 행만 읽음)
+        year 열에 두 해 이상이 있으면 전형별 연도 추이 차트를 함께 그린다.
+    instr: 전달하면 필터/통계/JSON/HTML/저장 구간 시간을 기록 (instr.report()로 확인)
+    groups: [(univ, dept, subtype), ...]로 조합을 더 제한 (interval_index의 합격 등급 범위 필터)
+    cache, dataset_version: 주면 같은 데이터셋 버전 + 선택 조합의 이전 결과 파일을 복사해 쓴다
+    order: 로드 때 만든 가나다순 순위 (없으면 선택된 값으로 만든다)
+    """
+    instr = instr or Instrumentation("plot_selected_depts")
+    output_path = out_dir / output_file
 
-    # 선택된 전형 필터링
-    if selected_subtypes:
-        df_filtered = df_filtered[df_filtered['subtype'].isin(selected_subtypes)]
+    cache_key = None
+    if cache is not None and dataset_version is not None:
+        cache_key = cache.report_key(dataset_version, selected_univs, selected_subtypes, selected_depts, groups,
+                                     renderer=renderer_fingerprint())
+        with instr.span("report_cache"):
+            hit = cache.fetch(cache_key, output_path)
+        if hit:
+            instr.count("report_cache_hit")
+            return f"{output_path.resolve()} {REPORT_WRITTEN} (이전 결과 재사용)"
+
+    df_filtered = select_report_rows(df, selected_depts, selected_univs, selected_subtypes, groups, instr, order)
 
     if df_filtered.empty:
         return "선택된 조건에 맞는 데이터가 없습니다."
 
-    # 필터링된 데이터에서 대학 목록 추출 (순서 보존을 위해 사용)
-    universities = sorted(df_filtered['univ'].unique())
+    with instr.span("html_template"):
+        html_content = render_report_html(df_filtered, selected_depts, selected_univs, selected_subtypes, instr, order=order)
 
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="ko">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>선택된 모집단위 입시 결과</title>
-        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-        <style>
-            body, html {{ margin:0; padding:0; font-family:'Malgun Gothic', '맑은 고딕', sans-serif; background-color: #f4f7f6; }}
-            .fixed-header {{ position: sticky; top: 0; background-color: white; padding: 10px 0; box-shadow: 0 2px 10px rgba(0,0,0,0.1); z-index: 1000; width: 100%; border-bottom: 1px solid #ddd; }}
-            .header-content {{ max-width: 1200px; margin: 0 auto; padding: 0 20px; display: flex; flex-direction: column; align-items: center; }}
-            .university-title {{ text-align: center; font-size: 24px; margin: 10px 0 15px; font-weight: bold; color: #333; }}
-            .controls-legend-wrapper {{ display: flex; justify-content: space-between; align-items: center; width: 100%; margin-bottom: 10px; flex-wrap: wrap; }}
-            .grade-toggle-container {{ padding: 10px; background-color: #f8f8f8; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.05); flex: 1; min-width: 280px; margin-right: 10px; text-align: center; }}
-            .grade-toggle-btn {{ padding: 10px 18px; margin: 0 5px; font-size: 14px; cursor: pointer; border: 1px solid #ccc; border-radius: 6px; background-color: white; transition: all 0.2s ease-in-out; font-weight: 500; }}
-            .grade-toggle-btn:hover {{ background-color: #e9e9e9; border-color: #bbb; }}
-            .grade-toggle-btn.active {{ background-color: #007bff; color: white; border-color: #0056b3; box-shadow: 0 0 5px rgba(0,123,255,0.5); }}
-            .legend-container {{ display: flex; flex-direction: column; align-items: flex-start; flex: 1; min-width: 300px; background-color: #f8f8f8; padding: 10px; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.05); }}
-            .legend-items-wrapper {{ display: flex; justify-content: flex-start; margin-bottom: 8px; flex-wrap: wrap; }}
-            .legend-item {{ display: inline-flex; align-items: center; margin: 5px 10px 5px 0; }}
-            .legend-marker {{ width: 18px; height: 18px; margin-right: 8px; display: inline-block; border-radius: 4px; }}
-            .legend-text {{ font-size: 14px; color: #333; }}
-            .axis-label {{ font-size: 13px; color: #505050; font-weight: bold; margin-top: 5px; }}
-            .axis-icon {{ font-size: 16px; margin-right: 5px; }}
-            .layout {{ display: flex; justify-content: center; align-items: flex-start; max-width: 1200px; margin: 20px auto; padding: 0 20px; }}
-            .toc-container {{ flex: 0 0 220px; position: sticky; top: 160px; margin-right: 25px; background-color: white; border: 1px solid #e0e0e0; border-radius: 8px; padding: 20px; max-height: calc(100vh - 200px); overflow-y: auto; box-shadow: 0 4px 12px rgba(0,0,0,0.08); z-index: 900; }}
-            .toc-header {{ font-weight: bold; font-size: 18px; margin-bottom: 15px; border-bottom: 1px solid #eee; padding-bottom: 10px; color: #333; }}
-            .toc-university {{ font-weight: bold; margin-top: 10px; cursor: pointer; padding: 6px 8px; border-radius: 4px; transition: background-color 0.2s; color: #0056b3; }}
-            .toc-university:hover {{ background-color: #e9ecef; }}
-            .toc-subtype-item {{ margin-left: 18px; font-size: 0.9em; cursor: pointer; padding: 5px 8px; border-radius: 4px; transition: background-color 0.2s; color: #333; }}
-            .toc-subtype-item:hover {{ background-color: #f1f3f5; }}
-            .main-content {{ flex: 1 1 auto; max-width: calc(100% - 245px); padding-top: 20px; }}
-            .dept-container {{ margin-bottom: 50px; border: 1px solid #d1d9e6; border-radius: 12px; padding: 25px; background-color: #ffffff; box-shadow: 0 6px 18px rgba(0,0,0,0.07); }}
-            .dept-header {{ margin-bottom: 20px; font-weight: bold; font-size: 22px; color: #2c3e50; border-bottom: 2px solid #007bff; padding-bottom: 12px; }}
-            .subtype-container {{ margin-bottom: 30px; border: 1px solid #e7eaf0; border-radius: 8px; padding: 20px; background-color: #fdfdfd; }}
-            .subtype-header {{ margin-bottom: 15px; font-weight: bold; font-size: 18px; color: #34495e; }}
-            .visualization-container {{ display: flex; flex-direction: column; width: 100%; margin-bottom: 20px; }}
-            .plot-stats-wrapper {{ width: 100%; margin-bottom: 10px; }}
-            .stats-container {{ display: flex; flex-wrap: wrap; gap: 10px; margin-bottom: 20px; }}
-            .stats-item {{ padding: 6px 12px; border-radius: 6px; background-color: #f0f4f7; white-space: nowrap; font-size: 14px; color: #333; border: 1px solid #d6dde3; }}
-            .stats-total {{ font-weight: bold; background-color: #e2e8ef; border-color: #c8d0d8; }}
-            .stats-pass {{ border-left: 4px solid #007bff; }}
-            .stats-wait {{ border-left: 4px solid #28a745; }}
-            .stats-fail {{ border-left: 4px solid #dc3545; }}
-            .highlight-rate, .highlight-fail-rate {{ font-weight: bold; }}
-            .highlight-rate {{ color: #0056b3; }}
-            .highlight-fail-rate {{ color: #c82333; }}
-            .highlight-mean {{ font-weight: bold; color: #1e7e34; }}
-            .highlight-range {{ color: #5a6268; font-size: 13px; }}
-            .plot-container {{ height: 350px; width: 100%; margin: 0 auto; }}
-            .stats-tables-wrapper {{ width: 100%; margin-bottom: 30px; }}
-            .additional-stats-container {{ width: 100%; padding: 10px 0; background-color: transparent; border-radius: 0; font-size: 13px; }}
-            .stats-detail-title {{ font-weight: bold; margin-bottom: 8px; color: #333; font-size: 15px; }}
-            .stats-table {{ width: 100%; border-collapse: collapse; margin-top: 8px; table-layout: fixed; }}
-            .stats-table th, .stats-table td {{ padding: 8px; text-align: center; border: 1px solid #dee2e6; }}
-            .stats-table th {{ background-color: #e9ecef; font-weight: bold; color: #495057; }}
-            .stats-table .pass-row td {{ background-color: rgba(0, 123, 255, 0.05); }}
-            .stats-table .fail-row td {{ background-color: rgba(220, 53, 69, 0.05); }}
-            .stats-table .waitlist-row td {{ background-color: rgba(40, 167, 69, 0.05); }}
-            .no-stats {{ font-style: italic; color: #6c757d; text-align: center; padding: 15px; }}
+    try:
+        with instr.span("file_write"):
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(html_content)
+        instr.count("html_chars", len(html_content))
+    except Exception as e:
+        return f"파일 저장 중 오류 발생: {e}"
+    if cache_key is not None:
+        try:
+            with instr.span("report_cache"):
+                cache.put(cache_key, dataset_version, output_path)
+        except OSError as e:
+            print(f"경고: 보고서 캐시 저장 실패: {e}")
+    return f"{output_path.resolve()} {REPORT_WRITTEN}"
+
+
+def report_written(msg: str) -> bool:
+    """plot_selected_depts의 반환 메시지가 파일을 실제로 쓴 경우인지 (빈 선택/저장 실패는 False)"""
+    return REPORT_WRITTEN in msg
+
+
+# 보고서 공통 스타일/스크립트: 파일 보고서에는 그대로 넣고(inline),
+# 보고서 서버에서는 /static/report.css, /static/report.js로 한 번만 내려보낸다.
+REPORT_CSS = """
+            body, html { margin:0; padding:0; font-family:'Malgun Gothic', '맑은 고딕', sans-serif; background-color: #f4f7f6; }
+            .fixed-header { position: sticky; top: 0; background-color: white; padding: 10px 0; box-shadow: 0 2px 10px rgba(0,0,0,0.1); z-index: 1000; width: 100%; border-bottom: 1px solid #ddd; }
+            .header-content { max-width: 1200px; margin: 0 auto; padding: 0 20px; display: flex; flex-direction: column; align-items: center; }
+            .university-title { text-align: center; font-size: 24px; margin: 10px 0 15px; font-weight: bold; color: #333; }
+            .controls-legend-wrapper { display: flex; justify-content: space-between; align-items: center; width: 100%; margin-bottom: 10px; flex-wrap: wrap; }
+            .grade-toggle-container { padding: 10px; background-color: #f8f8f8; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.05); flex: 1; min-width: 280px; margin-right: 10px; text-align: center; }
+            .grade-toggle-btn { padding: 10px 18px; margin: 0 5px; font-size: 14px; cursor: pointer; border: 1px solid #ccc; border-radius: 6px; background-color: white; transition: all 0.2s ease-in-out; font-weight: 500; }
+            .grade-toggle-btn:hover { background-color: #e9e9e9; border-color: #bbb; }
+            .grade-toggle-btn.active { background-color: #007bff; color: white; border-color: #0056b3; box-shadow: 0 0 5px rgba(0,123,255,0.5); }
+            .legend-container { display: flex; flex-direction: column; align-items: flex-start; flex: 1; min-width: 300px; background-color: #f8f8f8; padding: 10px; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.05); }
+            .legend-items-wrapper { display: flex; justify-content: flex-start; margin-bottom: 8px; flex-wrap: wrap; }
+            .legend-item { display: inline-flex; align-items: center; margin: 5px 10px 5px 0; }
+            .legend-marker { width: 18px; height: 18px; margin-right: 8px; display: inline-block; border-radius: 4px; }
+            .legend-text { font-size: 14px; color: #333; }
+            .axis-label { font-size: 13px; color: #505050; font-weight: bold; margin-top: 5px; }
+            .axis-icon { font-size: 16px; margin-right: 5px; }
+            .layout { display: flex; justify-content: center; align-items: flex-start; max-width: 1200px; margin: 20px auto; padding: 0 20px; }
+            .toc-container { flex: 0 0 220px; position: sticky; top: 160px; margin-right: 25px; background-color: white; border: 1px solid #e0e0e0; border-radius: 8px; padding: 20px; max-height: calc(100vh - 200px); overflow-y: auto; box-shadow: 0 4px 12px rgba(0,0,0,0.08); z-index: 900; }
+            .toc-header { font-weight: bold; font-size: 18px; margin-bottom: 15px; border-bottom: 1px solid #eee; padding-bottom: 10px; color: #333; }
+            .toc-university { font-weight: bold; margin-top: 10px; cursor: pointer; padding: 6px 8px; border-radius: 4px; transition: background-color 0.2s; color: #0056b3; }
+            .toc-university:hover { background-color: #e9ecef; }
+            .toc-subtype-item { margin-left: 18px; font-size: 0.9em; cursor: pointer; padding: 5px 8px; border-radius: 4px; transition: background-color 0.2s; color: #333; }
+            .toc-subtype-item:hover { background-color: #f1f3f5; }
+            .report-search { width: 100%; box-sizing: border-box; padding: 7px 10px; margin-bottom: 6px; border: 1px solid #ccd5e0; border-radius: 6px; font-size: 14px; }
+            .report-search-count { font-size: 12px; color: #718096; margin-bottom: 10px; min-height: 16px; }
+            .main-content { flex: 1 1 auto; max-width: calc(100% - 245px); padding-top: 20px; }
+            .dept-container { margin-bottom: 50px; border: 1px solid #d1d9e6; border-radius: 12px; padding: 25px; background-color: #ffffff; box-shadow: 0 6px 18px rgba(0,0,0,0.07); }
+            .dept-header { margin-bottom: 20px; font-weight: bold; font-size: 22px; color: #2c3e50; border-bottom: 2px solid #007bff; padding-bottom: 12px; }
+            .subtype-container { margin-bottom: 30px; border: 1px solid #e7eaf0; border-radius: 8px; padding: 20px; background-color: #fdfdfd; }
+            .subtype-header { margin-bottom: 15px; font-weight: bold; font-size: 18px; color: #34495e; }
+            .visualization-container { display: flex; flex-direction: column; width: 100%; margin-bottom: 20px; }
+            .plot-stats-wrapper { width: 100%; margin-bottom: 10px; }
+            .stats-container { display: flex; flex-wrap: wrap; gap: 10px; margin-bottom: 20px; }
+            .stats-item { padding: 6px 12px; border-radius: 6px; background-color: #f0f4f7; white-space: nowrap; font-size: 14px; color: #333; border: 1px solid #d6dde3; }
+            .stats-total { font-weight: bold; background-color: #e2e8ef; border-color: #c8d0d8; }
+            .stats-pass { border-left: 4px solid #007bff; }
+            .stats-wait { border-left: 4px solid #28a745; }
+            .stats-fail { border-left: 4px solid #dc3545; }
+            .highlight-rate, .highlight-fail-rate { font-weight: bold; }
+            .highlight-rate { color: #0056b3; }
+            .highlight-fail-rate { color: #c82333; }
+            .highlight-mean { font-weight: bold; color: #1e7e34; }
+            .highlight-range { color: #5a6268; font-size: 13px; }
+            .plot-container { height: 350px; width: 100%; margin: 0 auto; }
+            .stats-tables-wrapper { width: 100%; margin-bottom: 30px; }
+            .additional-stats-container { width: 100%; padding: 10px 0; background-color: transparent; border-radius: 0; font-size: 13px; }
+            .stats-detail-title { font-weight: bold; margin-bottom: 8px; color: #333; font-size: 15px; }
+            .stats-table { width: 100%; border-collapse: collapse; margin-top: 8px; table-layout: fixed; }
+            .stats-table th, .stats-table td { padding: 8px; text-align: center; border: 1px solid #dee2e6; }
+            .stats-table th { background-color: #e9ecef; font-weight: bold; color: #495057; }
+            .stats-table .pass-row td { background-color: rgba(0, 123, 255, 0.05); }
+            .stats-table .fail-row td { background-color: rgba(220, 53, 69, 0.05); }
+            .stats-table .waitlist-row td { background-color: rgba(40, 167, 69, 0.05); }
+            .trend-wrapper { width: 100%; margin-bottom: 20px; }
+            .trend-container { height: 260px; width: 100%; }
+            .no-stats { font-style: italic; color: #6c757d; text-align: center; padding: 15px; }
             /* 추가 시각화를 위한 스타일 */
-            .advanced-visualizations-container {{ width: 100%; margin-top: 20px; }}
-            .visualization-row {{ display: flex; margin-bottom: 30px; gap: 20px; flex-wrap: wrap; }}
-            .half-width-visualization {{ flex: 1 1 calc(50% - 10px); min-width: 400px; background-color: #FFFFFF; border-radius: 12px; padding: 20px; box-shadow: 0 3px 10px rgba(0,0,0,0.05); }}
-            .full-width-visualization {{ flex: 1 1 100%; background-color: #FFFFFF; border-radius: 12px; padding: 20px; box-shadow: 0 3px 10px rgba(0,0,0,0.05); }}
-            .visualization-title {{ font-weight: bold; font-size: 16px; margin-bottom: 15px; color: #506380; text-align: center; }}
-            @media (max-width: 992px) {{
-                .layout {{ flex-direction: column; align-items: center; }}
-                .toc-container {{ position: static; width: 100%; max-width: 600px; margin-right: 0; margin-bottom: 20px; max-height: 300px; }}
-                .main-content {{ max-width: 100%; width: 100%; }}
-                .controls-legend-wrapper {{ flex-direction: column; align-items: stretch; }}
-                .grade-toggle-container, .legend-container {{ width: auto; margin-right: 0; margin-bottom: 10px; }}
-                .visualization-row {{ flex-direction: column; }}
-                .half-width-visualization {{ min-width: 100%; margin-bottom: 15px; }}
-            }}
-            @media (max-width: 768px) {{
-                .fixed-header {{ padding: 5px 0; }}
-                .header-content {{ padding: 0 10px; }}
-                .university-title {{ font-size: 20px; margin-bottom: 10px; }}
-                .grade-toggle-btn {{ padding: 8px 12px; font-size: 13px; }}
-                .legend-item {{ margin: 3px 8px 3px 0; }}
-                .legend-text, .axis-label {{ font-size: 12px; }}
-                .dept-header {{ font-size: 20px; }}
-                .subtype-header {{ font-size: 17px; }}
-                .stats-item {{ font-size: 13px; padding: 5px 10px; }}
-                .plot-container {{ height: 300px; }}
-                .additional-stats-container {{ padding: 10px 0; }}
-                .stats-detail-title {{ font-size: 14px; }}
-                .stats-table th, .stats-table td {{ padding: 6px; }}
-            }}
-            .filter-info-container {{
+            .advanced-visualizations-container { width: 100%; margin-top: 20px; }
+            .visualization-row { display: flex; margin-bottom: 30px; gap: 20px; flex-wrap: wrap; }
+            .half-width-visualization { flex: 1 1 calc(50% - 10px); min-width: 400px; background-color: #FFFFFF; border-radius: 12px; padding: 20px; box-shadow: 0 3px 10px rgba(0,0,0,0.05); }
+            .full-width-visualization { flex: 1 1 100%; background-color: #FFFFFF; border-radius: 12px; padding: 20px; box-shadow: 0 3px 10px rgba(0,0,0,0.05); }
+            .visualization-title { font-weight: bold; font-size: 16px; margin-bottom: 15px; color: #506380; text-align: center; }
+            @media (max-width: 992px) {
+                .layout { flex-direction: column; align-items: center; }
+                .toc-container { position: static; width: 100%; max-width: 600px; margin-right: 0; margin-bottom: 20px; max-height: 300px; }
+                .main-content { max-width: 100%; width: 100%; }
+                .controls-legend-wrapper { flex-direction: column; align-items: stretch; }
+                .grade-toggle-container, .legend-container { width: auto; margin-right: 0; margin-bottom: 10px; }
+                .visualization-row { flex-direction: column; }
+                .half-width-visualization { min-width: 100%; margin-bottom: 15px; }
+            }
+            @media (max-width: 768px) {
+                .fixed-header { padding: 5px 0; }
+                .header-content { padding: 0 10px; }
+                .university-title { font-size: 20px; margin-bottom: 10px; }
+                .grade-toggle-btn { padding: 8px 12px; font-size: 13px; }
+                .legend-item { margin: 3px 8px 3px 0; }
+                .legend-text, .axis-label { font-size: 12px; }
+                .dept-header { font-size: 20px; }
+                .subtype-header { font-size: 17px; }
+                .stats-item { font-size: 13px; padding: 5px 10px; }
+                .plot-container { height: 300px; }
+                .additional-stats-container { padding: 10px 0; }
+                .stats-detail-title { font-size: 14px; }
+                .stats-table th, .stats-table td { padding: 6px; }
+            }
+            .filter-info-container {
                 margin: 15px 0;
                 background-color: #e9f7fe;
                 border: 1px solid #b8e3ff;
                 padding: 15px;
                 border-radius: 8px;
-            }}
-            .filter-info-container h3 {{
+            }
+            .filter-info-container h3 {
                 margin-top: 0;
                 color: #0275d8;
                 font-size: 16px;
                 margin-bottom: 10px;
-            }}
-            .filter-info-container ul {{
+            }
+            .filter-info-container ul {
                 margin: 0;
                 padding-left: 20px;
-            }}
-            .filter-info-container li {{
+            }
+            .filter-info-container li {
                 margin-bottom: 5px;
                 font-size: 14px;
-            }}
-        </style>
-
-    </head>
-    <body>
-        <div class="fixed-header">
-            <div class="header-content">
-                <div class="university-title">선택된 모집단위 입시 결과</div>
-                <div class="controls-legend-wrapper">
-                    <div class="grade-toggle-container">
-                        <button id="btn-conv-grade" class="grade-toggle-btn active" onclick="switchGradeType('conv')">환산등급</button>
-                        <button id="btn-all-subj-grade" class="grade-toggle-btn" onclick="switchGradeType('all_subj')">전교과100 등급</button>
-                    </div>
-                    <div class="legend-container">
-                        <div class="legend-items-wrapper">
-                            <div class="legend-item"><span class="legend-marker" style="background-color: rgba(51, 102, 204, 0.7);"></span><span class="legend-text">합격</span></div>
-                            <div class="legend-item"><span class="legend-marker" style="background-color: rgba(16, 150, 24, 0.7);"></span><span class="legend-text">충원합격</span></div>
-                            <div class="legend-item"><span class="legend-marker" style="background-color: rgba(220, 57, 18, 0.7);"></span><span class="legend-text">불합격</span></div>
-                        </div>
-                        <div class="axis-label"><span class="axis-icon">↕</span> Y축: <span id="grade-type-label">환산등급</span> (1등급 ~ 9등급)</div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        <div class="layout">
-            <aside class="toc-container">
-                <div class="toc-header">목차</div>
-                <div id="toc-content"></div>
-            </aside>
-            <main class="main-content">\n"""
-
-    y_positions = {"합격":0.01, "충원합격":0.0, "불합격":-0.03}
-    marker_styles = {
-        "합격": {"opacity":0.7, "line":dict(width=1.5, color="blue"), "color":"rgba(0,0,255,0.3)"},
-        "불합격": {"opacity":0.6, "line":dict(width=0.7, color="red"), "color":"rgba(255,0,0,0.2)"},
-        "충원합격": {"opacity":0.7, "line":dict(width=1.2, color="steelblue"), "color":"rgba(70,130,180,0.3)"}
-    }
-    plot_counter = 1
-
-    for univ_idx, univ in enumerate(universities, 1):
-        # 현재 대학 + 선택된 모집단위에 해당하는 데이터 필터링
-        df_univ = df_filtered[df_filtered['univ'] == univ]
-        html_content += f"""
-        <div class="dept-container" id="univ-{univ_idx}">
-            <div class="dept-header">{univ}</div>
-        """
-
-        # 각 대학에서 모집단위 목록 가져오기
-        if selected_depts:
-            univ_depts = sorted(set(df_univ['dept']) & set(selected_depts))
-        else:
-            univ_depts = sorted(df_univ['dept'].unique())
+            }
+"""
 
-        # 모집단위별 루프
-        for d_idx, dept in enumerate(univ_depts, 1):
-            dd = df_univ[df_univ['dept'] == dept]
+REPORT_SCRIPT = """
+    var currentGradeType = 'conv';
+    var plotsInitialized = false;
+    document.addEventListener('DOMContentLoaded', function() {
+        console.log('페이지 초기화 시작...');
+        var toc = document.getElementById('toc-content');
+        var tocHTML = '';
 
-            html_content += f"""
-            <div class="subtype-container" id="dept-container-{univ_idx}-{d_idx}">
-                <div class="subtype-header" style="color: #34495e;">{d_idx}) {dept}</div>
-            """
+        // 대학별 컨테이너 순회
+        document.querySelectorAll('.dept-container').forEach(function(container) {
+            var uniId = container.id;
+            var uniHeader = container.querySelector('.dept-header');
+            if (!uniHeader) return; // dept-header가 없는 경우 건너뛰기 (예: 전체 요약)
+            var uniTitle = uniHeader.textContent;
 
-            # 선택된 전형 목록 가져오기
-            if selected_subtypes:
-                dept_subtypes = sorted(set(dd['subtype']) & set(selected_subtypes))
-            else:
-                dept_subtypes = sorted(dd['subtype'].unique())
+            // '전체 데이터 요약'은 별도로 처리
+            if (uniId === 'overall-summary') return;
 
-            # 전형별 루프
-            for st_idx, subtype_val in enumerate(dept_subtypes, 1):
-                st_data = dd[dd['subtype'] == subtype_val]
-                if st_data.empty:
-                    continue
+            tocHTML += `<div class="toc-university" data-target="${uniId}" onclick="scrollToElement('${uniId}')">${uniTitle}</div>`;
 
-                # 통계 계산
-                conv_stats = compute_stats(st_data, "conv_grade")
-                all_subj_stats = compute_stats(st_data, "all_subj_grade")
-                conv_stats_html = create_stats_html(conv_stats)
-                all_subj_stats_html = create_stats_html(all_subj_stats)
+            // 모집단위 컨테이너 찾기 (dept-container- 접두사로 시작하는 ID)
+            container.querySelectorAll('[id^="dept-container-"]').forEach(function(deptContainer) {
+                var deptHeader = deptContainer.querySelector('.subtype-header');
+                if (deptHeader) {
+                    var deptId = deptContainer.id;
+                    var deptTitle = deptHeader.textContent.replace(/^\\d+\\)\\s*/, '').trim();
 
-                # 박스플롯 스크립트 및 통계 테이블 생성
-                plot_script, conv_detail_stats, all_subj_detail_stats = create_plot_data_script(
-                    plot_counter, st_data, y_positions, marker_styles
-                )
+                    // 모집단위 추가
+                    tocHTML += `<div class="toc-dept-item" data-target="${deptId}" style="margin-left: 18px; font-weight: bold; margin-top: 8px; color: #0056b3;">${deptTitle}</div>`;
 
-                html_content += f"""
-                <div class="subtype-container" id="subtype-{univ_idx}-{d_idx}-{st_idx}" style="margin-left: 20px; background-color: #fbfcfe;">
-                    <div class="subtype-header" style="font-size: 16px; color: #4a5568;">{st_idx}) {subtype_val}</div>
-                    <div class="visualization-container">
-                        <div class="plot-stats-wrapper">
-                            <div id="conv-stats-{plot_counter}" class="stats-container">{conv_stats_html}</div>
-                            <div id="all-subj-stats-{plot_counter}" class="stats-container" style="display:none;">{all_subj_stats_html}</div>
-                            <div class="plot-container" id="plot-{plot_counter}"></div>
-                        </div>
-                        {plot_script}
-                        <div class="stats-tables-wrapper">
-                            <div id="conv-additional-stats-{plot_counter}" class="additional-stats-container">
-                                {conv_detail_stats}
-                            </div>
-                            <div id="all-subj-additional-stats-{plot_counter}" class="additional-stats-container" style="display:none;">
-                                {all_subj_detail_stats}
-                            </div>
-                        </div>
-                    </div>
-                </div>
-                """
-                plot_counter += 1
+                    // 전형 컨테이너 찾기
+                    deptContainer.querySelectorAll('[id^="subtype-"]').forEach(function(subtypeContainer) {
+                        var subtypeHeader = subtypeContainer.querySelector('.subtype-header');
+                        if (subtypeHeader) {
+                            var subtypeId = subtypeContainer.id;
+                            var subtypeTitle = subtypeHeader.textContent.replace(/^\\d+\\)\\s*/, '').trim();
 
-            # 모집단위별 요약 (모든 전형 포함)
-            dept_summary_stats_conv = compute_stats(dd, "conv_grade")
-            dept_summary_stats_all_subj = compute_stats(dd, "all_subj_grade")
-            dept_summary_html_conv = create_stats_html(dept_summary_stats_conv)
-            dept_summary_html_all_subj = create_stats_html(dept_summary_stats_all_subj)
+                            // 전형 추가
+                            tocHTML += `<div class="toc-subtype-item" data-target="${subtypeId}" style="margin-left: 36px;" onclick="scrollToElement('${subtypeId}')">${subtypeTitle}</div>`;
+                        }
+                    });
 
-            plot_script, conv_detail_stats, all_subj_detail_stats = create_plot_data_script(
-                plot_counter, dd, y_positions, marker_styles
-            )
+                    // 모집단위 요약 추가
+                    var deptSummaryId = deptId.replace('container', 'summary');
+                    var deptSummaryElement = document.getElementById(deptSummaryId);
+                    if (deptSummaryElement) {
+                        var summaryHeader = deptSummaryElement.querySelector('.subtype-header');
+                        if (summaryHeader && summaryHeader.textContent.includes('전체 전형 통합')) { // 정확한 요약 항목인지 확인
+                            tocHTML += `<div class="toc-subtype-item" data-target="${deptSummaryId}" style="margin-left: 36px; font-style: italic;" onclick="scrollToElement('${deptSummaryId}')">전체 전형 통합</div>`;
+                        }
+                    }
+                }
+            });
 
-            html_content += f"""
-            <div class="subtype-container" id="dept-summary-{univ_idx}-{d_idx}" style="margin-left: 20px; background-color: #f0f4f8;">
-                <div class="subtype-header" style="font-size: 16px; color: #2c3e50;">전체 전형 통합</div>
-                <div class="visualization-container">
-                    <div class="plot-stats-wrapper">
-                        <div id="conv-stats-{plot_counter}" class="stats-container">{dept_summary_html_conv}</div>
-                        <div id="all-subj-stats-{plot_counter}" class="stats-container" style="display:none;">{dept_summary_html_all_subj}</div>
-                        <div class="plot-container" id="plot-{plot_counter}"></div>
-                    </div>
-                    {plot_script}
-                    <div class="stats-tables-wrapper">
-                        <div id="conv-additional-stats-{plot_counter}" class="additional-stats-container">
-                            {conv_detail_stats}
-                        </div>
-                        <div id="all-subj-additional-stats-{plot_counter}" class="additional-stats-container" style="display:none;">
-                            {all_subj_detail_stats}
-                        </div>
-                    </div>
-                </div>
-            </div>
-            """
-            plot_counter += 1
+            // 대학별 전형 요약 추가 (summary-container- 접두사로 시작하는 ID)
+            var univSummaryId = `summary-container-${uniId.split('-')[1]}`;
+            var summaryElement = document.getElementById(univSummaryId);
+            if (summaryElement) {
+                var summaryHeader = summaryElement.querySelector('.subtype-header'); // 전형별 요약 타이틀
+                if (summaryHeader && summaryHeader.textContent.includes('전형별 요약')) {
+                     tocHTML += `<div class="toc-subtype-item" data-target="${univSummaryId}" style="margin-left: 18px; font-weight: bold; color: #2a4365; margin-top: 8px;" onclick="scrollToElement('${univSummaryId}')">${summaryHeader.textContent}</div>`;
+                }
+            }
+        });
 
-            html_content += """
-            </div>
-            """
+        // 전체 요약 섹션 목차에 추가
+        var overallSummaryElem = document.getElementById('overall-summary');
+        if (overallSummaryElem) {
+            var overallHeader = overallSummaryElem.querySelector('.dept-header');
+            if (overallHeader) {
+                 tocHTML += `<div class="toc-university" onclick="scrollToElement('overall-summary')" style="margin-top: 20px; color: #e74c3c;">${overallHeader.textContent}</div>`;
+            }
+        }
+        toc.innerHTML = tocHTML;
+        initializeAllPlots();
 
-        # 대학별 전형 요약 섹션 (이전 코드와 유사)
-        summary_container_id = f"summary-container-{univ_idx}"
-        html_content += f"""
-        <div class="subtype-container" id="{summary_container_id}" style="background-color: #eef2f7;">
-            <div class="subtype-header" style="color: #1a202c;">전형별 요약</div>
-        """
+    });
 
-        # 전형 목록 가져오기
-        if selected_subtypes:
-            subtypes_all = sorted(set(df_univ['subtype']) & set(selected_subtypes))
-        else:
-            subtypes_all = sorted(df_univ['subtype'].unique())
+    // 지연 렌더링: 화면 근처(위아래 400px)에 온 플롯/추이 차트만 그린다.
+    // 검색으로 숨긴 구역은 화면에 들어오지 않으므로 그리지 않는다.
+    var plotObserver = null;
+    var nearViewport = new Set();
+    var LAZY_TARGETS = '.plot-container[id^="plot-"], .trend-container[id^="trend-"]';
 
-        for s_idx, subtype in enumerate(subtypes_all, 1):
-            # 해당 전형의 모든 데이터 추출
-            ss = df_univ[df_univ['subtype'] == subtype]
+    function initializeAllPlots() {
+        if (plotsInitialized || !window.Plotly) return;
+        console.log('플롯 지연 렌더링 준비...');
+        var targets = document.querySelectorAll(LAZY_TARGETS);
+        if ('IntersectionObserver' in window) {
+            plotObserver = new IntersectionObserver(function(entries) {
+                entries.forEach(function(entry) {
+                    if (entry.isIntersecting) {
+                        nearViewport.add(entry.target);
+                        renderLazyTarget(entry.target);
+                    } else {
+                        nearViewport.delete(entry.target);
+                    }
+                });
+            }, { rootMargin: '400px 0px' });
+            targets.forEach(function(el) { plotObserver.observe(el); });
+        } else {
+            targets.forEach(renderLazyTarget);
+        }
+        plotsInitialized = true;
+    }
 
-            # 선택된 모집단위 필터링 적용
-            if selected_depts:
-                ss = ss[ss['dept'].isin(selected_depts)]
-                if ss.empty:
-                    continue
+    function renderLazyTarget(el) {
+        if (el.dataset.rendered === currentGradeType) return;
+        if (el.classList.contains('trend-container')) {
+            renderTrend(el, currentGradeType);
+        } else {
+            renderPlot(el, currentGradeType);
+        }
+        el.dataset.rendered = currentGradeType;
+    }
 
-            # 통계 계산
-            conv_stats = compute_stats(ss, "conv_grade")
-            all_subj_stats = compute_stats(ss, "all_subj_grade")
-            conv_stats_html = create_stats_html(conv_stats)
-            all_subj_stats_html = create_stats_html(all_subj_stats)
+    function renderPlot(plotDiv, gradeType) {
+        var numericId = plotDiv.id.split('-')[1];
+        try {
+            if (!window.plotsData || !window.plotsData[numericId]) {
+                console.error('플롯 데이터를 찾을 수 없음:', numericId);
+                plotDiv.innerHTML = '<p style="text-align:center; color:red;">플롯 데이터 로드 실패</p>';
+                return;
+            }
+            var plotData = window.plotsData[numericId];
+            var traces = JSON.parse(JSON.stringify(gradeType === 'conv' ? plotData.convTraces : plotData.allSubjTraces));
+            var layout = createPlotLayout();
+            var draw = plotDiv.dataset.rendered ? Plotly.react : Plotly.newPlot;
+            draw(plotDiv, traces, layout, {displayModeBar: false, responsive: true, useResizeHandler: true});
+        } catch (error) {
+            console.error(`플롯 ${numericId} 렌더링 오류:`, error);
+            plotDiv.innerHTML = `<p style="text-align:center; color:red;">플롯 생성 중 오류 발생: ${error.message}</p>`;
+        }
+    }
 
-            # 박스플롯 스크립트 및 통계 테이블 생성
-            plot_script, conv_detail_stats, all_subj_detail_stats = create_plot_data_script(
-                plot_counter, ss, y_positions, marker_styles
-            )
-
-            html_content += f"""
-                <div class="subtype-container" id="subtype-summary-{univ_idx}-{s_idx}" style="margin-left: 20px; background-color: #fbfcfe;">
-                    <div class="subtype-header" style="font-size: 16px; color: #4a5568;">{subtype}</div>
-                    <div class="visualization-container">
-                        <div class="plot-stats-wrapper">
-                            <div id="conv-stats-{plot_counter}" class="stats-container">{conv_stats_html}</div>
-                            <div id="all-subj-stats-{plot_counter}" class="stats-container" style="display:none;">{all_subj_stats_html}</div>
-                            <div class="plot-container" id="plot-{plot_counter}"></div>
-                        </div>
-                        {plot_script}
-                        <div class="stats-tables-wrapper">
-                            <div id="conv-additional-stats-{plot_counter}" class="additional-stats-container">
-                                {conv_detail_stats}
-                            </div>
-                            <div id="all-subj-additional-stats-{plot_counter}" class="additional-stats-container" style="display:none;">
-                                {all_subj_detail_stats}
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            """
-            plot_counter += 1
-
-        html_content += """
-        </div>
-        </div>
-        """
-
-    # 전체 데이터 요약 섹션 추가
-    html_content += """
-    <div class="dept-container" id="overall-summary">
-        <div class="dept-header" style="color: #2c3e50; border-bottom: 2px solid #e74c3c;">전체 데이터 요약</div>
-        <div class="subtype-container" style="background-color: #f8f9fa;">
-            <div class="subtype-header" style="color: #1a202c;">선택된 모든 필터에 대한 종합 분석</div>
-    """
-
-    # 전체 필터링된 데이터에 대한 통계 계산
-    overall_conv_stats = compute_stats(df_filtered, "conv_grade")
-    overall_all_subj_stats = compute_stats(df_filtered, "all_subj_grade")
-    overall_conv_stats_html = create_stats_html(overall_conv_stats)
-    overall_all_subj_stats_html = create_stats_html(overall_all_subj_stats)
-
-    # 박스플롯 스크립트 및 통계 테이블 생성
-    overall_plot_script, overall_conv_detail_stats, overall_all_subj_detail_stats = create_plot_data_script(
-        plot_counter, df_filtered, y_positions, marker_styles
-    )
-
-    html_content += f"""
-        <div class="visualization-container">
-            <div class="plot-stats-wrapper">
-                <div id="conv-stats-{plot_counter}" class="stats-container">{overall_conv_stats_html}</div>
-                <div id="all-subj-stats-{plot_counter}" class="stats-container" style="display:none;">{overall_all_subj_stats_html}</div>
-                <div class="plot-container" id="plot-{plot_counter}"></div>
-            </div>
-            {overall_plot_script}
-            <div class="stats-tables-wrapper">
-                <div id="conv-additional-stats-{plot_counter}" class="additional-stats-container">
-                    {overall_conv_detail_stats}
-                </div>
-                <div id="all-subj-additional-stats-{plot_counter}" class="additional-stats-container" style="display:none;">
-                    {overall_all_subj_detail_stats}
-                </div>
-            </div>
-        </div>
-    """
-
-    # 추가 시각화 생성 - 전체 데이터 요약에 대한 추가 그래프
-    additional_visualizations = create_advanced_visualizations(plot_counter, df_filtered)
-    html_content += additional_visualizations
-
-    # 선택된 필터 정보 표시 (옵션)
-    filter_info = []
-    if selected_univs:
-        univ_count = len(selected_univs)
-        univ_text = f"{univ_count}개 대학" if univ_count > 3 else ", ".join(selected_univs)
-        filter_info.append(f"선택된 대학: {univ_text}")
-    if selected_subtypes:
-        subtype_count = len(selected_subtypes)
-        subtype_text = f"{subtype_count}개 전형" if subtype_count > 3 else ", ".join(selected_subtypes)
-        filter_info.append(f"선택된 전형: {subtype_text}")
-    if selected_depts:
-        dept_count = len(selected_depts)
-        dept_text = f"{dept_count}개 모집단위" if dept_count > 3 else ", ".join(selected_depts)
-        filter_info.append(f"선택된 모집단위: {dept_text}")
-
-    if filter_info:
-        filter_info_html = "<div class='filter-info-container'><h3>적용된 필터</h3><ul>"
-        for info in filter_info:
-            filter_info_html += f"<li>{info}</li>"
-        filter_info_html += "</ul></div>"
-        html_content += filter_info_html
-
-    html_content += """
-        </div>
-    </div>
-    """
-
-    plot_counter += 1
-
-    html_content += """
-    <script>
-    var currentGradeType = 'conv';
-    var plotsInitialized = false;
-    document.addEventListener('DOMContentLoaded', function() {
-        console.log('페이지 초기화 시작...');
-        var toc = document.getElementById('toc-content');
-        var tocHTML = '';
-
-        // 대학별 컨테이너 순회
-        document.querySelectorAll('.dept-container').forEach(function(container) {
-            var uniId = container.id;
-            var uniHeader = container.querySelector('.dept-header');
-            if (!uniHeader) return; // dept-header가 없는 경우 건너뛰기 (예: 전체 요약)
-            var uniTitle = uniHeader.textContent;
-
-            // '전체 데이터 요약'은 별도로 처리
-            if (uniId === 'overall-summary') return;
-
-            tocHTML += `<div class="toc-university" onclick="scrollToElement('${uniId}')">${uniTitle}</div>`;
-
-            // 모집단위 컨테이너 찾기 (dept-container- 접두사로 시작하는 ID)
-            container.querySelectorAll('[id^="dept-container-"]').forEach(function(deptContainer) {
-                var deptHeader = deptContainer.querySelector('.subtype-header');
-                if (deptHeader) {
-                    var deptId = deptContainer.id;
-                    var deptTitle = deptHeader.textContent.replace(/^\\d+\\)\\s*/, '').trim();
-
-                    // 모집단위 추가
-                    tocHTML += `<div class="toc-dept-item" style="margin-left: 18px; font-weight: bold; margin-top: 8px; color: #0056b3;">${deptTitle}</div>`;
-
-                    // 전형 컨테이너 찾기
-                    deptContainer.querySelectorAll('[id^="subtype-"]').forEach(function(subtypeContainer) {
-                        var subtypeHeader = subtypeContainer.querySelector('.subtype-header');
-                        if (subtypeHeader) {
-                            var subtypeId = subtypeContainer.id;
-                            var subtypeTitle = subtypeHeader.textContent.replace(/^\\d+\\)\\s*/, '').trim();
-
-                            // 전형 추가
-                            tocHTML += `<div class="toc-subtype-item" style="margin-left: 36px;" onclick="scrollToElement('${subtypeId}')">${subtypeTitle}</div>`;
-                        }
-                    });
-
-                    // 모집단위 요약 추가
-                    var deptSummaryId = deptId.replace('container', 'summary');
-                    var deptSummaryElement = document.getElementById(deptSummaryId);
-                    if (deptSummaryElement) {
-                        var summaryHeader = deptSummaryElement.querySelector('.subtype-header');
-                        if (summaryHeader && summaryHeader.textContent.includes('전체 전형 통합')) { // 정확한 요약 항목인지 확인
-                            tocHTML += `<div class="toc-subtype-item" style="margin-left: 36px; font-style: italic;" onclick="scrollToElement('${deptSummaryId}')">전체 전형 통합</div>`;
-                        }
-                    }
-                }
-            });
-
-            // 대학별 전형 요약 추가 (summary-container- 접두사로 시작하는 ID)
-            var univSummaryId = `summary-container-${uniId.split('-')[1]}`;
-            var summaryElement = document.getElementById(univSummaryId);
-            if (summaryElement) {
-                var summaryHeader = summaryElement.querySelector('.subtype-header'); // 전형별 요약 타이틀
-                if (summaryHeader && summaryHeader.textContent.includes('전형별 요약')) {
-                     tocHTML += `<div class="toc-subtype-item" style="margin-left: 18px; font-weight: bold; color: #2a4365; margin-top: 8px;" onclick="scrollToElement('${univSummaryId}')">${summaryHeader.textContent}</div>`;
-                }
-            }
-        });
-
-        // 전체 요약 섹션 목차에 추가
-        var overallSummaryElem = document.getElementById('overall-summary');
-        if (overallSummaryElem) {
-            var overallHeader = overallSummaryElem.querySelector('.dept-header');
-            if (overallHeader) {
-                 tocHTML += `<div class="toc-university" onclick="scrollToElement('overall-summary')" style="margin-top: 20px; color: #e74c3c;">${overallHeader.textContent}</div>`;
-            }
-        }
-        toc.innerHTML = tocHTML;
-        initializeAllPlots();
-
-    });
-
-    function initializeAllPlots() {
-        if (plotsInitialized || !window.Plotly) return;
-        console.log('모든 플롯 초기화 중...');
-        var plotContainers = document.querySelectorAll('.plot-container[id^="plot-"]');
-        plotContainers.forEach(function(plotDiv) {
-            var plotId = plotDiv.id;
-            var numericId = plotId.split('-')[1];
-            try {
-                // 기본 박스플롯 처리
-                if(plotId.startsWith('plot-')) {
-                    if (!window.plotsData || !window.plotsData[numericId]) {
-                        console.error('플롯 데이터를 찾을 수 없음:', numericId);
-                        plotDiv.innerHTML = '<p style="text-align:center; color:red;">플롯 데이터 로드 실패</p>';
-                        return;
-                    }
-                    var plotData = window.plotsData[numericId];
-                    var traces = JSON.parse(JSON.stringify(plotData.convTraces)); // 기본으로 convTraces 사용
-                    var layout = createPlotLayout();
-                    Plotly.newPlot(plotDiv, traces, layout, {displayModeBar: false, responsive: true, useResizeHandler: true});
-                }
-                // 추가 시각화는 별도 함수로 처리됨 (donut-chart, histograms 등)
-            } catch (error) {
-                console.error(`플롯 ${numericId} 초기화 오류:`, error);
-                plotDiv.innerHTML = `<p style="text-align:center; color:red;">플롯 생성 중 오류 발생: ${error.message}</p>`;
-            }
-        });
-        plotsInitialized = true;
-        console.log('모든 플롯 초기화 완료');
-    }
+    // 연도별 최종 합격 등급 추이 (window.trendData: 플롯 번호 → 연도별 min/mean/max)
+    function renderTrend(trendDiv, gradeType) {
+        if (!window.trendData) return;
+        var column = gradeType === 'conv' ? 'conv_grade' : 'all_subj_grade';
+        var lines = [
+            {key: 'min', name: '최고(최소 등급)', color: '#3366CC', dash: 'dot'},
+            {key: 'mean', name: '평균', color: '#109618', dash: 'solid'},
+            {key: 'max', name: '최저(최대 등급)', color: '#DC3912', dash: 'dot'}
+        ];
+        var trend = window.trendData[trendDiv.id.split('-')[1]];
+        if (!trend) return;
+        var years = trend.years.map(String);
+        var traces = lines.map(function(line) {
+            return {
+                x: years, y: trend[column][line.key], type: 'scatter', mode: 'lines+markers',
+                name: line.name, connectgaps: false,
+                line: { color: line.color, width: line.key === 'mean' ? 3 : 1.5, dash: line.dash },
+                customdata: trend[column].count,
+                hovertemplate: '%{x}년 ' + line.name + ': %{y:.2f}<br>합격 %{customdata}명<extra></extra>'
+            };
+        });
+        var layout = createPlotLayout();
+        layout.height = 250;
+        layout.xaxis = { type: 'category', showgrid: false, tickfont: { size: 13 } };
+        layout.showlegend = true;
+        layout.legend = { orientation: 'h', y: 1.12 };
+        layout.margin = {t: 30, b: 40, l: 60, r: 30};
+        Plotly.react(trendDiv, traces, layout, {displayModeBar: false, responsive: true});
+    }
 
     function createPlotLayout() {
         return {
@@ -1132,31 +1035,63 @@ def plot_selected_depts(df: pd.DataFrame, out_dir: Path, selected_depts: list =
     }
 
     function updateAllPlots(gradeType) {
-        console.log('모든 플롯 업데이트 중... 타입:', gradeType);
-        var plotContainers = document.querySelectorAll('.plot-container[id^="plot-"]');
-        plotContainers.forEach(function(plotDiv) {
-            var plotId = plotDiv.id;
-            var numericId = plotId.split('-')[1]; // plot-container의 ID에서 숫자 부분 추출
-            try {
-                if (!window.plotsData || !window.plotsData[numericId]) {
-                    console.error('플롯 데이터를 찾을 수 없음 (update):', numericId);
-                    return;
-                }
-                var plotData = window.plotsData[numericId];
-                var traces;
-                if (gradeType === 'conv') {
-                    traces = JSON.parse(JSON.stringify(plotData.convTraces));
-                } else {
-                    traces = JSON.parse(JSON.stringify(plotData.allSubjTraces));
-                }
-                var layout = createPlotLayout();
-                Plotly.react(plotDiv, traces, layout, {displayModeBar: false, responsive: true, useResizeHandler: true});
-            } catch (error) {
-                console.error(`플롯 ${numericId} 업데이트 오류:`, error);
-                // plotDiv.innerHTML = `<p style="text-align:center; color:red;">플롯 업데이트 중 오류 발생: ${error.message}</p>`;
+        // 이미 그린 것 중 화면 근처만 바로 다시 그리고, 나머지는 다시 보일 때 현재 등급으로 그린다
+        document.querySelectorAll(LAZY_TARGETS).forEach(function(el) {
+            if (!el.dataset.rendered) return;
+            if (!plotObserver || nearViewport.has(el)) renderLazyTarget(el);
+        });
+        console.log('화면 근처 플롯 업데이트 완료:', gradeType);
+    }
+
+    // 보고서 안 검색: window.reportIndex의 대학/모집단위/전형 이름으로 구역을 숨기고 보인다.
+    // 검색어를 공백으로 나눈 모든 단어가 (대학 모집단위 전형) 이름에 들어 있으면 일치.
+    var searchTimer = null;
+
+    function onReportSearch(query) {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(function() { applyReportSearch(query); }, 120);
+    }
+
+    function applyReportSearch(query) {
+        var index = window.reportIndex;
+        if (!index) return;
+        var tokens = query.toLowerCase().split(/\\s+/).filter(Boolean);
+        var shown = 0;
+        index.sections.forEach(function(sec) {
+            // sec: [구역 id, 대학 번호, 모집단위 번호(-1: 전형별 요약), 전형 번호(-1: 전체 전형 통합)]
+            var el = document.getElementById(sec[0]);
+            if (!el) return;
+            var text = (index.univs[sec[1]] + ' ' + (sec[2] >= 0 ? index.depts[sec[2]] : '') + ' ' +
+                        (sec[3] >= 0 ? index.subtypes[sec[3]] : '')).toLowerCase();
+            var match = tokens.every(function(t) { return text.indexOf(t) !== -1; });
+            el.style.display = match ? '' : 'none';
+            if (match) shown++;
+        });
+        // 보이는 구역이 없는 모집단위/전형별 요약/대학 컨테이너는 통째로 숨긴다
+        function hasVisible(container, selector) {
+            return Array.prototype.some.call(container.querySelectorAll(selector), function(el) {
+                return el.style.display !== 'none';
+            });
+        }
+        document.querySelectorAll('[id^="dept-container-"]').forEach(function(c) {
+            c.style.display = hasVisible(c, '[id^="subtype-"], [id^="dept-summary-"]') ? '' : 'none';
+        });
+        document.querySelectorAll('[id^="summary-container-"]').forEach(function(c) {
+            c.style.display = hasVisible(c, '[id^="subtype-summary-"]') ? '' : 'none';
+        });
+        document.querySelectorAll('.dept-container[id^="univ-"]').forEach(function(c) {
+            c.style.display = hasVisible(c, '[id^="dept-container-"], [id^="summary-container-"]') ? '' : 'none';
+        });
+        document.querySelectorAll('#toc-content [data-target]').forEach(function(item) {
+            var target = document.getElementById(item.dataset.target);
+            var visible = true;
+            for (var el = target; el && el !== document.body; el = el.parentElement) {
+                if (el.style.display === 'none') { visible = false; break; }
             }
+            item.style.display = visible ? '' : 'none';
         });
-        console.log('모든 플롯 업데이트 완료');
+        var counter = document.getElementById('report-search-count');
+        if (counter) counter.textContent = tokens.length ? `${shown} / ${index.sections.length}개 구역` : '';
     }
 
     function scrollToElement(id) {
@@ -1172,8 +1107,395 @@ def plot_selected_depts(df: pd.DataFrame, out_dir: Path, selected_depts: list =
             setTimeout(function() { el.style.backgroundColor = ''; }, 1500); // 1.5초 후 원래대로
         }
     }
-    </script>
     """
+
+# 보고서 HTML 구조(점 줄이기, 검색 색인, 정렬 등)가 바뀌면 올린다.
+# 디스크 보고서 캐시 키에 들어가므로 코드를 고치면 이전 실행의 보고서를 재사용하지 않는다.
+REPORT_FORMAT_VERSION = 2
+
+
+def renderer_fingerprint(point_budget: int = PLOT_POINT_BUDGET, asset_base: Optional[str] = None) -> str:
+    """렌더러 버전 + 공통 CSS/JS 해시 + 렌더링 옵션 (보고서 캐시 키용)"""
+    payload = json.dumps([REPORT_FORMAT_VERSION, _ASSET_HASH, point_budget, asset_base], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+_ASSET_HASH = hashlib.sha256((REPORT_CSS + REPORT_SCRIPT).encode("utf-8")).hexdigest()
+
+
+class _SearchIndex:
+    """보고서 안 검색용 색인: 이름은 한 번씩만 싣고 구역은 [id, 대학, 모집단위, 전형] 번호로"""
+
+    def __init__(self):
+        self.names = {"univs": {}, "depts": {}, "subtypes": {}}
+        self.sections = []
+
+    def _code(self, kind: str, name) -> int:
+        if name is None:
+            return -1
+        return self.names[kind].setdefault(str(name), len(self.names[kind]))
+
+    def add(self, section_id: str, univ, dept=None, subtype=None) -> None:
+        self.sections.append([section_id, self._code("univs", univ), self._code("depts", dept), self._code("subtypes", subtype)])
+
+    def to_dict(self) -> dict:
+        return {**{kind: list(names) for kind, names in self.names.items()}, "sections": self.sections}
+
+
+class _GroupPayloads:
+    """
+    그룹별 요약 통계/플롯 데이터 생성. 행 내용(환산/전교과 등급, 결과를 순서대로)이 같은 그룹은
+    (전형이 하나인 모집단위의 "전체 전형 통합", 모집단위가 하나인 대학의 "전형별 요약" 등)
+    통계를 다시 계산하지 않고 앞 그룹의 결과와 plotsData를 함께 쓴다.
+    절약한 바이트/시간은 instr 카운터 dedupe_bytes_saved, dedupe_seconds_saved로 남긴다.
+    """
+
+    def __init__(self, df: pd.DataFrame, y_positions: dict, marker_styles: dict, point_budget: int, instr: Instrumentation):
+        self.y_positions = y_positions
+        self.marker_styles = marker_styles
+        self.point_budget = point_budget
+        self.instr = instr
+        self.conv = np.ascontiguousarray(df["conv_grade"].to_numpy(dtype=float))
+        self.all_subj = np.ascontiguousarray(df["all_subj_grade"].to_numpy(dtype=float))
+        self.results = pd.factorize(df["result"].to_numpy())[0].astype(np.int32)
+        self._built = {}   # 행 내용 해시 → (plot_id, 결과, 만드는 데 걸린 시간)
+
+    def _digest(self, rows) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        for values in (self.conv, self.all_subj, self.results):
+            h.update(np.ascontiguousarray(values[rows]))
+        return h.digest()
+
+    def build(self, plot_id: int, data: pd.DataFrame, rows) -> tuple:
+        """
+        rows: data의 행 위치 (slice 또는 위치 배열, 보고서 전체 기준)
+        (환산 요약 HTML, 전교과 요약 HTML, plotsData 스크립트, 환산 상세 표, 전교과 상세 표)
+        """
+        instr = self.instr
+        with instr.span("dedupe"):
+            key = self._digest(rows)
+        if key in self._built:
+            first_id, built, elapsed = self._built[key]
+            script = f'\n    <script>window.plotsData["{plot_id}"] = window.plotsData["{first_id}"];</script>\n    '
+            instr.count("plots_deduplicated")
+            instr.count("dedupe_bytes_saved", len(built[2]) - len(script))
+            instr.count("dedupe_seconds_saved", elapsed)
+            return built[0], built[1], script, built[3], built[4]
+
+        t0 = time.perf_counter()
+        with instr.span("stats"):
+            conv_stats = compute_stats(data, "conv_grade")
+            all_subj_stats = compute_stats(data, "all_subj_grade")
+        plot_script, conv_detail_stats, all_subj_detail_stats = create_plot_data_script(
+            plot_id, data, self.y_positions, self.marker_styles, instr=instr, point_budget=self.point_budget
+        )
+        built = (create_stats_html(conv_stats), create_stats_html(all_subj_stats), plot_script, conv_detail_stats, all_subj_detail_stats)
+        self._built[key] = (plot_id, built, time.perf_counter() - t0)
+        return built
+
+
+def render_report_html(df_filtered: pd.DataFrame, selected_depts: list = None, selected_univs: list = None, selected_subtypes: list = None, instr: Optional[Instrumentation] = None, asset_base: Optional[str] = None, point_budget: int = PLOT_POINT_BUDGET, order: Optional[HierarchyOrder] = None) -> str:
+    """
+    select_sorted로 정렬된 선택 데이터에서 보고서 HTML 문자열을 만든다.
+    대학/모집단위/전형 루프는 정렬된 데이터의 연속 구간만 잘라 쓴다.
+    asset_base: 주면 공통 CSS/JS를 넣지 않고 {asset_base}/report.css, report.js를 참조한다.
+    point_budget: 플롯 하나에 넣을 최대 점 수 (넘으면 요약 통계 + 이상치/표본만)
+    order: 가나다순 순위 (대학별 전형 요약의 전형 순서, 없으면 선택된 값으로 만든다)
+    """
+    instr = instr or Instrumentation("render_report_html")
+    if asset_base is None:
+        style_block = f"<style>{REPORT_CSS}        </style>"
+        script_block = f"\n    <script>{REPORT_SCRIPT}</script>\n    "
+    else:
+        style_block = f'<link rel="stylesheet" href="{asset_base}/report.css">'
+        script_block = f'\n    <script src="{asset_base}/report.js"></script>\n    '
+    univ_values = df_filtered['univ'].to_numpy()
+    dept_values = df_filtered['dept'].to_numpy()
+    subtype_values = df_filtered['subtype'].to_numpy()
+    subtype_ranks = _column_ranks(subtype_values, "subtype", order)
+
+    # 여러 해 데이터면 (univ, dept, subtype, year) 최종 합격 등급 요약을 한 번만 계산해 두고
+    # 전형별 추이 차트는 그 표에서 꺼내 쓴다 (그룹마다 다시 필터링하지 않음)
+    trends = None
+    if 'year' in df_filtered.columns and df_filtered['year'].nunique() > 1:
+        with instr.span("stats"):
+            trends = YearlyTrends(df_filtered)
+    trend_data = {}
+    search_index = _SearchIndex()
+
+    html_content = f"""
+    <!DOCTYPE html>
+    <html lang="ko">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>선택된 모집단위 입시 결과</title>
+        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+        {style_block}
+
+    </head>
+    <body>
+        <div class="fixed-header">
+            <div class="header-content">
+                <div class="university-title">선택된 모집단위 입시 결과</div>
+                <div class="controls-legend-wrapper">
+                    <div class="grade-toggle-container">
+                        <button id="btn-conv-grade" class="grade-toggle-btn active" onclick="switchGradeType('conv')">환산등급</button>
+                        <button id="btn-all-subj-grade" class="grade-toggle-btn" onclick="switchGradeType('all_subj')">전교과100 등급</button>
+                    </div>
+                    <div class="legend-container">
+                        <div class="legend-items-wrapper">
+                            <div class="legend-item"><span class="legend-marker" style="background-color: rgba(51, 102, 204, 0.7);"></span><span class="legend-text">합격</span></div>
+                            <div class="legend-item"><span class="legend-marker" style="background-color: rgba(16, 150, 24, 0.7);"></span><span class="legend-text">충원합격</span></div>
+                            <div class="legend-item"><span class="legend-marker" style="background-color: rgba(220, 57, 18, 0.7);"></span><span class="legend-text">불합격</span></div>
+                        </div>
+                        <div class="axis-label"><span class="axis-icon">↕</span> Y축: <span id="grade-type-label">환산등급</span> (1등급 ~ 9등급)</div>
+                    </div>
+                </div>
+            </div>
+        </div>
+        <div class="layout">
+            <aside class="toc-container">
+                <div class="toc-header">목차</div>
+                <input type="search" id="report-search" class="report-search" placeholder="대학·모집단위·전형 검색" oninput="onReportSearch(this.value)">
+                <div id="report-search-count" class="report-search-count"></div>
+                <div id="toc-content"></div>
+            </aside>
+            <main class="main-content">\n"""
+
+    y_positions = {"합격":0.01, "충원합격":0.0, "불합격":-0.03}
+    marker_styles = {
+        "합격": {"opacity":0.7, "line":dict(width=1.5, color="blue"), "color":"rgba(0,0,255,0.3)"},
+        "불합격": {"opacity":0.6, "line":dict(width=0.7, color="red"), "color":"rgba(255,0,0,0.2)"},
+        "충원합격": {"opacity":0.7, "line":dict(width=1.2, color="steelblue"), "color":"rgba(70,130,180,0.3)"}
+    }
+    plot_counter = 1
+    payloads = _GroupPayloads(df_filtered, y_positions, marker_styles, point_budget, instr)
+
+    for univ_idx, (u_start, u_end) in enumerate(run_bounds(univ_values), 1):
+        # 현재 대학 구간 (정렬된 데이터의 연속 슬라이스)
+        univ = univ_values[u_start]
+        df_univ = df_filtered.iloc[u_start:u_end]
+        html_content += f"""
+        <div class="dept-container" id="univ-{univ_idx}">
+            <div class="dept-header">{univ}</div>
+        """
+
+        # 모집단위별 루프 (대학 구간 안에서 모집단위 순으로 정렬되어 있음)
+        for d_idx, (d_start, d_end) in enumerate(run_bounds(dept_values, u_start, u_end), 1):
+            dept = dept_values[d_start]
+            dd = df_filtered.iloc[d_start:d_end]
+
+            html_content += f"""
+            <div class="subtype-container" id="dept-container-{univ_idx}-{d_idx}">
+                <div class="subtype-header" style="color: #34495e;">{d_idx}) {dept}</div>
+            """
+
+            # 전형별 루프 (모집단위 구간 안에서 전형 순으로 정렬되어 있음)
+            for st_idx, (s_start, s_end) in enumerate(run_bounds(subtype_values, d_start, d_end), 1):
+                subtype_val = subtype_values[s_start]
+                st_data = df_filtered.iloc[s_start:s_end]
+
+                # 통계, 박스플롯 스크립트 및 통계 테이블 생성
+                conv_stats_html, all_subj_stats_html, plot_script, conv_detail_stats, all_subj_detail_stats = payloads.build(
+                    plot_counter, st_data, slice(s_start, s_end)
+                )
+
+                # 연도별 합격선 추이 (여러 해 데이터가 있을 때만)
+                trend_html = ""
+                trend = trends.trend(univ, dept, subtype_val) if trends is not None else None
+                if trend is not None:
+                    trend_data[plot_counter] = trend
+                    trend_html = f"""
+                        <div class="trend-wrapper">
+                            <div class="stats-detail-title">연도별 최종 합격 등급 추이 ({trend["years"][0]}~{trend["years"][-1]})</div>
+                            <div class="trend-container" id="trend-{plot_counter}"></div>
+                        </div>"""
+
+                search_index.add(f"subtype-{univ_idx}-{d_idx}-{st_idx}", univ, dept, subtype_val)
+                html_content += f"""
+                <div class="subtype-container" id="subtype-{univ_idx}-{d_idx}-{st_idx}" style="margin-left: 20px; background-color: #fbfcfe;">
+                    <div class="subtype-header" style="font-size: 16px; color: #4a5568;">{st_idx}) {subtype_val}</div>
+                    <div class="visualization-container">
+                        <div class="plot-stats-wrapper">
+                            <div id="conv-stats-{plot_counter}" class="stats-container">{conv_stats_html}</div>
+                            <div id="all-subj-stats-{plot_counter}" class="stats-container" style="display:none;">{all_subj_stats_html}</div>
+                            <div class="plot-container" id="plot-{plot_counter}"></div>
+                        </div>
+                        {plot_script}
+                        <div class="stats-tables-wrapper">
+                            <div id="conv-additional-stats-{plot_counter}" class="additional-stats-container">
+                                {conv_detail_stats}
+                            </div>
+                            <div id="all-subj-additional-stats-{plot_counter}" class="additional-stats-container" style="display:none;">
+                                {all_subj_detail_stats}
+                            </div>
+                        </div>{trend_html}
+                    </div>
+                </div>
+                """
+                plot_counter += 1
+
+            # 모집단위별 요약 (모든 전형 포함, 전형이 하나면 그 전형과 같은 데이터를 쓴다)
+            dept_summary_html_conv, dept_summary_html_all_subj, plot_script, conv_detail_stats, all_subj_detail_stats = payloads.build(
+                plot_counter, dd, slice(d_start, d_end)
+            )
+
+            search_index.add(f"dept-summary-{univ_idx}-{d_idx}", univ, dept)
+            html_content += f"""
+            <div class="subtype-container" id="dept-summary-{univ_idx}-{d_idx}" style="margin-left: 20px; background-color: #f0f4f8;">
+                <div class="subtype-header" style="font-size: 16px; color: #2c3e50;">전체 전형 통합</div>
+                <div class="visualization-container">
+                    <div class="plot-stats-wrapper">
+                        <div id="conv-stats-{plot_counter}" class="stats-container">{dept_summary_html_conv}</div>
+                        <div id="all-subj-stats-{plot_counter}" class="stats-container" style="display:none;">{dept_summary_html_all_subj}</div>
+                        <div class="plot-container" id="plot-{plot_counter}"></div>
+                    </div>
+                    {plot_script}
+                    <div class="stats-tables-wrapper">
+                        <div id="conv-additional-stats-{plot_counter}" class="additional-stats-container">
+                            {conv_detail_stats}
+                        </div>
+                        <div id="all-subj-additional-stats-{plot_counter}" class="additional-stats-container" style="display:none;">
+                            {all_subj_detail_stats}
+                        </div>
+                    </div>
+                </div>
+            </div>
+            """
+            plot_counter += 1
+
+            html_content += """
+            </div>
+            """
+
+        # 대학별 전형 요약 섹션 (이전 코드와 유사)
+        summary_container_id = f"summary-container-{univ_idx}"
+        html_content += f"""
+        <div class="subtype-container" id="{summary_container_id}" style="background-color: #eef2f7;">
+            <div class="subtype-header" style="color: #1a202c;">전형별 요약</div>
+        """
+
+        # 전형별 요약은 (univ, dept, subtype) 순서에서 연속이 아니므로
+        # 대학 구간을 전형 순으로 한 번만 재정렬한 뒤 연속 구간을 잘라 쓴다.
+        # (df_filtered가 이미 선택된 모집단위로 제한되어 있어 추가 필터링은 필요 없다)
+        by_subtype = np.argsort(subtype_ranks[u_start:u_end], kind="stable")
+        df_univ_by_subtype = df_univ.take(by_subtype)
+        univ_subtype_values = subtype_values[u_start:u_end][by_subtype]
+
+        for s_idx, (ss_start, ss_end) in enumerate(run_bounds(univ_subtype_values), 1):
+            subtype = univ_subtype_values[ss_start]
+            ss = df_univ_by_subtype.iloc[ss_start:ss_end]
+
+            # 통계, 박스플롯 스크립트 및 통계 테이블 생성
+            conv_stats_html, all_subj_stats_html, plot_script, conv_detail_stats, all_subj_detail_stats = payloads.build(
+                plot_counter, ss, u_start + by_subtype[ss_start:ss_end]
+            )
+
+            search_index.add(f"subtype-summary-{univ_idx}-{s_idx}", univ, subtype=subtype)
+            html_content += f"""
+                <div class="subtype-container" id="subtype-summary-{univ_idx}-{s_idx}" style="margin-left: 20px; background-color: #fbfcfe;">
+                    <div class="subtype-header" style="font-size: 16px; color: #4a5568;">{subtype}</div>
+                    <div class="visualization-container">
+                        <div class="plot-stats-wrapper">
+                            <div id="conv-stats-{plot_counter}" class="stats-container">{conv_stats_html}</div>
+                            <div id="all-subj-stats-{plot_counter}" class="stats-container" style="display:none;">{all_subj_stats_html}</div>
+                            <div class="plot-container" id="plot-{plot_counter}"></div>
+                        </div>
+                        {plot_script}
+                        <div class="stats-tables-wrapper">
+                            <div id="conv-additional-stats-{plot_counter}" class="additional-stats-container">
+                                {conv_detail_stats}
+                            </div>
+                            <div id="all-subj-additional-stats-{plot_counter}" class="additional-stats-container" style="display:none;">
+                                {all_subj_detail_stats}
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            """
+            plot_counter += 1
+
+        html_content += """
+        </div>
+        </div>
+        """
+
+    # 전체 데이터 요약 섹션 추가
+    html_content += """
+    <div class="dept-container" id="overall-summary">
+        <div class="dept-header" style="color: #2c3e50; border-bottom: 2px solid #e74c3c;">전체 데이터 요약</div>
+        <div class="subtype-container" style="background-color: #f8f9fa;">
+            <div class="subtype-header" style="color: #1a202c;">선택된 모든 필터에 대한 종합 분석</div>
+    """
+
+    # 전체 필터링된 데이터에 대한 통계, 박스플롯 스크립트 및 통계 테이블 생성
+    (overall_conv_stats_html, overall_all_subj_stats_html, overall_plot_script,
+     overall_conv_detail_stats, overall_all_subj_detail_stats) = payloads.build(plot_counter, df_filtered, slice(0, len(df_filtered)))
+
+    html_content += f"""
+        <div class="visualization-container">
+            <div class="plot-stats-wrapper">
+                <div id="conv-stats-{plot_counter}" class="stats-container">{overall_conv_stats_html}</div>
+                <div id="all-subj-stats-{plot_counter}" class="stats-container" style="display:none;">{overall_all_subj_stats_html}</div>
+                <div class="plot-container" id="plot-{plot_counter}"></div>
+            </div>
+            {overall_plot_script}
+            <div class="stats-tables-wrapper">
+                <div id="conv-additional-stats-{plot_counter}" class="additional-stats-container">
+                    {overall_conv_detail_stats}
+                </div>
+                <div id="all-subj-additional-stats-{plot_counter}" class="additional-stats-container" style="display:none;">
+                    {overall_all_subj_detail_stats}
+                </div>
+            </div>
+        </div>
+    """
+
+    # 추가 시각화 생성 - 전체 데이터 요약에 대한 추가 그래프
+    additional_visualizations = create_advanced_visualizations(plot_counter, df_filtered, instr, point_budget)
+    html_content += additional_visualizations
+
+    # 선택된 필터 정보 표시 (옵션)
+    filter_info = []
+    if selected_univs:
+        univ_count = len(selected_univs)
+        univ_text = f"{univ_count}개 대학" if univ_count > 3 else ", ".join(selected_univs)
+        filter_info.append(f"선택된 대학: {univ_text}")
+    if selected_subtypes:
+        subtype_count = len(selected_subtypes)
+        subtype_text = f"{subtype_count}개 전형" if subtype_count > 3 else ", ".join(selected_subtypes)
+        filter_info.append(f"선택된 전형: {subtype_text}")
+    if selected_depts:
+        dept_count = len(selected_depts)
+        dept_text = f"{dept_count}개 모집단위" if dept_count > 3 else ", ".join(selected_depts)
+        filter_info.append(f"선택된 모집단위: {dept_text}")
+
+    if filter_info:
+        filter_info_html = "<div class='filter-info-container'><h3>적용된 필터</h3><ul>"
+        for info in filter_info:
+            filter_info_html += f"<li>{info}</li>"
+        filter_info_html += "</ul></div>"
+        html_content += filter_info_html
+
+    html_content += """
+        </div>
+    </div>
+    """
+
+    plot_counter += 1
+
+    if trend_data:
+        html_content += f"""
+    <script>window.trendData = {_dumps(trend_data, instr)};</script>
+    """
+
+    # 이름에 "</script>"가 있어도 스크립트 태그가 끊기지 않게 한다
+    index_json = json.dumps(search_index.to_dict(), ensure_ascii=False).replace("</", "<\\/")
+    html_content += f"""
+    <script>window.reportIndex = {index_json};</script>
+    """
+    html_content += script_block
     html_content += """
             </main>
         </div>
@@ -1181,10 +1503,77 @@ def plot_selected_depts(df: pd.DataFrame, out_dir: Path, selected_depts: list =
     </html>
     """
 
-    output_path = out_dir / output_file
-    try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        return f"{output_path.resolve()} 파일이 생성되었습니다."
-    except Exception as e:
-        return f"파일 저장 중 오류 발생: {e}"
\ No newline at end of file
+    return html_content
+
+
+def render_match_html(recommendations: pd.DataFrame, students: pd.DataFrame, title: str = "학생별 모집단위 추천 결과") -> str:
+    """
+    batch_matching.match_students 결과로 학생별 추천 보고서 HTML을 만든다.
+    학생 목록(목차)과 학생마다 추천 표 하나씩. 추천 목록은 학생 순서대로 정렬되어 있다고 가정한다.
+    """
+    def pct(value):
+        return "-" if pd.isna(value) else f"{value*100:.0f}%"
+
+    def grade(value):
+        return "-" if pd.isna(value) else f"{value:.2f}"
+
+    parts = [f"""<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{escape(title)}</title>
+    <style>
+        body {{ margin:0; padding:20px; font-family:'Malgun Gothic', '맑은 고딕', sans-serif; background-color: #f4f7f6; color: #333; }}
+        h1 {{ text-align: center; font-size: 24px; }}
+        .student {{ max-width: 1000px; margin: 0 auto 30px; background: #fff; border: 1px solid #d1d9e6; border-radius: 12px; padding: 20px; box-shadow: 0 6px 18px rgba(0,0,0,0.07); }}
+        .student h2 {{ font-size: 20px; color: #2c3e50; border-bottom: 2px solid #007bff; padding-bottom: 8px; margin-top: 0; }}
+        .grades {{ color: #5a6268; font-size: 14px; margin-bottom: 10px; }}
+        table {{ width: 100%; border-collapse: collapse; font-size: 14px; }}
+        th, td {{ padding: 6px 8px; border: 1px solid #dee2e6; text-align: center; }}
+        th {{ background-color: #e9ecef; }}
+        .high td.likelihood {{ color: #0056b3; font-weight: bold; }}
+        .low td.likelihood {{ color: #c82333; }}
+        .index {{ max-width: 1000px; margin: 0 auto 30px; }}
+        .index a {{ color: #0056b3; text-decoration: none; }}
+        .no-stats {{ font-style: italic; color: #6c757d; text-align: center; padding: 15px; }}
+    </style>
+</head>
+<body>
+<h1>{escape(title)}</h1>
+<div class="index"><table>
+<tr><th>이름</th><th>학번</th><th>환산등급</th><th>전교과 등급</th><th>추천 수</th><th>1순위</th><th>가능성</th></tr>
+"""]
+    for i, st in enumerate(students.itertuples(index=False)):
+        best = "-" if pd.isna(st.best_univ) else f"{st.best_univ} {st.best_dept} ({st.best_subtype})"
+        parts.append(
+            f'<tr><td><a href="#student-{i}">{escape(str(st.name))}</a></td><td>{escape(str(st.student_id))}</td>'
+            f"<td>{grade(st.conv_grade)}</td><td>{grade(st.all_subj_grade)}</td><td>{st.recommended}</td>"
+            f"<td>{escape(best)}</td><td>{pct(st.best_likelihood)}</td></tr>\n"
+        )
+    parts.append("</table></div>\n")
+
+    student_codes = recommendations["student"].to_numpy()
+    bounds = {student_codes[s]: (s, e) for s, e in run_bounds(student_codes)} if len(student_codes) else {}
+    for i, st in enumerate(students.itertuples(index=False)):
+        parts.append(
+            f'<div class="student" id="student-{i}"><h2>{escape(str(st.name))}</h2>'
+            f'<div class="grades">환산등급 {grade(st.conv_grade)} · 전교과 등급 {grade(st.all_subj_grade)}</div>'
+        )
+        if i not in bounds:
+            parts.append("<div class='no-stats'>추천할 모집단위가 없습니다.</div></div>\n")
+            continue
+        start, end = bounds[i]
+        parts.append("<table><tr><th>순위</th><th>대학</th><th>모집단위</th><th>전형</th><th>가능성</th>"
+                     "<th>환산 기준</th><th>전교과 기준</th><th>합격자/지원자</th></tr>")
+        for rec in recommendations.iloc[start:end].itertuples(index=False):
+            level = "high" if rec.likelihood >= 0.7 else "low" if rec.likelihood < 0.3 else ""
+            parts.append(
+                f'<tr class="{level}"><td>{rec.rank}</td><td>{escape(str(rec.univ))}</td><td>{escape(str(rec.dept))}</td>'
+                f'<td>{escape(str(rec.subtype))}</td><td class="likelihood">{pct(rec.likelihood)}</td>'
+                f"<td>{pct(rec.conv_grade_likelihood)}</td><td>{pct(rec.all_subj_grade_likelihood)}</td>"
+                f"<td>{rec.pass_count}/{rec.applicants}</td></tr>"
+            )
+        parts.append("</table></div>\n")
+    parts.append("</body>\n</html>\n")
+    return "".join(parts)
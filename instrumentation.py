@@ -0,0 +1,287 @@
+# instrumentation.py
+# ---------------------------------------------------------------------
+# 실행 단위 성능 계측 (이름 붙은 타이밍 구간 + 카운터)
+#   - Instrumentation.span("이름") 컨텍스트로 구간 시간 측정
+#   - report()  → 구간별 합계/자기시간을 모은 RunReport
+#   - write_trace() → Chrome trace-event 형식 JSON (chrome://tracing, Perfetto)
+#   - trace_memory=True → tracemalloc으로 구간별 할당량/최대 메모리와 상위 할당 위치 기록
+# ---------------------------------------------------------------------
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+# 상태바 요약에 쓰는 구간 이름 → 표시 라벨
+SPAN_LABELS = {
+    "excel_parse": "엑셀 파싱",
+    "clean": "정리",
+    "index_build": "인덱스",
+    "session_save": "세션 저장",
+    "filter_sort": "필터/정렬",
+    "stats": "통계",
+    "json_encode": "JSON",
+    "html_template": "HTML",
+    "file_write": "저장",
+    "report_cache": "보고서 캐시",
+    "point_reduction": "점 줄이기",
+    "dedupe": "중복 확인",
+    "merge": "합치기",
+    # pipeline.ReportPipeline 단계
+    "stage:load": "읽기 단계",
+    "stage:clean": "정리 단계",
+    "stage:select": "선택 단계",
+    "stage:aggregate": "집계 단계",
+    "stage:render_html": "HTML 출력",
+    "stage:render_csv": "CSV 출력",
+    "stage:render_xlsx": "엑셀 출력",
+}
+
+
+@dataclass
+class SpanStats:
+    """같은 이름의 구간들을 모은 집계 (초 단위, 메모리는 바이트)"""
+    count: int = 0
+    total: float = 0.0
+    self_time: float = 0.0
+    max: float = 0.0
+    mem_delta: int = 0   # 구간 동안 늘어난(남아 있는) 할당량 합계
+    mem_peak: int = 0    # 구간 시작 시점 대비 최대 증가량
+
+
+@dataclass
+class AllocationSite:
+    """단계별 상위 할당 위치 (tracemalloc 스냅샷 비교 결과)"""
+    stage: str
+    location: str
+    size: int
+    count: int
+
+
+@dataclass
+class RunReport:
+    """한 번의 실행(로드 또는 보고서 생성)에 대한 계측 결과"""
+    name: str
+    wall_time: float
+    spans: dict = field(default_factory=dict)
+    counters: dict = field(default_factory=dict)
+    peak_memory: Optional[int] = None  # trace_memory일 때만 기록
+    top_allocations: list = field(default_factory=list)
+
+    def summary(self, limit: int = 5) -> str:
+        """상태바용 한 줄 요약 (자기시간이 큰 구간 순)"""
+        parts = [f"총 {self.wall_time:.2f}s"]
+        ranked = sorted(self.spans.items(), key=lambda kv: kv[1].self_time, reverse=True)
+        for name, st in ranked[:limit]:
+            parts.append(f"{SPAN_LABELS.get(name, name)} {st.self_time:.2f}s")
+        if self.counters.get("plots_deduplicated"):
+            parts.append(
+                f"같은 그룹 {int(self.counters['plots_deduplicated'])}개 재사용"
+                f"({_mb(self.counters.get('dedupe_bytes_saved', 0))}, {self.counters.get('dedupe_seconds_saved', 0):.2f}s 절약)"
+            )
+        if self.peak_memory is not None:
+            parts.append(f"최대 메모리 {_mb(self.peak_memory)}")
+            if self.top_allocations:
+                top = self.top_allocations[0]
+                parts.append(f"최대 할당 {SPAN_LABELS.get(top.stage, top.stage)}@{top.location} {_mb(top.size)}")
+        return " · ".join(parts)
+
+    def memory_summary(self) -> str:
+        """단계별 메모리 사용량과 상위 할당 위치를 여러 줄로 정리"""
+        if self.peak_memory is None:
+            return "메모리 프로파일링이 꺼져 있습니다."
+        lines = [f"최대 메모리 (tracemalloc): {_mb(self.peak_memory)}", "단계별 할당 (증가량 / 구간 내 최대):"]
+        for name, st in self.spans.items():
+            lines.append(f"  {SPAN_LABELS.get(name, name):<10} {_mb(st.mem_delta):>10} / {_mb(st.mem_peak):>10}")
+        if self.top_allocations:
+            lines.append("상위 할당 위치:")
+            for site in self.top_allocations:
+                lines.append(
+                    f"  [{SPAN_LABELS.get(site.stage, site.stage)}] {site.location}  {_mb(site.size)} ({site.count}개)"
+                )
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "wall_time": self.wall_time,
+            "spans": {name: vars(st) for name, st in self.spans.items()},
+            "counters": dict(self.counters),
+            "peak_memory": self.peak_memory,
+            "top_allocations": [vars(site) for site in self.top_allocations],
+        }
+
+
+def _own_filtered(snapshot: "tracemalloc.Snapshot") -> "tracemalloc.Snapshot":
+    """계측 코드 자신과 import 시스템의 할당은 상위 할당 위치에서 제외"""
+    return snapshot.filter_traces([
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+
+
+def _mb(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f}MB"
+
+
+class Instrumentation:
+    """
+    이름 붙은 타이밍 구간과 카운터를 기록한다.
+
+    구간은 중첩될 수 있으며, 자기시간(self_time)은 하위 구간 시간을 뺀 값이다.
+    여러 스레드에서 같은 객체를 써도 스레드별 스택으로 중첩 관계를 구분한다.
+
+    trace_memory=True이면 tracemalloc으로 구간별 할당량과 최대 메모리를 기록하고,
+    최상위 구간마다 시작/끝 스냅샷을 비교해 상위 할당 위치(top_n개)를 남긴다.
+    tracemalloc은 전역 상태이므로 메모리 수치는 단일 작업 스레드 기준이다.
+    """
+
+    def __init__(self, name: str = "run", *, trace_memory: bool = False, top_n: int = 10):
+        self.name = name
+        self._t0 = time.perf_counter()
+        self._events: list[tuple] = []  # (name, start, duration, child_time, tid, args)
+        self._memory: list[tuple] = []  # (name, mem_delta, mem_peak)
+        self._sites: list[AllocationSite] = []
+        self._counters: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.trace_memory = trace_memory
+        self.top_n = top_n
+        self._owns_tracemalloc = False
+        self._peak = 0
+        if trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owns_tracemalloc = True
+            tracemalloc.reset_peak()
+            self._mem0 = tracemalloc.get_traced_memory()[0]
+
+    @contextmanager
+    def span(self, name: str, **args):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        frame = [0.0, 0]  # 하위 구간 시간 누적, 구간 내 최대 메모리
+        snapshot = None
+        if self.trace_memory:
+            mem_start = self._enter_memory(stack)
+            if not stack:
+                snapshot = tracemalloc.take_snapshot()
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += duration
+            self._events.append((name, start, duration, frame[0], threading.get_ident(), args))
+            if self.trace_memory:
+                self._exit_memory(name, stack, frame, mem_start, snapshot)
+
+    # ──────────────────────── 메모리 계측 ───────────────────────────
+    def _enter_memory(self, stack: list) -> int:
+        # 부모 구간들의 최대값을 먼저 반영한 뒤 peak를 초기화해 이 구간만 측정한다.
+        current, peak = tracemalloc.get_traced_memory()
+        for parent in stack:
+            parent[1] = max(parent[1], peak)
+        self._peak = max(self._peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def _exit_memory(self, name: str, stack: list, frame: list, mem_start: int, snapshot) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, frame[1])
+        for parent in stack:
+            parent[1] = max(parent[1], peak)
+        self._peak = max(self._peak, peak)
+        self._memory.append((name, current - mem_start, peak - mem_start))
+        if snapshot is not None:
+            diff = _own_filtered(tracemalloc.take_snapshot()).compare_to(_own_filtered(snapshot), "lineno")
+            for stat in diff[: self.top_n]:
+                if stat.size_diff <= 0:
+                    continue
+                frame_info = stat.traceback[0]
+                self._sites.append(AllocationSite(
+                    stage=name,
+                    location=f"{Path(frame_info.filename).name}:{frame_info.lineno}",
+                    size=stat.size_diff,
+                    count=stat.count_diff,
+                ))
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def report(self) -> RunReport:
+        """구간/카운터 집계. trace_memory로 직접 시작한 tracemalloc은 여기서 멈춘다."""
+        spans: dict[str, SpanStats] = {}
+        for name, _start, duration, child, _tid, _args in list(self._events):
+            st = spans.setdefault(name, SpanStats())
+            st.count += 1
+            st.total += duration
+            st.self_time += duration - child
+            st.max = max(st.max, duration)
+
+        peak_memory = None
+        if self.trace_memory:
+            for name, delta, peak in list(self._memory):
+                st = spans[name]
+                st.mem_delta += delta
+                st.mem_peak = max(st.mem_peak, peak)
+            if tracemalloc.is_tracing():
+                self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            peak_memory = self._peak - self._mem0
+            self.close()
+        return RunReport(
+            name=self.name,
+            wall_time=time.perf_counter() - self._t0,
+            spans=spans,
+            counters=dict(self._counters),
+            peak_memory=peak_memory,
+            top_allocations=sorted(self._sites, key=lambda site: site.size, reverse=True)[: self.top_n],
+        )
+
+    def close(self) -> None:
+        """직접 시작한 tracemalloc을 멈춘다. 실패 경로에서도 finally로 부른다 (여러 번 불러도 된다)."""
+        if self._owns_tracemalloc:
+            if tracemalloc.is_tracing():
+                self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    def __enter__(self) -> "Instrumentation":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write_trace(self, path: Path) -> Path:
+        """Chrome trace-event 형식(JSON)으로 기록한다."""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": self.name}}]
+        for name, start, duration, _child, tid, args in list(self._events):
+            events.append({
+                "name": name,
+                "cat": self.name,
+                "ph": "X",
+                "ts": (start - self._t0) * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": tid,
+                "args": args,
+            })
+        end_ts = (time.perf_counter() - self._t0) * 1e6
+        for name, value in self._counters.items():
+            events.append({"name": name, "ph": "C", "ts": end_ts, "pid": pid, "args": {name: value}})
+
+        path = Path(path)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return path
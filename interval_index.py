@@ -0,0 +1,138 @@
+# interval_index.py
+# ---------------------------------------------------------------------
+# 그룹별 합격 등급 범위 [최솟값, 최댓값]에 대한 구간 색인
+#   "3.2등급이 합격 범위 안에 있는 모집단위는?" (stab)
+#   "2.5~3.0등급과 합격 범위가 겹치는 모집단위는?" (overlap)
+#
+# IntervalTree: 정적 중심 구간 트리. 노드마다 중심점을 지나는 구간을
+#   시작점 오름차순/끝점 내림차순으로 정렬해 두고 searchsorted로 잘라 쓴다.
+#   stab은 O(log n + k), overlap은 stab(a) + 시작점이 (a, b]인 구간.
+# PassRangeIndex: SelectionAggregator의 그룹 부분 집계(최솟값/최댓값)로 만든다
+#   (원본 행을 다시 훑지 않음).
+# ---------------------------------------------------------------------
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from selection_stats import DIMENSIONS, GRADE_COLUMNS, RESULT_KEYS, SelectionAggregator
+
+# 범위 종류 → 기준 결과 (pass: compute_stats의 pass_min/max, all_pass: 충원합격 포함)
+RANGE_KINDS = {"pass": RESULT_KEYS[:1], "all_pass": RESULT_KEYS[:2]}
+
+
+class _Node:
+    __slots__ = ("center", "by_lo", "lo_sorted", "by_hi", "hi_sorted", "left", "right")
+
+
+class IntervalTree:
+    """닫힌 구간 [lo, hi] 모음에 대한 정적 구간 트리 (구간 번호를 돌려준다)"""
+
+    def __init__(self, lo: np.ndarray, hi: np.ndarray):
+        self.lo = np.asarray(lo, dtype=float)
+        self.hi = np.asarray(hi, dtype=float)
+        idx = np.flatnonzero(~(np.isnan(self.lo) | np.isnan(self.hi)) & (self.lo <= self.hi))
+        self._start_order = idx[np.argsort(self.lo[idx], kind="stable")]
+        self._starts = self.lo[self._start_order]
+        self._root = self._build(idx)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _build(self, idx: np.ndarray) -> Optional[_Node]:
+        if len(idx) == 0:
+            return None
+        node = _Node()
+        endpoints = np.concatenate([self.lo[idx], self.hi[idx]])
+        node.center = float(np.median(endpoints))
+        lo, hi = self.lo[idx], self.hi[idx]
+        here = idx[(lo <= node.center) & (hi >= node.center)]
+        by_lo = here[np.argsort(self.lo[here], kind="stable")]
+        by_hi = here[np.argsort(-self.hi[here], kind="stable")]
+        node.by_lo, node.lo_sorted = by_lo, self.lo[by_lo]
+        node.by_hi, node.hi_sorted = by_hi, -self.hi[by_hi]  # 내림차순을 오름차순 키로
+        node.left = self._build(idx[hi < node.center])
+        node.right = self._build(idx[lo > node.center])
+        return node
+
+    def stab(self, x: float) -> np.ndarray:
+        """x를 포함하는 구간 번호 (lo <= x <= hi)"""
+        found = []
+        node = self._root
+        while node is not None:
+            if x < node.center:
+                # 중심을 지나는 구간은 hi >= center > x 이므로 lo <= x 만 보면 된다
+                found.append(node.by_lo[:np.searchsorted(node.lo_sorted, x, side="right")])
+                node = node.left
+            elif x > node.center:
+                found.append(node.by_hi[:np.searchsorted(node.hi_sorted, -x, side="right")])
+                node = node.right
+            else:
+                found.append(node.by_lo)
+                break
+        return np.sort(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+    def overlap(self, a: float, b: float) -> np.ndarray:
+        """[a, b]와 겹치는 구간 번호 (lo <= b 이고 hi >= a)"""
+        if a > b:
+            a, b = b, a
+        # a를 포함하는 구간 + 시작점이 (a, b]에 있는 구간 (둘은 겹치지 않는다)
+        left = np.searchsorted(self._starts, a, side="right")
+        right = np.searchsorted(self._starts, b, side="right")
+        return np.sort(np.concatenate([self.stab(a), self._start_order[left:right]]))
+
+
+class PassRangeIndex:
+    """
+    (univ, subtype, dept) 그룹별 합격 등급 범위 색인 (등급 종류마다 트리 하나).
+    kind="pass"는 '합격'만, "all_pass"는 '합격+충원합격' 기준.
+    """
+
+    def __init__(self, aggregator: SelectionAggregator, kind: str = "pass"):
+        if kind not in RANGE_KINDS:
+            raise ValueError(f"지원하지 않는 범위 종류: {kind}")
+        self.kind = kind
+        self.n_groups = aggregator.n_groups
+        self._keys = aggregator.group_keys()
+        self._ranges, self._trees = {}, {}
+        for col in GRADE_COLUMNS:
+            lo, hi, n = aggregator.group_ranges(col, RANGE_KINDS[kind])
+            self._ranges[col] = (lo, hi, n)
+            self._trees[col] = IntervalTree(lo, hi)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, kind: str = "pass") -> "PassRangeIndex":
+        return cls(SelectionAggregator(df), kind)
+
+    def stab(self, grade_column: str, grade: float) -> np.ndarray:
+        """합격 범위가 grade를 포함하는 그룹 번호"""
+        return self._trees[grade_column].stab(grade)
+
+    def overlap(self, grade_column: str, lo: float, hi: float) -> np.ndarray:
+        """합격 범위가 [lo, hi]와 겹치는 그룹 번호"""
+        return self._trees[grade_column].overlap(lo, hi)
+
+    def mask(self, grade_column: str, lo: float, hi: Optional[float] = None) -> np.ndarray:
+        """stab(hi가 없을 때)/overlap 결과를 SelectionAggregator.restrict용 그룹 마스크로"""
+        groups = self.stab(grade_column, lo) if hi is None else self.overlap(grade_column, lo, hi)
+        mask = np.zeros(self.n_groups, dtype=bool)
+        mask[groups] = True
+        return mask
+
+    def frame(self, groups: Iterable[int], grade_column: str) -> pd.DataFrame:
+        """그룹 번호 → univ/subtype/dept와 합격 범위 (min, max, count) 표, 대학/모집단위 순"""
+        groups = np.asarray(list(groups) if not isinstance(groups, np.ndarray) else groups, dtype=np.int64)
+        lo, hi, n = self._ranges[grade_column]
+        out = pd.DataFrame({dim: self._keys[dim][groups] for dim in DIMENSIONS})
+        out["min"], out["max"], out["count"] = lo[groups], hi[groups], n[groups]
+        return out.sort_values(["univ", "dept", "subtype"], ignore_index=True)
+
+    def query(self, grade_column: str, lo: float, hi: Optional[float] = None) -> pd.DataFrame:
+        """stab(hi 없음) 또는 overlap 결과 표"""
+        groups = self.stab(grade_column, lo) if hi is None else self.overlap(grade_column, lo, hi)
+        return self.frame(groups, grade_column)
+
+    def group_tuples(self, mask: np.ndarray) -> list:
+        """그룹 마스크 → [(univ, dept, subtype), ...] (plot_selected_depts의 groups 인자 형식)"""
+        idx = np.flatnonzero(mask)
+        return list(zip(self._keys["univ"][idx], self._keys["dept"][idx], self._keys["subtype"][idx]))
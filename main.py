@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
+import time
 import os
 import webbrowser
 from pathlib import Path
@@ -8,17 +9,30 @@ from pathlib import Path
 import pandas as pd  # used only for typing hints, not strictly required
 
 from filter_widgets import MultiSelectFilter
-from data_processor import read_input
-from html_generator import plot_selected_depts
+from data_processor import infer_year, read_input, read_inputs
+from selection_stats import SelectionAggregator
+from batch_matching import match_students, read_roster, write_match_excel
+from session import load_session, save_dataset, save_state
+from history_store import DEFAULT_DB_PATH, HistoryStore
+from html_generator import plot_selected_depts, render_match_html, report_written
+from stats_export import export_stats
+from report_cache import ReportFileCache, dataset_version
+from sheet_schema import DEFAULT_LAYOUT_CACHE, LayoutCache, use_layout_cache
+from dataset_snapshot import DatasetRef, DatasetSnapshot, next_version
+from folder_watch import DEFAULT_POLL_SECONDS, FolderDataset
+from instrumentation import Instrumentation, RunReport
 from utils import sanitize
 
 
 class DepartmentSelector(tk.Tk):
     """주요 흐름
-    1) 엑셀을 로드하면 DataFrame(self.df)이 채워진다.
+    1) 엑셀을 로드하면 DatasetSnapshot(데이터 + 색인)이 만들어져 self.data에 원자적으로 교체된다.
+       (또는 'DB로 탐색'을 누르면 SQLite 이력 DB(self.store)를 직접 조회하는 스냅숏.)
+       읽는 쪽은 self.snapshot을 한 번 읽어 그 스냅숏만 쓴다 (작업 스레드에도 그대로 넘김).
     2) 그 시점에 3‑중 MultiSelectFilter(UI)가 생성된다.
-    3) 필터 변화 → _on_filter_change → 그래프 / HTML 재생성.  
-       (render_plots(df) 함수를 이미 갖고 계시다면 그대로 호출하세요.)
+    3) 필터 변화 → _on_filter_change → 후보 갱신 + 미리보기 통계 갱신.
+       (미리보기는 SelectionAggregator가 증분 집계로 계산한다.)
+    4) 'HTML 보고서 생성' → plot_selected_depts 로 보고서 파일 생성.
     """
 
     # ------------------------------------------------------------
@@ -28,16 +42,31 @@ class DepartmentSelector(tk.Tk):
         super().__init__()
 
         self.title("모집단위 입시 결과 시각화 프로그램")
-        self.geometry("950x650")
-        self.minsize(900, 600)
+        self.geometry("950x720")
+        self.minsize(900, 650)
 
-        # DataFrame 자리
-        self.df: pd.DataFrame | None = None
+        # 데이터셋 스냅숏 (교체는 메인 스레드에서 _publish로만)
+        self.data = DatasetRef()
+        self.selection: SelectionAggregator | None = None  # 현재 스냅숏의 필터 선택 상태 (메인 스레드 전용)
+        self._range_groups: list | None = None             # 범위 필터가 남긴 (univ, dept, subtype) 조합
+
+        # 이력 DB 연결 (DB로 탐색하면 이 연결을 조회하는 스냅숏이 만들어진다)
+        self.store: HistoryStore | None = None
 
         # 출력 디렉터리
         self.output_dir = Path("output_htmls")
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+        # 보고서 결과 캐시 (데이터셋 버전 + 선택 조합이 같으면 이전 파일을 복사)
+        self.report_cache = ReportFileCache()
+        # 워크북별 열 배치 캐시 (머리글 위치를 한 번 찾으면 다음 로드부터 바로 필요한 열만 읽음)
+        use_layout_cache(LayoutCache(DEFAULT_LAYOUT_CACHE))
+
+        # 폴더 감시 (바뀐 파일만 다시 읽고, 원하면 영향받은 보고서를 다시 생성)
+        self.watch: FolderDataset | None = None
+        self._watch_job: str | None = None
+        self._generated: dict = {}   # 이번 실행에서 만든 보고서 파일명 → 선택 조건
+
         # 기본 스타일
         self.style = ttk.Style(self)
         if "clam" in self.style.theme_names():
@@ -49,6 +78,10 @@ class DepartmentSelector(tk.Tk):
         # 창 가운데 정렬
         self._center_window()
 
+        # 이전 세션 복원 + 종료 시 선택 상태 저장
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.after(0, self._restore_session)
+
     # ------------------------------------------------------------
     # ▶ 베이스 위젯 (파일 선택, 상태바 등)
     # ------------------------------------------------------------
@@ -67,7 +100,25 @@ class DepartmentSelector(tk.Tk):
         ttk.Button(top_frame, text="파일 찾아보기", command=self._browse_file).pack(
             side=tk.LEFT, padx=(0, 5)
         )
-        ttk.Button(top_frame, text="데이터 로드", command=self._load_file).pack(side=tk.LEFT)
+        ttk.Button(top_frame, text="데이터 로드", command=self._load_file).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(top_frame, text="폴더 감시", command=self._start_watch).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(top_frame, text="제외 행 보기", command=self._show_validation).pack(side=tk.LEFT, padx=(0, 5))
+        self.regen_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top_frame, text="변경 시 보고서 다시 생성", variable=self.regen_var).pack(side=tk.LEFT)
+
+        # ── 이력 DB (SQLite) ─────────────────────────────────
+        db_frame = ttk.LabelFrame(self.main_frame, text="이력 DB (SQLite)", padding=10)
+        db_frame.pack(fill=tk.X, pady=(0, 15))
+
+        self.db_path_var = tk.StringVar(value=str(DEFAULT_DB_PATH))
+        ttk.Entry(db_frame, textvariable=self.db_path_var, width=40).pack(
+            side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10)
+        )
+        ttk.Label(db_frame, text="연도:").pack(side=tk.LEFT)
+        self.year_var = tk.StringVar()
+        ttk.Entry(db_frame, textvariable=self.year_var, width=6).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(db_frame, text="DB에 추가", command=self._append_to_store).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(db_frame, text="DB로 탐색", command=self._open_store).pack(side=tk.LEFT)
 
         # ── 필터 영역 placeholder (엑셀 로드 후 build_filters) ──
         self.filter_container = ttk.Frame(self.main_frame)
@@ -89,12 +140,26 @@ class DepartmentSelector(tk.Tk):
         ttk.Entry(bottom_frame, textvariable=self.filename_var).pack(
             side=tk.LEFT, fill=tk.X, expand=True, padx=5
         )
+        self.trace_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bottom_frame, text="성능 추적(JSON) 저장", variable=self.trace_var).pack(
+            side=tk.LEFT, padx=(0, 5)
+        )
+        self.profile_memory_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bottom_frame, text="메모리 프로파일링", variable=self.profile_memory_var).pack(
+            side=tk.LEFT, padx=(0, 5)
+        )
         ttk.Button(
             bottom_frame,
             text="HTML 보고서 생성",
             command=self._generate_html,
             style="Accent.TButton",
         ).pack(side=tk.RIGHT)
+        ttk.Button(bottom_frame, text="합격 가능성 조회", command=self._open_estimator).pack(
+            side=tk.RIGHT, padx=(0, 5)
+        )
+        ttk.Button(bottom_frame, text="통계 내보내기", command=self._export_stats).pack(
+            side=tk.RIGHT, padx=(0, 5)
+        )
 
         # 스타일 맵
         self.style.configure("Accent.TButton", font=("Helvetica", 10, "bold"), foreground="white")
@@ -136,22 +201,53 @@ class DepartmentSelector(tk.Tk):
         filter_frame = ttk.Frame(self.filter_container)
         filter_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.univ_filter = MultiSelectFilter(filter_frame, self.df, "univ", label="대학", callback=self._on_filter_change)
-        self.subtype_filter = MultiSelectFilter(filter_frame, self.df, "subtype", label="전형", callback=self._on_filter_change)
-        self.dept_filter = MultiSelectFilter(filter_frame, self.df, "dept", label="모집단위", callback=self._on_filter_change)
+        snap = self.snapshot
+        df, order = snap.df, snap.order
+        self.univ_filter = MultiSelectFilter(filter_frame, df, "univ", label="대학", callback=self._on_filter_change, order=order.get("univ"))
+        self.subtype_filter = MultiSelectFilter(filter_frame, df, "subtype", label="전형", callback=self._on_filter_change, order=order.get("subtype"))
+        self.dept_filter = MultiSelectFilter(filter_frame, df, "dept", label="모집단위", callback=self._on_filter_change, order=order.get("dept"))
 
         for col, widget in enumerate((self.univ_filter, self.subtype_filter, self.dept_filter)):
             widget.grid(row=0, column=col, sticky="nsew", padx=5)
             filter_frame.columnconfigure(col, weight=1)
 
+        # ── 합격 등급 범위 필터 (구간 색인) ─────────────────────
+        self._range_groups = None
+        range_frame = ttk.LabelFrame(self.filter_container, text="합격 등급 범위 필터", padding=8)
+        range_frame.pack(fill=tk.X, pady=(10, 0))
+        self.range_grade_var = tk.StringVar(value="환산등급")
+        ttk.Combobox(
+            range_frame, textvariable=self.range_grade_var, values=("환산등급", "전교과 등급"),
+            state="readonly", width=10,
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        self.range_lo_var, self.range_hi_var = tk.StringVar(), tk.StringVar()
+        ttk.Entry(range_frame, textvariable=self.range_lo_var, width=6).pack(side=tk.LEFT)
+        ttk.Label(range_frame, text="~").pack(side=tk.LEFT, padx=3)
+        ttk.Entry(range_frame, textvariable=self.range_hi_var, width=6).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(range_frame, text="적용", command=self._apply_range_filter).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(range_frame, text="해제", command=self._clear_range_filter).pack(side=tk.LEFT, padx=(0, 10))
+        self.range_info_var = tk.StringVar(value="합격 등급 범위에 이 등급(또는 구간)이 포함되는 모집단위만 남깁니다.")
+        ttk.Label(range_frame, textvariable=self.range_info_var, anchor=tk.W).pack(side=tk.LEFT, fill=tk.X)
+
+        # ── 선택 미리보기 패널 ─────────────────────────────────
+        preview_frame = ttk.LabelFrame(self.filter_container, text="선택 미리보기", padding=8)
+        preview_frame.pack(fill=tk.X, pady=(10, 0))
+        self.preview_var = tk.StringVar()
+        ttk.Label(preview_frame, textvariable=self.preview_var, justify=tk.LEFT, anchor=tk.W).pack(fill=tk.X)
+        self._update_preview()
+
     # ------------------------------------------------------------
     # ▶ 파일 다이얼로그
     # ------------------------------------------------------------
     def _browse_file(self) -> None:
-        file_path = filedialog.askopenfilename(title="입시 결과 엑셀 파일 선택", filetypes=[("Excel files", "*.xlsx *.xls")])
-        if file_path:
-            self.file_path_var.set(file_path)
-            self.status_var.set(f"선택된 파일: {Path(file_path).name}")
+        # 여러 해 파일을 함께 고르면 ';'로 이어 붙이고, 로드 시 파일 이름의 연도로 year 열을 붙인다
+        file_paths = filedialog.askopenfilenames(title="입시 결과 엑셀 파일 선택 (여러 해 선택 가능)", filetypes=[("Excel files", "*.xlsx *.xls")])
+        if file_paths:
+            self.file_path_var.set(";".join(file_paths))
+            self.status_var.set(f"선택된 파일: {', '.join(Path(p).name for p in file_paths)}")
+            year = infer_year(file_paths[0]) if len(file_paths) == 1 else None
+            if year is not None:
+                self.year_var.set(str(year))
 
     # ------------------------------------------------------------
     # ▶ 엑셀 로드 (스레드)
@@ -161,34 +257,206 @@ class DepartmentSelector(tk.Tk):
         if not file_path:
             messagebox.showerror("오류", "먼저 엑셀 파일을 선택해주세요.")
             return
-        if not Path(file_path).exists():
-            messagebox.showerror("오류", f"파일을 찾을 수 없습니다: {file_path}")
-            return
+        for path in file_path.split(";"):
+            if not Path(path).exists():
+                messagebox.showerror("오류", f"파일을 찾을 수 없습니다: {path}")
+                return
 
+        self._stop_watch()
         # UI 잠금
         self._set_widgets_state(tk.DISABLED)
         self.status_var.set("데이터 로드 중...")
 
-        threading.Thread(target=self._load_file_thread, args=(file_path,), daemon=True).start()
+        profile_memory = self.profile_memory_var.get()
+        version = next_version()  # 나중에 누른 로드가 먼저 끝난 로드를 이기도록 시작할 때 번호를 받는다
+        threading.Thread(target=self._load_file_thread, args=(file_path, profile_memory, version), daemon=True).start()
 
-    def _load_file_thread(self, file_path: str) -> None:
+    def _load_file_thread(self, file_path: str, profile_memory: bool = False, version: int | None = None) -> None:
+        instr = Instrumentation("load", trace_memory=profile_memory)
         try:
-            df = read_input(Path(file_path))
-            self.df = df
-            self.after(0, self._build_filters)
-            self.after(0, lambda: self.status_var.set("데이터 로드 완료. 필터를 선택하세요."))
+            paths = file_path.split(";")
+            reports = []  # 파일별 검증 결과 (사유별 제외 행 번호)
+            if len(paths) > 1:
+                df = read_inputs(paths, instr=instr, reports=reports)  # 연도별 파일 → year 열로 합침
+            else:
+                df = read_input(Path(file_path), instr=instr, reports=reports)
+            with instr.span("index_build"):
+                snap = DatasetSnapshot.from_frame(df, paths, version=version, validation=reports)
+            try:
+                with instr.span("session_save"):
+                    save_dataset(df, snap.aggregator, file_path if len(paths) == 1 else None)
+            except OSError as e:
+                print(f"세션 저장 실패: {e}")
+            report = instr.report()
+            if profile_memory:
+                print(report.memory_summary())
+            rejected = sum(r.rows_rejected for r in reports)
+            note = f" · 제외 {rejected:,}행 ('제외 행 보기')" if rejected else ""
+            self.after(0, lambda: self._publish(
+                snap, f"데이터 로드 완료 ({len(df):,}행{note} · {report.summary()}). 필터를 선택하세요."
+            ))
         except Exception as e:
-            self.after(0, lambda: messagebox.showerror("오류", f"파일 로드 실패: {e}"))
+            self.after(0, lambda e=e: messagebox.showerror("오류", f"파일 로드 실패: {e}"))
             self.after(0, lambda: self.status_var.set("데이터 로드 실패."))
         finally:
+            instr.close()  # 실패해도 tracemalloc을 켜 둔 채로 두지 않는다
             self.after(0, lambda: self._set_widgets_state(tk.NORMAL))
 
+    def _show_validation(self) -> None:
+        """현재 데이터의 파일별 검증 결과 (사유별 제외 행의 엑셀 행 번호)"""
+        snap = self.snapshot
+        if snap is None or not snap.validation:
+            messagebox.showinfo("제외 행", "검증 결과가 없습니다. 엑셀 파일을 먼저 로드하세요.")
+            return
+        lines = []
+        for report in snap.validation:
+            lines.append(report.summary())
+            lines += report.details()
+        messagebox.showinfo("제외 행", "\n".join(lines))
+
+    @property
+    def snapshot(self) -> DatasetSnapshot | None:
+        return self.data.current
+
+    def _publish(self, snap: DatasetSnapshot, status: str, rebuild_filters: bool = True) -> bool:
+        """
+        메인 스레드에서 스냅숏 교체 + 선택 집계기/필터/캐시 갱신.
+        더 나중에 시작한 로드가 이미 반영됐으면 snap은 버린다.
+        """
+        if not self.data.publish(snap):
+            self.status_var.set("더 최근에 로드한 데이터가 있어 이 결과는 반영하지 않았습니다.")
+            return False
+        self.selection = snap.selection()
+        self.report_cache.retain(snap.token)  # 다른 데이터로 만든 결과는 버린다
+        if rebuild_filters or not hasattr(self, "univ_filter"):
+            self._build_filters()
+            self._on_filter_change()
+        else:
+            # 필터 위젯은 그대로 두고 데이터만 바꾼다 (선택 유지, 범위 필터는 새 색인에 다시 적용)
+            for widget in (self.univ_filter, self.subtype_filter, self.dept_filter):
+                widget.set_source(snap.df, snap.order.get(widget.column))
+            if self._range_groups is not None:
+                self._apply_range_filter()
+            else:
+                self._on_filter_change()
+        self.status_var.set(status)
+        return True
+
+    # ------------------------------------------------------------
+    # ▶ 폴더 감시 (mtime/크기 폴링 → 바뀐 파일만 다시 읽기)
+    # ------------------------------------------------------------
+    def _start_watch(self) -> None:
+        folder = filedialog.askdirectory(title="감시할 입시 결과 폴더 선택")
+        if not folder:
+            return
+        self._stop_watch()
+        self._set_widgets_state(tk.DISABLED)
+        self.status_var.set(f"폴더 읽는 중: {folder}")
+        watch = FolderDataset(Path(folder))
+
+        def worker():
+            try:
+                instr = Instrumentation("load")
+                result = watch.load(instr)
+                if watch.df is None:
+                    note = f" ({result.failure_note()})" if result.failed else ""
+                    raise ValueError(f"폴더에 읽을 수 있는 엑셀 파일이 없습니다.{note}")
+                snap = watch.snapshot()
+                self.after(0, lambda: self._on_watch_loaded(watch, snap, result, instr.report()))
+            except Exception as e:
+                self.after(0, lambda e=e: messagebox.showerror("오류", f"폴더 로드 실패: {e}"))
+                self.after(0, lambda: self.status_var.set("폴더 로드 실패."))
+            finally:
+                self.after(0, lambda: self._set_widgets_state(tk.NORMAL))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_watch_loaded(self, watch: FolderDataset, snap: DatasetSnapshot, result, report: RunReport) -> None:
+        status = f"폴더 감시 중: {watch.folder.name} (파일 {len(watch.paths)}개, {len(snap.df):,}행 · {report.summary()})"
+        if result.failed:
+            status += f" · {result.failure_note()}"
+        if self._publish(snap, status):
+            self.watch = watch
+            self._schedule_watch()
+
+    def _schedule_watch(self) -> None:
+        self._watch_job = self.after(int(DEFAULT_POLL_SECONDS * 1000), self._poll_watch)
+
+    def _stop_watch(self) -> None:
+        if self._watch_job is not None:
+            self.after_cancel(self._watch_job)
+        self._watch_job = None
+        self.watch = None
+
+    def _poll_watch(self) -> None:
+        watch = self.watch
+        if watch is None:
+            return
+
+        def worker():
+            try:
+                instr = Instrumentation("load")
+                result = watch.poll(instr)
+                if result is not None and watch.df is not None:
+                    snap = watch.snapshot()
+                    self.after(0, lambda: self._on_watch_reload(watch, snap, result, instr.report()))
+            except Exception as e:
+                print(f"폴더 감시 오류: {e}")
+            finally:
+                self.after(0, lambda: self._schedule_watch() if self.watch is watch else None)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_watch_reload(self, watch: FolderDataset, snap: DatasetSnapshot, result, report: RunReport) -> None:
+        if self.watch is not watch:
+            return
+        changed = [p.name for p in result.changes.added + result.changes.changed]
+        msg = (f"폴더 변경 반영: 읽음 {', '.join(changed) or '-'}, 삭제 {len(result.changes.removed)}개, "
+               f"바뀐 그룹 {len(result.affected):,}개 ({len(snap.df):,}행 · {report.summary()})")
+        if result.failed:
+            msg += f" · {result.failure_note()}"
+        stale = [name for name, sel in self._generated.items() if result.touches(**sel)]
+        if stale and self.regen_var.get():
+            msg += f" · 보고서 {len(stale)}개 다시 생성 중"
+        elif stale:
+            msg += f" · 다시 만들어야 할 보고서 {len(stale)}개"
+        if self._publish(snap, msg, rebuild_filters=False) and stale and self.regen_var.get():
+            self._regenerate_reports(snap, stale)
+
+    def _regenerate_reports(self, snap: DatasetSnapshot, filenames: list) -> None:
+        """바뀐 그룹이 들어 있는 보고서를 백그라운드에서 새 스냅숏으로 다시 생성"""
+        df, version, order = snap.df, snap.token, snap.order
+        jobs = [(name, self._generated[name]) for name in filenames]
+
+        def worker():
+            done, failed = [], []
+            for filename, sel in jobs:
+                try:
+                    msg = plot_selected_depts(
+                        df, self.output_dir, sel["depts"], sel["univs"], sel["subtypes"], filename,
+                        groups=sel["groups"], cache=self.report_cache, dataset_version=version, order=order,
+                    )
+                except Exception as e:
+                    msg = str(e)
+                # 빈 선택/저장 실패는 예외가 아니라 메시지로 돌아온다
+                if report_written(msg):
+                    done.append(filename)
+                else:
+                    failed.append(f"{filename} ({msg})")
+            status = f"보고서 다시 생성 완료: {', '.join(done) or '없음'}"
+            if failed:
+                status += f" · 실패: {', '.join(failed)}"
+            self.after(0, lambda: self.status_var.set(status))
+
+        threading.Thread(target=worker, daemon=True).start()
+
     # ------------------------------------------------------------
-    # ▶ 필터 변경 → 그래프 / HTML 재렌더
+    # ▶ 필터 변경 → 후보 목록 / 미리보기 갱신
     # ------------------------------------------------------------
 
     def _on_filter_change(self) -> None:
-        if self.df is None:
+        snap = self.snapshot
+        if snap is None:
             return
 
         # 현재 선택된 필터 값 가져오기
@@ -196,44 +464,95 @@ class DepartmentSelector(tk.Tk):
         subs = self.subtype_filter.get_selected()
         depts = self.dept_filter.get_selected()
 
-        # 기본 데이터프레임 복사
-        filtered_df = self.df.copy()
-        
-        # 필터링을 위한 임시 데이터프레임 (각 필터에 적용할 데이터)
-        univ_filter_df = self.df.copy()
-        subtype_filter_df = self.df.copy()
-        dept_filter_df = self.df.copy()
-        
-        # 선택된 필터 적용 - 결과 확인용
-        if univs:
-            filtered_df = filtered_df[filtered_df["univ"].isin(univs)]
-            subtype_filter_df = subtype_filter_df[subtype_filter_df["univ"].isin(univs)]
-            dept_filter_df = dept_filter_df[dept_filter_df["univ"].isin(univs)]
-        
-        if subs:
-            filtered_df = filtered_df[filtered_df["subtype"].isin(subs)]
-            univ_filter_df = univ_filter_df[univ_filter_df["subtype"].isin(subs)]
-            dept_filter_df = dept_filter_df[dept_filter_df["subtype"].isin(subs)]
-        
-        if depts:
-            filtered_df = filtered_df[filtered_df["dept"].isin(depts)]
-            univ_filter_df = univ_filter_df[univ_filter_df["dept"].isin(depts)]
-            subtype_filter_df = subtype_filter_df[subtype_filter_df["dept"].isin(depts)]
-
-        # 각 필터 항목 업데이트
-        self.univ_filter.refresh(univ_filter_df["univ"].unique())
-        self.subtype_filter.refresh(subtype_filter_df["subtype"].unique())
-        self.dept_filter.refresh(dept_filter_df["dept"].unique())
-
-        # 필요하다면 그래프 즉시 렌더
-        if not filtered_df.empty and hasattr(self, "render_plots"):
-            self.render_plots(filtered_df)
+        # 각 필터 항목 업데이트 (자기 자신을 제외한 나머지 필터 조건 적용)
+        # 후보 계산은 행 대신 (대학, 전형, 모집단위) 그룹 인덱스에서 한다.
+        # (이력 DB 모드에서는 같은 조건을 SQL WHERE로 내려 DISTINCT 조회)
+        if snap.uses_store:
+            where = dict(univs=univs, subtypes=subs, depts=depts)
+            self.univ_filter.refresh(snap.store.distinct("univ", **where))
+            self.subtype_filter.refresh(snap.store.distinct("subtype", **where))
+            self.dept_filter.refresh(snap.store.distinct("dept", **where))
+        else:
+            self.univ_filter.refresh(self.selection.candidates("univ", univs, subs, depts))
+            self.subtype_filter.refresh(self.selection.candidates("subtype", univs, subs, depts))
+            self.dept_filter.refresh(self.selection.candidates("dept", univs, subs, depts))
+
+        # 미리보기 통계 갱신 (증분 집계)
+        self._update_preview()
+
+    # ------------------------------------------------------------
+    # ▶ 선택 미리보기 (compute_stats 형식 통계)
+    # ------------------------------------------------------------
+    def _update_preview(self) -> None:
+        if not hasattr(self, "preview_var"):
+            return
+        selection = (
+            self.univ_filter.get_selected(),
+            self.subtype_filter.get_selected(),
+            self.dept_filter.get_selected(),
+        )
+        snap = self.snapshot
+        if snap is not None and snap.uses_store:
+            where = dict(zip(("univs", "subtypes", "depts"), selection))
+            stats_for = lambda column: snap.store.selection_stats(column, **where)
+        elif self.selection is not None:
+            self.selection.update(*selection)
+            stats_for = self.selection.stats
+        else:
+            return
+        lines = []
+        for column, name in (("conv_grade", "환산등급"), ("all_subj_grade", "전교과등급")):
+            stats = stats_for(column)
+            if not lines:
+                lines.append(
+                    f"총 {stats.get('total_count', 0)}명 · "
+                    f"합격 {stats.get('pass_count', 0)}명 · 충원합격 {stats.get('waitlist_count', 0)}명 · "
+                    f"불합격 {stats.get('fail_count', 0)}명 · 합격률(충원 포함) {stats.get('all_pass_rate', '0.0%')}"
+                )
+            if "all_pass_mean" in stats:
+                lines.append(
+                    f"{name} 합격선: {stats['all_pass_min']:.2f} ~ {stats['all_pass_max']:.2f} "
+                    f"(평균 {stats['all_pass_mean']:.2f})"
+                )
+            else:
+                lines.append(f"{name} 합격선: 데이터 없음")
+        self.preview_var.set("\n".join(lines))
+
+    # ------------------------------------------------------------
+    # ▶ 합격 등급 범위 필터
+    # ------------------------------------------------------------
+    def _apply_range_filter(self) -> None:
+        snap = self.snapshot
+        if snap is None or snap.uses_store:
+            messagebox.showerror("오류", "합격 등급 범위 필터는 엑셀 데이터를 로드했을 때만 사용할 수 있습니다.")
+            return
+        try:
+            lo = float(self.range_lo_var.get())
+            hi = float(self.range_hi_var.get()) if self.range_hi_var.get().strip() else None
+        except ValueError:
+            messagebox.showerror("오류", "등급을 숫자로 입력해주세요. (예: 3.2 또는 2.5 ~ 3.0)")
+            return
+        column = "conv_grade" if self.range_grade_var.get() == "환산등급" else "all_subj_grade"
+        mask = snap.range_index.mask(column, lo, hi)
+        self.selection.restrict(mask)
+        self._range_groups = snap.range_index.group_tuples(mask)
+        span = f"{lo:g}" if hi is None else f"{min(lo, hi):g}~{max(lo, hi):g}"
+        self.range_info_var.set(f"{self.range_grade_var.get()} {span}: 합격 범위가 걸치는 조합 {int(mask.sum()):,}개")
+        self._on_filter_change()
+
+    def _clear_range_filter(self) -> None:
+        if self.selection is not None:
+            self.selection.restrict(None)
+        self._range_groups = None
+        self.range_info_var.set("범위 필터 해제")
+        self._on_filter_change()
 
     # ------------------------------------------------------------
     # ▶ HTML 보고서 생성
     # ------------------------------------------------------------
     def _generate_html(self) -> None:
-        if self.df is None:
+        snap = self.snapshot  # 생성 중에 다른 데이터가 로드돼도 이 스냅숏으로 끝까지 만든다
+        if snap is None:
             messagebox.showerror("오류", "먼저 데이터를 로드해주세요.")
             return
 
@@ -241,7 +560,7 @@ class DepartmentSelector(tk.Tk):
         selected_univs = self.univ_filter.get_selected() or None
         selected_subtypes = self.subtype_filter.get_selected() or None
 
-        if not any([selected_depts, selected_univs, selected_subtypes]):
+        if not any([selected_depts, selected_univs, selected_subtypes]) and self._range_groups is None:
             messagebox.showerror("오류", "대학, 전형 또는 모집단위를 하나 이상 선택해주세요.")
             return
 
@@ -267,20 +586,50 @@ class DepartmentSelector(tk.Tk):
         bar.pack(pady=(0, 15))
         bar.start(10)
 
+        source = snap.source
+        groups = self._range_groups
+        if snap.uses_store:
+            # 이력 DB는 추가할 때마다 바뀌므로 생성 시점의 파일 정보/행 수로 버전을 만든다
+            version = dataset_version([snap.store.path], snap.store.count())
+        else:
+            version = snap.token
+        order = snap.order
+        save_trace = self.trace_var.get()
+        profile_memory = self.profile_memory_var.get()
+        selection = dict(univs=selected_univs, subtypes=selected_subtypes, depts=selected_depts, groups=groups)
+
         def worker():
+            instr = Instrumentation("report", trace_memory=profile_memory)
             try:
-                msg = plot_selected_depts(self.df, self.output_dir, selected_depts, selected_univs, selected_subtypes, filename)
-                self.after(0, lambda: self._on_html_done(msg, output_path, prog_win))
+                msg = plot_selected_depts(
+                    source, self.output_dir, selected_depts, selected_univs, selected_subtypes, filename,
+                    instr=instr, groups=groups, cache=self.report_cache, dataset_version=version, order=order,
+                )
+                report = instr.report()
+                if profile_memory:
+                    print(report.memory_summary())
+                if save_trace:
+                    instr.write_trace(output_path.with_suffix(".trace.json"))
+                self.after(0, lambda: self._on_html_done(msg, output_path, prog_win, report, filename, selection))
             except Exception as e:
-                self.after(0, lambda: self._on_html_error(e, prog_win))
+                self.after(0, lambda e=e: self._on_html_error(e, prog_win))
+            finally:
+                instr.close()
 
         threading.Thread(target=worker, daemon=True).start()
 
-    def _on_html_done(self, msg: str, output_path: Path, win: tk.Toplevel) -> None:
+    def _on_html_done(self, msg: str, output_path: Path, win: tk.Toplevel, report: RunReport,
+                      filename: str, selection: dict) -> None:
         if win.winfo_exists():
             win.destroy()
+        # 빈 선택/저장 실패는 예외가 아니라 메시지로 돌아온다: 파일이 없으니 다시 생성 대상에도 넣지 않는다
+        if not report_written(msg):
+            messagebox.showwarning("생성 안 됨", msg)
+            self.status_var.set(f"보고서를 만들지 못했습니다: {msg}")
+            return
+        self._generated[filename] = selection
         messagebox.showinfo("생성 완료", msg)
-        self.status_var.set(f"보고서 생성 완료: {output_path.name}")
+        self.status_var.set(f"보고서 생성 완료: {output_path.name} ({report.summary()})")
         if messagebox.askyesno("보고서 열기", "생성된 보고서를 열어보시겠습니까?"):
             webbrowser.open(output_path.resolve().as_uri())
 
@@ -290,6 +639,240 @@ class DepartmentSelector(tk.Tk):
         messagebox.showerror("오류", f"HTML 생성 실패: {err}")
         self.status_var.set("HTML 보고서 생성 실패")
 
+    # ------------------------------------------------------------
+    # ▶ 그룹별 통계 표 내보내기 (선택이 없으면 전체)
+    # ------------------------------------------------------------
+    def _export_stats(self) -> None:
+        snap = self.snapshot
+        if snap is None:
+            messagebox.showerror("오류", "먼저 데이터를 로드해주세요.")
+            return
+        path = filedialog.asksaveasfilename(
+            title="그룹별 통계 저장",
+            initialdir=self.output_dir,
+            initialfile="그룹별_통계.xlsx",
+            defaultextension=".xlsx",
+            filetypes=[("Excel", "*.xlsx"), ("CSV", "*.csv")],
+        )
+        if not path:
+            return
+
+        source = snap.source
+        selection = dict(
+            univs=self.univ_filter.get_selected() or None,
+            subtypes=self.subtype_filter.get_selected() or None,
+            depts=self.dept_filter.get_selected() or None,
+            groups=self._range_groups,
+            order=snap.order,
+        )
+        self.status_var.set("그룹별 통계를 저장하는 중…")
+
+        def worker():
+            try:
+                instr = Instrumentation("export")
+                result = export_stats(source, Path(path), instr=instr, **selection)
+                msg = (f"그룹별 통계 저장: {result.path.name} ({result.groups:,}개 그룹, "
+                       f"{result.elapsed:.1f}s, {instr.report().summary()})")
+                self.after(0, lambda: self.status_var.set(msg))
+            except Exception as e:
+                self.after(0, lambda e=e: messagebox.showerror("오류", f"통계 내보내기 실패: {e}"))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    # ------------------------------------------------------------
+    # ▶ 학생 합격 가능성 조회
+    # ------------------------------------------------------------
+    def _open_estimator(self) -> None:
+        snap = self.snapshot
+        if snap is None:
+            messagebox.showerror("오류", "먼저 데이터를 로드해주세요.")
+            return
+        estimator = snap.estimator  # 창을 연 시점의 스냅숏으로 조회한다
+
+        win = tk.Toplevel(self)
+        win.title("학생 합격 가능성 조회")
+        win.geometry("720x480")
+        win.transient(self)
+
+        form = ttk.Frame(win, padding=10)
+        form.pack(fill=tk.X)
+        conv_var, all_subj_var = tk.StringVar(), tk.StringVar()
+        ttk.Label(form, text="환산등급:").pack(side=tk.LEFT)
+        ttk.Entry(form, textvariable=conv_var, width=8).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(form, text="전교과 등급:").pack(side=tk.LEFT)
+        ttk.Entry(form, textvariable=all_subj_var, width=8).pack(side=tk.LEFT, padx=(0, 10))
+        use_filters_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(form, text="현재 필터 선택 안에서만", variable=use_filters_var).pack(side=tk.LEFT)
+        info_var = tk.StringVar(value="등급을 입력하고 조회를 누르세요. (합격자 중 내 등급 이하 비율)")
+
+        columns = ("univ", "dept", "subtype", "likelihood", "conv", "all_subj", "pass_count")
+        headings = ("대학", "모집단위", "전형", "가능성", "환산", "전교과", "합격자")
+        tree = ttk.Treeview(win, columns=columns, show="headings")
+        for col, head in zip(columns, headings):
+            tree.heading(col, text=head)
+            tree.column(col, width=150 if col in ("univ", "dept", "subtype") else 70, anchor=tk.CENTER)
+
+        def fmt(value):
+            return "-" if pd.isna(value) else f"{value*100:.0f}%"
+
+        def run():
+            try:
+                conv = float(conv_var.get()) if conv_var.get().strip() else None
+                all_subj = float(all_subj_var.get()) if all_subj_var.get().strip() else None
+                filters = {}
+                if use_filters_var.get() and hasattr(self, "univ_filter"):
+                    filters = dict(
+                        univs=self.univ_filter.get_selected(),
+                        subtypes=self.subtype_filter.get_selected(),
+                        depts=self.dept_filter.get_selected(),
+                    )
+                start = time.perf_counter()
+                ranked = estimator.score(conv, all_subj, top=200, **filters)
+                elapsed = time.perf_counter() - start
+            except ValueError as e:
+                messagebox.showerror("오류", f"등급을 확인해주세요: {e}", parent=win)
+                return
+            tree.delete(*tree.get_children())
+            for row in ranked.itertuples(index=False):
+                tree.insert("", tk.END, values=(
+                    row.univ, row.dept, row.subtype, fmt(row.likelihood),
+                    fmt(row.conv_grade_likelihood), fmt(row.all_subj_grade_likelihood), row.pass_count,
+                ))
+            info_var.set(f"{estimator.n_groups:,}개 모집단위 중 상위 {len(ranked)}개 ({elapsed*1000:.1f} ms)")
+
+        def run_roster():
+            roster_path = filedialog.askopenfilename(
+                parent=win, title="학생 명단 선택 (머리글: 이름/학번/환산등급/전교과)",
+                filetypes=[("Excel/CSV", "*.xlsx *.xls *.csv")],
+            )
+            if not roster_path:
+                return
+            info_var.set("명단 일괄 매칭 중...")
+
+            def worker():
+                try:
+                    roster = read_roster(Path(roster_path))
+                    result = match_students(estimator, roster, top=10)
+                    stem = sanitize(Path(roster_path).stem + "_추천결과")
+                    excel_path = write_match_excel(result, self.output_dir / f"{stem}.xlsx")
+                    html_path = self.output_dir / f"{stem}.html"
+                    html_path.write_text(render_match_html(result.recommendations, result.students), encoding="utf-8")
+                except Exception as e:
+                    err = e
+                    self.after(0, lambda: messagebox.showerror("오류", f"일괄 매칭 실패: {err}", parent=win))
+                    self.after(0, lambda: info_var.set("일괄 매칭 실패"))
+                    return
+                self.after(0, lambda: info_var.set(
+                    f"{len(roster):,}명 매칭 완료 ({result.students_per_sec:,.0f}명/초): {excel_path.name}, {html_path.name}"
+                ))
+                self.after(0, lambda: webbrowser.open(html_path.resolve().as_uri()))
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        ttk.Button(form, text="조회", command=run).pack(side=tk.RIGHT)
+        ttk.Button(form, text="명단 일괄 매칭", command=run_roster).pack(side=tk.RIGHT, padx=(0, 5))
+        ttk.Label(win, textvariable=info_var, anchor=tk.W, padding=(10, 0)).pack(fill=tk.X)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+    # ------------------------------------------------------------
+    # ▶ 이력 DB (SQLite) 적재 / 탐색
+    # ------------------------------------------------------------
+    def _get_store(self) -> HistoryStore:
+        path = Path(self.db_path_var.get().strip() or DEFAULT_DB_PATH)
+        if self.store is None or self.store.path != path:
+            if self.store is not None:
+                self.store.close()
+            self.store = HistoryStore(path)
+        return self.store
+
+    def _append_to_store(self) -> None:
+        snap = self.snapshot
+        if snap is None or snap.df is None:
+            messagebox.showerror("오류", "먼저 엑셀 데이터를 로드해주세요.")
+            return
+        year_text = self.year_var.get().strip()
+        if year_text and not year_text.isdigit():
+            messagebox.showerror("오류", "연도는 숫자로 입력해주세요. (예: 2025)")
+            return
+        year = int(year_text) if year_text else None
+        df, source = snap.df, self.file_path_var.get().strip() or None
+        store = self._get_store()
+        self.status_var.set("이력 DB에 추가 중...")
+
+        def worker():
+            try:
+                added = store.append(df, year=year, source=source)
+                self.after(0, lambda: self.status_var.set(
+                    f"이력 DB에 {added:,}행 추가 완료 ({store.path.name}, 전체 {store.count():,}행)"
+                ))
+            except Exception as e:
+                err = e
+                self.after(0, lambda: messagebox.showerror("오류", f"DB 추가 실패: {err}"))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _open_store(self) -> None:
+        store = self._get_store()
+        total = store.count()
+        if total == 0:
+            messagebox.showinfo("이력 DB", "DB에 저장된 데이터가 없습니다. 먼저 'DB에 추가'를 해주세요.")
+            return
+        self._stop_watch()
+        self._publish(
+            DatasetSnapshot.from_store(store),
+            f"이력 DB 탐색 중: {store.path.name} ({total:,}행, 연도 {store.years() or '미지정'})",
+        )
+
+    # ------------------------------------------------------------
+    # ▶ 세션 스냅샷 복원 / 저장
+    # ------------------------------------------------------------
+    def _restore_session(self) -> None:
+        start = time.perf_counter()
+        session = load_session()
+        if session is None:
+            return
+        # 원본이 바뀌었으면 스냅샷은 옛 데이터이므로 원본 정보로 버전을 만들지 않는다
+        sources = [session.source] if session.source and not session.source_changed else []
+        snap = DatasetSnapshot.from_frame(
+            session.df, sources, aggregator=session.aggregator, token=dataset_version(sources, len(session.df)),
+        )
+        if not self.data.publish(snap):  # 복원 중에 사용자가 이미 다른 데이터를 로드함
+            return
+        self.selection = snap.selection()
+        if session.source:
+            self.file_path_var.set(session.source)
+        if session.output_filename:
+            self.filename_var.set(session.output_filename)
+
+        self._build_filters()
+        selections = session.selections
+        self.univ_filter.set_selected(selections.get("univ", []))
+        self.subtype_filter.set_selected(selections.get("subtype", []))
+        self.dept_filter.set_selected(selections.get("dept", []))
+        self._on_filter_change()
+
+        elapsed = time.perf_counter() - start
+        note = " 원본 파일이 변경되었습니다. 필요하면 다시 로드하세요." if session.source_changed else ""
+        self.status_var.set(f"이전 세션 복원 ({len(snap.df):,}행, {elapsed:.2f}s).{note}")
+
+    def _on_close(self) -> None:
+        snap = self.snapshot
+        if snap is not None and not snap.uses_store and hasattr(self, "univ_filter"):
+            try:
+                save_state(
+                    {
+                        "univ": self.univ_filter.get_selected(),
+                        "subtype": self.subtype_filter.get_selected(),
+                        "dept": self.dept_filter.get_selected(),
+                    },
+                    self.filename_var.get().strip() or None,
+                )
+            except OSError as e:
+                print(f"세션 저장 실패: {e}")
+        if self.store is not None:
+            self.store.close()
+        self.destroy()
+
     # ------------------------------------------------------------
     # ▶ 유틸 : 위젯 상태 잠금/해제
     # ------------------------------------------------------------
@@ -0,0 +1,279 @@
+# pipeline.py
+# ---------------------------------------------------------------------
+# 단계별 보고서 파이프라인: 읽기(load) → 정리(clean) → 선택(select) → 집계(aggregate) → 출력(render_*)
+#   - Stage: 이름, 입력 단계, 키에 들어가는 매개변수, 실행 함수를 선언한다.
+#   - 단계 결과는 타입이 정해진 중간 산출물(RawFrames, CleanData, Selection, GroupStats, Rendered)이고
+#     (단계 이름, 입력 단계 키, 자기 매개변수)의 해시를 키로 LRU에 보관한다.
+#     키는 결과를 만들기 전에 모두 계산하므로, 출력 형식이나 템플릿 옵션만 바꾸면
+#     render 단계 키만 달라지고 읽기/정리/선택/집계는 실행하지도 꺼내지도 않는다.
+#   - load 키는 원본 파일의 경로/수정 시각/크기(dataset_version)라서 파일이 바뀌면 전부 다시 한다.
+#   - 단계마다 instr의 "stage:<이름>" 구간으로 따로 측정하고, 재사용은 "stage_hit:<이름>" 카운터로 남긴다.
+#
+#   pipe = ReportPipeline()
+#   params = {"sources": ["2025_입시결과.xlsx"], "univs": ["가람대학교"]}
+#   pipe.render("html", params).write(out_dir / "보고서.html")
+#   pipe.render("xlsx", params)   # 집계까지는 재사용, 엑셀 쓰기만 실행
+# ---------------------------------------------------------------------
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+
+from collation import HierarchyOrder
+from data_processor import clean_frame, infer_year, read_raw
+from html_generator import render_report_html, select_report_rows
+from instrumentation import Instrumentation
+from plot_reduction import PLOT_POINT_BUDGET
+from report_cache import LRUCache, dataset_version
+from stats_export import export_columns, iter_stats_rows, table_bytes
+
+DEFAULT_CACHE_ENTRIES = 32
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024
+
+
+# ── 중간 산출물 ──────────────────────────────────────────────
+@dataclass(frozen=True, eq=False)
+class RawFrames:
+    """파일별 정리 전 원본 (경로, 연도, DataFrame)"""
+    frames: tuple
+    token: str
+
+    @property
+    def nbytes(self) -> int:
+        return sum(int(df.memory_usage(deep=True).sum()) for _, _, df in self.frames)
+
+
+@dataclass(frozen=True, eq=False)
+class CleanData:
+    """
+    정리된 데이터. source는 DataFrame 또는 HistoryStore (스냅숏에서 받은 경우)
+    validation: 파일별 ValidationReport (사유별 제외 행 번호)
+    """
+    source: object
+    order: HierarchyOrder
+    token: str
+    validation: tuple = ()
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.source.memory_usage(deep=True).sum()) if isinstance(self.source, pd.DataFrame) else 0
+
+
+@dataclass(frozen=True, eq=False)
+class Selection:
+    """선택 조건에 맞는 행을 (univ, dept, subtype) 가나다순으로 정렬한 것"""
+    df: pd.DataFrame
+    univs: Optional[list]
+    subtypes: Optional[list]
+    depts: Optional[list]
+    order: HierarchyOrder
+
+    @property
+    def empty(self) -> bool:
+        return self.df.empty
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.df.memory_usage(deep=True).sum())
+
+
+@dataclass(frozen=True, eq=False)
+class GroupStats:
+    """그룹별 통계 표 (stats_export.export_columns 열)"""
+    table: pd.DataFrame
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.table.memory_usage(deep=True).sum())
+
+
+@dataclass(frozen=True, eq=False)
+class Rendered:
+    """파일에 그대로 쓸 최종 출력"""
+    fmt: str
+    content: bytes
+    rows: int
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.content)
+
+    def write(self, path: Path) -> Path:
+        path = Path(path)
+        path.write_bytes(self.content)
+        return path
+
+
+# ── 단계 정의 ────────────────────────────────────────────────
+@dataclass(frozen=True)
+class Stage:
+    """
+    inputs: 결과를 받아 쓰는 앞 단계 이름 (run(params, *입력 산출물, instr=)로 전달)
+    params: 키에 들어가는 매개변수 이름 (목록 값은 정렬해서 넣는다)
+    fingerprint: 주면 params 대신 이 함수(params → 문자열)로 키를 만든다 (load의 파일 버전)
+    """
+    name: str
+    run: Callable
+    inputs: tuple = ()
+    params: tuple = ()
+    fingerprint: Optional[Callable] = None
+
+
+def _load(params: dict, *, instr: Instrumentation) -> RawFrames:
+    paths = [Path(p) for p in params["sources"]]
+    if not paths:
+        raise ValueError("입력 엑셀 파일을 지정해주세요.")
+    # 여러 해 파일이면 read_inputs처럼 파일 이름의 연도를 붙인다
+    years = [infer_year(p) for p in paths] if len(paths) > 1 else [None]
+    missing = [p.name for p, y in zip(paths, years) if len(paths) > 1 and y is None]
+    if missing:
+        raise ValueError(f"연도를 알 수 없는 파일: {', '.join(missing)} (파일 이름에 연도를 넣거나 직접 지정해주세요)")
+    frames = tuple((p, y, read_raw(p, instr)) for p, y in zip(paths, years))
+    return RawFrames(frames, dataset_version(paths))
+
+
+def _clean(params: dict, raw: RawFrames, *, instr: Instrumentation) -> CleanData:
+    reports = []
+    frames = [clean_frame(frame, instr, year, reports, path.name) for path, year, frame in raw.frames]
+    df = pd.concat(frames, ignore_index=True)
+    with instr.span("index_build"):
+        order = HierarchyOrder.from_frame(df)
+    return CleanData(df, order, raw.token, tuple(reports))
+
+
+def _select(params: dict, data: CleanData, *, instr: Instrumentation) -> Selection:
+    univs, subtypes, depts = params.get("univs"), params.get("subtypes"), params.get("depts")
+    df = select_report_rows(data.source, depts, univs, subtypes, params.get("groups"), instr, data.order)
+    return Selection(df, univs, subtypes, depts, data.order)
+
+
+def _aggregate(params: dict, selection: Selection, *, instr: Instrumentation) -> GroupStats:
+    with instr.span("stats"):
+        rows = [row for chunk in iter_stats_rows(selection.df) for row in chunk]
+    return GroupStats(pd.DataFrame(rows, columns=export_columns()))
+
+
+def _render_html(params: dict, selection: Selection, *, instr: Instrumentation) -> Rendered:
+    if selection.empty:
+        raise ValueError("선택된 조건에 맞는 데이터가 없습니다.")
+    with instr.span("html_template"):
+        html = render_report_html(
+            selection.df, selection.depts, selection.univs, selection.subtypes, instr,
+            asset_base=params.get("asset_base"),
+            point_budget=params.get("point_budget") or PLOT_POINT_BUDGET,
+            order=selection.order,
+        )
+    return Rendered("html", html.encode("utf-8"), len(selection.df))
+
+
+def _table_renderer(fmt: str) -> Callable:
+    def render(params: dict, stats: GroupStats, *, instr: Instrumentation) -> Rendered:
+        with instr.span("file_write"):
+            return Rendered(fmt, table_bytes(stats.table, fmt), len(stats.table))
+    return render
+
+
+DEFAULT_STAGES = (
+    Stage("load", _load, params=("sources",), fingerprint=lambda p: dataset_version(p.get("sources") or ())),
+    Stage("clean", _clean, inputs=("load",)),
+    Stage("select", _select, inputs=("clean",), params=("univs", "subtypes", "depts", "groups")),
+    Stage("aggregate", _aggregate, inputs=("select",)),
+    Stage("render_html", _render_html, inputs=("select",), params=("asset_base", "point_budget")),
+    Stage("render_csv", _table_renderer("csv"), inputs=("aggregate",)),
+    Stage("render_xlsx", _table_renderer("xlsx"), inputs=("aggregate",)),
+)
+
+# 출력 형식 → 마지막 단계 (html은 행이 필요해서 select를, 표 형식은 aggregate를 받는다)
+RENDER_STAGES = {"html": "render_html", "csv": "render_csv", "xlsx": "render_xlsx"}
+
+
+def _key_value(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sorted(str(v) for v in value)
+    return value
+
+
+class ReportPipeline:
+    """
+    선언된 단계를 키 기반 캐시와 함께 실행한다. 여러 스레드에서 함께 써도 되지만
+    같은 키를 동시에 요청하면 양쪽이 모두 계산할 수 있다 (결과는 같음).
+    """
+
+    def __init__(
+        self,
+        stages=DEFAULT_STAGES,
+        max_entries: int = DEFAULT_CACHE_ENTRIES,
+        max_bytes: Optional[int] = DEFAULT_CACHE_BYTES,
+    ):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache = LRUCache(max_entries, max_bytes, sizeof=lambda item: item[1].nbytes)
+
+    def keys(self, target: str, params: dict, given: Optional[dict] = None) -> dict:
+        """target까지 필요한 단계들의 키 (결과는 만들지 않는다)"""
+        given = given or {}
+        keys: dict = {}
+
+        def visit(name: str) -> str:
+            if name in keys:
+                return keys[name]
+            if name in given:
+                keys[name] = given[name][0]
+                return keys[name]
+            stage = self.stages[name]
+            if stage.fingerprint is not None:
+                own = stage.fingerprint(params)
+            else:
+                own = {p: _key_value(params.get(p)) for p in stage.params}
+            payload = {"stage": name, "inputs": [visit(i) for i in stage.inputs], "params": own}
+            text = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+            keys[name] = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+            return keys[name]
+
+        visit(target)
+        return keys
+
+    def run(
+        self,
+        target: str,
+        params: Optional[dict] = None,
+        *,
+        given: Optional[dict] = None,
+        instr: Optional[Instrumentation] = None,
+    ):
+        """
+        target 단계의 산출물. 캐시에 있는 단계에서 멈추고, 없는 단계만 앞에서부터 실행한다.
+        given: {단계 이름: (키, 산출물)} — 이미 가진 결과로 그 단계와 앞 단계를 건너뛴다 (from_snapshot)
+        """
+        params = params or {}
+        given = given or {}
+        instr = instr or Instrumentation("pipeline")
+        keys = self.keys(target, params, given)
+
+        def produce(name: str):
+            if name in given:
+                return given[name][1]
+            hit = self.cache.get(keys[name])
+            if hit is not None:
+                instr.count(f"stage_hit:{name}")
+                return hit[1]
+            stage = self.stages[name]
+            inputs = [produce(i) for i in stage.inputs]
+            with instr.span(f"stage:{name}"):
+                artifact = stage.run(params, *inputs, instr=instr)
+            self.cache.put(keys[name], (name, artifact))
+            return artifact
+
+        return produce(target)
+
+    def render(self, fmt: str, params: Optional[dict] = None, **kwargs) -> Rendered:
+        if fmt not in RENDER_STAGES:
+            raise ValueError(f"지원하지 않는 출력 형식: {fmt} ({', '.join(RENDER_STAGES)})")
+        return self.run(RENDER_STAGES[fmt], params, **kwargs)
+
+
+def from_snapshot(snapshot) -> dict:
+    """이미 로드한 DatasetSnapshot을 clean 단계 결과로 (run/render의 given=)"""
+    return {"clean": (snapshot.token, CleanData(snapshot.source, snapshot.order, snapshot.token, snapshot.validation))}
@@ -0,0 +1,87 @@
+# plot_reduction.py
+# ---------------------------------------------------------------------
+# 큰 그룹의 플롯 데이터 줄이기 (보고서 크기/렌더링 시간을 데이터 크기와 무관하게)
+#   - box_summary():        Plotly 박스플롯과 같은 방식의 정확한 요약 통계
+#                           (linear 사분위수, 1.5 IQR 안의 가장 먼 값까지 수염)
+#   - reduce_box_points():  이상치 + 순위 기준 층화 표본만 남긴다 (hover용, 결정적)
+#   - split_budget():       플롯 하나의 점 예산을 결과별 trace에 나눈다
+#   - bin_histogram():      히스토그램 값을 (구간 대표값, 개수)로 미리 집계
+# 박스는 요약 통계로 그리므로 표본을 줄여도 모양이 바뀌지 않는다.
+# ---------------------------------------------------------------------
+import numpy as np
+
+PLOT_POINT_BUDGET = 1500   # 플롯 하나(등급 종류별)에 넣을 최대 점 수
+
+
+def box_summary(values: np.ndarray) -> dict:
+    """q1/median/q3/lowerfence/upperfence/mean (값이 없으면 빈 dict)"""
+    v = np.sort(np.asarray(values, dtype=float))
+    if len(v) == 0:
+        return {}
+    q1, median, q3 = np.percentile(v, [25, 50, 75])
+    iqr = q3 - q1
+    inside = v[(v >= q1 - 1.5 * iqr) & (v <= q3 + 1.5 * iqr)]
+    return {
+        "q1": float(q1), "median": float(median), "q3": float(q3),
+        "lowerfence": float(inside[0]), "upperfence": float(inside[-1]),
+        "mean": float(v.mean()),
+    }
+
+
+def _spread(sorted_values: np.ndarray, k: int) -> np.ndarray:
+    """정렬된 값에서 순위가 고르게 떨어진 k개 (양 끝 포함)"""
+    n = len(sorted_values)
+    if k >= n:
+        return sorted_values
+    if k <= 0:
+        return sorted_values[:0]
+    if k == 1:
+        return sorted_values[n // 2:n // 2 + 1]
+    return sorted_values[np.round(np.linspace(0, n - 1, k)).astype(np.int64)]
+
+
+def reduce_box_points(values: np.ndarray, budget: int) -> tuple[np.ndarray, np.ndarray, dict]:
+    """
+    (이상치, 층화 표본, box_summary) - 합쳐서 budget개 이하.
+    이상치를 먼저 모두 남기고 남은 예산만큼 수염 안쪽 값을 순위 기준으로 고르게 고른다.
+    이상치만으로 예산을 넘으면 이상치에서도 순위 기준으로 고른다.
+    """
+    v = np.sort(np.asarray(values, dtype=float))
+    v = v[~np.isnan(v)]
+    summary = box_summary(v)
+    if not summary:
+        return v, v, summary
+    outlier = (v < summary["lowerfence"]) | (v > summary["upperfence"])
+    outliers, inliers = v[outlier], v[~outlier]
+    if len(outliers) >= budget:
+        return _spread(outliers, budget), inliers[:0], summary
+    # hover용 표본은 같은 값이 여러 번 있어도 의미가 없으므로 중복을 뺀다
+    return outliers, np.unique(_spread(inliers, budget - len(outliers))), summary
+
+
+def split_budget(sizes, budget: int) -> list:
+    """크기 비례로 예산 나누기 (합계가 예산 이하이면 그대로, 0이 아닌 그룹은 최소 1)"""
+    sizes = np.asarray(sizes, dtype=np.int64)
+    total = int(sizes.sum())
+    if total <= budget:
+        return sizes.tolist()
+    shares = np.where(sizes > 0, np.maximum(1, sizes * budget // total), 0)
+    return np.minimum(shares, sizes).tolist()
+
+
+def bin_histogram(values: np.ndarray, start: float, size: float) -> tuple[list, list]:
+    """
+    구간 [start + k*size, start + (k+1)*size) 마다 (구간 안의 최솟값, 개수).
+    대표값으로 실제 값을 쓰므로 Plotly가 같은 xbins로 다시 나눠도 같은 구간에 들어간다
+    (histfunc: 'sum'과 함께 쓰면 원래 히스토그램과 같다).
+    """
+    v = np.asarray(values, dtype=float)
+    v = v[~np.isnan(v)]
+    if len(v) == 0:
+        return [], []
+    bins = np.floor((v - start) / size).astype(np.int64)
+    order = np.lexsort((v, bins))
+    bins, v = bins[order], v[order]
+    first = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    counts = np.diff(np.r_[first, len(v)])
+    return v[first].tolist(), counts.tolist()
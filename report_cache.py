@@ -0,0 +1,257 @@
+# report_cache.py
+# ---------------------------------------------------------------------
+# 보고서 캐시 공통 부품
+#   - dataset_version(): 데이터셋 버전 토큰 (원본 파일 정보 + 행 수)
+#   - selection_key():   데이터셋 버전 + 정렬된 선택 목록의 정규화 해시
+#   - LRUCache:          항목 수/바이트 상한이 있는 스레드 안전 LRU
+#   - ReportFileCache:   렌더링한 보고서 파일 캐시 (같은 선택이면 파일 복사만)
+# ---------------------------------------------------------------------
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+
+def normalize_selection(values: Optional[Iterable[str]]) -> list:
+    """선택 목록 정규화: None/빈 목록 → [], 중복 제거 후 정렬"""
+    return sorted({str(v) for v in values or ()})
+
+
+def dataset_version(sources: Iterable = (), n_rows: Optional[int] = None) -> str:
+    """
+    원본 파일(경로, 수정 시각, 크기)과 행 수로 만든 버전 토큰.
+    원본 파일 정보가 없으면 매번 새 토큰을 만든다 (다시 로드하면 항상 무효화).
+    """
+    parts = []
+    for source in sources:
+        path = Path(source)
+        if path.exists():
+            st = path.stat()
+            parts.append([str(path.resolve()), st.st_mtime_ns, st.st_size])
+    if not parts:
+        return uuid.uuid4().hex[:16]
+    payload = json.dumps({"sources": parts, "rows": n_rows}, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def selection_key(version: str, univs=None, subtypes=None, depts=None, **extra) -> str:
+    """데이터셋 버전 + 정렬된 선택 목록(+ 추가 옵션)의 SHA-256 해시"""
+    payload = {
+        "version": version,
+        "univ": normalize_selection(univs),
+        "subtype": normalize_selection(subtypes),
+        "dept": normalize_selection(depts),
+    }
+    payload.update({k: extra[k] for k in sorted(extra)})
+    text = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """
+    항목 수(max_entries)와 총 크기(max_bytes, sizeof로 계산) 상한을 둔 LRU 캐시.
+    여러 스레드에서 함께 써도 되도록 모든 접근을 잠금으로 감싼다.
+    on_evict: 항목이 밀려나거나 지워질 때 (key, value)로 호출 (예: 캐시 파일 삭제)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 64,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable = len,
+        on_evict: Optional[Callable] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._on_evict = on_evict
+        self._items: OrderedDict = OrderedDict()
+        self._sizes: dict = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value) -> None:
+        evicted = []
+        with self._lock:
+            if key in self._items:
+                self.bytes -= self._sizes.pop(key)
+                del self._items[key]
+            size = self._sizeof(value)
+            self._items[key] = value
+            self._sizes[key] = size
+            self.bytes += size
+            while len(self._items) > 1 and (
+                len(self._items) > self.max_entries
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                old_key, old_value = self._items.popitem(last=False)
+                self.bytes -= self._sizes.pop(old_key)
+                self.evictions += 1
+                evicted.append((old_key, old_value))
+        for item in evicted:
+            self._notify(*item)
+
+    def pop(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self.bytes -= self._sizes.pop(key)
+            value = self._items.pop(key)
+        self._notify(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            items = list(self._items.items())
+            self._items.clear()
+            self._sizes.clear()
+            self.bytes = 0
+        for item in items:
+            self._notify(*item)
+
+    def items(self) -> list:
+        """(key, value) 목록, 오래 안 쓴 것부터"""
+        with self._lock:
+            return list(self._items.items())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._items), "bytes": self.bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            }
+
+    def _notify(self, key, value) -> None:
+        if self._on_evict is not None:
+            self._on_evict(key, value)
+
+
+DEFAULT_REPORT_CACHE_DIR = Path(".susi_report_cache")
+
+
+class ReportFileCache:
+    """
+    렌더링한 보고서 HTML 파일 캐시 (cache_dir/<키>.html + index.json).
+    키는 report_key()로 만들고, 항목마다 데이터셋 버전을 기록해 retain()으로
+    다른 버전(다시 로드하기 전 데이터)의 항목을 한꺼번에 지운다.
+    적중하면 캐시 파일을 출력 경로로 복사한다. (하드 링크는 출력 파일을 덮어쓸 때
+    캐시 파일까지 바뀌므로 쓰지 않는다.) 색인은 디스크에 남아 다음 실행에도 쓴다.
+    """
+
+    INDEX = "index.json"
+
+    def __init__(
+        self,
+        cache_dir: Path = DEFAULT_REPORT_CACHE_DIR,
+        max_entries: int = 32,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lru = LRUCache(max_entries, max_bytes, sizeof=lambda e: e["size"], on_evict=self._remove_file)
+        self._index_lock = threading.Lock()
+        self._load_index()
+
+    @staticmethod
+    def report_key(version: str, univs=None, subtypes=None, depts=None, groups=None, renderer: Optional[str] = None) -> str:
+        """
+        데이터셋 버전 + 정렬된 선택 목록 (+ 합격 등급 범위 필터 조합) 키.
+        renderer: html_generator.renderer_fingerprint() — 렌더러 코드/옵션이 바뀌면 다른 키가 된다
+        """
+        extra = {} if groups is None else {"groups": sorted(list(map(str, g)) for g in groups)}
+        if renderer is not None:
+            extra["renderer"] = renderer
+        return selection_key(version, univs, subtypes, depts, **extra)
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        """캐시에 있으면 dest로 복사하고 True"""
+        entry = self._lru.get(key)
+        if entry is None:
+            return False
+        try:
+            shutil.copyfile(self._path(key), dest)
+        except FileNotFoundError:
+            self._lru.pop(key)
+            self._save_index()
+            return False
+        self._save_index()
+        return True
+
+    def put(self, key: str, version: str, rendered: Path) -> None:
+        """렌더링한 파일을 캐시에 복사해 둔다 (임시 파일에 쓴 뒤 교체)"""
+        tmp = self._path(key).with_suffix(".tmp")
+        shutil.copyfile(rendered, tmp)
+        os.replace(tmp, self._path(key))
+        self._lru.put(key, {"version": version, "size": self._path(key).stat().st_size})
+        self._save_index()
+
+    def retain(self, version: str) -> int:
+        """version이 아닌 항목을 모두 지우고 지운 개수를 반환 (데이터셋을 다시 로드할 때)"""
+        stale = [key for key, entry in self._lru.items() if entry["version"] != version]
+        for key in stale:
+            self._lru.pop(key)
+        if stale:
+            self._save_index()
+        return len(stale)
+
+    def clear(self) -> None:
+        self._lru.clear()
+        self._save_index()
+
+    def stats(self) -> dict:
+        return self._lru.stats()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    # ──────────────────────── 내부 유틸 ───────────────────────────
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.html"
+
+    def _remove_file(self, key: str, _entry) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _load_index(self) -> None:
+        try:
+            entries = json.loads((self.cache_dir / self.INDEX).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            entries = []
+        for key, entry in entries:
+            if self._path(key).exists():
+                self._lru.put(key, entry)
+        # 색인에 없는 파일(이전 실행에서 남은 것)은 지운다
+        known = {key for key, _ in self._lru.items()}
+        for path in self.cache_dir.glob("*.html"):
+            if path.stem not in known:
+                path.unlink()
+
+    def _save_index(self) -> None:
+        with self._index_lock:
+            tmp = self.cache_dir / (self.INDEX + ".tmp")
+            tmp.write_text(json.dumps(self._lru.items(), ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.cache_dir / self.INDEX)
@@ -0,0 +1,515 @@
+# report_server.py
+# ---------------------------------------------------------------------
+# 교내 공유용 로컬 보고서 서버 (표준 라이브러리 http.server)
+#
+#   python cli.py serve 입시결과.xlsx --port 8765
+#   → http://127.0.0.1:8765/  (필터 선택 화면)
+#     /report?univ=가람대학교&subtype=학생부교과   (선택 조건 보고서)
+#
+# 데이터셋(엑셀 또는 이력 DB)은 시작할 때 한 번만 읽고, 요청마다
+# select_report_rows + render_report_html로 보고서를 만든다.
+#   - 응답 캐시: report_cache.LRUCache (데이터셋 버전 + 정렬된 선택 목록 키)
+#   - ETag/If-None-Match: 같은 보고서는 304로 본문 없이 응답
+#   - 같은 보고서를 동시에 요청하면 한 번만 렌더링하고 나머지는 그 결과(또는 오류)를 그대로 받는다
+#   - 맞는 행이 없는 선택은 EMPTY_RESULT_TTL초 동안 기억해 같은 요청에 선택을 다시 돌리지 않는다
+#   - 공통 CSS/JS는 /static/<해시>/report.css, report.js로 한 번만 내려보내고
+#     주소에 내용 해시가 들어가므로 브라우저가 오래 캐시한다
+#   - attach_jobs()로 렌더링을 report_jobs 작업 큐에 보내면 동시 실행 수와 메모리를 제한한다
+#     (POST /api/jobs?univ=… 로 미리 등록, GET /api/jobs[/<번호>]로 상태/시간 확인)
+#   - 데이터셋은 DatasetSnapshot 하나로 들고 있고 요청/작업마다 처음에 고정한다.
+#     publish()로 새 스냅숏(폴더 감시 등)을 넣어도 진행 중인 렌더링은 이전 스냅숏으로 끝난다.
+# ---------------------------------------------------------------------
+import gzip
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from html import escape
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from data_processor import read_input, read_inputs
+from dataset_snapshot import DatasetRef, DatasetSnapshot
+from folder_watch import FolderDataset
+from history_store import HistoryStore
+from html_generator import REPORT_CSS, REPORT_SCRIPT, render_report_html, select_report_rows
+from instrumentation import Instrumentation
+from report_cache import LRUCache, dataset_version, normalize_selection, selection_key
+from report_jobs import DEFAULT_JOB_MEMORY, DEFAULT_WORKERS, ReportJob, ReportJobQueue, estimate_report_bytes
+from selection_stats import DIMENSIONS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_ENTRIES = 64
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+EMPTY_RESULT_TTL = 30.0  # 빈 결과를 기억하는 시간(초). 데이터셋이 바뀌면 키가 달라져 바로 무효
+EMPTY_RESULT_ENTRIES = 1024
+
+# 쿼리 문자열 이름 → select_report_rows 인자 (univ=…&univ=… 처럼 여러 번 지정)
+QUERY_KEYS = {"univ": "univs", "subtype": "subtypes", "dept": "depts"}
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+@dataclass
+class RenderedReport:
+    """캐시에 넣는 렌더링 결과 (gzip 본문은 미리 한 번만 압축)"""
+    body: bytes
+    gzipped: bytes
+    etag: str
+    rows: int
+    elapsed: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + len(self.gzipped)
+
+
+class _InFlight:
+    """렌더링 중인 키. 끝나면 결과(빈 결과는 None)나 예외를 기다리던 요청에 그대로 넘긴다"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.report: Optional[RenderedReport] = None
+        self.error: Optional[BaseException] = None
+
+
+class _StaticAsset:
+    def __init__(self, text: str, content_type: str):
+        self.body = text.encode("utf-8")
+        self.gzipped = gzip.compress(self.body)
+        self.etag = _etag(self.body)
+        self.content_type = content_type
+
+
+class ReportService:
+    """
+    서버가 공유하는 상태: 한 번 읽은 데이터셋 스냅숏(후보 목록용 집계, 가나다순 포함), 응답 캐시.
+    source: DataFrame, HistoryStore 또는 DatasetSnapshot
+    version: 데이터셋 버전 토큰 (캐시 키에 들어감, 다시 로드하면 바뀐다)
+    """
+
+    def __init__(
+        self,
+        source,
+        version: Optional[str] = None,
+        cache: Optional[LRUCache] = None,
+    ):
+        if isinstance(source, DatasetSnapshot):
+            snapshot = source
+        elif isinstance(source, HistoryStore):
+            snapshot = DatasetSnapshot.from_store(source, token=version or dataset_version())
+        else:
+            snapshot = DatasetSnapshot.from_frame(source, token=version or dataset_version())
+        self.data = DatasetRef(snapshot)
+        self.cache = cache or LRUCache(DEFAULT_CACHE_ENTRIES, DEFAULT_CACHE_BYTES, sizeof=lambda r: r.size)
+        self._inflight: dict = {}
+        self._empty = LRUCache(EMPTY_RESULT_ENTRIES, sizeof=lambda expires: 0)  # 키 → 만료 시각
+        self._inflight_lock = threading.Lock()
+        self.renders = 0
+        self.jobs: Optional[ReportJobQueue] = None
+
+        self.assets = {
+            "report.css": _StaticAsset(REPORT_CSS, "text/css; charset=utf-8"),
+            "report.js": _StaticAsset(REPORT_SCRIPT, "application/javascript; charset=utf-8"),
+        }
+        digest = hashlib.sha1(b"".join(a.body for a in self.assets.values())).hexdigest()[:12]
+        self.asset_base = f"/static/{digest}"
+
+    # ── 현재 스냅숏 (한 요청 안에서는 snapshot을 한 번만 읽어 쓴다) ──
+    @property
+    def snapshot(self) -> DatasetSnapshot:
+        return self.data.current
+
+    @property
+    def source(self):
+        return self.data.current.source
+
+    @property
+    def version(self) -> str:
+        return self.data.current.token
+
+    @property
+    def order(self):
+        return self.data.current.order
+
+    def publish(self, snapshot: DatasetSnapshot) -> bool:
+        """새 데이터셋으로 교체 (캐시 키에 token이 들어가므로 이전 보고서는 더 이상 맞지 않는다)"""
+        return self.data.publish(snapshot)
+
+    def candidates(self, dim: str, univs=None, subtypes=None, depts=None) -> list:
+        """필터 후보 목록 (자기 차원을 제외한 나머지 선택을 만족하는 값)"""
+        snap = self.snapshot
+        if snap.aggregator is not None:
+            values = [str(v) for v in snap.aggregator.candidates(dim, univs, subtypes, depts)]
+        else:
+            values = snap.store.distinct(dim, univs=univs, subtypes=subtypes, depts=depts)
+        return snap.order[dim].sort(values)
+
+    def attach_jobs(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        max_concurrent: Optional[int] = None,
+        memory_budget: int = DEFAULT_JOB_MEMORY,
+    ) -> ReportJobQueue:
+        """보고서 렌더링을 작업 큐로 보낸다 (동시 실행 수/메모리 상한, 같은 선택은 한 번만 실행)"""
+        self.jobs = ReportJobQueue(self._run_job, workers=workers, max_concurrent=max_concurrent,
+                                   memory_budget=memory_budget)
+        self.jobs.start_thread()
+        return self.jobs
+
+    def close(self) -> None:
+        if self.jobs is not None:
+            self.jobs.close()
+            self.jobs = None
+
+    def render(
+        self,
+        univs: Optional[Iterable[str]] = None,
+        subtypes: Optional[Iterable[str]] = None,
+        depts: Optional[Iterable[str]] = None,
+    ) -> tuple[Optional[RenderedReport], bool]:
+        """
+        선택 조건 보고서와 캐시 적중 여부. 조건에 맞는 행이 없으면 report는 None
+        (최근에 빈 결과로 확인한 선택이면 (None, True)).
+        같은 키를 동시에 요청하면 먼저 온 요청만 렌더링하고 나머지는 그 결과나 예외를 그대로 받는다
+        (작업 큐가 있으면 큐의 중복 제거가 같은 역할을 한다).
+        """
+        univs, subtypes, depts = (normalize_selection(v) for v in (univs, subtypes, depts))
+        snap = self.snapshot
+        key = selection_key(snap.token, univs, subtypes, depts)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached[0], True
+        if self.jobs is not None:
+            return self.jobs.run_threadsafe(*self._job_args(snap, key, univs, subtypes, depts)), False
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = _InFlight()
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.report, pending.report is not None
+        try:
+            # 앞서 렌더링한 요청이 캐시에 넣고 막 빠졌을 수 있다
+            cached = self._lookup(key)
+            if cached is not None:
+                pending.report = cached[0]
+                return cached[0], True
+            pending.report = self._store(key, self._render(snap, univs, subtypes, depts))
+            return pending.report, False
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            pending.done.set()
+
+    def _lookup(self, key) -> Optional[tuple]:
+        """캐시된 보고서 또는 아직 유효한 빈 결과면 (report,), 모르면 None"""
+        report = self.cache.get(key)
+        if report is not None:
+            return (report,)
+        expires = self._empty.get(key)
+        if expires is not None:
+            if time.monotonic() < expires:
+                return (None,)
+            self._empty.pop(key)
+        return None
+
+    def _store(self, key, report: Optional[RenderedReport]) -> Optional[RenderedReport]:
+        if report is None:
+            self._empty.put(key, time.monotonic() + EMPTY_RESULT_TTL)
+        else:
+            self.cache.put(key, report)
+        return report
+
+    def submit(self, univs=None, subtypes=None, depts=None) -> Optional[ReportJob]:
+        """기다리지 않고 작업만 등록 (이미 캐시에 있거나 빈 결과로 확인한 선택이면 None)"""
+        univs, subtypes, depts = (normalize_selection(v) for v in (univs, subtypes, depts))
+        snap = self.snapshot
+        key = selection_key(snap.token, univs, subtypes, depts)
+        if self._lookup(key) is not None:
+            return None
+        return self.jobs.submit_threadsafe(*self._job_args(snap, key, univs, subtypes, depts))
+
+    def _job_args(self, snap: DatasetSnapshot, key, univs, subtypes, depts) -> tuple:
+        estimate = estimate_report_bytes(snap.source, univs, subtypes, depts)
+        label = "; ".join(f"{dim}={','.join(sel)}" for dim, sel in zip(DIMENSIONS, (univs, subtypes, depts)) if sel)
+        return key, (snap, key, univs, subtypes, depts), estimate, label
+
+    def _run_job(self, payload, instr: Instrumentation) -> Optional[RenderedReport]:
+        snap, key, univs, subtypes, depts = payload
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached[0]
+        return self._store(key, self._render(snap, univs, subtypes, depts, instr))
+
+    def _render(self, snap: DatasetSnapshot, univs, subtypes, depts,
+                instr: Optional[Instrumentation] = None) -> Optional[RenderedReport]:
+        start = time.perf_counter()
+        instr = instr or Instrumentation("serve_report")
+        df = select_report_rows(snap.source, depts or None, univs or None, subtypes or None, instr=instr, order=snap.order)
+        if df.empty:
+            return None
+        with instr.span("html_template"):
+            html = render_report_html(df, depts or None, univs or None, subtypes or None, instr, asset_base=self.asset_base, order=snap.order)
+        body = html.encode("utf-8")
+        with self._inflight_lock:
+            self.renders += 1
+        return RenderedReport(body, gzip.compress(body, compresslevel=6), _etag(body), len(df),
+                              time.perf_counter() - start)
+
+    def status(self) -> dict:
+        status = {"version": self.version, "renders": self.renders, "cache": self.cache.stats()}
+        if self.jobs is not None:
+            status["jobs"] = self.jobs.stats()
+        return status
+
+    def index_html(self) -> str:
+        """필터 선택 화면 (목록은 /api/candidates로 서로 좁혀진다)"""
+        labels = {"univ": "대학", "subtype": "전형", "dept": "모집단위"}
+        selects = "\n".join(
+            f'<label>{labels[dim]}<select name="{dim}" multiple size="18" onchange="refresh(\'{dim}\')">'
+            + "".join(f'<option value="{escape(v)}">{escape(v)}</option>' for v in self.candidates(dim))
+            + "</select></label>"
+            for dim in DIMENSIONS
+        )
+        return f"""<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="UTF-8">
+<title>모집단위 입시 결과 보고서</title>
+<style>
+body {{ font-family: 'Malgun Gothic', sans-serif; margin: 24px; }}
+form {{ display: flex; gap: 16px; flex-wrap: wrap; align-items: flex-end; }}
+label {{ display: flex; flex-direction: column; font-weight: bold; gap: 4px; }}
+select {{ min-width: 220px; }}
+button {{ padding: 8px 20px; font-size: 15px; }}
+</style>
+</head>
+<body>
+<h1>모집단위 입시 결과 보고서</h1>
+<form action="/report" method="get" target="_blank">
+{selects}
+<button type="submit">보고서 보기</button>
+</form>
+<script>
+async function refresh(changed) {{
+    const form = document.querySelector('form');
+    const params = new URLSearchParams(new FormData(form));
+    for (const dim of {json.dumps(list(DIMENSIONS))}) {{
+        if (dim === changed) continue;
+        const select = form.elements[dim];
+        const chosen = new Set(Array.from(select.selectedOptions, o => o.value));
+        const res = await fetch('/api/candidates?dim=' + dim + '&' + params.toString());
+        const values = await res.json();
+        select.innerHTML = '';
+        for (const v of values) {{
+            const opt = new Option(v, v, false, chosen.has(v));
+            select.add(opt);
+        }}
+    }}
+}}
+</script>
+</body>
+</html>
+"""
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """GET 전용 요청 처리기 (server.service로 ReportService를 공유)"""
+
+    server_version = "SusiReportServer/1.0"
+
+    # ───────────────────────── 라우팅 ──────────────────────────
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        try:
+            if url.path == "/":
+                self._send_html(self.server.service.index_html())
+            elif url.path == "/report":
+                self._send_report(query)
+            elif url.path.startswith("/static/"):
+                self._send_static(url.path)
+            elif url.path == "/api/candidates":
+                self._send_candidates(query)
+            elif url.path == "/api/status":
+                self._send_json(self.server.service.status())
+            elif url.path == "/api/jobs" or url.path.startswith("/api/jobs/"):
+                self._send_jobs(url.path)
+            else:
+                self._send_error(HTTPStatus.NOT_FOUND, "페이지를 찾을 수 없습니다.")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        try:
+            if url.path == "/api/jobs":
+                self._submit_job(parse_qs(url.query))
+            else:
+                self._send_error(HTTPStatus.NOT_FOUND, "페이지를 찾을 수 없습니다.")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _selection(self, query: dict) -> dict:
+        return {arg: query.get(name, []) for name, arg in QUERY_KEYS.items()}
+
+    def _send_report(self, query: dict) -> None:
+        selection = self._selection(query)
+        if not any(selection.values()):
+            self._send_error(HTTPStatus.BAD_REQUEST, "univ, subtype, dept 중 하나 이상을 지정해주세요.")
+            return
+        report, hit = self.server.service.render(**selection)
+        if report is None:
+            self._send_error(HTTPStatus.NOT_FOUND, "선택된 조건에 맞는 데이터가 없습니다.")
+            return
+        extra = {"X-Report-Cache": "hit" if hit else "miss", "X-Report-Rows": str(report.rows)}
+        # 데이터가 바뀌면 ETag도 바뀌므로 매번 재검증(no-cache)하고 같으면 304
+        self._send_cached(report.body, report.gzipped, report.etag, "text/html; charset=utf-8", "no-cache", extra)
+
+    def _send_static(self, path: str) -> None:
+        service = self.server.service
+        base, _, name = path.rpartition("/")
+        asset = service.assets.get(name)
+        if asset is None or base != service.asset_base:
+            self._send_error(HTTPStatus.NOT_FOUND, "파일을 찾을 수 없습니다.")
+            return
+        self._send_cached(asset.body, asset.gzipped, asset.etag, asset.content_type,
+                          "public, max-age=31536000, immutable")
+
+    def _send_candidates(self, query: dict) -> None:
+        dim = (query.get("dim") or [""])[0]
+        if dim not in DIMENSIONS:
+            self._send_error(HTTPStatus.BAD_REQUEST, f"지원하지 않는 항목: {dim}")
+            return
+        self._send_json(self.server.service.candidates(dim, **self._selection(query)))
+
+    def _send_jobs(self, path: str) -> None:
+        jobs = self.server.service.jobs
+        if jobs is None:
+            self._send_error(HTTPStatus.NOT_FOUND, "작업 큐가 꺼져 있습니다.")
+            return
+        if path.rstrip("/") == "/api/jobs":
+            self._send_json({"stats": jobs.stats(), "jobs": jobs.jobs()})
+            return
+        job_id = path.rsplit("/", 1)[-1]
+        job = jobs.get(int(job_id)) if job_id.isdigit() else None
+        if job is None:
+            self._send_error(HTTPStatus.NOT_FOUND, f"작업을 찾을 수 없습니다: {job_id}")
+            return
+        self._send_json(job.to_dict())
+
+    def _submit_job(self, query: dict) -> None:
+        service = self.server.service
+        selection = self._selection(query)
+        if service.jobs is None:
+            self._send_error(HTTPStatus.NOT_FOUND, "작업 큐가 꺼져 있습니다.")
+        elif not any(selection.values()):
+            self._send_error(HTTPStatus.BAD_REQUEST, "univ, subtype, dept 중 하나 이상을 지정해주세요.")
+        else:
+            job = service.submit(**selection)
+            if job is None:
+                self._send_json({"status": "cached"})
+            else:
+                self._send_json(job.to_dict(), HTTPStatus.ACCEPTED)
+
+    # ───────────────────────── 응답 ──────────────────────────
+    def _send_cached(self, body: bytes, gzipped: bytes, etag: str, content_type: str,
+                     cache_control: str, extra: Optional[dict] = None) -> None:
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        headers.update(extra or {})
+        if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzipped
+            headers["Content-Encoding"] = "gzip"
+        self._send(HTTPStatus.OK, body, content_type, headers)
+
+    def _send_html(self, html: str) -> None:
+        self._send(HTTPStatus.OK, html.encode("utf-8"), "text/html; charset=utf-8", {"Cache-Control": "no-cache"})
+
+    def _send_json(self, payload, status: HTTPStatus = HTTPStatus.OK) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._send(status, body, "application/json; charset=utf-8", {"Cache-Control": "no-cache"})
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        body = f"<!DOCTYPE html><meta charset=\"UTF-8\"><p>{escape(message)}</p>".encode("utf-8")
+        self._send(status, body, "text/html; charset=utf-8")
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str, headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(
+    service: ReportService,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    quiet: bool = False,
+) -> ThreadingHTTPServer:
+    """요청마다 스레드를 쓰는 서버 (port=0이면 빈 포트를 고른다)"""
+    server = ThreadingHTTPServer((host, port), ReportRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.quiet = quiet
+    return server
+
+
+def load_service(
+    inputs: Iterable[str] = (),
+    db: Optional[str] = None,
+    cache_entries: int = DEFAULT_CACHE_ENTRIES,
+    cache_bytes: int = DEFAULT_CACHE_BYTES,
+    folder: Optional[FolderDataset] = None,
+) -> ReportService:
+    """엑셀 파일(여러 해 가능), 이력 DB 또는 읽어 둔 감시 폴더에서 서비스를 만든다 (엑셀은 여기서 한 번만 읽음)"""
+    inputs = list(inputs)
+    cache = LRUCache(cache_entries, cache_bytes, sizeof=lambda r: r.size)
+    if folder is not None:
+        return ReportService(folder.snapshot(), cache=cache)
+    if db:
+        store = HistoryStore(Path(db))
+        return ReportService(store, dataset_version([db], store.count()), cache)
+    df = read_inputs(inputs) if len(inputs) > 1 else read_input(Path(inputs[0]))
+    return ReportService(df, dataset_version(inputs, len(df)), cache)
+
+
+def watch_folder(service: ReportService, folder: FolderDataset, interval: float, stop: threading.Event) -> None:
+    """감시 폴더가 바뀌면 새 스냅숏으로 교체 (serve --watch, 데몬 스레드에서 실행)"""
+    while not stop.wait(interval):
+        try:
+            result = folder.poll()
+        except Exception as e:
+            print(f"폴더 감시 오류: {e}")
+            continue
+        if result is not None and folder.df is not None:
+            service.publish(folder.snapshot())
+            print(f"데이터셋 교체: {service.version} ({len(folder.df):,}행, 바뀐 그룹 {len(result.affected):,}개)")
+        if result is not None and result.failed:
+            print(result.failure_note())
@@ -0,0 +1,411 @@
+# selection_stats.py
+# ---------------------------------------------------------------------
+# 필터 선택에 대한 통계를 증분 방식으로 유지하는 집계기
+# (대학/전형/모집단위 조합 단위의 부분 집계를 로드 시 한 번만 계산)
+# ---------------------------------------------------------------------
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional
+
+RESULT_KEYS = ("합격", "충원합격", "불합격")
+GRADE_COLUMNS = ("conv_grade", "all_subj_grade")
+DIMENSIONS = ("univ", "subtype", "dept")
+
+# 결과 인덱스: 0=합격, 1=충원합격, 2=불합격, 3=기타
+_OTHER = len(RESULT_KEYS)
+_N_RESULTS = _OTHER + 1
+
+
+def stats_from_partials(count, n, total, mins, maxs) -> dict:
+    """
+    결과별 부분 집계(길이 4: 합격, 충원합격, 불합격, 기타)로 compute_stats 형식 딕셔너리 생성.
+    count: 행 수, n: 유효 등급 수, total: 등급 합계, mins/maxs: 등급 최솟값/최댓값 (없으면 NaN)
+    """
+    count = np.asarray(count)
+    total_count = int(count.sum())
+    stats = {"total_count": total_count}
+    if total_count == 0:
+        return stats
+
+    def grade_range(prefix, cols):
+        cnt = n[cols].sum()
+        if cnt == 0:
+            return
+        stats[f"{prefix}_min"] = np.fmin.reduce(mins[cols])
+        stats[f"{prefix}_max"] = np.fmax.reduce(maxs[cols])
+        stats[f"{prefix}_mean"] = total[cols].sum() / cnt
+
+    n, total = np.asarray(n), np.asarray(total, dtype=float)
+    mins, maxs = np.asarray(mins, dtype=float), np.asarray(maxs, dtype=float)
+    all_pass = int(count[0] + count[1])
+    if all_pass:
+        stats["all_pass_count"] = all_pass
+        stats["all_pass_rate"] = f"{all_pass/total_count*100:.1f}%"
+        grade_range("all_pass", [0, 1])
+    for i, prefix in ((0, "pass"), (1, "waitlist")):
+        if count[i]:
+            stats[f"{prefix}_count"] = int(count[i])
+            stats[f"{prefix}_rate"] = f"{count[i]/total_count*100:.1f}%"
+            grade_range(prefix, [i])
+    if count[2]:
+        stats["fail_count"] = int(count[2])
+    return stats
+
+
+class SelectionAggregator:
+    """
+    (univ, subtype, dept) 그룹별 부분 집계를 미리 계산해 두고,
+    선택이 바뀔 때 추가/제거된 그룹만 누적 합계에 더하거나 빼는 집계기.
+
+    빈 선택은 MultiSelectFilter와 동일하게 '전체'로 취급한다.
+    개수/합계는 증분으로 갱신되고, 최솟값/최댓값은 선택된 그룹의
+    부분 집계에서 계산하므로 원본 행을 다시 훑지 않는다.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        keys = pd.MultiIndex.from_frame(df[list(DIMENSIONS)])
+        gid, groups = keys.factorize()
+        n_groups = len(groups)
+
+        # 차원별 값 코드 (그룹 단위)
+        values, codes = {}, {}
+        for level, dim in enumerate(DIMENSIONS):
+            dim_codes, uniques = pd.factorize(groups.get_level_values(level))
+            values[dim] = list(uniques)
+            codes[dim] = dim_codes
+
+        # 결과 코드
+        rcode = np.full(len(df), _OTHER, dtype=np.int64)
+        result = df["result"].to_numpy()
+        for i, key in enumerate(RESULT_KEYS):
+            rcode[result == key] = i
+        cell = gid * _N_RESULTS + rcode
+        size = n_groups * _N_RESULTS
+
+        # 그룹 x 결과 부분 집계
+        g_count = np.bincount(cell, minlength=size).reshape(n_groups, _N_RESULTS)
+        shape = (len(GRADE_COLUMNS), n_groups, _N_RESULTS)
+        g_n = np.zeros(shape, dtype=np.int64)
+        g_sum = np.zeros(shape)
+        g_min = np.full(shape, np.nan)
+        g_max = np.full(shape, np.nan)
+        for ci, col in enumerate(GRADE_COLUMNS):
+            grades = df[col].to_numpy(dtype=float)
+            valid = ~np.isnan(grades)
+            c, g = cell[valid], grades[valid]
+            g_n[ci] = np.bincount(c, minlength=size).reshape(n_groups, _N_RESULTS)
+            g_sum[ci] = np.bincount(c, weights=g, minlength=size).reshape(n_groups, _N_RESULTS)
+            mins = np.full(size, np.inf)
+            maxs = np.full(size, -np.inf)
+            np.minimum.at(mins, c, g)
+            np.maximum.at(maxs, c, g)
+            mins[np.isinf(mins)] = np.nan
+            maxs[np.isinf(maxs)] = np.nan
+            g_min[ci] = mins.reshape(n_groups, _N_RESULTS)
+            g_max[ci] = maxs.reshape(n_groups, _N_RESULTS)
+
+        self._setup(values, codes, {
+            "count": g_count, "n": g_n, "sum": g_sum, "min": g_min, "max": g_max,
+        })
+
+    @classmethod
+    def from_state(cls, values: dict, arrays: dict) -> "SelectionAggregator":
+        """state()로 저장한 부분 집계에서 원본 행 없이 복원"""
+        self = cls.__new__(cls)
+        codes = {dim: np.asarray(arrays[f"codes_{dim}"]) for dim in DIMENSIONS}
+        partials = {key: np.asarray(arrays[f"g_{key}"]) for key in ("count", "n", "sum", "min", "max")}
+        self._setup(values, codes, partials)
+        return self
+
+    @classmethod
+    def merge(cls, parts: Iterable["SelectionAggregator"]) -> "SelectionAggregator":
+        """
+        여러 집계기(예: 파일별)를 하나로. 같은 그룹은 개수/합계를 더하고 최솟값/최댓값을 합친다.
+        원본 행을 다시 훑지 않으므로 파일 하나가 바뀌면 그 파일만 다시 집계하면 된다.
+        """
+        parts = list(parts)
+        keys = [part.group_keys() for part in parts]
+        index = pd.MultiIndex.from_arrays([
+            np.concatenate([k[dim] for k in keys]) if keys else np.array([], dtype=object) for dim in DIMENSIONS
+        ])
+        gid, groups = index.factorize()
+        n_groups = len(groups)
+
+        shape = (len(GRADE_COLUMNS), n_groups, _N_RESULTS)
+        partials = {
+            "count": np.zeros((n_groups, _N_RESULTS), dtype=np.int64),
+            "n": np.zeros(shape, dtype=np.int64), "sum": np.zeros(shape),
+            "min": np.full(shape, np.nan), "max": np.full(shape, np.nan),
+        }
+        offset = 0
+        for part in parts:
+            ids = gid[offset:offset + part.n_groups]
+            offset += part.n_groups
+            np.add.at(partials["count"], ids, part._g_count)
+            np.add.at(partials["n"], (slice(None), ids), part._g_n)
+            np.add.at(partials["sum"], (slice(None), ids), part._g_sum)
+            np.fmin.at(partials["min"], (slice(None), ids), part._g_min)
+            np.fmax.at(partials["max"], (slice(None), ids), part._g_max)
+
+        values, codes = {}, {}
+        for level, dim in enumerate(DIMENSIONS):
+            codes[dim], uniques = pd.factorize(groups.get_level_values(level))
+            values[dim] = list(uniques)
+        self = cls.__new__(cls)
+        self._setup(values, codes, partials)
+        return self
+
+    def copy(self) -> "SelectionAggregator":
+        """부분 집계 배열은 공유하고 선택 상태(update/restrict)만 따로 가진 집계기"""
+        other = type(self).__new__(type(self))
+        other._setup(self._values, self._codes, {
+            "count": self._g_count, "n": self._g_n, "sum": self._g_sum, "min": self._g_min, "max": self._g_max,
+        })
+        return other
+
+    def state(self) -> tuple[dict, dict]:
+        """(차원별 값 목록, 그룹 코드/부분 집계 배열) - 세션 저장용"""
+        arrays = {f"codes_{dim}": self._codes[dim] for dim in DIMENSIONS}
+        arrays.update({
+            "g_count": self._g_count, "g_n": self._g_n, "g_sum": self._g_sum,
+            "g_min": self._g_min, "g_max": self._g_max,
+        })
+        return {dim: list(vals) for dim, vals in self._values.items()}, arrays
+
+    def _setup(self, values: dict, codes: dict, partials: dict) -> None:
+        self._values = values
+        self._codes = codes
+        self._g_count = partials["count"]
+        self._g_n = partials["n"]
+        self._g_sum = partials["sum"]
+        self._g_min = partials["min"]
+        self._g_max = partials["max"]
+        self.n_groups = len(self._g_count)
+
+        # 차원 값 → 그룹 목록
+        self._groups_by: dict[str, dict[int, np.ndarray]] = {}
+        for dim in DIMENSIONS:
+            dim_codes = self._codes[dim]
+            n_values = len(self._values[dim])
+            order = np.argsort(dim_codes, kind="stable")
+            bounds = np.searchsorted(dim_codes[order], np.arange(n_values + 1))
+            self._groups_by[dim] = {c: order[bounds[c]:bounds[c + 1]] for c in range(n_values)}
+        self._lookup = {
+            dim: {v: i for i, v in enumerate(vals)} for dim, vals in self._values.items()
+        }
+
+        # 추가 그룹 제한 (예: 합격 등급 범위 필터). None이면 제한 없음
+        self._restrict: Optional[np.ndarray] = None
+
+        # 선택 상태: 처음에는 전체 선택(빈 선택)
+        self._effective = {dim: set(range(len(self._values[dim]))) for dim in DIMENSIONS}
+        self._dim_ok = {dim: np.ones(len(self._values[dim]), dtype=bool) for dim in DIMENSIONS}
+        self._included = np.ones(self.n_groups, dtype=bool)
+        self._count = self._g_count.sum(axis=0)
+        self._n = self._g_n.sum(axis=1)
+        self._sum = self._g_sum.sum(axis=1)
+
+    # ───────────────────────── 공개 메서드 ──────────────────────────
+    def update(
+        self,
+        univs: Optional[Iterable[str]] = None,
+        subtypes: Optional[Iterable[str]] = None,
+        depts: Optional[Iterable[str]] = None,
+    ) -> None:
+        """새 선택을 반영한다. 한 차원만 바뀌면 해당 그룹만 더하고 뺀다."""
+        new_eff = {
+            dim: self._resolve(dim, sel)
+            for dim, sel in zip(DIMENSIONS, (univs, subtypes, depts))
+        }
+        changed = [dim for dim in DIMENSIONS if new_eff[dim] != self._effective[dim]]
+        if not changed:
+            return
+        if len(changed) > 1:
+            self._rebuild(new_eff)
+            return
+
+        dim = changed[0]
+        old, new = self._effective[dim], new_eff[dim]
+        self._set_effective(dim, new)
+        removed = self._matching_groups(dim, old - new)
+        added = self._matching_groups(dim, new - old)
+        self._apply(removed, -1)
+        self._apply(added, +1)
+
+    def candidates(
+        self,
+        dim: str,
+        univs: Optional[Iterable[str]] = None,
+        subtypes: Optional[Iterable[str]] = None,
+        depts: Optional[Iterable[str]] = None,
+    ) -> list:
+        """
+        dim 필터에 보여줄 후보 값: 자기 자신을 제외한 나머지 차원 선택을 만족하는
+        그룹들의 dim 값 (행 대신 그룹 단위로 계산)
+        """
+        mask = np.ones(self.n_groups, dtype=bool) if self._restrict is None else self._restrict.copy()
+        for other, sel in zip(DIMENSIONS, (univs, subtypes, depts)):
+            if other == dim or not sel:
+                continue
+            ok = np.zeros(len(self._values[other]), dtype=bool)
+            ok[list(self._resolve(other, sel))] = True
+            mask &= ok[self._codes[other]]
+        present = np.unique(self._codes[dim][mask])
+        return [self._values[dim][c] for c in present]
+
+    def restrict(self, groups: Optional[np.ndarray]) -> None:
+        """
+        그룹 단위 추가 제한(길이 n_groups 불리언 마스크, None이면 해제).
+        candidates()와 stats()가 모두 이 제한을 따른다.
+        """
+        self._restrict = None if groups is None else np.asarray(groups, dtype=bool)
+        self._rebuild(self._effective)
+
+    def group_keys(self) -> dict:
+        """그룹 번호 순서의 차원별 값 배열 {dim: ndarray}"""
+        return {dim: np.asarray(self._values[dim], dtype=object)[self._codes[dim]] for dim in DIMENSIONS}
+
+    def group_ranges(self, grade_column: str = "conv_grade", results: Iterable[str] = RESULT_KEYS[:1]) -> tuple:
+        """
+        그룹별 (최솟값, 최댓값, 유효 등급 수) 배열 - results에 속한 행 기준.
+        기본은 '합격'만 (compute_stats의 pass_min/pass_max와 같음).
+        """
+        ci = GRADE_COLUMNS.index(grade_column)
+        cols = [RESULT_KEYS.index(r) for r in results]
+        lo = np.fmin.reduce(self._g_min[ci][:, cols], axis=1)
+        hi = np.fmax.reduce(self._g_max[ci][:, cols], axis=1)
+        n = self._g_n[ci][:, cols].sum(axis=1)
+        return lo, hi, n
+
+    def stats(self, grade_column: str = "conv_grade") -> dict:
+        """현재 선택에 대한 compute_stats 형식의 통계 딕셔너리"""
+        ci = GRADE_COLUMNS.index(grade_column)
+        idx = np.flatnonzero(self._included)
+        return stats_from_partials(
+            self._count,
+            self._n[ci],
+            self._sum[ci],
+            np.fmin.reduce(self._g_min[ci][idx], axis=0, initial=np.nan),
+            np.fmax.reduce(self._g_max[ci][idx], axis=0, initial=np.nan),
+        )
+
+    # ──────────────────────── 내부 유틸 ───────────────────────────
+    def _resolve(self, dim: str, selected) -> set:
+        selected = list(selected or ())
+        if not selected:
+            return set(range(len(self._values[dim])))
+        lookup = self._lookup[dim]
+        return {lookup[v] for v in selected if v in lookup}
+
+    def _set_effective(self, dim: str, codes: set) -> None:
+        ok = np.zeros(len(self._values[dim]), dtype=bool)
+        ok[list(codes)] = True
+        self._effective[dim] = codes
+        self._dim_ok[dim] = ok
+
+    def _matching_groups(self, dim: str, codes: set) -> np.ndarray:
+        """dim 값이 codes에 속하고 나머지 차원 선택을 만족하는 그룹"""
+        if not codes:
+            return np.empty(0, dtype=np.int64)
+        cand = np.concatenate([self._groups_by[dim][c] for c in codes])
+        for other in DIMENSIONS:
+            if other != dim:
+                cand = cand[self._dim_ok[other][self._codes[other][cand]]]
+        if self._restrict is not None:
+            cand = cand[self._restrict[cand]]
+        return cand
+
+    def _apply(self, groups: np.ndarray, sign: int) -> None:
+        if len(groups) == 0:
+            return
+        self._included[groups] = sign > 0
+        self._count += sign * self._g_count[groups].sum(axis=0)
+        self._n += sign * self._g_n[:, groups].sum(axis=1)
+        self._sum += sign * self._g_sum[:, groups].sum(axis=1)
+
+    def _rebuild(self, effective: dict) -> None:
+        for dim, codes in effective.items():
+            self._set_effective(dim, codes)
+        mask = np.ones(self.n_groups, dtype=bool) if self._restrict is None else self._restrict.copy()
+        for dim in DIMENSIONS:
+            mask &= self._dim_ok[dim][self._codes[dim]]
+        self._included = mask
+        self._count = self._g_count[mask].sum(axis=0)
+        self._n = self._g_n[:, mask].sum(axis=1)
+        self._sum = self._g_sum[:, mask].sum(axis=1)
+
+
+class YearlyTrends:
+    """
+    (univ, dept, subtype, year) 단위 최종 합격(합격+충원합격) 등급 요약.
+    보고서 전에 선택 데이터 전체를 한 번만 훑어 계산해 두고,
+    그룹별 추이는 정렬된 표의 연속 구간을 잘라 돌려준다.
+    year 열이 없거나 NaN인 행은 제외한다.
+    """
+
+    GROUP_COLUMNS = ("univ", "dept", "subtype")
+
+    def __init__(self, df: pd.DataFrame):
+        if "year" in df.columns:
+            mask = df["result"].isin(RESULT_KEYS[:2]).to_numpy() & df["year"].notna().to_numpy()
+        else:
+            mask = np.zeros(len(df), dtype=bool)
+        rows = df[mask]
+        keys = pd.MultiIndex.from_arrays(
+            [rows[c].to_numpy() for c in self.GROUP_COLUMNS] + [rows["year"].to_numpy(dtype=float).astype(int)],
+            names=list(self.GROUP_COLUMNS) + ["year"],
+        )
+        gid, groups = keys.factorize()
+        groups = groups.set_names(keys.names)
+        n_groups = len(groups)
+
+        columns = {}
+        for col in GRADE_COLUMNS:
+            grades = rows[col].to_numpy(dtype=float)
+            valid = ~np.isnan(grades)
+            c, g = gid[valid], grades[valid]
+            count = np.bincount(c, minlength=n_groups)
+            total = np.bincount(c, weights=g, minlength=n_groups)
+            mins = np.full(n_groups, np.inf)
+            maxs = np.full(n_groups, -np.inf)
+            np.minimum.at(mins, c, g)
+            np.maximum.at(maxs, c, g)
+            empty = count == 0
+            with np.errstate(invalid="ignore", divide="ignore"):
+                columns[f"{col}_mean"] = np.where(empty, np.nan, total / np.maximum(count, 1))
+            columns[f"{col}_min"] = np.where(empty, np.nan, mins)
+            columns[f"{col}_max"] = np.where(empty, np.nan, maxs)
+            columns[f"{col}_count"] = count
+
+        self.table = pd.DataFrame(columns, index=groups).sort_index()
+        self.years = sorted(set(self.table.index.get_level_values("year")))
+
+        # (univ, dept, subtype) → 정렬된 표에서의 [start, end) 구간
+        group_keys = self.table.index.droplevel("year")
+        self._slices = {}
+        if len(group_keys):
+            codes, uniques = group_keys.factorize()
+            bounds = np.flatnonzero(np.diff(codes)) + 1
+            starts = np.concatenate([[0], bounds])
+            ends = np.concatenate([bounds, [len(codes)]])
+            for key, s, e in zip(uniques[codes[starts]], starts, ends):
+                self._slices[key] = (int(s), int(e))
+
+    def trend(self, univ, dept, subtype, min_years: int = 2) -> Optional[dict]:
+        """
+        그룹의 연도별 최종 합격 등급 min/mean/max.
+        연도가 min_years개 미만이면 None.
+        {"years": [...], "conv_grade": {"min": [...], "mean": [...], "max": [...], "count": [...]}, ...}
+        """
+        bounds = self._slices.get((univ, dept, subtype))
+        if bounds is None or bounds[1] - bounds[0] < min_years:
+            return None
+        part = self.table.iloc[bounds[0]:bounds[1]]
+        trend = {"years": part.index.get_level_values("year").tolist()}
+        for col in GRADE_COLUMNS:
+            trend[col] = {
+                stat: [None if np.isnan(v) else round(float(v), 2) for v in part[f"{col}_{stat}"].to_numpy(dtype=float)]
+                for stat in ("min", "mean", "max")
+            }
+            trend[col]["count"] = part[f"{col}_count"].astype(int).tolist()
+        return trend
@@ -0,0 +1,145 @@
+# session.py
+# ---------------------------------------------------------------------
+# 세션 스냅샷: 로드한 데이터셋 + 필터 인덱스 + 선택 상태를 디스크에 저장하고
+# 다음 실행 때 memmap으로 바로 복원한다 (엑셀 재파싱 없이 즉시 시작).
+#
+#   <session_dir>/
+#     session.json          형식 버전, 원본 파일 정보, 열 메타데이터, 선택/파일명
+#     data_<열>.npy         columnar.encode_frame 배열 (범주 코드, 1/100 정수 등급)
+#     index_<이름>.npy      SelectionAggregator 그룹 코드/부분 집계
+# ---------------------------------------------------------------------
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from columnar import decode_frame, encode_frame
+from selection_stats import SelectionAggregator
+
+SESSION_VERSION = 1
+DEFAULT_SESSION_DIR = Path(".susi_session")
+_META = "session.json"
+
+
+@dataclass
+class Session:
+    """복원된 세션"""
+    df: pd.DataFrame
+    aggregator: SelectionAggregator
+    source: Optional[str] = None
+    source_changed: bool = False
+    selections: dict = field(default_factory=dict)  # {"univ": [...], "subtype": [...], "dept": [...]}
+    output_filename: Optional[str] = None
+
+
+def _source_info(source: Optional[str]) -> Optional[dict]:
+    if not source or not Path(source).exists():
+        return None
+    st = Path(source).stat()
+    return {"path": str(source), "mtime": st.st_mtime, "size": st.st_size}
+
+
+def _write_meta(session_dir: Path, meta: dict) -> None:
+    # 임시 파일에 쓴 뒤 교체해서 중간에 종료돼도 깨진 메타데이터가 남지 않게 한다
+    tmp = session_dir / (_META + ".tmp")
+    tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, session_dir / _META)
+
+
+def _read_meta(session_dir: Path) -> Optional[dict]:
+    path = session_dir / _META
+    if not path.exists():
+        return None
+    try:
+        meta = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == SESSION_VERSION else None
+
+
+def save_dataset(
+    df: pd.DataFrame,
+    aggregator: SelectionAggregator,
+    source: Optional[str] = None,
+    session_dir: Path = DEFAULT_SESSION_DIR,
+) -> None:
+    """데이터셋과 파생 인덱스를 압축 열 배열로 저장 (선택 상태는 초기화)"""
+    session_dir = Path(session_dir)
+    session_dir.mkdir(parents=True, exist_ok=True)
+    # 배열을 바꾸기 전에 이전 메타데이터부터 지운다: 중간에 실패하면 새/일부 배열을
+    # 이전 열 메타데이터(길이, 범주 순서)로 잘못 읽는 대신 복원할 세션이 없게 된다
+    (session_dir / _META).unlink(missing_ok=True)
+    for old in session_dir.glob("*.npy"):
+        old.unlink()
+
+    arrays, frame_meta = encode_frame(df)
+    for name, values in arrays.items():
+        np.save(session_dir / f"data_{name}.npy", values)
+    values, index_arrays = aggregator.state()
+    for name, arr in index_arrays.items():
+        np.save(session_dir / f"index_{name}.npy", arr)
+
+    _write_meta(session_dir, {
+        "version": SESSION_VERSION,
+        "source": _source_info(source),
+        "frame": frame_meta,
+        "index_values": values,
+        "index_arrays": list(index_arrays),
+        "selections": {},
+        "output_filename": None,
+    })
+
+
+def save_state(
+    selections: dict,
+    output_filename: Optional[str],
+    session_dir: Path = DEFAULT_SESSION_DIR,
+) -> None:
+    """선택 상태와 출력 파일명만 갱신 (데이터 배열은 다시 쓰지 않음)"""
+    meta = _read_meta(Path(session_dir))
+    if meta is None:
+        return
+    meta["selections"] = {dim: list(values) for dim, values in selections.items()}
+    meta["output_filename"] = output_filename
+    _write_meta(Path(session_dir), meta)
+
+
+def load_session(session_dir: Path = DEFAULT_SESSION_DIR) -> Optional[Session]:
+    """저장된 세션을 memmap으로 읽어 복원. 없거나 형식이 다르면 None"""
+    session_dir = Path(session_dir)
+    meta = _read_meta(session_dir)
+    if meta is None:
+        return None
+    try:
+        arrays = {
+            col["name"]: np.load(session_dir / f"data_{col['name']}.npy", mmap_mode="r")
+            for col in meta["frame"]["columns"]
+        }
+        # 범주 열은 코드 배열 그대로 pd.Categorical로 둔다 (행마다 문자열 객체를 만들지 않음)
+        df = decode_frame(arrays, meta["frame"], categorical=True)
+        index_arrays = {
+            name: np.load(session_dir / f"index_{name}.npy", mmap_mode="r")
+            for name in meta["index_arrays"]
+        }
+        aggregator = SelectionAggregator.from_state(meta["index_values"], index_arrays)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"세션 복원 실패: {e}")
+        return None
+
+    source = meta.get("source") or {}
+    current = _source_info(source.get("path"))
+    changed = bool(source) and (
+        current is None or current["mtime"] != source["mtime"] or current["size"] != source["size"]
+    )
+    return Session(
+        df=df,
+        aggregator=aggregator,
+        source=source.get("path"),
+        source_changed=changed,
+        selections=meta.get("selections") or {},
+        output_filename=meta.get("output_filename"),
+    )
@@ -0,0 +1,130 @@
+# shared_dataset.py
+# ---------------------------------------------------------------------
+# 작업 프로세스에 데이터셋 넘기기 (공유 메모리, 복사 없음)
+#   - 부모: SharedDataset.create(df)로 columnar.encode_frame 배열(범주 코드 + 1/100 정수 등급)을
+#     공유 메모리 블록 하나에 올리고, 작은 handle(블록 이름 + 열 배치)만 작업에 넘긴다.
+#   - 작업: SharedDataset.attach(handle)로 같은 블록을 이름으로 열어 numpy 배열로 본다.
+#     DataFrame을 pickle해서 보내지 않으므로 작업 시작 비용과 작업별 메모리가 데이터 크기와 무관하다.
+#   - frame(univs=…, subtypes=…, depts=…)은 선택된 행만 DataFrame으로 복원한다.
+#
+# ProcessPoolExecutor(initializer=init_worker, initargs=(handle,))로 프로세스마다 한 번만 연결하고
+# 작업 함수에서는 worker_dataset()으로 꺼내 쓴다.
+# ---------------------------------------------------------------------
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from columnar import decode_frame, encode_frame
+
+_ALIGN = 64
+_SELECT_COLUMNS = (("univ", "univs"), ("subtype", "subtypes"), ("dept", "depts"))
+
+
+@dataclass(frozen=True)
+class SharedDatasetHandle:
+    """작업에 넘기는 값 (블록 이름, 열 메타데이터, 열별 (이름, dtype, 시작 바이트, 길이))"""
+    name: str
+    meta: dict
+    layout: tuple
+
+
+class SharedDataset:
+    """공유 메모리 위의 압축 열 배열. create()로 만든 쪽이 unlink() 책임을 진다."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, handle: SharedDatasetHandle, owner: bool):
+        self._shm = shm
+        self.handle = handle
+        self.owner = owner
+        self.arrays = {
+            name: np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for name, dtype, offset, length in handle.layout
+        }
+        for values in self.arrays.values():
+            values.flags.writeable = owner
+        self._categories = {
+            col["name"]: {c: i for i, c in enumerate(col["categories"])}
+            for col in handle.meta["columns"] if col["kind"] == "category"
+        }
+
+    # ───────────────────────── 생성/연결 ──────────────────────────
+    @classmethod
+    def create(cls, df: pd.DataFrame) -> "SharedDataset":
+        arrays, meta = encode_frame(df)
+        layout, size = [], 0
+        for name, values in arrays.items():
+            size = -(-size // _ALIGN) * _ALIGN
+            layout.append((name, values.dtype.str, size, len(values)))
+            size += values.nbytes
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        handle = SharedDatasetHandle(shm.name, meta, tuple(layout))
+        dataset = cls(shm, handle, owner=True)
+        for name, values in arrays.items():
+            dataset.arrays[name][:] = values
+        for values in dataset.arrays.values():
+            values.flags.writeable = False
+        return dataset
+
+    @classmethod
+    def attach(cls, handle: SharedDatasetHandle) -> "SharedDataset":
+        return cls(shared_memory.SharedMemory(name=handle.name), handle, owner=False)
+
+    def close(self) -> None:
+        """이 프로세스의 연결만 닫는다 (배열 참조를 먼저 놓아야 닫힌다)"""
+        if self._shm is None:
+            return
+        self.arrays = {}
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ───────────────────────── 조회 ──────────────────────────
+    def __len__(self) -> int:
+        return self.handle.meta["rows"]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(values.nbytes for values in self.arrays.values())
+
+    def rows(self, univs=None, subtypes=None, depts=None) -> np.ndarray:
+        """선택 조건에 맞는 행 번호 (범주 코드 비교만, 문자열 복원 없음)"""
+        mask = np.ones(len(self), dtype=bool)
+        selection = {"univs": univs, "subtypes": subtypes, "depts": depts}
+        for col, arg in _SELECT_COLUMNS:
+            if selection[arg]:
+                codes = [self._categories[col][v] for v in selection[arg] if v in self._categories[col]]
+                mask &= np.isin(self.arrays[col], codes)
+        return np.flatnonzero(mask)
+
+    def frame(self, univs=None, subtypes=None, depts=None, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """선택된 행만 원래 형태의 DataFrame으로 복원 (조건이 없으면 전체)"""
+        if rows is None and (univs or subtypes or depts):
+            rows = self.rows(univs, subtypes, depts)
+        if rows is None:
+            return decode_frame(self.arrays, self.handle.meta)
+        return decode_frame({name: values[rows] for name, values in self.arrays.items()}, self.handle.meta)
+
+
+# ───────────────────────── 작업 프로세스 ──────────────────────────
+_worker_dataset: Optional[SharedDataset] = None
+
+
+def init_worker(handle: SharedDatasetHandle) -> None:
+    """ProcessPoolExecutor initializer: 프로세스마다 한 번 공유 블록에 연결"""
+    global _worker_dataset
+    _worker_dataset = SharedDataset.attach(handle)
+
+
+def worker_dataset() -> SharedDataset:
+    if _worker_dataset is None:
+        raise RuntimeError("init_worker()로 연결된 데이터셋이 없습니다.")
+    return _worker_dataset
@@ -0,0 +1,288 @@
+# sheet_schema.py
+# ---------------------------------------------------------------------
+# 입시 결과 워크북의 열 배치 찾기 + 워크북별 배치 캐시
+#   - detect_layout(): 첫 시트의 처음 MAX_HEADER_ROWS행만 스트리밍으로 읽어 LAYOUT_HEADERS의
+#     머리글 이름으로 필요한 열을 찾는다. .xlsx는 시트 XML을 iterparse로 앞부분만 읽고
+#     (openpyxl read_only는 <dimension>이 없는 파일에서 열 때 시트 전체를 훑는다),
+#     공유 문자열도 머리글이 가리키는 번호까지만 읽는다. .xls는 xlrd on_demand.
+#   - SheetLayout: 머리글까지 건너뛸 행 수 + 열 번호. read_excel의 skiprows/usecols로 그대로 써서
+#     본문은 여전히 필요한 열만 읽는다.
+#   - LayoutCache: 워크북 지문(경로, 수정 시각, 크기) → SheetLayout. 같은 파일을 다시 읽을 때는
+#     머리글을 다시 훑지 않는다. path를 주면 JSON 파일에 남겨 다음 실행에도 쓴다.
+#   - 머리글을 찾지 못하면 예전 고정 배치(DEFAULT_LAYOUT: 3행부터 F/J/L/R/U/AE)로 읽는다.
+# ---------------------------------------------------------------------
+import hashlib
+import json
+import os
+import posixpath
+import re
+import threading
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
+
+from instrumentation import Instrumentation
+
+RAW_COLUMNS = ("univ", "subtype", "dept", "conv_grade", "result", "all_subj_grade")
+MAX_HEADER_ROWS = 10
+DEFAULT_LAYOUT_CACHE = Path(".susi_layout_cache.json")
+
+# 열 → 허용하는 머리글 이름 (공백/괄호 제거, 소문자 비교, 앞의 이름이 우선)
+LAYOUT_HEADERS = {
+    "univ": ("대학명", "대학", "대학교", "대학교명"),
+    "subtype": ("전형명", "전형", "세부전형", "세부전형명", "전형유형"),
+    "dept": ("모집단위", "모집단위명", "학과", "학과명"),
+    "conv_grade": ("환산등급", "환산", "교과환산등급"),
+    "result": ("최종결과", "결과", "합격여부", "최종합격여부", "합불"),
+    "all_subj_grade": ("전교과100", "전교과", "전교과등급", "전교과평균"),
+}
+
+
+def _normalize(header) -> str:
+    return re.sub(r"[\s()\[\]]", "", str(header)).lower()
+
+
+@dataclass(frozen=True)
+class SheetLayout:
+    """
+    skiprows: 데이터 앞(머리글 포함)의 행 수, columns: RAW_COLUMNS 순서의 열 번호(0부터)
+    detected: 머리글로 찾았으면 True, 기본 배치면 False
+    """
+    skiprows: int
+    columns: tuple
+    detected: bool = True
+
+    @property
+    def first_row(self) -> int:
+        """첫 데이터 행의 엑셀 행 번호 (1부터)"""
+        return self.skiprows + 1
+
+    @property
+    def _sheet_order(self) -> list:
+        return sorted(zip(self.columns, RAW_COLUMNS))
+
+    @property
+    def usecols(self) -> str:
+        """read_excel usecols (시트 순서의 열 문자, 예: 'F,J,L,R,U,AE')"""
+        return ",".join(get_column_letter(idx + 1) for idx, _ in self._sheet_order)
+
+    @property
+    def names(self) -> list:
+        """read_excel이 돌려주는 열(시트 순서)에 붙일 이름"""
+        return [name for _, name in self._sheet_order]
+
+    def to_dict(self) -> dict:
+        return {"skiprows": self.skiprows, "columns": list(self.columns), "detected": self.detected}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SheetLayout":
+        return cls(int(data["skiprows"]), tuple(int(c) for c in data["columns"]), bool(data.get("detected", True)))
+
+
+# 예전 고정 배치: 머리글 2행, F(대학)/J(전형)/L(모집단위)/R(환산)/U(결과)/AE(전교과)
+DEFAULT_LAYOUT = SheetLayout(2, (5, 9, 11, 17, 20, 30), detected=False)
+
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+
+
+def _first_sheet_member(zf: zipfile.ZipFile) -> str:
+    """workbook.xml의 첫 시트가 가리키는 zip 안 경로"""
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    sheet = workbook.find(f"{_NS}sheets/{_NS}sheet")
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    target = next(r.get("Target") for r in rels if r.get("Id") == sheet.get(f"{_REL_NS}id"))
+    return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+
+
+def _shared_strings(zf: zipfile.ZipFile, upto: int) -> list:
+    """공유 문자열 0..upto번만 읽는다"""
+    if upto < 0 or "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+    strings = []
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag == f"{_NS}si":
+                strings.append("".join(t.text or "" for t in elem.iter(f"{_NS}t")))
+                elem.clear()
+                if len(strings) > upto:
+                    break
+    return strings
+
+
+def _xlsx_head_rows(path: Path, n_rows: int) -> list:
+    rows, shared = [], []  # shared: (행, 열, 공유 문자열 번호)
+    with zipfile.ZipFile(path) as zf:
+        with zf.open(_first_sheet_member(zf)) as f:
+            for _, elem in ET.iterparse(f):
+                if elem.tag != f"{_NS}row":
+                    continue
+                row_no = int(elem.get("r", len(rows) + 1))
+                if row_no > n_rows:
+                    break
+                rows += [[] for _ in range(row_no - len(rows))]
+                values = rows[row_no - 1]
+                for cell in elem.iter(f"{_NS}c"):
+                    ref = cell.get("r")
+                    col = column_index_from_string(coordinate_from_string(ref)[0]) - 1 if ref else len(values)
+                    values += [None] * (col + 1 - len(values))
+                    kind, v = cell.get("t"), cell.find(f"{_NS}v")
+                    if kind == "inlineStr":
+                        values[col] = "".join(t.text or "" for t in cell.iter(f"{_NS}t"))
+                    elif v is not None and kind == "s":
+                        shared.append((row_no - 1, col, int(v.text)))
+                    elif v is not None:
+                        values[col] = v.text
+                elem.clear()
+        strings = _shared_strings(zf, max((i for _, _, i in shared), default=-1))
+    for r, c, i in shared:
+        rows[r][c] = strings[i] if i < len(strings) else None
+    return rows
+
+
+def _head_rows(path: Path, n_rows: int) -> list:
+    """첫 시트의 처음 n_rows행 값 (본문은 읽지 않는다)"""
+    if path.suffix.lower() == ".xls":
+        import xlrd  # .xls 전용 (requirements.txt)
+        book = xlrd.open_workbook(str(path), on_demand=True)
+        try:
+            sheet = book.sheet_by_index(0)
+            return [sheet.row_values(i) for i in range(min(n_rows, sheet.nrows))]
+        finally:
+            book.release_resources()
+    return _xlsx_head_rows(path, n_rows)
+
+
+def find_layout(rows: list) -> Optional[SheetLayout]:
+    """머리글 후보 행들에서 모든 열 이름이 있는 첫 행으로 배치를 만든다 (없으면 None)"""
+    for row_idx, row in enumerate(rows):
+        positions = {}
+        for col_idx, value in enumerate(row):
+            if value is not None:
+                positions.setdefault(_normalize(value), col_idx)
+        columns = []
+        for column in RAW_COLUMNS:
+            idx = next((positions[n] for n in map(_normalize, LAYOUT_HEADERS[column]) if n in positions), None)
+            if idx is None:
+                break
+            columns.append(idx)
+        if len(columns) == len(RAW_COLUMNS) and len(set(columns)) == len(columns):
+            return SheetLayout(row_idx + 1, tuple(columns))
+    return None
+
+
+def detect_layout(path: Path, max_rows: int = MAX_HEADER_ROWS) -> Optional[SheetLayout]:
+    """워크북 머리글에서 배치를 찾는다 (못 찾으면 None)"""
+    return find_layout(_head_rows(Path(path), max_rows))
+
+
+def workbook_fingerprint(path: Path) -> Optional[str]:
+    """경로 + 수정 시각 + 크기 해시 (파일이 없으면 None)"""
+    path = Path(path)
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    payload = json.dumps([str(path.resolve()), st.st_mtime_ns, st.st_size], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class LayoutCache:
+    """
+    워크북 지문 → SheetLayout (최근 max_entries개).
+    path를 주면 바뀔 때마다 JSON으로 저장하고 다음 실행 때 읽어 온다.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = 512):
+        self.path = Path(path) if path is not None else None
+        self.max_entries = max_entries
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        if self.path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, fingerprint: str) -> Optional[SheetLayout]:
+        with self._lock:
+            layout = self._items.get(fingerprint)
+            if layout is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items.move_to_end(fingerprint)
+            return layout
+
+    def put(self, fingerprint: str, layout: SheetLayout) -> None:
+        with self._lock:
+            self._items[fingerprint] = layout
+            self._items.move_to_end(fingerprint)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+            snapshot = {k: v.to_dict() for k, v in self._items.items()}
+        if self.path is not None:
+            self._save(snapshot)
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            for key, value in data.items():
+                self._items[key] = SheetLayout.from_dict(value)
+        except (OSError, ValueError, KeyError, TypeError):
+            self._items.clear()  # 없거나 깨진 파일은 빈 캐시로 시작
+
+    def _save(self, snapshot: dict) -> None:
+        try:
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(snapshot, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"경고: 열 배치 캐시 저장 실패: {e}")
+
+
+# 프로세스 기본 캐시 (메모리). GUI/CLI는 use_layout_cache()로 파일에 남는 캐시를 쓴다.
+_default_cache = LayoutCache()
+
+
+def use_layout_cache(cache: LayoutCache) -> LayoutCache:
+    """read_input이 기본으로 쓰는 배치 캐시를 바꾼다"""
+    global _default_cache
+    _default_cache = cache
+    return cache
+
+
+def resolve_layout(path: Path, cache: Optional[LayoutCache] = None, instr: Optional[Instrumentation] = None) -> SheetLayout:
+    """
+    캐시에 있으면 그대로, 없으면 머리글을 훑어 찾고 캐시에 넣는다.
+    파일을 열 수 없으면 기본 배치를 돌려주고 (실제 오류는 본문 읽기에서 난다) 캐시하지 않는다.
+    """
+    cache = cache if cache is not None else _default_cache
+    instr = instr or Instrumentation("resolve_layout")
+    fingerprint = workbook_fingerprint(path)
+    if fingerprint is None:
+        return DEFAULT_LAYOUT
+    layout = cache.get(fingerprint)
+    if layout is not None:
+        instr.count("layout_cache_hit")
+        return layout
+    try:
+        with instr.span("schema_detect", file=Path(path).name):
+            layout = detect_layout(path)
+    except Exception as e:
+        print(f"경고: {Path(path).name} 머리글 확인 실패 ({e}), 기본 열 배치로 읽습니다.")
+        return DEFAULT_LAYOUT
+    if layout is None:
+        print(f"경고: {Path(path).name}에서 머리글을 찾지 못해 기본 열 배치({DEFAULT_LAYOUT.usecols}, "
+              f"{DEFAULT_LAYOUT.first_row}행부터)로 읽습니다.")
+        layout = DEFAULT_LAYOUT
+    cache.put(fingerprint, layout)
+    return layout
@@ -0,0 +1,233 @@
+# stats_export.py
+# ---------------------------------------------------------------------
+# 그룹별 통계 표 내보내기 (.xlsx / .csv)
+#   - 한 줄 = (대학, 모집단위, 전형) 그룹 하나. compute_stats(인원/합격률/합격선)와
+#     compute_additional_stats(결과별 평균/표준편차/변동계수/최소/사분위/최대)를
+#     환산/전교과 등급 모두 담는다.
+#   - 그룹 통계는 그룹 묶음(chunk_groups개) 단위로 정렬 + bincount로 한꺼번에 계산하고,
+#     엑셀은 openpyxl write-only 모드, CSV는 csv.writer로 묶음마다 바로 써서
+#     그룹이 수십만 개여도 메모리는 묶음 하나 크기만 쓴다.
+# ---------------------------------------------------------------------
+import csv
+import io
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from collation import HierarchyOrder
+from html_generator import select_report_rows
+from instrumentation import Instrumentation
+from selection_stats import GRADE_COLUMNS, RESULT_KEYS
+
+DEFAULT_CHUNK_GROUPS = 20_000
+SHEET_NAME = "그룹별 통계"
+
+_GRADE_LABELS = {"conv_grade": "환산", "all_subj_grade": "전교과"}
+_STAT_LABELS = ("인원", "평균", "표준편차", "변동계수(%)", "최소", "1사분위", "중앙값", "3사분위", "최대")
+_N_RESULTS = len(RESULT_KEYS) + 1  # 합격/충원합격/불합격 + 기타
+
+
+def export_columns() -> list:
+    """내보내는 표의 머리글"""
+    columns = ["대학", "모집단위", "전형", "지원자", "합격", "충원합격", "불합격", "합격률(충원 포함, %)"]
+    for col in GRADE_COLUMNS:
+        g = _GRADE_LABELS[col]
+        columns += [f"{g} 합격선 최고", f"{g} 합격선 최저", f"{g} 합격선 평균"]
+        for result in RESULT_KEYS:
+            columns += [f"{g} {result} {stat}" for stat in _STAT_LABELS]
+    return columns
+
+
+@dataclass
+class ExportResult:
+    path: Path
+    groups: int
+    rows: int
+    elapsed: float
+
+    @property
+    def groups_per_sec(self) -> float:
+        return self.groups / self.elapsed if self.elapsed > 0 else float("inf")
+
+
+def _quantile(values: np.ndarray, start: np.ndarray, n: np.ndarray, q: float) -> np.ndarray:
+    """정렬된 values에서 칸마다 [start, start+n) 구간의 선형 보간 분위수 (np.quantile과 같음)"""
+    out = np.full(len(n), np.nan)
+    ok = n > 0
+    pos = q * (n[ok] - 1)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, n[ok] - 1)
+    frac = pos - lo
+    a, b = values[start[ok] + lo], values[start[ok] + hi]
+    out[ok] = a + frac * (b - a)
+    return out
+
+
+def _grade_stats(grades: np.ndarray, gid: np.ndarray, rcode: np.ndarray, n_groups: int) -> dict:
+    """그룹 x 결과 칸별 통계 배열 (모양: n_groups x _N_RESULTS)"""
+    size = n_groups * _N_RESULTS
+    order = np.lexsort((grades, rcode, gid))        # 칸 안에서 등급 오름차순, NaN은 칸의 끝
+    cell = (gid * _N_RESULTS + rcode)[order]
+    values = grades[order]
+    valid = ~np.isnan(values)
+    start = np.searchsorted(cell, np.arange(size))
+    n = np.bincount(cell[valid], minlength=size)
+    total = np.bincount(cell[valid], weights=values[valid], minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / n
+        dev = np.bincount(cell[valid], weights=(values[valid] - mean[cell[valid]]) ** 2, minlength=size)
+        std = np.where(n > 1, np.sqrt(dev / (n - 1)), np.nan)
+        cv = np.where(mean != 0, std / mean * 100, 0.0)
+    has = n > 0
+    stats = {
+        "n": n, "sum": total, "mean": np.where(has, mean, np.nan), "std": std, "cv": np.where(has, cv, np.nan),
+        "min": np.where(has, values[np.minimum(start, len(values) - 1)] if len(values) else np.nan, np.nan),
+        "max": np.where(has, values[np.maximum(start + n - 1, 0)] if len(values) else np.nan, np.nan),
+        "q1": _quantile(values, start, n, 0.25),
+        "median": _quantile(values, start, n, 0.5),
+        "q3": _quantile(values, start, n, 0.75),
+    }
+    return {key: arr.reshape(n_groups, _N_RESULTS) for key, arr in stats.items()}
+
+
+def _chunk_rows(chunk: pd.DataFrame, keys: np.ndarray) -> list:
+    """정렬된 그룹 묶음 → 표의 줄 목록 (값은 파이썬 스칼라, 없는 값은 None)"""
+    gid = np.cumsum(np.r_[0, keys[1:] != keys[:-1]]) if len(keys) else keys
+    n_groups = int(gid[-1]) + 1 if len(gid) else 0
+    rcode = np.full(len(chunk), len(RESULT_KEYS), dtype=np.int64)
+    result = chunk["result"].to_numpy()
+    for i, key in enumerate(RESULT_KEYS):
+        rcode[result == key] = i
+    counts = np.bincount(gid * _N_RESULTS + rcode, minlength=n_groups * _N_RESULTS).reshape(n_groups, _N_RESULTS)
+    applicants = counts.sum(axis=1)
+    first = np.flatnonzero(np.r_[True, gid[1:] != gid[:-1]])
+
+    columns = [
+        chunk["univ"].to_numpy()[first], chunk["dept"].to_numpy()[first], chunk["subtype"].to_numpy()[first],
+        applicants, counts[:, 0], counts[:, 1], counts[:, 2],
+        np.round((counts[:, 0] + counts[:, 1]) / applicants * 100, 1),
+    ]
+    for col in GRADE_COLUMNS:
+        st = _grade_stats(chunk[col].to_numpy(dtype=float), gid, rcode, n_groups)
+        n_pass = st["n"][:, 0] + st["n"][:, 1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            columns += [
+                np.fmin(st["min"][:, 0], st["min"][:, 1]),
+                np.fmax(st["max"][:, 0], st["max"][:, 1]),
+                np.where(n_pass > 0, (st["sum"][:, 0] + st["sum"][:, 1]) / n_pass, np.nan),
+            ]
+        for r in range(len(RESULT_KEYS)):
+            columns += [st[key][:, r] for key in ("n", "mean", "std", "cv", "min", "q1", "median", "q3", "max")]
+
+    as_lists = []
+    for values in columns:
+        if values.dtype.kind == "f":
+            values = np.where(np.isnan(values), None, np.round(values, 4))
+        as_lists.append(values.tolist())
+    return list(zip(*as_lists))
+
+
+def iter_stats_rows(df_sorted: pd.DataFrame, chunk_groups: int = DEFAULT_CHUNK_GROUPS) -> Iterator[list]:
+    """(univ, dept, subtype) 순으로 정렬된 행에서 그룹 묶음마다 표의 줄 목록을 만든다"""
+    if df_sorted.empty:
+        return
+    keys = pd.MultiIndex.from_frame(df_sorted[["univ", "dept", "subtype"]]).codes
+    changed = np.zeros(len(df_sorted), dtype=bool)
+    for level in keys:
+        changed[1:] |= level[1:] != level[:-1]
+    starts = np.r_[0, np.flatnonzero(changed)]
+    bounds = np.r_[starts[::chunk_groups], len(df_sorted)]
+    group_id = np.cumsum(changed)
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        yield _chunk_rows(df_sorted.iloc[lo:hi], group_id[lo:hi])
+
+
+def stats_table(source, **selection) -> pd.DataFrame:
+    """선택 조건 그룹 통계를 DataFrame으로 (작은 선택/확인용, 파일은 export_stats)"""
+    df_sorted = select_report_rows(source, selection.get("depts"), selection.get("univs"), selection.get("subtypes"))
+    rows = [row for chunk in iter_stats_rows(df_sorted) for row in chunk]
+    return pd.DataFrame(rows, columns=export_columns())
+
+
+def table_bytes(table: pd.DataFrame, fmt: str) -> bytes:
+    """stats_table 결과를 export_stats와 같은 형식(csv: UTF-8 BOM, xlsx: write-only)의 파일 내용으로"""
+    # DataFrame이 None으로 바꾼 NaN은 다시 빈 칸으로
+    rows = ([None if v != v else v for v in row] for row in table.itertuples(index=False, name=None))
+    if fmt == "csv":
+        buf = io.StringIO(newline="")
+        writer = csv.writer(buf)
+        writer.writerow(export_columns())
+        writer.writerows(rows)
+        return buf.getvalue().encode("utf-8-sig")
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(SHEET_NAME)
+    ws.freeze_panes = "D2"
+    ws.append(export_columns())
+    for row in rows:
+        ws.append(row)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def export_stats(
+    source,
+    path: Path,
+    *,
+    univs: Optional[list] = None,
+    subtypes: Optional[list] = None,
+    depts: Optional[list] = None,
+    groups: Optional[list] = None,
+    order: Optional[HierarchyOrder] = None,
+    chunk_groups: int = DEFAULT_CHUNK_GROUPS,
+    instr: Optional[Instrumentation] = None,
+) -> ExportResult:
+    """
+    선택 조건(모두 비우면 전체 데이터)의 그룹 통계 표를 path에 저장.
+    확장자가 .csv면 CSV(UTF-8 BOM, 엑셀에서 바로 열림), 아니면 .xlsx (write-only)
+    source: DataFrame 또는 HistoryStore
+    """
+    instr = instr or Instrumentation("export_stats")
+    start = time.perf_counter()
+    path = Path(path)
+    df_sorted = select_report_rows(source, depts, univs, subtypes, groups, instr, order)
+    n_groups = 0
+
+    if path.suffix.lower() == ".csv":
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(export_columns())
+            for rows in _timed_chunks(df_sorted, chunk_groups, instr):
+                with instr.span("file_write"):
+                    writer.writerows(rows)
+                n_groups += len(rows)
+    else:
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(SHEET_NAME)
+        ws.freeze_panes = "D2"
+        ws.append(export_columns())
+        for rows in _timed_chunks(df_sorted, chunk_groups, instr):
+            with instr.span("file_write"):
+                for row in rows:
+                    ws.append(row)
+            n_groups += len(rows)
+        with instr.span("file_write"):
+            wb.save(path)
+
+    instr.count("export_groups", n_groups)
+    return ExportResult(path, n_groups, len(df_sorted), time.perf_counter() - start)
+
+
+def _timed_chunks(df_sorted: pd.DataFrame, chunk_groups: int, instr: Instrumentation) -> Iterator[list]:
+    chunks = iter_stats_rows(df_sorted, chunk_groups)
+    while True:
+        with instr.span("stats"):
+            rows = next(chunks, None)
+        if rows is None:
+            return
+        yield rows
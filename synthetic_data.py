@@ -0,0 +1,175 @@
+# synthetic_data.py
+# ---------------------------------------------------------------------
+# 벤치마크/테스트용 합성 입시 결과 데이터 생성기
+#   - generate_dataset(): read_input 결과와 같은 열 구성의 DataFrame
+#   - write_workbook():   read_input이 기대하는 F/J/L/R/U/AE 레이아웃의 .xlsx
+#   - generate_roster():  batch_matching.read_roster 형식의 학생 명단
+# ---------------------------------------------------------------------
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# read_input(usecols="F,L,J,R,U,AE")은 시트 순서대로 열을 읽는다.
+# F=대학, J=전형, L=모집단위, R=환산등급, U=결과, AE=전교과등급
+SHEET_COLUMNS = {
+    "univ": 6,
+    "subtype": 10,
+    "dept": 12,
+    "conv_grade": 18,
+    "result": 21,
+    "all_subj_grade": 31,
+}
+HEADER_ROWS = 2
+
+_UNIV_SYLLABLES = ["가람", "나래", "다온", "라온", "마루", "바름", "새봄", "아라", "온새", "자람",
+                   "차오", "하늘", "한빛", "은솔", "푸른", "미르", "솔빛", "해솔", "늘봄", "단비"]
+_DEPTS = ["국어국문학과", "영어영문학과", "수학과", "물리학과", "화학과", "생명과학과", "경영학과",
+          "경제학과", "행정학과", "심리학과", "컴퓨터공학과", "전자공학과", "기계공학과", "건축학과",
+          "간호학과", "약학과", "교육학과", "사회복지학과", "신문방송학과", "AI융합학부",
+          "Global Business학과", "미디어커뮤니케이션학과", "화학공학과", "산업공학과"]
+_SUBTYPES = ["학생부교과", "학생부종합", "지역균형", "논술", "농어촌", "기회균형", "특기자", "고른기회"]
+
+
+def _names(base: list, n: int, suffix: str = "") -> list:
+    """기본 이름 목록을 n개까지 늘린다 (부족하면 일련번호를 붙인다)."""
+    names = []
+    for i in range(n):
+        name = base[i % len(base)]
+        round_ = i // len(base)
+        names.append(f"{name}{suffix}" if round_ == 0 else f"{name}{suffix}{round_ + 1}")
+    return names
+
+
+def _univ_names(n: int) -> list:
+    names = []
+    for i in range(n):
+        a = _UNIV_SYLLABLES[i % len(_UNIV_SYLLABLES)]
+        b = _UNIV_SYLLABLES[(i // len(_UNIV_SYLLABLES) * 7 + i) % len(_UNIV_SYLLABLES)]
+        round_ = i // (len(_UNIV_SYLLABLES) ** 2)
+        names.append(f"{a}{b}대학교" + (f"{round_ + 1}" if round_ else ""))
+    return names
+
+
+def generate_dataset(
+    n_rows: int,
+    n_univs: int = 40,
+    n_depts: int = 30,
+    n_subtypes: int = 4,
+    *,
+    pass_ratio: float = 0.30,
+    waitlist_ratio: float = 0.15,
+    missing_ratio: float = 0.02,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    합성 입시 결과 생성.
+
+    n_depts / n_subtypes : 대학별 모집단위 수 / 모집단위별 전형 수
+    pass_ratio, waitlist_ratio : 전체 지원자 중 합격 / 충원합격 비율 (근사값)
+    missing_ratio : 등급 한쪽이 비어 있는 행의 비율
+
+    모집단위 그룹마다 대학 수준과 학과 선호도에 따른 합격선을 두고,
+    지원자 등급은 합격선 주변의 정규분포(1~9 범위)로 뽑는다.
+    합격 확률은 (합격선 - 등급)에 대한 로지스틱 함수로 정한다.
+    """
+    rng = np.random.default_rng(seed)
+    univs = _univ_names(n_univs)
+    depts = _names(_DEPTS, max(n_depts, 1))
+    subtypes = _names(_SUBTYPES, max(n_subtypes, 1))
+
+    # 그룹 정의: 대학마다 모집단위 n_depts개, 모집단위마다 전형 n_subtypes개
+    univ_level = rng.uniform(1.3, 5.5, n_univs)
+    g_univ = np.repeat(np.arange(n_univs), n_depts * n_subtypes)
+    g_dept = np.tile(np.repeat(np.arange(n_depts), n_subtypes), n_univs)
+    g_sub = np.tile(np.arange(n_subtypes), n_univs * n_depts)
+    n_groups = len(g_univ)
+    dept_pref = rng.normal(0, 0.35, n_depts)
+    sub_shift = np.linspace(-0.3, 0.6, n_subtypes)
+    cut = np.clip(univ_level[g_univ] + dept_pref[g_dept] + sub_shift[g_sub]
+                  + rng.normal(0, 0.2, n_groups), 1.0, 8.0)
+
+    # 지원자 배정 (인기 그룹일수록 지원자가 많게)
+    popularity = rng.gamma(2.0, 1.0, n_groups)
+    group = rng.choice(n_groups, size=n_rows, p=popularity / popularity.sum())
+
+    conv = np.clip(cut[group] + rng.normal(0.35, 0.9, n_rows), 1.0, 9.0).round(2)
+    all_subj = np.clip(conv + rng.normal(0.1, 0.35, n_rows), 1.0, 9.0).round(2)
+
+    # 합격 확률: 로지스틱 + 목표 비율에 맞춘 절편 (이분 탐색)
+    margin = (cut[group] - conv) / 0.45
+    target = min(max(pass_ratio + waitlist_ratio, 0.0), 1.0)
+    lo, hi = -20.0, 20.0
+    for _ in range(50):
+        mid = (lo + hi) / 2
+        if (1 / (1 + np.exp(-(margin + mid)))).mean() < target:
+            lo = mid
+        else:
+            hi = mid
+    admitted = rng.random(n_rows) < 1 / (1 + np.exp(-(margin + lo)))
+    waitlist_share = waitlist_ratio / target if target > 0 else 0.0
+    waitlisted = admitted & (rng.random(n_rows) < waitlist_share)
+    result = np.where(waitlisted, "충원합격", np.where(admitted, "합격", "불합격"))
+
+    # 등급 한쪽 결측
+    missing = rng.random(n_rows) < missing_ratio
+    which = rng.random(n_rows) < 0.5
+    conv = np.where(missing & which, np.nan, conv)
+    all_subj = np.where(missing & ~which, np.nan, all_subj)
+
+    return pd.DataFrame({
+        "univ": np.asarray(univs, dtype=object)[g_univ[group]],
+        "subtype": np.asarray(subtypes, dtype=object)[g_sub[group]],
+        "dept": np.asarray(depts, dtype=object)[g_dept[group]],
+        "conv_grade": conv,
+        "result": result.astype(object),
+        "all_subj_grade": all_subj,
+    })
+
+
+def write_workbook(df: pd.DataFrame, path: Path) -> Path:
+    """
+    read_input이 읽는 레이아웃(머리글 2행, F/J/L/R/U/AE 열)으로 .xlsx 저장.
+    openpyxl write-only 모드로 행 단위 스트리밍 기록한다.
+    """
+    from openpyxl import Workbook
+
+    path = Path(path)
+    width = max(SHEET_COLUMNS.values())
+    positions = [(SHEET_COLUMNS[col] - 1, col) for col in SHEET_COLUMNS]
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("입시결과")
+    titles = {"univ": "대학명", "subtype": "전형명", "dept": "모집단위", "conv_grade": "환산등급",
+              "result": "최종결과", "all_subj_grade": "전교과(100)"}
+    ws.append(["수시 입시 결과 (합성 데이터)"])
+    header = [None] * width
+    for idx, col in positions:
+        header[idx] = titles[col]
+    ws.append(header)
+
+    columns = [(idx, df[col].to_numpy()) for idx, col in positions]
+    for i in range(len(df)):
+        row = [None] * width
+        for idx, values in columns:
+            value = values[i]
+            if isinstance(value, float) and np.isnan(value):
+                continue
+            row[idx] = value
+        ws.append(row)
+    wb.save(path)
+    return path
+
+
+def generate_roster(n_students: int, *, missing_ratio: float = 0.02, seed: int = 0) -> pd.DataFrame:
+    """학생 명단 (이름, 학번, 환산등급, 전교과 등급 - read_roster가 찾는 머리글 그대로)"""
+    rng = np.random.default_rng(seed)
+    conv = np.round(np.clip(rng.normal(3.5, 1.3, n_students), 1.0, 9.0), 2)
+    all_subj = np.round(np.clip(conv + rng.normal(0.2, 0.4, n_students), 1.0, 9.0), 2)
+    all_subj[rng.random(n_students) < missing_ratio] = np.nan
+    return pd.DataFrame({
+        "이름": [f"학생{i + 1:04d}" for i in range(n_students)],
+        "학번": [f"{30000 + i + 1}" for i in range(n_students)],
+        "환산등급": conv,
+        "전교과 등급": all_subj,
+    })
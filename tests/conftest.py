@@ -0,0 +1,16 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def small_frame():
+    """두 대학, 다섯 행짜리 read_input 형식 데이터 (B대 국어는 환산등급 없음, A대 수학은 전교과 없음)"""
+    return pd.DataFrame({
+        'univ': ['A대', 'A대', 'B대', 'B대', 'A대'],
+        'subtype': ['교과', '종합', '교과', '교과', '교과'],
+        'dept': ['국어', '국어', '수학', '국어', '수학'],
+        'conv_grade': [1.5, 2.5, 3.0, np.nan, 2.0],
+        'result': ['합격', '불합격', '충원합격', '합격', '불합격'],
+        'all_subj_grade': [1.7, 2.4, 3.1, 2.2, np.nan],
+    })
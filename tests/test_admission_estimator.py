@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from admission_estimator import AdmissionEstimator
+from synthetic_data import generate_dataset
+
+
+def brute_force(df, univ, dept, subtype, column, grade):
+    mask = (df['univ'] == univ) & (df['dept'] == dept) & (df['subtype'] == subtype)
+    passed = df.loc[mask & df['result'].isin(['합격', '충원합격']), column].dropna()
+    return (passed >= grade).mean() if len(passed) >= 3 else np.nan
+
+
+@pytest.mark.parametrize('grade', [0.5, 2.0, 3.37, 5.0, 9.5])
+def test_likelihood_matches_brute_force(grade):
+    df = generate_dataset(3000, n_univs=5, n_depts=6, n_subtypes=3, seed=1).dropna(subset=['univ', 'dept', 'subtype'])
+    estimator = AdmissionEstimator(df)
+    ranked = estimator.score(conv_grade=grade)
+
+    assert len(ranked) > 0
+    assert ranked['likelihood'].is_monotonic_decreasing
+    for row in ranked.sample(20, random_state=0).itertuples(index=False):
+        assert row.conv_grade_likelihood == pytest.approx(
+            brute_force(df, row.univ, row.dept, row.subtype, 'conv_grade', grade)
+        )
+
+
+def test_combined_score_filters_and_min_pass():
+    df = pd.DataFrame({
+        'univ': ['A대'] * 4 + ['B대'] * 4,
+        'dept': ['국어'] * 8,
+        'subtype': ['교과'] * 8,
+        'conv_grade': [1.0, 2.0, 3.0, 4.0, 2.0, 2.5, 3.0, 1.0],
+        'result': ['합격', '충원합격', '합격', '불합격', '합격', '합격', '합격', '불합격'],
+        'all_subj_grade': [1.5, 2.5, np.nan, 4.0, 2.0, 2.0, 2.0, 1.0],
+    })
+    estimator = AdmissionEstimator(df)
+    ranked = estimator.score(conv_grade=2.0, all_subj_grade=2.0)
+
+    a = ranked.set_index('univ').loc['A대']
+    assert a['conv_grade_likelihood'] == pytest.approx(2 / 3)
+    assert np.isnan(a['all_subj_grade_likelihood'])  # 유효 등급 2개 < min_pass
+    assert a['likelihood'] == pytest.approx(2 / 3)
+    b = ranked.set_index('univ').loc['B대']
+    assert b['likelihood'] == pytest.approx(1.0)
+    assert ranked['univ'].tolist() == ['B대', 'A대']
+
+    assert estimator.score(conv_grade=2.0, univs=['A대'])['univ'].tolist() == ['A대']
+    with pytest.raises(ValueError):
+        estimator.score()
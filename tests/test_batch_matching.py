@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from admission_estimator import AdmissionEstimator
+from batch_matching import match_students, normalize_roster, read_roster, write_match_excel
+from html_generator import render_match_html
+from synthetic_data import generate_dataset, generate_roster
+
+
+@pytest.fixture(scope="module")
+def estimator():
+    df = generate_dataset(4000, n_univs=6, n_depts=8, n_subtypes=3, seed=2).dropna(subset=['univ', 'dept', 'subtype'])
+    return AdmissionEstimator(df)
+
+
+def test_read_roster_maps_headers(tmp_path):
+    path = tmp_path / 'roster.xlsx'
+    generate_roster(5, missing_ratio=0.0, seed=1).to_excel(path, index=False)
+    roster = read_roster(path)
+    assert list(roster.columns) == ['name', 'student_id', 'conv_grade', 'all_subj_grade']
+    assert len(roster) == 5
+
+    (tmp_path / 'bad.csv').write_text('학생번호,점수\n1,2\n', encoding='utf-8')
+    with pytest.raises(ValueError):
+        read_roster(tmp_path / 'bad.csv')
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, None])
+def test_batch_matches_single_lookups(estimator, chunk_size):
+    roster = normalize_roster(generate_roster(25, seed=3))
+    roster.loc[3, 'conv_grade'] = np.nan
+    result = match_students(estimator, roster, top=5, chunk_size=chunk_size)
+
+    assert result.students['recommended'].max() <= 5
+    for i, st in roster.iterrows():
+        single = estimator.score(
+            None if np.isnan(st.conv_grade) else st.conv_grade,
+            None if np.isnan(st.all_subj_grade) else st.all_subj_grade,
+            top=5,
+        )
+        batch = result.recommendations[result.recommendations['student'] == i]
+        assert batch['rank'].tolist() == list(range(1, len(single) + 1))
+        assert (batch[['univ', 'dept', 'subtype']].to_numpy() == single[['univ', 'dept', 'subtype']].to_numpy()).all()
+        assert batch['likelihood'].to_numpy() == pytest.approx(single['likelihood'].to_numpy())
+
+
+def test_outputs(estimator, tmp_path):
+    roster = normalize_roster(generate_roster(3, seed=4))
+    result = match_students(estimator, roster, top=3, min_likelihood=0.5)
+    assert (result.recommendations['likelihood'] >= 0.5).all()
+
+    write_match_excel(result, tmp_path / 'out.xlsx')
+    assert (tmp_path / 'out.xlsx').exists()
+    html = render_match_html(result.recommendations, result.students)
+    assert html.count('class="student"') == 3
@@ -0,0 +1,37 @@
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from collation import ColumnOrder, HierarchyOrder, collation_key
+from html_generator import select_sorted
+
+
+def test_collation_key_orders_hangul_digits_and_latin():
+    values = ['KAIST', '한양대', '가톨릭대', '전형10', '전형2', '1차', 'abc', 'Abd', '(특별)']
+    assert sorted(values, key=collation_key) == [
+        '(특별)', '1차', '가톨릭대', '전형2', '전형10', '한양대', 'abc', 'Abd', 'KAIST',
+    ]
+    # NFD로 풀어 쓴 한글도 같은 자리에 온다
+    nfd = unicodedata.normalize('NFD', '나래대')
+    assert sorted(['다온대', nfd, '가람대'], key=collation_key) == ['가람대', nfd, '다온대']
+
+
+def test_column_order_ranks_and_sort():
+    order = ColumnOrder(['나대', '가대', 'B대', np.nan, '가대'])
+    assert order.values == ['가대', '나대', 'B대']
+    assert order.ranks(['B대', '가대', '없음', None]).tolist() == [2, 0, 3, 3]
+    # 색인에 없는 값은 뒤에 가나다순으로
+    assert order.sort(['B대', '하대', '가대', '다대']) == ['가대', 'B대', '다대', '하대']
+
+
+def test_select_sorted_uses_collation_order():
+    df = pd.DataFrame({
+        'univ': ['KAIST', '한양대', '가톨릭대', '한양대'],
+        'dept': ['수학', '국어10', '국어', '국어2'],
+        'subtype': ['교과', '교과', '교과', '교과'],
+    })
+    expected = [('가톨릭대', '국어'), ('한양대', '국어2'), ('한양대', '국어10'), ('KAIST', '수학')]
+    for order in (None, HierarchyOrder.from_frame(df)):
+        rows = select_sorted(df, order=order)
+        assert list(zip(rows['univ'], rows['dept'])) == expected
@@ -3,7 +3,7 @@ import pandas as pd
 from pathlib import Path
 import pytest
 
-from data_processor import read_input, compute_stats, compute_additional_stats
+from data_processor import read_input, read_inputs, infer_year, compute_stats, compute_additional_stats, validate_frame, RAW_COLUMNS
 
 
 def test_read_input(monkeypatch):
@@ -27,14 +27,53 @@ def test_read_input(monkeypatch):
 
     df = read_input(Path('dummy.xlsx'))
 
+    # 파일이 없으면 머리글을 훑지 않고 기본 배치로 읽는다
     assert called['skiprows'] == 2
-    assert called['usecols'] == 'F,L,J,R,U,AE'
+    assert called['usecols'] == 'F,J,L,R,U,AE'
     assert list(df.columns) == ['univ', 'subtype', 'dept', 'conv_grade', 'result', 'all_subj_grade']
     assert len(df) == 2
     assert df['univ'].isna().sum() == 0
     assert df['result'].isna().sum() == 0
 
 
+def test_read_inputs_tags_year(monkeypatch):
+    raw = pd.DataFrame([['univ1', 'typeA', 'dept1', 1.1, '합격', 3.2]])
+    monkeypatch.setattr(pd, 'read_excel', lambda path, header=None, skiprows=None, usecols=None, engine=None: raw.copy())
+
+    assert infer_year(Path('2025_입시결과.xlsx')) == 2025
+    assert infer_year(Path('입시결과.xlsx')) is None
+    df = read_inputs([Path('2024_결과.xlsx'), Path('결과(2025).xlsx')])
+    assert df['year'].tolist() == [2024, 2025]
+    with pytest.raises(ValueError):
+        read_inputs([Path('결과.xlsx')])
+
+
+def test_validate_frame_reasons_and_labels(monkeypatch):
+    raw = pd.DataFrame([
+        ['univ1', 'typeA', 'dept1', 1.1, '합격 ', 3.2],
+        ['univ1', 'typeA', 'dept1', 0.0, '최초합격', 2.5],   # 환산등급만 범위 밖 → 비우고 남김
+        ['univ1', 'typeA', 'dept1', 12.0, '불합격', None],   # 남는 등급 없음 → 범위 밖으로 제외
+        [None, 'typeA', 'dept1', 2.0, '합격', 2.0],
+        ['univ1', 'typeA', 'dept1', '-', '추가합격', None],
+    ])
+    monkeypatch.setattr(pd, 'read_excel', lambda path, header=None, skiprows=None, usecols=None, engine=None: raw.copy())
+    reports = []
+    df = read_input(Path('dummy.xlsx'), reports=reports)
+
+    assert df['result'].tolist() == ['합격', '합격']
+    assert math.isnan(df['conv_grade'].iloc[1]) and df['all_subj_grade'].iloc[1] == 2.5
+    report = reports[0]
+    assert (report.rows_in, report.rows_kept, report.source) == (5, 2, 'dummy.xlsx')
+    # 행 번호는 엑셀 기준 (머리글 두 줄 다음부터)
+    assert {k: v.tolist() for k, v in report.rejected.items()} == {
+        'missing_required': [6], 'grade_out_of_range': [5], 'missing_grade': [7],
+    }
+    assert report.fixed == {'result_normalized': 2, 'grade_cleared': 1}
+
+    clean, again = validate_frame(raw.set_axis(RAW_COLUMNS, axis=1), 'raw')
+    assert len(clean) == 2 and again.rejected['missing_required'].tolist() == [3]
+
+
 def sample_df():
     return pd.DataFrame({
         'result': ['합격', '합격', '불합격', '충원합격', '충원합격'],
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from dataset_snapshot import DatasetRef, DatasetSnapshot, next_version
+from report_server import ReportService
+
+
+def _frame(extra_univ=None):
+    df = pd.DataFrame({
+        'univ': ['A대', 'A대', 'B대', 'B대'],
+        'subtype': ['교과', '종합', '교과', '교과'],
+        'dept': ['국어', '국어', '수학', '국어'],
+        'conv_grade': [1.5, 2.5, 3.0, np.nan],
+        'result': ['합격', '불합격', '충원합격', '합격'],
+        'all_subj_grade': [1.7, 2.4, 3.1, 2.2],
+    })
+    if extra_univ:
+        df = pd.concat([df, df.assign(univ=extra_univ)], ignore_index=True)
+    return df
+
+
+def test_publish_keeps_newest_load_and_pinned_snapshot():
+    ref = DatasetRef()
+    older, newer = next_version(), next_version()
+    late = DatasetSnapshot.from_frame(_frame(), version=older, token='old')
+    first = DatasetSnapshot.from_frame(_frame('C대'), version=newer, token='new')
+    assert ref.publish(first)
+    pinned = ref.current
+    assert not ref.publish(late)          # 먼저 시작했지만 늦게 끝난 로드는 버린다
+    assert ref.current is pinned and len(pinned.df) == 8
+
+    # 선택 상태는 복사본마다 따로, 스냅숏의 집계기는 그대로
+    view = pinned.selection()
+    view.update(univs=['A대'])
+    assert view.stats()['total_count'] == 2
+    assert pinned.aggregator.stats()['total_count'] == 8
+    assert pinned.range_index is pinned.range_index
+
+
+def test_report_service_renders_from_pinned_snapshot():
+    service = ReportService(_frame(), version='v1')
+    assert service.candidates('univ') == ['A대', 'B대']
+    report, _ = service.render(univs=['B대'])
+    assert report.rows == 2
+
+    service.publish(DatasetSnapshot.from_frame(_frame('C대'), token='v2'))
+    assert service.version == 'v2' and service.candidates('univ') == ['A대', 'B대', 'C대']
+    report, cached = service.render(univs=['C대'])
+    assert report.rows == 4 and not cached
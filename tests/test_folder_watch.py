@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from folder_watch import FolderDataset
+from selection_stats import SelectionAggregator
+from synthetic_data import generate_dataset, write_workbook
+
+
+def test_merge_matches_single_aggregator():
+    a = generate_dataset(600, n_univs=3, n_depts=4, n_subtypes=2, seed=1)
+    b = generate_dataset(400, n_univs=2, n_depts=4, n_subtypes=2, seed=2)
+    merged = SelectionAggregator.merge([SelectionAggregator(a), SelectionAggregator(b)])
+    full = SelectionAggregator(pd.concat([a, b], ignore_index=True))
+    assert merged.n_groups == full.n_groups
+    univ = a['univ'].iloc[0]
+    for agg in (merged, full):
+        agg.update(univs=[univ])
+    for col in ('conv_grade', 'all_subj_grade'):
+        got, want = merged.stats(col), full.stats(col)
+        assert got.keys() == want.keys()
+        for key, value in want.items():
+            assert got[key] == value if isinstance(value, str) else np.isclose(got[key], value)
+
+
+def test_folder_dataset_rereads_only_changed_files(tmp_path, capsys):
+    a = generate_dataset(500, n_univs=2, n_depts=3, n_subtypes=2, seed=1)
+    b = generate_dataset(300, n_univs=2, n_depts=3, n_subtypes=2, seed=2)
+    write_workbook(a, tmp_path / '2024_a.xlsx')
+    write_workbook(b, tmp_path / '2025_b.xlsx')
+
+    watch = FolderDataset(tmp_path)
+    first = watch.load()
+    assert first.rows_read == 800 and sorted(watch.df['year'].unique()) == [2024, 2025]
+    assert watch.poll() is None
+    version = watch.version
+
+    univ = b['univ'].iloc[0]
+    b.loc[b['univ'] == univ, 'conv_grade'] += 0.5
+    write_workbook(b, tmp_path / '2025_b.xlsx')
+    assert watch.poll() is None          # 첫 폴링은 복사가 끝났는지 확인만 한다
+    result = watch.poll()
+    assert [p.name for p in result.changes.changed] == ['2025_b.xlsx'] and result.rows_read == 300
+    assert result.affected and {g[0] for g in result.affected} == {univ}
+    assert result.touches(univs=[univ]) and not result.touches(univs=['없는대학교'])
+    assert watch.version != version and len(watch.df) == 800
+
+    (tmp_path / '2024_a.xlsx').unlink()
+    result = watch.poll()
+    assert [p.name for p in result.changes.removed] == ['2024_a.xlsx']
+    assert len(watch.df) == 300 and watch.aggregator.stats()['total_count'] == 300
+
+    # 읽지 못한 파일은 감시 쪽에서 따로 출력하지 않고 결과의 failed로 넘긴다
+    (tmp_path / '2026_c.xlsx').write_bytes(b'not a workbook')
+    result = watch.load()
+    assert list(result.failed) == [tmp_path / '2026_c.xlsx'] and len(watch.df) == 300
+    assert result.failure_note().startswith('읽기 실패: 2026_c.xlsx')
+    assert '감시 폴더' not in capsys.readouterr().out
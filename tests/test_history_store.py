@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processor import compute_stats
+from history_store import HistoryStore
+from html_generator import plot_selected_depts, select_sorted
+
+
+@pytest.fixture
+def store(tmp_path, small_frame):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    store.append(small_frame, year=2024, source="2024.xlsx")
+    store.append(small_frame.iloc[:2], year=2025)
+    yield store
+    store.close()
+
+
+def test_distinct_pushes_filters_down(store):
+    assert store.years() == [2024, 2025]
+    assert store.distinct("univ") == ['A대', 'B대']
+    assert store.distinct("subtype", univs=['B대']) == ['교과']
+    assert store.distinct("dept", univs=['A대'], years=[2025]) == ['국어']
+    # 자기 자신에 대한 조건은 후보 목록에 영향을 주지 않는다
+    assert store.distinct("univ", univs=['A대']) == ['A대', 'B대']
+    assert store.count(univs=['A대'], years=[2024]) == 3
+    # 바인딩 변수 상한보다 많은 선택도 한 번에 조회한다
+    many = [f'대학{i}' for i in range(40_000)] + ['B대']
+    assert store.count(univs=many, years=[2024]) == 2
+    # numpy 스칼라도 값 개수와 상관없이 같게 걸러진다
+    assert store.count(years=[np.int64(2024)]) == 5 and store.count(years=list(np.arange(2000, 2400))) == 7
+    assert store.distinct("dept", univs=many, years=list(np.arange(1000, 3000))) == ['국어', '수학']
+
+
+def test_selection_stats_matches_compute_stats(store, small_frame):
+    df = small_frame
+    for col in ("conv_grade", "all_subj_grade"):
+        expected = compute_stats(df[df['univ'] == 'A대'], col)
+        actual = store.selection_stats(col, univs=['A대'], years=[2024])
+        assert actual.keys() == expected.keys()
+        for key, value in expected.items():
+            assert actual[key] == pytest.approx(value, nan_ok=True), key
+
+
+def test_query_matches_select_sorted_and_feeds_report(store, tmp_path, small_frame):
+    expected = select_sorted(small_frame, None, None, ['교과'])
+    actual = store.query(subtypes=['교과'], years=[2024])
+    pd.testing.assert_frame_equal(
+        actual.reset_index(drop=True), expected[actual.columns].reset_index(drop=True), check_dtype=False
+    )
+
+    plot_selected_depts(store, tmp_path, None, ['A대'], None, 'db.html')
+    assert (tmp_path / 'db.html').exists()
+
+
+def test_multi_year_report_includes_trends(store, tmp_path):
+    plot_selected_depts(store, tmp_path, None, ['A대'], None, 'trend.html')
+    html = (tmp_path / 'trend.html').read_text(encoding='utf-8')
+    assert 'window.trendData' in html
+    assert '연도별 최종 합격 등급 추이 (2024~2025)' in html
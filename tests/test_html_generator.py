@@ -0,0 +1,57 @@
+import json
+import re
+
+import pytest
+
+from html_generator import REPORT_SCRIPT, render_report_html, select_report_rows
+from instrumentation import Instrumentation
+
+
+@pytest.fixture
+def script_frame(small_frame):
+    """모집단위 이름에 </script>가 들어 있는 데이터 (내장 JSON이 스크립트를 닫으면 안 된다)"""
+    return small_frame.assign(dept=['국어', '국어', '수학', '국어', '수학</script>'])
+
+
+def _report_index(html):
+    match = re.search(r"window\.reportIndex = (\{.*?\});</script>", html)
+    assert match
+    return json.loads(match.group(1).replace("<\\/", "</"))
+
+
+def test_report_embeds_search_index_for_every_section(script_frame):
+    html = render_report_html(select_report_rows(script_frame, selected_univs=['A대', 'B대']))
+    index = _report_index(html)
+    assert index["univs"] == ['A대', 'B대']
+    # 이름은 한 번씩만 싣는다
+    assert sorted(index["depts"]) == sorted(set(index["depts"]))
+    # 이름 속 "</script>"가 색인 스크립트를 끊지 않는다
+    assert '수학</script>' in index["depts"]
+
+    ids = {sec[0]: sec for sec in index["sections"]}
+    section_ids = set(re.findall(r'id="((?:subtype|dept-summary|subtype-summary)-[\d-]+)"', html))
+    assert set(ids) == section_ids
+    # 전형 구역은 세 이름을 모두, 모집단위 통합은 전형 없이, 전형별 요약은 모집단위 없이
+    _, u, d, s = ids["subtype-1-1-2"]
+    assert (index["univs"][u], index["depts"][d], index["subtypes"][s]) == ('A대', '국어', '종합')
+    assert ids["dept-summary-1-1"][3] == -1 and ids["subtype-summary-1-1"][2] == -1
+    assert 'id="report-search"' in html
+
+
+def test_plots_render_lazily():
+    assert "IntersectionObserver" in REPORT_SCRIPT
+    assert "Plotly.newPlot(plotDiv" not in REPORT_SCRIPT
+
+
+def test_identical_groups_share_one_payload(script_frame):
+    instr = Instrumentation("dedupe")
+    html = render_report_html(select_report_rows(script_frame, selected_univs=['A대', 'B대']), instr=instr)
+    counters = instr.report().counters
+    # 전형이 하나뿐인 모집단위 3곳의 "전체 전형 통합"과 A대 "전형별 요약"의 종합은
+    # 앞의 전형 플롯을 그대로 쓴다
+    assert counters["plots_deduplicated"] == 4 and counters["dedupe_bytes_saved"] > 0
+    aliases = re.findall(r'window\.plotsData\["(\d+)"\] = window\.plotsData\["(\d+)"\];', html)
+    assert len(aliases) == 4 and all(int(first) < int(plot) for plot, first in aliases)
+    plot_ids = re.findall(r'class="plot-container" id="plot-(\d+)"', html)
+    assert all(f'window.plotsData["{plot_id}"] =' in html for plot_id in plot_ids)
+    assert "재사용" in instr.report().summary()
@@ -0,0 +1,77 @@
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+
+from html_generator import plot_selected_depts
+from instrumentation import Instrumentation
+
+
+def test_nested_spans_report_self_time(tmp_path):
+    instr = Instrumentation("test")
+    with instr.span("outer"):
+        with instr.span("inner"):
+            time.sleep(0.01)
+    instr.count("rows", 3)
+    instr.count("rows", 2)
+
+    report = instr.report()
+    assert report.spans["outer"].count == 1
+    assert report.spans["inner"].total >= 0.01
+    assert report.spans["outer"].self_time < report.spans["outer"].total
+    assert report.counters["rows"] == 5
+    assert "총" in report.summary()
+
+    trace = json.loads(instr.write_trace(tmp_path / "trace.json").read_text(encoding="utf-8"))
+    complete = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert {e["name"] for e in complete} == {"outer", "inner"}
+    assert all(e["dur"] >= 0 for e in complete)
+
+
+def test_plot_selected_depts_records_stages(tmp_path):
+    df = pd.DataFrame({
+        'univ': ['A대', 'A대', 'B대'],
+        'subtype': ['교과', '교과', '종합'],
+        'dept': ['국어', '국어', '수학'],
+        'conv_grade': [1.5, 2.5, 3.0],
+        'result': ['합격', '불합격', '충원합격'],
+        'all_subj_grade': [1.7, 2.4, 3.1],
+    })
+    instr = Instrumentation("report")
+    plot_selected_depts(df, tmp_path, None, ['A대', 'B대'], None, 'out.html', instr=instr)
+
+    report = instr.report()
+    for stage in ("filter_sort", "stats", "json_encode", "html_template", "file_write"):
+        assert stage in report.spans
+    assert report.counters["rows_selected"] == 3
+
+
+def test_memory_tracing_records_peak_and_sites():
+    instr = Instrumentation("memory", trace_memory=True, top_n=3)
+    with instr.span("allocate"):
+        block = bytearray(4 * 1024 * 1024)
+        with instr.span("inner"):
+            temp = [0] * 10_000
+            del temp
+    report = instr.report()
+
+    assert report.peak_memory >= 4 * 1024 * 1024
+    assert report.spans["allocate"].mem_peak >= 4 * 1024 * 1024
+    assert report.spans["allocate"].mem_delta >= 4 * 1024 * 1024
+    assert report.top_allocations[0].stage == "allocate"
+    assert report.top_allocations[0].location.startswith("test_instrumentation.py:")
+    assert "최대 메모리" in report.summary()
+    del block
+
+
+def test_close_stops_tracemalloc_on_error_path():
+    assert not tracemalloc.is_tracing()
+    try:
+        with Instrumentation("failing", trace_memory=True) as instr:
+            with instr.span("load"):
+                raise ValueError("읽기 실패")
+    except ValueError:
+        pass
+    assert not tracemalloc.is_tracing()
+    assert instr.report().peak_memory >= 0  # 멈춘 뒤에도 보고서는 만들 수 있다
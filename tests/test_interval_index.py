@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from data_processor import compute_stats
+from html_generator import select_sorted
+from interval_index import IntervalTree, PassRangeIndex
+from selection_stats import SelectionAggregator
+from synthetic_data import generate_dataset
+
+
+def test_tree_matches_brute_force():
+    rng = np.random.default_rng(0)
+    lo = rng.uniform(1, 8, 500)
+    hi = lo + rng.exponential(0.7, 500)
+    lo[::25] = np.nan
+    tree = IntervalTree(lo, hi)
+
+    for x in np.concatenate([rng.uniform(0, 10, 50), lo[1:6], hi[1:6]]):
+        assert tree.stab(x).tolist() == np.flatnonzero((lo <= x) & (hi >= x)).tolist()
+    for a, b in rng.uniform(0, 10, (50, 2)):
+        expected = np.flatnonzero((lo <= max(a, b)) & (hi >= min(a, b)))
+        assert tree.overlap(a, b).tolist() == expected.tolist()
+
+
+@pytest.fixture(scope="module")
+def df():
+    return generate_dataset(3000, n_univs=5, n_depts=6, n_subtypes=3, seed=5).dropna(subset=['univ', 'dept', 'subtype'])
+
+
+@pytest.mark.parametrize('column', ['conv_grade', 'all_subj_grade'])
+def test_pass_ranges_match_compute_stats(df, column):
+    index = PassRangeIndex.from_frame(df)
+    table = index.query(column, 3.2)
+    assert len(table) > 0
+
+    found = set()
+    for keys, group in df.groupby(['univ', 'dept', 'subtype']):
+        stats = compute_stats(group, column)
+        if 'pass_min' in stats and stats['pass_min'] <= 3.2 <= stats['pass_max']:
+            found.add(keys)
+    assert set(zip(table['univ'], table['dept'], table['subtype'])) == found
+
+
+def test_restricted_aggregator_and_report_selection(df):
+    agg = SelectionAggregator(df)
+    index = PassRangeIndex(agg)
+    mask = index.mask('conv_grade', 2.0, 2.5)
+    groups = index.group_tuples(mask)
+    agg.restrict(mask)
+
+    selected = select_sorted(df, groups=groups)
+    assert set(zip(selected['univ'], selected['dept'], selected['subtype'])) == set(groups)
+    for column in ('conv_grade', 'all_subj_grade'):
+        expected = compute_stats(selected, column)
+        actual = agg.stats(column)
+        assert actual.keys() == expected.keys()
+        for key, value in expected.items():
+            assert actual[key] == pytest.approx(value), key
+    assert set(agg.candidates('univ')) == set(selected['univ'])
+
+    agg.restrict(None)
+    assert agg.stats('conv_grade')['total_count'] == len(df)
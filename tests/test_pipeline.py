@@ -0,0 +1,51 @@
+import pandas as pd
+
+from dataset_snapshot import DatasetSnapshot
+from instrumentation import Instrumentation
+from pipeline import ReportPipeline, from_snapshot
+from synthetic_data import generate_dataset, write_workbook
+
+
+def _stages(instr):
+    report = instr.report()
+    ran = sorted(name[len("stage:"):] for name in report.spans if name.startswith("stage:"))
+    hits = sorted(name[len("stage_hit:"):] for name in report.counters if name.startswith("stage_hit:"))
+    return ran, hits
+
+
+def test_format_change_reuses_upstream_stages(tmp_path):
+    df = generate_dataset(600, n_univs=3, n_depts=4, n_subtypes=2, seed=5)
+    write_workbook(df, tmp_path / "결과.xlsx")
+    pipe = ReportPipeline()
+    params = {"sources": [tmp_path / "결과.xlsx"], "univs": [df["univ"].iloc[0]]}
+
+    instr = Instrumentation("first")
+    html = pipe.render("html", params, instr=instr)
+    assert _stages(instr) == (["clean", "load", "render_html", "select"], [])
+    assert html.content.startswith(b"\n    <!DOCTYPE html>")
+
+    instr = Instrumentation("csv")
+    csv = pipe.render("csv", params, instr=instr)
+    assert _stages(instr) == (["aggregate", "render_csv"], ["select"])
+    table = pd.read_csv(csv.write(tmp_path / "t.csv"), encoding="utf-8-sig")
+    assert len(table) == csv.rows and table["지원자"].sum() == html.rows
+
+    # 템플릿 옵션만 바뀌면 출력 단계만, 선택 순서만 바뀌면 키가 같아 전부 재사용
+    instr = Instrumentation("budget")
+    pipe.render("html", dict(params, point_budget=50), instr=instr)
+    assert _stages(instr) == (["render_html"], ["select"])
+    instr = Instrumentation("again")
+    pipe.render("xlsx", params, instr=instr)
+    pipe.render("csv", dict(params, univs=list(reversed(params["univs"]))), instr=instr)
+    assert _stages(instr) == (["render_xlsx"], ["aggregate", "render_csv"])
+
+
+def test_snapshot_skips_load_and_clean():
+    df = generate_dataset(300, n_univs=2, n_depts=3, n_subtypes=2, seed=2)
+    snap = DatasetSnapshot.from_frame(df, token="v1")
+    pipe = ReportPipeline()
+    instr = Instrumentation("snap")
+    stats = pipe.run("aggregate", {"subtypes": [df["subtype"].iloc[0]]}, given=from_snapshot(snap), instr=instr)
+    assert _stages(instr) == (["aggregate", "select"], [])
+    assert stats.table["지원자"].sum() == (df["subtype"] == df["subtype"].iloc[0]).sum()
+    assert "load" not in pipe.keys("aggregate", {}, from_snapshot(snap))
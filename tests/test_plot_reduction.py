@@ -0,0 +1,66 @@
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+from html_generator import create_plot_data_script
+from plot_reduction import bin_histogram, box_summary, reduce_box_points, split_budget
+
+
+def test_box_summary_uses_plotly_fences():
+    values = np.array([1.0, 2.0, 2.5, 3.0, 3.5, 4.0, 9.0])
+    s = box_summary(values)
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    assert (s["q1"], s["median"], s["q3"]) == (q1, med, q3)
+    # 수염은 1.5 IQR 안의 가장 먼 실제 값, 9.0은 이상치
+    assert s["lowerfence"] == 1.0 and s["upperfence"] == 4.0
+    assert box_summary(np.array([])) == {}
+
+
+def test_reduce_box_points_is_bounded_and_deterministic():
+    rng = np.random.default_rng(0)
+    values = np.round(np.r_[rng.normal(3, 0.5, 50_000), [8.5, 8.9, 0.2]], 2)
+    outliers, sample, summary = reduce_box_points(values, 1000)
+    assert len(outliers) + len(sample) <= 1000
+    assert {8.5, 8.9, 0.2} <= set(outliers.tolist())
+    assert summary == box_summary(values)
+    again = reduce_box_points(values[::-1], 1000)
+    assert np.array_equal(again[0], outliers) and np.array_equal(again[1], sample)
+    # 층화 표본은 수염 안쪽 양 끝을 포함한다
+    assert sample.min() == summary["lowerfence"] and sample.max() == summary["upperfence"]
+
+
+def test_split_budget_and_histogram_bins():
+    assert split_budget([10, 0, 5], 100) == [10, 0, 5]
+    shares = split_budget([9000, 0, 1000, 3], 1000)
+    assert sum(shares) <= 1000 and shares[1] == 0 and shares[3] == 1
+
+    values = np.array([1.0, 1.1, 1.24, 1.25, 2.6, 9.0, np.nan])
+    xs, counts = bin_histogram(values, 1, 0.25)
+    assert xs == [1.0, 1.25, 2.6, 9.0] and counts == [3, 1, 1, 1]
+
+
+def _large_frame(n):
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        'univ': 'A대', 'subtype': '교과', 'dept': '국어',
+        'conv_grade': np.round(rng.uniform(1, 9, n), 2),
+        'result': rng.choice(['합격', '충원합격', '불합격'], n),
+        'all_subj_grade': np.round(rng.uniform(1, 9, n), 2),
+    })
+
+
+def _points(script):
+    return sum(len(json.loads(values)) for values in re.findall(r"\by: (\[[^\]]*\])", script))
+
+
+def test_plot_payload_stays_within_budget():
+    small = _large_frame(200)
+    script, _, _ = create_plot_data_script(1, small, None, None, point_budget=500)
+    assert "boxpoints: 'outliers'" in script and _points(script) == 400
+
+    big = _large_frame(20_000)
+    script, _, _ = create_plot_data_script(1, big, None, None, point_budget=500)
+    assert "q1: [" in script and "boxpoints: 'outliers'" not in script
+    assert _points(script) <= 2 * 500
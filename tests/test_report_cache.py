@@ -0,0 +1,61 @@
+from html_generator import plot_selected_depts, renderer_fingerprint, report_written
+from plot_reduction import PLOT_POINT_BUDGET
+from instrumentation import Instrumentation
+from report_cache import ReportFileCache, dataset_version
+
+
+def test_report_key_is_canonical():
+    key = ReportFileCache.report_key
+    assert key("v1", ['B대', 'A대'], None, ['국어']) == key("v1", ['A대', 'B대'], [], ['국어', '국어'])
+    assert key("v1", ['A대']) != key("v2", ['A대'])
+    assert key("v1", ['A대'], groups=[('A대', '국어', '교과')]) != key("v1", ['A대'])
+    # 렌더러 코드/옵션이 바뀌면 같은 데이터·선택이라도 다른 키
+    assert renderer_fingerprint() == renderer_fingerprint(PLOT_POINT_BUDGET, None)
+    assert renderer_fingerprint(point_budget=500) != renderer_fingerprint()
+    assert renderer_fingerprint(asset_base="/static") != renderer_fingerprint()
+    assert key("v1", ['A대'], renderer=renderer_fingerprint()) != key("v1", ['A대'])
+
+
+def test_plot_selected_depts_reuses_cached_file(tmp_path, small_frame):
+    cache = ReportFileCache(tmp_path / "cache")
+    df = small_frame
+    version = dataset_version()
+
+    first = Instrumentation("first")
+    msg = plot_selected_depts(df, tmp_path, None, ['A대'], None, "a.html", instr=first, cache=cache, dataset_version=version)
+    assert "재사용" not in msg and len(cache) == 1
+    original = (tmp_path / "a.html").read_bytes()
+
+    second = Instrumentation("second")
+    msg = plot_selected_depts(df, tmp_path, None, ['A대'], None, "b.html", instr=second, cache=cache, dataset_version=version)
+    assert "재사용" in msg and report_written(msg)
+    assert (tmp_path / "b.html").read_bytes() == original
+    assert not report_written(plot_selected_depts(df, tmp_path, None, ['없는대'], None, "c.html"))
+    report = second.report()
+    assert report.counters["report_cache_hit"] == 1 and "html_template" not in report.spans
+
+    # 출력 파일을 덮어써도 캐시 파일은 그대로
+    plot_selected_depts(df, tmp_path, None, ['B대'], None, "a.html", cache=cache, dataset_version=version)
+    plot_selected_depts(df, tmp_path, None, ['A대'], None, "c.html", cache=cache, dataset_version=version)
+    assert (tmp_path / "c.html").read_bytes() == original
+
+
+def test_lru_eviction_retain_and_reopen(tmp_path, small_frame):
+    cache_dir = tmp_path / "cache"
+    cache = ReportFileCache(cache_dir, max_entries=2)
+    df = small_frame
+    for univ in ('A대', 'B대'):
+        plot_selected_depts(df, tmp_path, None, [univ], None, "out.html", cache=cache, dataset_version="v1")
+    plot_selected_depts(df, tmp_path, ['국어'], None, None, "out.html", cache=cache, dataset_version="v2")
+    assert len(cache) == 2 and len(list(cache_dir.glob("*.html"))) == 2
+
+    # 다시 열면 색인을 읽어 이어서 쓴다
+    reopened = ReportFileCache(cache_dir, max_entries=2)
+    renderer = renderer_fingerprint()
+    assert reopened.fetch(ReportFileCache.report_key("v1", ['B대'], renderer=renderer), tmp_path / "x.html")
+    assert not reopened.fetch(ReportFileCache.report_key("v1", ['A대'], renderer=renderer), tmp_path / "y.html")
+    assert not reopened.fetch(ReportFileCache.report_key("v1", ['B대']), tmp_path / "z.html")
+
+    # 데이터셋을 다시 로드하면 다른 버전 항목은 모두 지운다
+    assert reopened.retain("v2") == 1
+    assert len(reopened) == 1 and len(list(cache_dir.glob("*.html"))) == 1
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cli import parse_job_spec
+from report_jobs import DONE, FAILED, ReportJobQueue, estimate_report_bytes
+
+
+class _Recorder:
+    """동시에 실행 중인 작업 수의 최댓값을 기록하는 runner"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = []
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, payload, instr):
+        with self._lock:
+            self.calls.append(payload)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        with instr.span("render"):
+            time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if payload == "boom":
+            raise ValueError("렌더링 실패")
+        return f"done:{payload}"
+
+
+def test_identical_pending_jobs_are_deduplicated():
+    runner = _Recorder()
+
+    async def main():
+        queue = ReportJobQueue(runner, workers=2)
+        try:
+            first = await queue.submit("k1", "a")
+            second = await queue.submit("k1", "a")
+            other = await queue.submit("k2", "b")
+            results = await asyncio.gather(queue.wait(first), queue.wait(second), queue.wait(other))
+            return queue, first, second, results
+        finally:
+            queue.close()
+
+    queue, first, second, results = asyncio.run(main())
+    assert first is second and first.requests == 2
+    assert results == ["done:a", "done:a", "done:b"]
+    assert runner.calls == ["a", "b"] and queue.deduplicated == 1
+    assert first.status == DONE and first.run_seconds >= 0.05 and "render" in first.spans
+
+
+def test_concurrency_and_memory_budget_limit_running_jobs():
+    runner = _Recorder()
+
+    async def run(max_concurrent, memory_budget, estimate):
+        queue = ReportJobQueue(runner, workers=4, max_concurrent=max_concurrent, memory_budget=memory_budget)
+        try:
+            for i in range(6):
+                await queue.submit(f"k{i}", i, estimated_bytes=estimate)
+            await queue.join()
+        finally:
+            queue.close()
+
+    asyncio.run(run(2, 10**9, 0))
+    assert runner.peak == 2
+    runner.peak = 0
+    # 예상 메모리 40 x 2 = 80 ≤ 100 이지만 3개는 상한 초과
+    asyncio.run(run(4, 100, 40))
+    assert runner.peak == 2
+    runner.peak = 0
+    # 상한보다 큰 작업도 혼자서는 실행된다
+    asyncio.run(run(4, 100, 500))
+    assert runner.peak == 1
+
+
+def test_failed_job_reports_error_and_threadsafe_api():
+    queue = ReportJobQueue(_Recorder(delay=0.01), workers=1)
+    queue.start_thread()
+    try:
+        assert queue.run_threadsafe("ok", "x", label="정상") == "done:x"
+        with pytest.raises(ValueError):
+            queue.run_threadsafe("bad", "boom")
+        jobs = {job["label"] or job["key"]: job for job in queue.jobs()}
+        assert jobs["정상"]["status"] == DONE
+        assert jobs["bad"]["status"] == FAILED and "렌더링 실패" in jobs["bad"]["error"]
+        assert queue.stats()["failed"] == 1
+    finally:
+        queue.close()
+
+
+def test_estimate_and_job_spec():
+    df = pd.DataFrame({
+        'univ': ['A대', 'A대', 'B대'], 'subtype': ['교과', '종합', '교과'], 'dept': ['국어', '국어', '수학'],
+        'conv_grade': [1.5, 2.5, np.nan], 'result': ['합격', '불합격', '합격'], 'all_subj_grade': [1.7, 2.4, 2.2],
+    })
+    assert estimate_report_bytes(df, univs=['A대']) > estimate_report_bytes(df, subtypes=['종합']) > 0
+    assert estimate_report_bytes(df, univs=['없음']) == 0
+    assert parse_job_spec("univ=A대,B대; subtype=교과") == {"univs": ['A대', 'B대'], "subtypes": ['교과'], "depts": []}
+    with pytest.raises(ValueError):
+        parse_job_spec("campus=서울")
@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import quote
+
+import pytest
+
+from report_cache import LRUCache, selection_key
+from report_server import ReportService, make_server
+
+
+@pytest.fixture
+def server(small_frame):
+    service = ReportService(small_frame, version="v1")
+    server = make_server(service, port=0, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(server, path, headers=None):
+    host, port = server.server_address[:2]
+    req = urllib.request.Request(f"http://{host}:{port}{path}", headers=headers or {})
+    try:
+        with urllib.request.urlopen(req) as res:
+            return res.status, dict(res.headers), res.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+def test_selection_key_ignores_order_and_duplicates():
+    assert selection_key("v1", ['B대', 'A대', 'A대']) == selection_key("v1", ['A대', 'B대'])
+    assert selection_key("v1", ['A대']) != selection_key("v2", ['A대'])
+    assert selection_key("v1", univs=['국어']) != selection_key("v1", depts=['국어'])
+
+
+def test_lru_cache_evicts_by_entries_and_bytes():
+    evicted = []
+    cache = LRUCache(max_entries=2, max_bytes=10, on_evict=lambda k, v: evicted.append(k))
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.get("a")                  # a가 최근 사용
+    cache.put("c", b"12")           # 항목 수 초과 → b 제거
+    assert evicted == ["b"] and "a" in cache
+    cache.put("d", b"123456789")    # 용량 초과 → a, c 제거
+    assert evicted == ["b", "a", "c"] and cache.bytes == 9
+
+
+def test_report_is_cached_and_revalidated(server):
+    path = "/report?univ=" + quote("A대")
+    status, headers, body = _get(server, path)
+    assert status == 200 and headers["X-Report-Cache"] == "miss"
+    assert "A대" in body.decode("utf-8")
+    # 공통 CSS/JS는 보고서에 넣지 않고 해시 주소로 참조
+    asset_base = server.service.asset_base
+    assert f'href="{asset_base}/report.css"' in body.decode("utf-8")
+
+    status, headers2, body2 = _get(server, path.replace("A", "%41"))
+    assert status == 200 and headers2["X-Report-Cache"] == "hit" and body2 == body
+    assert headers2["ETag"] == headers["ETag"]
+
+    status, _, body = _get(server, path, {"If-None-Match": headers["ETag"]})
+    assert status == 304 and body == b""
+    assert server.service.renders == 1
+
+
+def test_concurrent_identical_requests_render_once(server):
+    path = "/report?subtype=" + quote("교과")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(_get(server, path)[0])) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [200] * 8
+    assert server.service.renders == 1
+
+
+def test_waiters_share_failure_and_empty_result_is_remembered(small_frame):
+    service = ReportService(small_frame, version="v1")
+    calls = []
+    gate = threading.Event()
+
+    def failing(snap, univs, subtypes, depts, instr=None):
+        calls.append(subtypes)
+        gate.wait(5)
+        raise RuntimeError("렌더링 실패")
+
+    service._render = failing
+    errors = []
+
+    def request():
+        try:
+            service.render(subtypes=["교과"])
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1 and len(errors) == 6
+
+    # 빈 선택은 한 번만 고르고 이후에는 기억한 결과를 쓴다
+    del service._render
+    assert service.render(univs=["없는대"]) == (None, False)
+    service._render = failing
+    assert service.render(univs=["없는대"]) == (None, True)
+    assert len(calls) == 1
+
+
+def test_static_assets_and_errors(server):
+    base = server.service.asset_base
+    status, headers, body = _get(server, f"{base}/report.js", {"Accept-Encoding": "gzip"})
+    assert status == 200 and headers["Content-Encoding"] == "gzip"
+    assert "immutable" in headers["Cache-Control"]
+    assert _get(server, "/static/old/report.js")[0] == 404
+    assert _get(server, "/report")[0] == 400
+    assert _get(server, "/report?univ=" + quote("없는대"))[0] == 404
+    status, _, body = _get(server, "/api/candidates?dim=dept&univ=" + quote("B대"))
+    assert status == 200 and body.decode("utf-8") == '["국어", "수학"]'
+
+
+def test_job_queue_endpoints(server):
+    service = server.service
+    service.attach_jobs(workers=1)
+    try:
+        host, port = server.server_address[:2]
+        req = urllib.request.Request(f"http://{host}:{port}/api/jobs?dept=" + quote("국어"), method="POST")
+        with urllib.request.urlopen(req) as res:
+            assert res.status == 202
+        status, headers, _ = _get(server, "/report?dept=" + quote("국어"))
+        assert status == 200
+        status, _, body = _get(server, "/api/jobs")
+        payload = json.loads(body)
+        assert payload["stats"]["done"] == 1 and payload["jobs"][0]["label"] == "dept=국어"
+        assert _get(server, "/api/jobs/1")[0] == 200 and _get(server, "/api/jobs/99")[0] == 404
+        assert service.renders == 1
+    finally:
+        service.close()
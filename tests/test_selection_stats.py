@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+from data_processor import compute_stats
+from selection_stats import SelectionAggregator, YearlyTrends
+
+
+def sample_df():
+    return pd.DataFrame({
+        'univ': ['A대', 'A대', 'A대', 'B대', 'B대', 'C대', 'C대'],
+        'subtype': ['교과', '교과', '종합', '교과', '종합', '교과', '교과'],
+        'dept': ['국어', '국어', '수학', '국어', '수학', '수학', '수학'],
+        'conv_grade': [1.5, 2.5, 3.0, 2.0, None, 4.0, 1.2],
+        'result': ['합격', '불합격', '충원합격', '합격', '합격', '불합격', '충원합격'],
+        'all_subj_grade': [1.7, 2.4, 3.1, 2.2, 2.8, 4.1, None],
+    })
+
+
+def expected(df, univs, subs, depts, column):
+    if univs:
+        df = df[df['univ'].isin(univs)]
+    if subs:
+        df = df[df['subtype'].isin(subs)]
+    if depts:
+        df = df[df['dept'].isin(depts)]
+    return compute_stats(df, column)
+
+
+def assert_same(actual, exp):
+    assert set(actual) == set(exp)
+    for key, value in exp.items():
+        if isinstance(value, str):
+            assert actual[key] == value
+        else:
+            assert actual[key] == pytest.approx(value)
+
+
+def test_initial_selection_matches_full_dataset():
+    df = sample_df()
+    agg = SelectionAggregator(df)
+    for column in ('conv_grade', 'all_subj_grade'):
+        assert_same(agg.stats(column), compute_stats(df, column))
+
+
+@pytest.mark.parametrize('steps', [
+    [(['A대'], [], []), (['A대', 'C대'], [], []), (['C대'], [], [])],
+    [([], ['교과'], []), (['B대'], ['교과'], []), (['B대'], ['교과'], ['수학'])],
+    [(['A대'], ['종합'], ['국어']), ([], [], []), (['없는대학'], [], [])],
+])
+def test_incremental_updates_match_compute_stats(steps):
+    df = sample_df()
+    agg = SelectionAggregator(df)
+    for univs, subs, depts in steps:
+        agg.update(univs, subs, depts)
+        for column in ('conv_grade', 'all_subj_grade'):
+            assert_same(agg.stats(column), expected(df, univs, subs, depts, column))
+
+
+def test_yearly_trends_match_per_year_pass_stats():
+    frames = []
+    for year, shift in ((2023, 0.0), (2024, 0.5)):
+        df = sample_df()
+        df['conv_grade'] = df['conv_grade'] + shift
+        df['year'] = year
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+    trends = YearlyTrends(df)
+
+    assert trends.years == [2023, 2024]
+    trend = trends.trend('A대', '국어', '교과')
+    assert trend['years'] == [2023, 2024]
+    for i, year in enumerate(trend['years']):
+        part = df[(df['year'] == year) & (df['univ'] == 'A대') & (df['dept'] == '국어') & (df['subtype'] == '교과')]
+        stats = compute_stats(part, 'conv_grade')
+        assert trend['conv_grade']['min'][i] == pytest.approx(stats['all_pass_min'])
+        assert trend['conv_grade']['mean'][i] == pytest.approx(stats['all_pass_mean'])
+        assert trend['conv_grade']['max'][i] == pytest.approx(stats['all_pass_max'])
+    # 최종 합격 등급이 없는 해는 None
+    assert trends.trend('B대', '수학', '종합')['conv_grade']['mean'] == [None, None]
+    # 한 해만 있는 데이터에는 추이가 없다
+    assert YearlyTrends(frames[0]).trend('A대', '국어', '교과') is None
@@ -0,0 +1,101 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import session
+from columnar import decode_frame, encode_frame
+from data_processor import compute_stats
+from html_generator import plot_selected_depts
+from selection_stats import SelectionAggregator
+from session import load_session, save_dataset, save_state
+
+
+def sample_df():
+    return pd.DataFrame({
+        'univ': ['A대', 'A대', 'B대', 'C대'],
+        'subtype': ['교과', '종합', '교과', '교과'],
+        'dept': ['국어', '국어', '수학', '수학'],
+        'conv_grade': [1.35, np.nan, 2.0, 4.07],
+        'result': ['합격', '불합격', '충원합격', '합격'],
+        'all_subj_grade': [1.7, 2.4, np.nan, 3.33333],
+    })
+
+
+def test_encode_decode_round_trip():
+    df = sample_df()
+    arrays, meta = encode_frame(df)
+
+    assert arrays['univ'].dtype == np.int16
+    assert arrays['conv_grade'].dtype == np.int16       # 소수 둘째 자리까지 → 정수 코드
+    assert arrays['all_subj_grade'].dtype == np.float64  # 정밀도가 더 높으면 float 유지
+
+    restored = decode_frame(arrays, meta)
+    pd.testing.assert_frame_equal(restored, df)
+
+    # 숫자 범주는 타입을 유지하고, categorical=True면 값 배열 대신 코드 + 범주로 복원
+    coded = df.assign(dept=pd.Series([101, 101, 205, np.nan], dtype=object), result=df['result'].astype('category'))
+    arrays, meta = encode_frame(coded)
+    restored = decode_frame(arrays, json.loads(json.dumps(meta)))  # 세션 파일처럼 JSON을 거쳐도 같다
+    pd.testing.assert_frame_equal(restored, coded)
+    lazy = decode_frame(arrays, meta, categorical=True)
+    assert isinstance(lazy['univ'].dtype, pd.CategoricalDtype)
+    assert lazy['dept'].cat.categories.tolist() == [101, 205] and lazy['dept'].isna().iloc[3]
+
+
+def test_session_round_trip(tmp_path):
+    df = sample_df()
+    source = tmp_path / 'source.xlsx'
+    source.write_bytes(b'dummy')
+    save_dataset(df, SelectionAggregator(df), str(source), tmp_path / 'session')
+    save_state({'univ': ['A대'], 'subtype': [], 'dept': []}, 'out.html', tmp_path / 'session')
+
+    session = load_session(tmp_path / 'session')
+
+    assert isinstance(session.df['univ'].dtype, pd.CategoricalDtype)  # memmap 코드를 값 배열로 풀지 않음
+    pd.testing.assert_frame_equal(session.df.astype(df.dtypes.to_dict()), df)
+    assert session.selections['univ'] == ['A대']
+    assert session.output_filename == 'out.html'
+    assert session.source == str(source)
+    assert not session.source_changed
+
+    session.aggregator.update(['A대'], [], [])
+    fresh = SelectionAggregator(df)
+    fresh.update(['A대'], [], [])
+    assert session.aggregator.stats('conv_grade') == pytest.approx(fresh.stats('conv_grade'))
+    assert session.aggregator.candidates('dept', ['B대']) == ['수학']
+
+    source.write_bytes(b'changed content')
+    assert load_session(tmp_path / 'session').source_changed
+
+
+def test_restored_session_reports_match_fresh_load(tmp_path):
+    df = sample_df()
+    save_dataset(df, SelectionAggregator(df), None, tmp_path / 'session')
+    restored = load_session(tmp_path / 'session').df
+
+    for univ in ('A대', 'B대'):  # B대에는 불합격이 없다 (범주형 복원에서도 0건 키가 생기면 안 됨)
+        assert compute_stats(restored[restored['univ'] == univ]) == compute_stats(df[df['univ'] == univ])
+    plot_selected_depts(df, tmp_path, None, ['B대', 'C대'], None, 'fresh.html')
+    plot_selected_depts(restored, tmp_path, None, ['B대', 'C대'], None, 'restored.html')
+    assert (tmp_path / 'restored.html').read_text(encoding='utf-8') == (tmp_path / 'fresh.html').read_text(encoding='utf-8')
+
+
+def test_failed_save_leaves_no_stale_session(tmp_path, monkeypatch):
+    df = sample_df()
+    save_dataset(df, SelectionAggregator(df), None, tmp_path / 'session')
+    other = df.iloc[::-1].reset_index(drop=True).head(3)
+
+    def fail(session_dir, meta):
+        raise OSError('disk full')
+
+    # 배열은 모두 새로 썼는데 메타데이터를 쓰기 전에 실패: 이전 메타데이터로 새 배열을 읽으면 안 된다
+    monkeypatch.setattr(session, '_write_meta', fail)
+    with pytest.raises(OSError):
+        save_dataset(other, SelectionAggregator(other), None, tmp_path / 'session')
+    assert load_session(tmp_path / 'session') is None
+
+
+def test_missing_session_returns_none(tmp_path):
+    assert load_session(tmp_path / 'nothing') is None
@@ -0,0 +1,34 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from shared_dataset import SharedDataset, init_worker, worker_dataset
+
+
+def _select_in_worker(selection):
+    dataset = worker_dataset()
+    return dataset.frame(**selection).to_dict("list"), dataset.owner
+
+
+def test_round_trip_and_selection(small_frame):
+    df = small_frame
+    with SharedDataset.create(df) as dataset:
+        pd.testing.assert_frame_equal(dataset.frame(), df)
+        assert dataset.rows(univs=['A대'], depts=['국어']).tolist() == [0, 1]
+        assert dataset.rows(univs=['없는대']).tolist() == []
+        sub = dataset.frame(subtypes=['교과'], depts=['수학'])
+        assert sub['univ'].tolist() == ['B대', 'A대'] and np.isnan(sub['all_subj_grade'].iloc[1])
+        # 공유 배열은 읽기 전용
+        with pytest.raises(ValueError):
+            dataset.arrays['conv_grade'][0] = 0
+
+
+def test_workers_attach_by_name(small_frame):
+    df = small_frame
+    with SharedDataset.create(df) as dataset:
+        with ProcessPoolExecutor(1, initializer=init_worker, initargs=(dataset.handle,)) as pool:
+            data, owner = pool.submit(_select_in_worker, {"univs": ['B대']}).result()
+    assert data['dept'] == ['수학', '국어'] and data['conv_grade'][0] == 3.0
+    assert not owner
@@ -0,0 +1,61 @@
+import pandas as pd
+from openpyxl import Workbook
+
+import sheet_schema
+from data_processor import read_input
+from instrumentation import Instrumentation
+from sheet_schema import DEFAULT_LAYOUT, LayoutCache, detect_layout, resolve_layout
+from synthetic_data import generate_dataset, write_workbook
+
+
+def _vendor_workbook(df, path):
+    """머리글 1행, 열 하나 추가 + 순서가 다른 내보내기 파일 (공유 문자열 사용)"""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(['번호', '대학명', '비고', '모집단위', '전형명', '최종 결과', '환산등급', '전교과 (100)'])
+    for i, row in enumerate(df.itertuples(index=False)):
+        grades = [None if g != g else g for g in (row.conv_grade, row.all_subj_grade)]
+        ws.append([i + 1, row.univ, '-', row.dept, row.subtype, row.result, *grades])
+    wb.save(path)
+    return path
+
+
+def test_detects_shifted_columns_by_header(tmp_path):
+    df = generate_dataset(200, n_univs=2, n_depts=3, n_subtypes=2, seed=3)
+    vendor = _vendor_workbook(df, tmp_path / 'vendor.xlsx')
+    standard = write_workbook(df, tmp_path / 'standard.xlsx')
+
+    layout = detect_layout(vendor)
+    assert layout.skiprows == 1 and layout.usecols == 'B,D,E,F,G,H'
+    assert detect_layout(standard).columns == DEFAULT_LAYOUT.columns
+
+    reports = []
+    got = read_input(vendor, reports=reports)
+    pd.testing.assert_frame_equal(got, read_input(standard))
+    assert reports[0].rows_kept == len(df)
+
+    title_only = Workbook()
+    title_only.active.append(['입시 결과'])
+    title_only.save(tmp_path / 'plain.xlsx')
+    assert detect_layout(tmp_path / 'plain.xlsx') is None
+
+
+def test_layout_cache_skips_detection_and_persists(tmp_path, monkeypatch):
+    df = generate_dataset(50, n_univs=1, n_depts=2, n_subtypes=1, seed=1)
+    vendor = _vendor_workbook(df, tmp_path / 'vendor.xlsx')
+    cache = LayoutCache(tmp_path / 'layouts.json')
+    first = resolve_layout(vendor, cache)
+
+    def fail(path, max_rows=0):
+        raise AssertionError('detect_layout should not run on a cache hit')
+
+    monkeypatch.setattr(sheet_schema, 'detect_layout', fail)
+    instr = Instrumentation('load')
+    reloaded = LayoutCache(tmp_path / 'layouts.json')
+    assert resolve_layout(vendor, reloaded, instr) == first
+    assert instr.report().counters['layout_cache_hit'] == 1
+
+    # 파일이 바뀌면 지문이 달라져 다시 찾는다
+    _vendor_workbook(df.head(10), vendor)
+    monkeypatch.undo()
+    assert resolve_layout(vendor, reloaded) == first and len(reloaded) == 2
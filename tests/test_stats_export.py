@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from data_processor import compute_additional_stats, compute_stats
+from stats_export import export_columns, export_stats, stats_table
+
+
+def _frame():
+    rng = np.random.default_rng(3)
+    n = 400
+    df = pd.DataFrame({
+        'univ': rng.choice(['가람대', '나래대'], n),
+        'dept': rng.choice(['국어교육과', '수학과', '경영학과'], n),
+        'subtype': rng.choice(['교과', '종합'], n),
+        'result': rng.choice(['합격', '충원합격', '불합격'], n, p=[0.3, 0.2, 0.5]),
+        'conv_grade': np.round(rng.uniform(1, 6, n), 2),
+        'all_subj_grade': np.round(rng.uniform(1, 6, n), 2),
+    })
+    df.loc[::17, 'all_subj_grade'] = np.nan
+    return df
+
+
+def test_stats_table_matches_per_group_stats():
+    df = _frame()
+    table = stats_table(df)
+    assert list(table.columns) == export_columns()
+    assert len(table) == df.groupby(['univ', 'dept', 'subtype']).ngroups
+
+    row = table[(table['대학'] == '나래대') & (table['모집단위'] == '수학과') & (table['전형'] == '종합')].iloc[0]
+    group = df[(df['univ'] == '나래대') & (df['dept'] == '수학과') & (df['subtype'] == '종합')]
+    basic = compute_stats(group, 'all_subj_grade')
+    extra = compute_additional_stats(group, 'all_subj_grade')
+    assert row['지원자'] == basic['total_count']
+    assert row['전교과 합격선 최고'] == pytest.approx(basic['all_pass_min'])
+    assert row['전교과 합격선 평균'] == pytest.approx(basic['all_pass_mean'], abs=1e-4)
+    for result in ('합격', '충원합격', '불합격'):
+        assert row[f'전교과 {result} 인원'] == extra[result]['count']
+        for label, key in (('표준편차', 'std'), ('1사분위', 'q1'), ('중앙값', 'median'), ('최대', 'max')):
+            assert row[f'전교과 {result} {label}'] == pytest.approx(extra[result][key], abs=1e-4)
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.xlsx'])
+def test_export_stats_writes_every_group(tmp_path, suffix):
+    df = _frame()
+    result = export_stats(df, tmp_path / f'통계{suffix}', univs=['가람대'], chunk_groups=2)
+    expected = df[df['univ'] == '가람대'].groupby(['dept', 'subtype']).ngroups
+    assert (result.groups, result.rows) == (expected, int((df['univ'] == '가람대').sum()))
+
+    if suffix == '.csv':
+        written = pd.read_csv(result.path, encoding='utf-8-sig')
+        header, n_rows = list(written.columns), len(written)
+    else:
+        ws = load_workbook(result.path, read_only=True)['그룹별 통계']
+        rows = list(ws.iter_rows(values_only=True))
+        header, n_rows = list(rows[0]), len(rows) - 1
+    assert header == export_columns()
+    assert n_rows == expected
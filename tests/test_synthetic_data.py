@@ -0,0 +1,34 @@
+import numpy as np
+
+from data_processor import read_input
+from synthetic_data import generate_dataset, write_workbook
+
+
+def test_generate_dataset_shape_and_ratios():
+    df = generate_dataset(5000, n_univs=5, n_depts=4, n_subtypes=3, pass_ratio=0.3, waitlist_ratio=0.1, seed=7)
+
+    assert list(df.columns) == ['univ', 'subtype', 'dept', 'conv_grade', 'result', 'all_subj_grade']
+    assert len(df) == 5000
+    assert df['univ'].nunique() == 5
+    assert df['dept'].nunique() == 4
+    assert df['subtype'].nunique() == 3
+    assert df['conv_grade'].dropna().between(1, 9).all()
+    ratios = df['result'].value_counts(normalize=True)
+    assert abs(ratios['합격'] - 0.3) < 0.05
+    assert abs(ratios['충원합격'] - 0.1) < 0.05
+
+    again = generate_dataset(5000, n_univs=5, n_depts=4, n_subtypes=3, pass_ratio=0.3, waitlist_ratio=0.1, seed=7)
+    assert again.equals(df)
+
+
+def test_workbook_round_trips_through_read_input(tmp_path):
+    df = generate_dataset(300, n_univs=3, n_depts=2, n_subtypes=2, missing_ratio=0.1, seed=1)
+    path = write_workbook(df, tmp_path / 'synthetic.xlsx')
+
+    loaded = read_input(path)
+
+    assert len(loaded) == len(df)
+    for column in ('univ', 'subtype', 'dept', 'result'):
+        assert (loaded[column].to_numpy() == df[column].to_numpy()).all()
+    for column in ('conv_grade', 'all_subj_grade'):
+        assert np.allclose(loaded[column], df[column], equal_nan=True)